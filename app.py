@@ -3,34 +3,115 @@ Backend Flask - Sistema de Logística FIIS SIE
 API REST para el sistema de simulación logística
 """
 
-from flask import Flask, jsonify, request, render_template
+from flask import Flask, Response, g, jsonify, request, render_template
 from flask_cors import CORS
 import json
 import os
+import uuid
 from sistema import (
-    simular_demanda, mostrar_simulacion, exportar_pedidos_tabla,
-    procesar_dia_inventario, asignar_picking, planificar_rutas,
-    calcular_indicadores, generar_alertas, reporte_logistica,
+    mostrar_simulacion, exportar_pedidos_tabla,
+    simular_periodo, replicar_simulacion, reporte_logistica, generar_log_inventario,
     dic_sku, dic_clientes, dic_vehiculos, inventario_inicial,
-    punto_reposicion, lote_reposicion
+    punto_reposicion, AcumuladorIndicadores, __version__
 )
+from sistema.catalogos import version_catalogos
+from sistema.cache import CacheResultados, clave_contenido
+from sistema.trabajos import GestorTrabajos, ColaLlena
+from sistema.estado import crear_almacen, MAX_BYTES_ESTADO
+from sistema.alertas import motor_predeterminado
+from sistema.pedidos import a_json
 
 app = Flask(__name__)
 CORS(app)
 
-# Variables globales para almacenar el estado de la simulación
-simulacion_actual = {
-    'pedidos': {},
-    'inventario': inventario_inicial.copy(),
-    'indicadores': {},
-    'alertas': [],
-    'configuracion': {
-        'dias_simulacion': 7,
-        'capacidad_picking': 1500,
-        'mostrar_detalles': False
-    }
+# Los pedidos del pipeline son vistas de un almacén compacto: se serializan
+# como los diccionarios que representan
+_json_predeterminado = app.json.default
+
+def _a_json(valor):
+    try:
+        return a_json(valor)
+    except TypeError:
+        return _json_predeterminado(valor)
+
+app.json.default = _a_json
+
+# Límites por petición Monte Carlo: réplicas, días por réplica y procesos
+MAX_REPLICAS = int(os.environ.get('MAX_REPLICAS', 5000))
+MAX_DIAS_MONTECARLO = int(os.environ.get('MAX_DIAS_MONTECARLO', 365))
+MAX_PROCESOS_MONTECARLO = int(os.environ.get('MAX_PROCESOS_MONTECARLO', os.cpu_count() or 1))
+
+# Simulaciones en segundo plano: hilos trabajadores, trabajos activos admitidos
+# y bytes de resultados terminados que se conservan
+gestor_trabajos = GestorTrabajos(
+    max_concurrentes=int(os.environ.get('MAX_TRABAJOS_CONCURRENTES', 2)),
+    max_en_cola=int(os.environ.get('MAX_TRABAJOS_EN_COLA', 20)),
+    max_por_sesion=int(os.environ.get('MAX_TRABAJOS_POR_SESION', 3)),
+    max_bytes_resultados=int(os.environ.get('MAX_BYTES_TRABAJOS', 64 * 1024 * 1024))
+)
+
+# Resultados de corridas con semilla: la misma petición se responde sin recalcular
+cache_resultados = CacheResultados(
+    ttl=int(os.environ.get('CACHE_TTL_SEGUNDOS', 3600)),
+    max_bytes=int(os.environ.get('CACHE_MAX_BYTES', 64 * 1024 * 1024))
+)
+
+# Formatos de respuesta de /api/simular: JSON único o un evento por día
+TIPOS_TRANSMISION = {
+    'ndjson': 'application/x-ndjson',
+    'sse': 'text/event-stream'
 }
 
+# Estado de la simulación por sesión. SISTEMA_ESTADO=sqlite lo comparte entre
+# todos los procesos trabajadores; por defecto vive en memoria de cada proceso.
+almacen_estado = crear_almacen(max_bytes=int(os.environ.get('MAX_BYTES_ESTADO', MAX_BYTES_ESTADO)))
+
+def estado_inicial():
+    """Estado de una sesión sin simulaciones"""
+    return {
+        'pedidos': {},
+        'inventario': inventario_inicial.copy(),
+        'indicadores': {},
+        'acumulador': None,
+        'alertas': [],
+        'alertas_periodo': [],
+        'configuracion': {
+            'dias_simulacion': 7,
+            'capacidad_picking': 1500,
+            'mostrar_detalles': False
+        }
+    }
+
+def cargar_estado(sesion):
+    """Estado guardado de la sesión (o el inicial si no hay)"""
+    return almacen_estado.obtener(sesion) or estado_inicial()
+
+def guardar_estado(sesion, cambios):
+    """Actualiza el estado de la sesión con los campos de cambios"""
+    estado = cargar_estado(sesion)
+    estado.update(cambios)
+    almacen_estado.guardar(sesion, estado)
+    return estado
+
+def sesion_actual():
+    """
+    Identificador de la sesión del cliente: cookie 'sesion_id' o encabezado
+    X-Sesion-Id; si no trae ninguno se crea uno y se devuelve en la cookie.
+    """
+    if 'sesion_id' not in g:
+        g.sesion_id = request.cookies.get('sesion_id') or request.headers.get('X-Sesion-Id')
+        if not g.sesion_id:
+            g.sesion_id = uuid.uuid4().hex
+            g.sesion_nueva = True
+    return g.sesion_id
+
+@app.after_request
+def guardar_sesion(respuesta):
+    """Envía la cookie de sesión cuando se acaba de crear"""
+    if g.get('sesion_nueva'):
+        respuesta.set_cookie('sesion_id', g.sesion_id, httponly=True, samesite='Lax')
+    return respuesta
+
 @app.route('/')
 def index():
     """Página principal"""
@@ -49,79 +130,324 @@ def get_catalogos():
 
 @app.route('/api/simular', methods=['POST'])
 def simular():
-    """Ejecutar simulación logística"""
-    global simulacion_actual
+    """
+    Ejecutar simulación logística
     
+    Con "formato": "ndjson" o "sse" (o el encabezado Accept equivalente)
+    cada día se envía apenas termina y el servidor sólo retiene un día de
+    resultados. Con "asincrono": true se encola como trabajo en segundo plano
+    y se responde de inmediato su id (ver /api/jobs/<id>). Si no, se
+    responde un único JSON al final.
+    """
     try:
-        data = request.get_json()
-        n_dias = data.get('dias', 7)
-        capacidad_picking = data.get('capacidad_picking', 1500)
+        sesion = sesion_actual()
+        data = request.get_json() or {}
+        try:
+            n_dias = _entero_peticion(data, 'dias', 7, 1)
+            capacidad_picking = _entero_peticion(data, 'capacidad_picking', 1500, 0)
+            # Entero opcional: misma semilla => mismos resultados
+            semilla = _entero_peticion(data, 'semilla', None, 0)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        nivel_log = data.get('nivel_log', 'resumen')  # 'ninguno', 'resumen' o 'completo'
+        flota_limitada = bool(data.get('flota_limitada', False))  # Jornada y viajes finitos
+        arrastrar_backlog = bool(data.get('arrastrar_backlog', False))  # Pendientes pasan al día siguiente
+        formato = data.get('formato') or _formato_aceptado()
         
-        # Simular demanda
-        pedidos_simulados = simular_demanda(n_dias, dic_clientes, dic_sku)
+        if formato in TIPOS_TRANSMISION:
+            eventos = _transmitir_simulacion(sesion, formato, n_dias, capacidad_picking, semilla,
+                                             nivel_log, flota_limitada, arrastrar_backlog)
+            return Response(eventos, mimetype=TIPOS_TRANSMISION[formato],
+                            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
         
-        # Procesar cada día
-        resultados_completos = {}
-        indicadores_diarios = []
-        inventario_actual = inventario_inicial.copy()
+        if data.get('asincrono'):
+            # Se ejecuta en un hilo trabajador; el cliente consulta /api/jobs/<id>
+            def ejecutar(trabajo):
+                respuesta, estado = _simulacion_cacheada(n_dias, capacidad_picking, semilla, nivel_log,
+                                                         flota_limitada, arrastrar_backlog, trabajo)
+                guardar_estado(sesion, estado)
+                return respuesta
+            
+            trabajo = gestor_trabajos.enviar(sesion, ejecutar, n_dias)
+            return jsonify({
+                'success': True,
+                'trabajo_id': trabajo.id,
+                'estado_url': f"/api/jobs/{trabajo.id}"
+            }), 202
+        
+        respuesta, estado = _simulacion_cacheada(n_dias, capacidad_picking, semilla, nivel_log,
+                                                 flota_limitada, arrastrar_backlog)
+        
+        # Actualizar la simulación actual de la sesión
+        guardar_estado(sesion, estado)
+        
+        return jsonify(respuesta)
         
-        for dia in range(1, n_dias + 1):
-            dia_key = f"Dia_{dia}"
+    except ColaLlena as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 429
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def _simulacion_cacheada(n_dias, capacidad_picking, semilla, nivel_log, flota_limitada,
+                         arrastrar_backlog, trabajo=None):
+    """
+    Igual que _simulacion_completa, pero consulta primero la caché de
+    resultados. Sólo se cachean corridas con semilla (las demás no se
+    repiten); la clave incluye la versión del sistema y de los catálogos.
+    """
+    if semilla is None:
+        return _simulacion_completa(n_dias, capacidad_picking, semilla, nivel_log,
+                                    flota_limitada, arrastrar_backlog, trabajo)
+    
+    clave = clave_contenido('simular', __version__, version_catalogos(), {
+        'dias': n_dias,
+        'capacidad_picking': capacidad_picking,
+        'semilla': semilla,
+        'nivel_log': nivel_log,
+        'flota_limitada': flota_limitada,
+        'arrastrar_backlog': arrastrar_backlog
+    })
+    guardado = cache_resultados.obtener(clave)
+    if guardado is not None:
+        if trabajo is not None:
+            trabajo.avanzar(n_dias)
+        return guardado['respuesta'], guardado['estado']
+    
+    respuesta, estado = _simulacion_completa(n_dias, capacidad_picking, semilla, nivel_log,
+                                             flota_limitada, arrastrar_backlog, trabajo)
+    cache_resultados.guardar(clave, {'respuesta': respuesta, 'estado': estado})
+    return respuesta, estado
+
+def _simulacion_completa(n_dias, capacidad_picking, semilla, nivel_log, flota_limitada,
+                         arrastrar_backlog, trabajo=None):
+    """
+    Corre la simulación completa y arma la respuesta JSON de /api/simular
+    
+    Args:
+        trabajo: Trabajo en segundo plano al que informar cada día (opcional)
+    
+    Returns:
+        Tupla (respuesta, estado): estado trae pedidos, inventario,
+        indicadores y alertas para la simulación actual
+    """
+    # Procesar cada día (la demanda se simula día a día dentro del periodo)
+    pedidos_simulados = {}
+    resultados_completos = {}
+    indicadores_diarios = []
+    acumulador = AcumuladorIndicadores()
+    inventario_actual = inventario_inicial.copy()
+    alertas = []
+    
+    for dia_key, resultado_dia in simular_periodo(
+        n_dias, capacidad_picking, semilla, nivel_log=nivel_log,
+        flota_limitada=flota_limitada, arrastrar_backlog=arrastrar_backlog
+    ):
+        if nivel_log == 'completo':
+            # El log completo se arma bajo demanda: aquí sí se envía
+            generar_log_inventario(resultado_dia['inventario'])
+        
+        # Guardar resultados del día
+        pedidos_simulados[dia_key] = resultado_dia['pedidos']
+        resultados_completos[dia_key] = resultado_dia
+        inventario_actual = resultado_dia['inventario']['stock_final']
+        alertas = resultado_dia['alertas']
+        indicadores_diarios.append(resultado_dia['indicadores'])
+        acumulador.agregar_dia(resultado_dia['indicadores'], resultado_dia['pedidos'])
+        
+        if trabajo is not None:
+            trabajo.avanzar()
+    
+    respuesta = {
+        'success': True,
+        'resultados': resultados_completos,
+        'resumen': {
+            'dias_simulados': n_dias,
+            'semilla': semilla,
+            'total_pedidos': sum(len(pedidos_dia) for pedidos_dia in pedidos_simulados.values()),
+            'indicadores_finales': indicadores_diarios[-1] if indicadores_diarios else {}
+        }
+    }
+    estado = {
+        'pedidos': pedidos_simulados,
+        'inventario': inventario_actual,
+        'indicadores': indicadores_diarios,
+        'acumulador': acumulador.a_dict(),
+        'alertas': alertas,
+        'alertas_periodo': motor_predeterminado().evaluar_lote(indicadores_diarios, list(pedidos_simulados))
+    }
+    respuesta['resumen']['alertas_periodo'] = estado['alertas_periodo']
+    return respuesta, estado
+
+def _formato_aceptado():
+    """Formato de transmisión pedido por el encabezado Accept (None = JSON)"""
+    aceptado = request.headers.get('Accept', '')
+    for formato, tipo in TIPOS_TRANSMISION.items():
+        if tipo in aceptado:
+            return formato
+    return None
+
+def _evento(formato, tipo, contenido):
+    """Serializa un evento como línea NDJSON o mensaje SSE"""
+    texto = app.json.dumps({'tipo': tipo, **contenido})
+    if formato == 'sse':
+        return f"event: {tipo}\ndata: {texto}\n\n"
+    return texto + "\n"
+
+def _transmitir_simulacion(sesion, formato, n_dias, capacidad_picking, semilla, nivel_log,
+                           flota_limitada, arrastrar_backlog):
+    """
+    Genera los eventos de una simulación transmitida: uno 'dia' por día,
+    y al final 'fin' con el resumen (o 'error' si algo falla a mitad).
+    Los pedidos de cada día viajan en su evento y se descartan una vez
+    enviado; sólo se retienen los indicadores diarios y el acumulador, que
+    usan el resumen, las alertas del periodo y /api/reporte.
+    """
+    dias_simulados = []
+    total_pedidos = 0
+    indicadores_diarios = []
+    acumulador = AcumuladorIndicadores()
+    inventario_actual = inventario_inicial.copy()
+    alertas = []
+    
+    try:
+        for dia_key, resultado_dia in simular_periodo(
+            n_dias, capacidad_picking, semilla, nivel_log=nivel_log,
+            flota_limitada=flota_limitada, arrastrar_backlog=arrastrar_backlog
+        ):
+            if nivel_log == 'completo':
+                generar_log_inventario(resultado_dia['inventario'])
+            
+            dias_simulados.append(dia_key)
+            total_pedidos += len(resultado_dia['pedidos'])
+            inventario_actual = resultado_dia['inventario']['stock_final']
+            alertas = resultado_dia['alertas']
+            indicadores_diarios.append(resultado_dia['indicadores'])
+            acumulador.agregar_dia(resultado_dia['indicadores'], resultado_dia['pedidos'])
             
-            if dia_key in pedidos_simulados:
-                pedidos_dia = pedidos_simulados[dia_key]
-                
-                # Procesar inventario
-                resultado_inventario = procesar_dia_inventario(
-                    pedidos_dia, inventario_actual, punto_reposicion, lote_reposicion
-                )
-                inventario_actual = resultado_inventario['stock_final']
-                
-                # Procesar picking
-                resultados_picking = asignar_picking(dia, pedidos_dia, capacidad_picking)
-                
-                # Planificar transporte
-                resultados_transporte = planificar_rutas(dia, resultados_picking['pedidos_preparados'])
-                
-                # Calcular indicadores
-                indicadores = calcular_indicadores(
-                    len(pedidos_dia),
-                    resultados_picking['pedidos_preparados'],
-                    resultados_picking['pedidos_pendientes'],
-                    resultados_picking['unidades_preparadas'],
-                    resultados_picking['unidades_preparadas'] + resultados_picking['backlog'],
-                    resultados_transporte
-                )
-                
-                # Generar alertas
-                alertas = generar_alertas(indicadores)
-                
-                # Guardar resultados del día
-                resultados_completos[dia_key] = {
-                    'pedidos': pedidos_dia,
-                    'inventario': resultado_inventario,
-                    'picking': resultados_picking,
-                    'transporte': resultados_transporte,
-                    'indicadores': indicadores,
-                    'alertas': alertas
-                }
-                
-                indicadores_diarios.append(indicadores)
+            yield _evento(formato, 'dia', {'dia': dia_key, 'resultado': resultado_dia})
+            # No retener el día enviado mientras se simula el siguiente
+            resultado_dia = None
+        
+        alertas_periodo = motor_predeterminado().evaluar_lote(indicadores_diarios, dias_simulados)
+        guardar_estado(sesion, {
+            # Los pedidos ya se enviaron en los eventos 'dia'
+            'pedidos': {},
+            'inventario': inventario_actual,
+            'indicadores': indicadores_diarios,
+            'acumulador': acumulador.a_dict(),
+            'alertas': alertas,
+            'alertas_periodo': alertas_periodo
+        })
         
-        # Actualizar simulación actual
-        simulacion_actual['pedidos'] = pedidos_simulados
-        simulacion_actual['inventario'] = inventario_actual
-        simulacion_actual['indicadores'] = indicadores_diarios
-        simulacion_actual['alertas'] = alertas
+        yield _evento(formato, 'fin', {'resumen': {
+            'dias_simulados': n_dias,
+            'semilla': semilla,
+            'total_pedidos': total_pedidos,
+            'indicadores_finales': indicadores_diarios[-1] if indicadores_diarios else {},
+            'alertas_periodo': alertas_periodo
+        }})
+        
+    except Exception as e:
+        yield _evento(formato, 'error', {'error': str(e)})
+
+@app.route('/api/jobs', methods=['GET'])
+def listar_trabajos():
+    """Trabajos en segundo plano de la sesión (sin resultados)"""
+    return jsonify({
+        'trabajos': [t.a_dict(incluir_resultado=False) for t in gestor_trabajos.listar(sesion_actual())]
+    })
+
+@app.route('/api/jobs/<trabajo_id>', methods=['GET'])
+def estado_trabajo(trabajo_id):
+    """Progreso (días completados, ETA) y, al terminar, resultados de un trabajo"""
+    trabajo = gestor_trabajos.obtener(trabajo_id, sesion_actual())
+    if trabajo is None:
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+    
+    return jsonify(trabajo.a_dict())
+
+@app.route('/api/jobs/<trabajo_id>', methods=['DELETE'])
+def cancelar_trabajo(trabajo_id):
+    """Cancelar un trabajo en cola o en ejecución"""
+    if not gestor_trabajos.cancelar(trabajo_id, sesion_actual()):
+        return jsonify({
+            'success': False,
+            'error': 'El trabajo no existe o ya terminó'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'message': 'Cancelación solicitada'
+    })
+
+@app.route('/api/cache', methods=['GET'])
+def estadisticas_cache():
+    """Aciertos, fallos y ocupación de la caché de resultados"""
+    return jsonify(cache_resultados.estadisticas())
+
+@app.route('/api/cache', methods=['DELETE'])
+def limpiar_cache():
+    """Vaciar la caché de resultados"""
+    cache_resultados.limpiar()
+    return jsonify({
+        'success': True,
+        'message': 'Caché vaciada'
+    })
+
+def _entero_peticion(data, clave, defecto, minimo, maximo=None):
+    """
+    Entero de la petición JSON dentro de [minimo, maximo]
+    
+    Raises:
+        ValueError: Si no es un entero o está fuera del rango
+    """
+    valor = data.get(clave)
+    if valor is None:
+        return defecto
+    if isinstance(valor, bool) or not isinstance(valor, int):
+        raise ValueError(f"'{clave}' debe ser un entero")
+    if valor < minimo or (maximo is not None and valor > maximo):
+        rango = f"estar entre {minimo} y {maximo}" if maximo is not None else f"ser mayor o igual a {minimo}"
+        raise ValueError(f"'{clave}' debe {rango}")
+    return valor
+
+@app.route('/api/montecarlo', methods=['POST'])
+def montecarlo():
+    """Ejecutar réplicas Monte Carlo y devolver bandas de indicadores"""
+    try:
+        data = request.get_json() or {}
+        try:
+            n_replicas = _entero_peticion(data, 'replicas', 100, 1, MAX_REPLICAS)
+            n_dias = _entero_peticion(data, 'dias', 7, 1, MAX_DIAS_MONTECARLO)
+            capacidad_picking = _entero_peticion(data, 'capacidad_picking', 1500, 0)
+            semilla = _entero_peticion(data, 'semilla', None, 0)
+            # Nunca más procesos que el límite configurado (por defecto, los núcleos)
+            procesos = _entero_peticion(data, 'procesos', MAX_PROCESOS_MONTECARLO, 1)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        resultado = replicar_simulacion(
+            n_replicas, n_dias,
+            capacidad_picking=capacidad_picking,
+            semilla=semilla,
+            max_procesos=min(procesos, MAX_PROCESOS_MONTECARLO)
+        )
         
         return jsonify({
             'success': True,
-            'resultados': resultados_completos,
-            'resumen': {
-                'dias_simulados': n_dias,
-                'total_pedidos': sum(len(pedidos_dia) for pedidos_dia in pedidos_simulados.values()),
-                'indicadores_finales': indicadores_diarios[-1] if indicadores_diarios else {}
-            }
+            'resultados': resultado
         })
         
     except Exception as e:
@@ -133,6 +459,7 @@ def simular():
 @app.route('/api/indicadores', methods=['GET'])
 def get_indicadores():
     """Obtener indicadores de la simulación actual"""
+    simulacion_actual = cargar_estado(sesion_actual())
     if not simulacion_actual['indicadores']:
         return jsonify({
             'error': 'No hay simulación activa'
@@ -140,13 +467,39 @@ def get_indicadores():
     
     return jsonify({
         'indicadores': simulacion_actual['indicadores'],
-        'alertas': simulacion_actual['alertas']
+        'alertas': simulacion_actual['alertas'],
+        'alertas_periodo': simulacion_actual.get('alertas_periodo', [])
+    })
+
+@app.route('/api/indicadores/ventanas', methods=['GET'])
+def get_indicadores_ventanas():
+    """
+    Indicadores resumidos de la simulación actual sin la serie diaria:
+    acumulados ponderados, ventanas móviles de 7/30 días y percentiles P50/P95
+    """
+    simulacion_actual = cargar_estado(sesion_actual())
+    if not simulacion_actual.get('acumulador'):
+        return jsonify({
+            'error': 'No hay simulación activa'
+        }), 404
+    
+    acumulador = AcumuladorIndicadores.desde_dict(simulacion_actual['acumulador'])
+    return jsonify({
+        'dias': acumulador.dias,
+        'acumulados': {clave: acumulador.tasa(clave) for clave in ('OTIF', 'Fill_Rate', 'Backlog_Rate')},
+        'ventanas': acumulador.ventanas_moviles(),
+        'percentiles': acumulador.percentiles()
     })
 
 @app.route('/api/pedidos', methods=['GET'])
 def get_pedidos():
     """Obtener pedidos de la simulación actual"""
+    simulacion_actual = cargar_estado(sesion_actual())
     if not simulacion_actual['pedidos']:
+        if simulacion_actual['indicadores']:
+            return jsonify({
+                'error': 'La simulación se transmitió: sus pedidos se enviaron en los eventos de cada día'
+            }), 404
         return jsonify({
             'error': 'No hay simulación activa'
         }), 404
@@ -162,11 +515,15 @@ def get_pedidos():
 @app.route('/api/reporte', methods=['GET'])
 def get_reporte():
     """Generar reporte completo"""
-    if not simulacion_actual['pedidos']:
+    simulacion_actual = cargar_estado(sesion_actual())
+    if not simulacion_actual['indicadores']:
         return jsonify({'error': 'No hay simulación activa'}), 404
     
-    # CORRECCIÓN: Pasamos TODA la lista de indicadores, no solo el último
+    # CORRECCIÓN: Pasamos TODA la lista de indicadores, no solo el último.
+    # Si la corrida guardó su acumulador, el reporte no recorre el historial.
     lista_indicadores = simulacion_actual['indicadores']
+    if simulacion_actual.get('acumulador'):
+        lista_indicadores = AcumuladorIndicadores.desde_dict(simulacion_actual['acumulador'])
     alertas_finales = simulacion_actual['alertas']
     
     reporte_texto = reporte_logistica(
@@ -182,7 +539,8 @@ def get_reporte():
 @app.route('/api/configuracion', methods=['GET', 'POST'])
 def configuracion():
     """Obtener o actualizar configuración"""
-    global simulacion_actual
+    sesion = sesion_actual()
+    simulacion_actual = cargar_estado(sesion)
     
     if request.method == 'GET':
         return jsonify(simulacion_actual['configuracion'])
@@ -190,6 +548,7 @@ def configuracion():
     elif request.method == 'POST':
         data = request.get_json()
         simulacion_actual['configuracion'].update(data)
+        guardar_estado(sesion, {'configuracion': simulacion_actual['configuracion']})
         return jsonify({
             'success': True,
             'configuracion': simulacion_actual['configuracion']
@@ -198,19 +557,7 @@ def configuracion():
 @app.route('/api/reset', methods=['POST'])
 def reset():
     """Resetear la simulación"""
-    global simulacion_actual
-    
-    simulacion_actual = {
-        'pedidos': {},
-        'inventario': inventario_inicial.copy(),
-        'indicadores': {},
-        'alertas': [],
-        'configuracion': {
-            'dias_simulacion': 7,
-            'capacidad_picking': 1500,
-            'mostrar_detalles': False
-        }
-    }
+    almacen_estado.eliminar(sesion_actual())
     
     return jsonify({
         'success': True,
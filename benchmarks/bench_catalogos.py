@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark de catálogos: carga de un catálogo grande desde CSV (en frío y
+desde la caché compilada) y simulación de unos días sobre él
+Uso: python benchmarks/bench_catalogos.py [skus] [clientes] [dias]
+"""
+
+import os
+import sys
+import csv
+import time
+import random
+import shutil
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def escribir_catalogo(carpeta, n_skus, n_clientes, semilla=1):
+    """Genera productos.csv, clientes.csv, vehiculos.csv y zonas.csv sintéticos"""
+    rnd = random.Random(semilla)
+    zonas = [f"Zona {i:02d}" for i in range(1, 21)]
+
+    with open(os.path.join(carpeta, 'productos.csv'), 'w', newline='', encoding='utf-8') as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(['sku', 'nombre', 'unidad', 'inventario_inicial', 'punto_reposicion', 'lote_reposicion'])
+        for i in range(n_skus):
+            escritor.writerow([f"P{i:06d}", f"Producto {i}", 'cajas', rnd.randint(40, 120),
+                               rnd.randint(10, 40), rnd.randint(60, 160)])
+
+    with open(os.path.join(carpeta, 'clientes.csv'), 'w', newline='', encoding='utf-8') as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(['cliente', 'nombre', 'zona', 'x', 'y'])
+        for i in range(n_clientes):
+            escritor.writerow([f"C{i:06d}", f"Cliente {i}", rnd.choice(zonas),
+                               round(rnd.uniform(-25, 25), 2), round(rnd.uniform(-25, 25), 2)])
+
+    with open(os.path.join(carpeta, 'vehiculos.csv'), 'w', newline='', encoding='utf-8') as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(['vehiculo', 'capacidad', 'costo_km', 'tipo'])
+        for i in range(40):
+            escritor.writerow([f"V{i:02d}", rnd.choice((80, 100, 120, 150)), round(rnd.uniform(3.5, 6.5), 2), 'Camión'])
+
+    with open(os.path.join(carpeta, 'zonas.csv'), 'w', newline='', encoding='utf-8') as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(['zona', 'duracion_viaje_horas'])
+        for zona in zonas:
+            escritor.writerow([zona, rnd.choice((1.5, 2.0, 2.5, 3.0))])
+
+def main():
+    n_skus = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_clientes = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    n_dias = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    carpeta = tempfile.mkdtemp(prefix='bench_catalogos_')
+    os.environ['SISTEMA_CACHE_DIR'] = os.path.join(carpeta, 'cache')
+    try:
+        escribir_catalogo(carpeta, n_skus, n_clientes)
+        from sistema.catalogos import cargar_catalogos
+        from sistema import simular_periodo
+
+        print(f"Catálogo: {n_skus:,} SKUs | {n_clientes:,} clientes")
+        for nombre, usar_cache in (('en frío', False), ('desde caché', True)):
+            t0 = time.perf_counter()
+            compilado = cargar_catalogos(carpeta, usar_cache=usar_cache)
+            print(f"{nombre:>12}: {time.perf_counter() - t0:6.3f} s "
+                  f"({len(compilado.skus):,} SKUs, {len(compilado.zonas)} zonas)")
+
+        for flags in ({}, {'flota_limitada': True}):
+            t0 = time.perf_counter()
+            for _ in simular_periodo(n_dias, semilla=1, **flags):
+                pass
+            etiqueta = 'flota' if flags else 'ilimitada'
+            print(f"{etiqueta:>12}: {n_dias} días en {time.perf_counter() - t0:6.3f} s")
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Benchmark de generación de demanda: modo clásico vs. tabla columnar (NumPy)
+Uso: python benchmarks/bench_demanda.py [lineas_objetivo]
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sistema import dic_clientes, dic_sku, simular_demanda, simular_demanda_columnar
+
+def resumen_clasico(pedidos_por_dia):
+    """Estadísticos básicos de la salida en diccionarios"""
+    n_pedidos = [len(p) for p in pedidos_por_dia.values()]
+    lineas = [len(p['productos']) for dia in pedidos_por_dia.values() for p in dia.values()]
+    cantidades = [c for dia in pedidos_por_dia.values() for p in dia.values() for c in p['productos'].values()]
+    return np.mean(n_pedidos), np.mean(lineas), np.mean(cantidades), len(cantidades)
+
+def resumen_columnar(tabla, n_dias):
+    """Estadísticos básicos de la tabla columnar"""
+    n_lineas = tabla['cantidad'].size
+    n_pedidos = np.unique(tabla['dia'].astype(np.int64) * 1_000_000 + tabla['pedido_id']).size
+    return n_pedidos / n_dias, n_lineas / n_pedidos, tabla['cantidad'].mean(), n_lineas
+
+def medir(funcion, repeticiones=3):
+    """Mejor tiempo de varias ejecuciones y el último resultado"""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor, resultado
+
+def main():
+    lineas_objetivo = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    # ~16 pedidos/día × ~1.9 líneas/pedido
+    n_dias = max(1, lineas_objetivo // 30)
+    
+    t_clasico, pedidos = medir(lambda: simular_demanda(n_dias, dic_clientes, dic_sku))
+    t_columnar, tabla = medir(lambda: simular_demanda_columnar(n_dias, dic_clientes, dic_sku))
+    
+    print(f"Días simulados: {n_dias:,}")
+    for nombre, t, (ped, lin, cant, total) in (
+        ("clásico", t_clasico, resumen_clasico(pedidos)),
+        ("columnar", t_columnar, resumen_columnar(tabla, n_dias)),
+    ):
+        print(f"{nombre:>9}: {t:8.3f} s | {total:,} líneas | pedidos/día {ped:.2f} | "
+              f"líneas/pedido {lin:.3f} | unidades/línea {cant:.2f}")
+    print(f"Aceleración: {t_clasico / t_columnar:.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark de exportación: CSV fila a fila vs. columnar por bloques
+(tamaño en disco, tiempo de escritura y de relectura)
+Uso: python benchmarks/bench_exportacion.py [lineas] [lineas_por_dia]
+"""
+
+import os
+import sys
+import csv
+import time
+import random
+import shutil
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sistema import dic_clientes, dic_sku, exportar_datos_csv, exportar_columnar, leer_columnar
+
+def dias_sinteticos(n_lineas, lineas_por_dia, semilla=1):
+    """Genera (dia_key, {'pedidos': ...}) de a un día, ~2 líneas por pedido"""
+    rnd = random.Random(semilla)
+    clientes = list(dic_clientes)
+    skus = list(dic_sku)
+    generadas = 0
+    dia = 0
+    while generadas < n_lineas:
+        dia += 1
+        pedidos = {}
+        lineas_dia = 0
+        while lineas_dia < lineas_por_dia and generadas + lineas_dia < n_lineas:
+            cliente_id = rnd.choice(clientes)
+            productos = {rnd.choice(skus): rnd.randint(5, 40) for _ in range(rnd.randint(1, 3))}
+            pedidos[f"{dia:05d}-{len(pedidos) + 1:06d}"] = {
+                'cliente': cliente_id,
+                'productos': productos,
+                'fecha': dia,
+                'zona': dic_clientes[cliente_id]['zona']
+            }
+            lineas_dia += len(productos)
+        generadas += lineas_dia
+        yield f"Dia_{dia}", {'pedidos': pedidos}
+
+def tamano(ruta):
+    if os.path.isfile(ruta):
+        return os.path.getsize(ruta)
+    return sum(os.path.getsize(os.path.join(ruta, nombre)) for nombre in os.listdir(ruta))
+
+def main():
+    n_lineas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    lineas_por_dia = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    carpeta = tempfile.mkdtemp(prefix='bench_exportacion_')
+    try:
+        print(f"Líneas de pedido: {n_lineas:,} ({lineas_por_dia:,} por día)")
+
+        # Los mismos días, ya generados, para medir sólo la exportación
+        dias = list(dias_sinteticos(n_lineas, lineas_por_dia))
+
+        destino = os.path.join(carpeta, 'columnar')
+        t0 = time.perf_counter()
+        filas = exportar_columnar(destino, dias)['pedidos']
+        t_col = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        tabla = leer_columnar(destino, 'pedidos')
+        t_col_lectura = time.perf_counter() - t0
+        assert len(tabla['Cantidad']) == filas
+
+        archivo = os.path.join(carpeta, 'pedidos.csv')
+        t0 = time.perf_counter()
+        exportar_datos_csv({dia_key: dia['pedidos'] for dia_key, dia in dias}, None, archivo)
+        t_csv = time.perf_counter() - t0
+        del dias
+        t0 = time.perf_counter()
+        with open(archivo, newline='', encoding='utf-8') as entrada:
+            lector = csv.reader(entrada)
+            next(lector)
+            cantidades = [int(fila[5]) for fila in lector]
+        t_csv_lectura = time.perf_counter() - t0
+        assert len(cantidades) == filas
+
+        for nombre, escritura, lectura, ruta in (('csv', t_csv, t_csv_lectura, archivo),
+                                                 ('columnar', t_col, t_col_lectura, destino)):
+            print(f"{nombre:>8}: escritura {escritura:6.2f} s | relectura {lectura:6.2f} s | "
+                  f"{tamano(ruta) / 1e6:8.1f} MB")
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
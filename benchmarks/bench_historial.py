@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark de reproducción de historial: lectura día a día de un CSV y de
+una exportación columnar (velocidad, y memoria máxima sobre los primeros
+días) y, opcionalmente, el pipeline completo sobre los primeros días
+Uso: python benchmarks/bench_historial.py [pedidos_por_dia] [dias] [dias_pipeline]
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import shutil
+import tempfile
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sistema import dic_clientes, dic_sku, HistorialPedidos, simular_periodo
+from sistema.exportacion import EscritorColumnar, ESQUEMAS, MANIFIESTO
+
+def escribir_historial(ruta_csv, directorio, pedidos_por_dia, n_dias):
+    """CSV y exportación columnar con n_dias de pedidos_por_dia pedidos (día a día)"""
+    clientes = np.array(list(dic_clientes))
+    zonas = np.array([dic_clientes[c]['zona'] for c in clientes])
+    skus = np.array(list(dic_sku))
+    rng = np.random.default_rng(1)
+    os.makedirs(directorio, exist_ok=True)
+    escritor = EscritorColumnar(directorio, 'pedidos', ESQUEMAS['pedidos'])
+    lineas = 0
+    with open(ruta_csv, 'w', newline='', encoding='utf-8') as archivo:
+        writer = csv.writer(archivo)
+        writer.writerow(['Dia', 'Pedido_ID', 'Cliente', 'Zona', 'SKU', 'Cantidad'])
+        for dia in range(1, n_dias + 1):
+            por_pedido = rng.integers(1, 4, size=pedidos_por_dia)
+            pedido = np.repeat(np.arange(pedidos_por_dia), por_pedido)
+            cliente = rng.integers(0, clientes.size, size=pedidos_por_dia)[pedido]
+            sku = (rng.integers(0, skus.size, size=pedido.size))
+            columnas = [[f"Dia_{dia}"] * pedido.size, [f"{dia}-{p}" for p in pedido.tolist()],
+                        clientes[cliente].tolist(), zonas[cliente].tolist(), skus[sku].tolist(),
+                        rng.integers(5, 41, size=pedido.size).tolist()]
+            writer.writerows(zip(*columnas))
+            escritor.extender(columnas)
+            lineas += pedido.size
+    with open(os.path.join(directorio, MANIFIESTO), 'w', encoding='utf-8') as archivo:
+        json.dump({'version': 1, 'tablas': {'pedidos': escritor.cerrar()}}, archivo, ensure_ascii=False)
+    return lineas
+
+def pico_memoria(historial, dias=2):
+    """Memoria máxima leyendo los primeros días (tracemalloc frena mucho la lectura)"""
+    tracemalloc.start()
+    for i, _ in enumerate(historial, 1):
+        if i == dias:
+            break
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return pico
+
+def medir(nombre, ruta):
+    historial = HistorialPedidos(ruta)
+    t0 = time.perf_counter()
+    for _ in historial:
+        pass
+    segundos = time.perf_counter() - t0
+    pico = pico_memoria(HistorialPedidos(ruta))
+    resumen = historial.resumen()
+    print(f"{nombre:>9}: {segundos:6.2f} s | {resumen['lineas'] / segundos / 1e6:5.2f} M líneas/s | "
+          f"{resumen['pedidos'] / segundos / 1e3:6.1f} k pedidos/s | memoria máx {pico / 1e6:6.1f} MB")
+    return segundos
+
+def main():
+    pedidos_por_dia = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    n_dias = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    dias_pipeline = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    carpeta = tempfile.mkdtemp()
+    try:
+        ruta_csv = os.path.join(carpeta, 'historial.csv')
+        directorio = os.path.join(carpeta, 'columnar')
+        lineas = escribir_historial(ruta_csv, directorio, pedidos_por_dia, n_dias)
+        print(f"Pedidos/día: {pedidos_por_dia:,} | días {n_dias} | líneas {lineas:,} | "
+              f"CSV {os.path.getsize(ruta_csv) / 1e6:.0f} MB")
+
+        t_csv = medir('csv', ruta_csv)
+        medir('columnar', directorio)
+        print(f"Un año (365 días) por CSV: ~{t_csv / n_dias * 365 / 60:.1f} min de lectura")
+
+        if dias_pipeline:
+            t0 = time.perf_counter()
+            for _ in simular_periodo(dias_pipeline, capacidad_picking=pedidos_por_dia * 50,
+                                     pedidos_por_dia=HistorialPedidos(ruta_csv), nivel_log='ninguno'):
+                pass
+            print(f" pipeline: {(time.perf_counter() - t0) / dias_pipeline:6.2f} s por día")
+    finally:
+        shutil.rmtree(carpeta)
+
+if __name__ == '__main__':
+    main()
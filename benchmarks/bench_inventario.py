@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark de inventario: costo por día según el tamaño del catálogo
+Compara el esquema anterior (copia del stock por pedido) con LibroStock.
+Uso: python benchmarks/bench_inventario.py [pedidos_por_dia]
+"""
+
+import os
+import sys
+import time
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sistema.inventario import LibroStock, procesar_dia_libro, procesar_dia_inventario, reservar_y_actualizar
+
+def crear_catalogo(n_skus):
+    """Stock, punto de reorden y lote sintéticos para n_skus productos"""
+    skus = [f"S{i:06d}" for i in range(n_skus)]
+    stock = {sku: 500 for sku in skus}
+    punto = {sku: 50 for sku in skus}
+    lote = {sku: 400 for sku in skus}
+    return skus, stock, punto, lote
+
+def crear_pedidos(skus, n_pedidos, rnd):
+    """Pedidos de 1 a 3 líneas sobre SKUs al azar"""
+    return {
+        f"{i:06d}": {'productos': {rnd.choice(skus): rnd.randint(5, 40) for _ in range(rnd.randint(1, 3))}}
+        for i in range(n_pedidos)
+    }
+
+def dia_copia_por_pedido(pedidos_dia, stock):
+    """Esquema anterior: dos copias completas del stock por pedido"""
+    stock_actual = stock.copy()
+    for pedido in pedidos_dia.values():
+        stock_anterior = stock_actual.copy()
+        stock_actual, _, _ = reservar_y_actualizar(stock_actual, pedido)
+    return stock_actual
+
+def medir(funcion, repeticiones=3):
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor
+
+def main():
+    n_pedidos = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rnd = random.Random(1)
+    
+    print(f"Pedidos por día: {n_pedidos:,}")
+    print(f"{'SKUs':>8} | {'copia/pedido':>12} | {'wrapper dict':>12} | {'LibroStock':>10}")
+    for n_skus in (5, 1_000, 5_000, 20_000):
+        skus, stock, punto, lote = crear_catalogo(n_skus)
+        pedidos = crear_pedidos(skus, n_pedidos, rnd)
+        
+        t_copia = medir(lambda: dia_copia_por_pedido(pedidos, stock), repeticiones=1)
+        t_wrapper = medir(lambda: procesar_dia_inventario(pedidos, stock, punto, lote))
+        # El libro persiste entre días: se crea una vez fuera de la medición
+        libro = LibroStock(stock, punto, lote)
+        t_libro = medir(lambda: procesar_dia_libro(pedidos, libro))
+        
+        print(f"{n_skus:>8,} | {t_copia * 1000:>9.1f} ms | {t_wrapper * 1000:>9.1f} ms | {t_libro * 1000:>7.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Benchmark del log de inventario: tiempo y tamaño de la respuesta de
+/api/simular según el nivel de log
+Uso: python benchmarks/bench_log_inventario.py [dias]
+"""
+
+import os
+import sys
+import json
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sistema import dic_clientes, dic_sku, simular_demanda, simular_periodo, generar_log_inventario, a_json
+
+def correr(pedidos, n_dias, nivel_log):
+    """Simula el periodo y serializa como lo hace /api/simular"""
+    t0 = time.perf_counter()
+    resultados = {}
+    for dia_key, resultado in simular_periodo(n_dias, 1500, 1, pedidos_por_dia=pedidos, nivel_log=nivel_log):
+        if nivel_log == 'completo':
+            generar_log_inventario(resultado['inventario'])
+        resultados[dia_key] = resultado
+    t_simulacion = time.perf_counter() - t0
+    
+    t0 = time.perf_counter()
+    tamano = len(json.dumps({'success': True, 'resultados': resultados}, default=a_json).encode('utf-8'))
+    t_json = time.perf_counter() - t0
+    return t_simulacion, t_json, tamano
+
+def main():
+    n_dias = int(sys.argv[1]) if len(sys.argv) > 1 else 90
+    pedidos = simular_demanda(n_dias, dic_clientes, dic_sku, semilla=1)
+    
+    print(f"Días simulados: {n_dias}")
+    for nivel in ('completo', 'resumen', 'ninguno'):
+        mejor = min((correr(pedidos, n_dias, nivel) for _ in range(5)), key=lambda r: r[0] + r[1])
+        t_sim, t_json, tamano = mejor
+        print(f"{nivel:>9}: simulación {t_sim * 1000:7.1f} ms | JSON {t_json * 1000:6.1f} ms | "
+              f"respuesta {tamano / 1024:8.1f} KiB")
+
+if __name__ == '__main__':
+    main()
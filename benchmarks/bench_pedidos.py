@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Benchmark de pedidos: diccionarios anidados vs. AlmacenPedidos compacto
+(memoria de la demanda y del picking del día)
+Uso: python benchmarks/bench_pedidos.py [pedidos]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sistema import dic_clientes, dic_sku, simular_demanda_columnar, tabla_a_pedidos_por_dia, asignar_picking
+from sistema.pedidos import AlmacenPedidos
+
+def medir(nombre, armar, capacidad):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    pedidos = armar()
+    t_armado = time.perf_counter() - t0
+    memoria_pedidos = tracemalloc.get_traced_memory()[0]
+
+    t0 = time.perf_counter()
+    resultado = asignar_picking(1, pedidos, capacidad, semilla=1, estrategia='fifo')
+    t_picking = time.perf_counter() - t0
+    memoria_total = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"{nombre:>12}: armado {t_armado:6.2f} s | picking {t_picking:6.2f} s | "
+          f"pedidos {memoria_pedidos / 1e6:7.1f} MB | con picking {memoria_total / 1e6:7.1f} MB | "
+          f"preparados {len(resultado['pedidos_preparados']):,}")
+
+def main():
+    n_pedidos = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    # Un solo día con n_pedidos: se generan ~16 por día y se renumeran
+    n_dias = max(1, n_pedidos // 16)
+    tabla = simular_demanda_columnar(n_dias, dic_clientes, dic_sku, np.random.default_rng(1))
+    tabla['dia'] = np.ones_like(tabla['dia'])
+    capacidad = int(tabla['cantidad'].sum() * 0.8)
+
+    print(f"Pedidos: {len(np.unique(tabla['pedido_id'])):,} | líneas {tabla['cantidad'].size:,}")
+    medir('diccionarios', lambda: tabla_a_pedidos_por_dia(tabla, dic_clientes)['Dia_1'], capacidad)
+    medir('compacto', lambda: AlmacenPedidos.desde_tabla(tabla, dic_clientes).vista(), capacidad)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark de perfiles de demanda: sorteo de SKUs con tabla de alias vs.
+Generator.choice con probabilidades, y generación de días con mucha demanda
+Uso: python benchmarks/bench_perfiles.py [skus] [pedidos_por_dia] [dias]
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sistema import PerfilDemanda, TablaAlias, simular_demanda_perfil
+
+def main():
+    n_skus = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    pedidos_por_dia = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    n_dias = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    dic_sku = {f"SKU{i:06d}": {'nombre': f"Producto {i}"} for i in range(n_skus)}
+    dic_clientes = {f"C{i:05d}": {'nombre': f"Cliente {i}", 'zona': f"Zona {i % 5}"} for i in range(20_000)}
+
+    pesos = np.arange(1, n_skus + 1, dtype=np.float64) ** -1.1
+    rng = np.random.default_rng(1)
+    sorteos = pedidos_por_dia * 2
+
+    t0 = time.perf_counter()
+    alias = TablaAlias(pesos)
+    t_armado = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(n_dias):
+        alias.muestrear(rng, sorteos)
+    t_alias = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    probabilidades = pesos / pesos.sum()
+    for _ in range(n_dias):
+        rng.choice(n_skus, size=sorteos, p=probabilidades)
+    t_choice = time.perf_counter() - t0
+
+    print(f"SKUs: {n_skus:,} | sorteos/día {sorteos:,} | días {n_dias}")
+    print(f"   choice(p): {t_choice:6.2f} s")
+    print(f"       alias: {t_alias:6.2f} s (+ armado {t_armado:.2f} s una vez)")
+
+    perfil = PerfilDemanda(pedidos_dia=(pedidos_por_dia * 9 // 10, pedidos_por_dia * 11 // 10),
+                           multiplicador_semana=(1.0, 1.0, 1.1, 1.1, 1.3, 0.8, 0.4),
+                           amplitud_estacional=0.2, zipf_skus=1.1,
+                           pesos_clientes={c: 20.0 for c in list(dic_clientes)[:200]},
+                           promociones=[{'desde': 3, 'hasta': 5, 'skus': list(dic_sku)[500:520], 'factor': 50}])
+    t0 = time.perf_counter()
+    tabla = simular_demanda_perfil(n_dias, perfil, dic_clientes, dic_sku, semilla=1)
+    t_perfil = time.perf_counter() - t0
+    ids = np.unique(tabla['pedido_id'])
+    print(f"      perfil: {t_perfil:6.2f} s | pedidos {ids.size:,} (IDs únicos) | líneas {tabla['cantidad'].size:,}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Benchmark de picking: orden aleatorio histórico vs. planificación por
+prioridad y olas
+Uso: python benchmarks/bench_picking.py [pedidos] [capacidad]
+"""
+
+import os
+import sys
+import time
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sistema import dic_clientes, dic_sku, asignar_picking
+
+def crear_pedidos(n_pedidos, dia, rnd):
+    """Pedidos de 1-3 SKUs; algunos vienen atrasados de días anteriores"""
+    clientes = list(dic_clientes)
+    skus = list(dic_sku)
+    pedidos = {}
+    for i in range(n_pedidos):
+        cliente_id = rnd.choice(clientes)
+        pedidos[f"{i + 1:06d}"] = {
+            'cliente': cliente_id,
+            'productos': {rnd.choice(skus): rnd.randint(5, 40) for _ in range(rnd.randint(1, 3))},
+            'fecha': max(1, dia - rnd.choice((0, 0, 0, 1, 2, 3))),
+            'zona': dic_clientes[cliente_id]['zona']
+        }
+    return pedidos
+
+def main():
+    n_pedidos = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    capacidad = int(sys.argv[2]) if len(sys.argv) > 2 else 600_000
+    dia = 5
+    pedidos = crear_pedidos(n_pedidos, dia, random.Random(1))
+    
+    print(f"Pedidos: {n_pedidos:,} | capacidad {capacidad:,} unidades")
+    for estrategia, objetivo in (('aleatoria', 'unidades'), ('olas', 'unidades'), ('olas', 'pedidos')):
+        t0 = time.perf_counter()
+        r = asignar_picking(dia, pedidos, capacidad, semilla=1, estrategia=estrategia, objetivo=objetivo)
+        t = time.perf_counter() - t0
+        atrasados = sum(1 for p in r['pedidos_pendientes'].values() if p['fecha'] < dia - 2)
+        olas = f"olas {len(r['olas']):>6,}" if 'olas' in r else " " * 11
+        print(f"{estrategia:>9}/{objetivo:<8}: {t:6.3f} s | preparados {len(r['pedidos_preparados']):>6,} | "
+              f"unidades {r['unidades_preparadas']:>8,} | vencidos sin preparar {atrasados:>5,} | {olas}")
+
+if __name__ == '__main__':
+    main()
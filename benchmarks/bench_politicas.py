@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Benchmark del optimizador de políticas (s,Q) / (s,S): tiempo para elegir
+punto de reposición y lote de un catálogo grande con varios escenarios
+Uso: python benchmarks/bench_politicas.py [skus] [dias] [escenarios] [procesos]
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sistema.politicas import optimizar_politicas, escenarios_demanda, NIVELES_Z, FACTORES_LOTE
+
+def main():
+    n_skus = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    n_dias = int(sys.argv[2]) if len(sys.argv) > 2 else 365
+    n_escenarios = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    max_procesos = int(sys.argv[4]) if len(sys.argv) > 4 else None
+
+    # Historia sintética: tasas lognormales y demanda intermitente en la cola
+    rng = np.random.default_rng(1)
+    tasas = rng.lognormal(mean=2.0, sigma=1.0, size=n_skus)
+    activa = rng.random((180, n_skus)) < np.clip(tasas / 10, 0.05, 1.0)
+    historia = rng.poisson(tasas, size=(180, n_skus)) * activa
+    demanda = escenarios_demanda(historia, n_escenarios, n_dias, rng)
+    skus = [f"P{i:06d}" for i in range(n_skus)]
+
+    n_candidatos = len(NIVELES_Z) * len(FACTORES_LOTE)
+    print(f"SKUs: {n_skus:,} | días: {n_dias} | escenarios: {n_escenarios} | "
+          f"candidatos por SKU: {n_candidatos} | procesos: {max_procesos or os.cpu_count()}")
+    for politica in ('sQ', 'sS'):
+        t0 = time.perf_counter()
+        resultado = optimizar_politicas(demanda, skus, politica=politica, max_procesos=max_procesos)
+        resumen = resultado['resumen']
+        print(f"{politica:>4}: {time.perf_counter() - t0:7.2f} s | cumplen {resumen['skus_cumplen']:,} | "
+              f"costo/día {resumen['costo_total_dia']:,.0f} | fill rate mínimo {resumen['fill_rate_minimo']:.1f}%")
+
+if __name__ == '__main__':
+    main()
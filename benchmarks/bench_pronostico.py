@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Benchmark de pronóstico: ajuste vectorizado de muchas series y
+actualización incremental de un día (sin reajustar)
+Uso: python benchmarks/bench_pronostico.py [series] [dias]
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sistema.pronostico import PronosticoDemanda, MODELOS
+
+def main():
+    n_series = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    n_dias = int(sys.argv[2]) if len(sys.argv) > 2 else 365
+    rng = np.random.default_rng(1)
+    # Mezcla de series regulares e intermitentes
+    tasas = rng.choice([0.2, 1.0, 15.0], size=n_series)
+    historia = rng.poisson(tasas, size=(n_dias, n_series))
+    dia_nuevo = rng.poisson(tasas)
+    claves = [f"SKU{i:06d}" for i in range(n_series)]
+
+    print(f"Series: {n_series:,} | días {n_dias}")
+    for modelo in MODELOS:
+        pronostico = PronosticoDemanda(claves, modelo)
+        t0 = time.perf_counter()
+        pronostico.ajustar(historia)
+        t_ajuste = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        pronostico.actualizar(dia_nuevo)
+        t_dia = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        puntos = pronostico.puntos_reposicion(tiempo_entrega=3)
+        t_puntos = time.perf_counter() - t0
+        print(f"{modelo:>12}: ajuste {t_ajuste:6.2f} s | día nuevo {t_dia * 1000:6.1f} ms | "
+              f"puntos {t_puntos * 1000:6.1f} ms ({len(puntos):,} SKUs)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark de reposición con tiempos de entrega: lista de órdenes recorrida
+cada día vs. buffer circular de TransitoReposicion (costo por llegada)
+Uso: python benchmarks/bench_reposicion.py [ordenes_por_dia] [dias] [tiempo_maximo]
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sistema import TransitoReposicion
+
+def con_lista(ordenes_por_dia, tiempos):
+    """Órdenes en una lista: cada día se recorre entera para ver qué llega"""
+    en_camino, recibidas, t_recibir = [], 0, 0.0
+    for dia, tiempos_dia in enumerate(tiempos, start=1):
+        t0 = time.perf_counter()
+        quedan = []
+        for orden in en_camino:
+            if orden[0] <= dia:
+                recibidas += orden[2]
+            else:
+                quedan.append(orden)
+        en_camino = quedan
+        t_recibir += time.perf_counter() - t0
+        for sku, tiempo in enumerate(tiempos_dia.tolist()):
+            en_camino.append((dia + tiempo, sku, 1))
+    return recibidas, t_recibir
+
+def con_transito(ordenes_por_dia, tiempos):
+    transito = TransitoReposicion({}, tiempo_defecto=(1, int(tiempos.max())))
+    recibidas, t_recibir = 0, 0.0
+    for dia, tiempos_dia in enumerate(tiempos, start=1):
+        t0 = time.perf_counter()
+        recibidas += sum(transito.recibir(dia).values())
+        t_recibir += time.perf_counter() - t0
+        for sku, tiempo in enumerate(tiempos_dia.tolist()):
+            # Tiempo ya sorteado: se fija para comparar con la lista
+            transito.tiempos[sku] = tiempo
+            transito.pedir(dia, sku, 1)
+    return recibidas, t_recibir
+
+def main():
+    ordenes_por_dia = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    dias = int(sys.argv[2]) if len(sys.argv) > 2 else 90
+    tiempo_maximo = int(sys.argv[3]) if len(sys.argv) > 3 else 60
+    tiempos = np.random.default_rng(1).integers(1, tiempo_maximo + 1, size=(dias, ordenes_por_dia))
+
+    print(f"Órdenes/día: {ordenes_por_dia:,} | días {dias} | tiempos de entrega 1-{tiempo_maximo}")
+    for nombre, funcion in (('lista', con_lista), ('buffer', con_transito)):
+        t0 = time.perf_counter()
+        recibidas, t_recibir = funcion(ordenes_por_dia, tiempos)
+        print(f"{nombre:>8}: total {time.perf_counter() - t0:6.2f} s | recibir {t_recibir:6.2f} s | "
+              f"recibidas {recibidas:,}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Benchmark del ruteo por distancia (ahorros + 2-opt)
+Uso: python benchmarks/bench_ruteo.py [paradas] [clientes]
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sistema.ruteo import matriz_distancias, construir_rutas, distancia_ruta
+
+def main():
+    n_paradas = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_clientes = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    rng = np.random.default_rng(1)
+    
+    # Clientes repartidos alrededor de cinco centros de zona (km)
+    centros = np.array([(0, 18), (0, -20), (16, 2), (-14, 0), (2, 3)], dtype=float)
+    puntos = centros[rng.integers(0, 5, n_clientes)] + rng.normal(0, 3, (n_clientes, 2))
+    coordenadas = {f"K{i:05d}": tuple(p) for i, p in enumerate(puntos.tolist())}
+    
+    t0 = time.perf_counter()
+    indice, matriz = matriz_distancias(coordenadas, (0.0, 0.0))
+    t_matriz = time.perf_counter() - t0
+    
+    clientes = list(coordenadas)
+    ubicaciones = [indice[clientes[i]] for i in rng.integers(0, n_clientes, n_paradas)]
+    cargas = rng.integers(5, 121, n_paradas).tolist()
+    
+    t0 = time.perf_counter()
+    rutas = construir_rutas(ubicaciones, cargas, matriz, 150)
+    t_rutas = time.perf_counter() - t0
+    
+    km = sum(distancia_ruta([ubicaciones[p] for p in ruta], matriz) for ruta in rutas)
+    km_directo = sum(2 * matriz[0, u] for u in ubicaciones)
+    
+    print(f"Paradas: {n_paradas:,} | clientes: {n_clientes:,}")
+    print(f"Matriz de distancias: {t_matriz * 1000:.1f} ms (caché en disco en siguientes corridas)")
+    print(f"Construcción de rutas: {t_rutas * 1000:.1f} ms | {len(rutas):,} rutas | "
+          f"{km:,.0f} km (viajes directos: {km_directo:,.0f} km)")
+
+if __name__ == '__main__':
+    main()
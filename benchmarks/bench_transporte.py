@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Benchmark de planificación de rutas: planificador aleatorio histórico
+vs. empaque first-fit / best-fit decreasing
+Uso: python benchmarks/bench_transporte.py [pedidos_por_zona] [zonas]
+"""
+
+import os
+import sys
+import time
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sistema import dic_clientes, dic_sku, planificar_rutas
+
+def crear_pedidos(pedidos_por_zona, n_zonas, rnd):
+    """Pedidos preparados (1-3 SKUs de 5-40 unidades) repartidos por zona"""
+    clientes_por_zona = {}
+    for cliente_id, cliente in dic_clientes.items():
+        clientes_por_zona.setdefault(cliente['zona'], []).append(cliente_id)
+    zonas = list(clientes_por_zona)[:n_zonas]
+    
+    pedidos = {}
+    for zona in zonas:
+        for _ in range(pedidos_por_zona):
+            productos = {rnd.choice(list(dic_sku)): rnd.randint(5, 40) for _ in range(rnd.randint(1, 3))}
+            pedidos[f"{len(pedidos) + 1:06d}"] = {
+                'cliente': rnd.choice(clientes_por_zona[zona]),
+                'productos': productos,
+                'zona': zona,
+                'total_unidades': sum(productos.values())
+            }
+    return pedidos
+
+def main():
+    pedidos_por_zona = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    n_zonas = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    pedidos = crear_pedidos(pedidos_por_zona, n_zonas, random.Random(1))
+    
+    print(f"Pedidos: {len(pedidos):,} ({pedidos_por_zona:,} por zona, {n_zonas} zonas)")
+    for estrategia in ('aleatoria', 'ffd', 'bfd'):
+        t0 = time.perf_counter()
+        stats = planificar_rutas(1, pedidos, semilla=1, estrategia=estrategia)['estadisticas']
+        t = time.perf_counter() - t0
+        print(f"{estrategia:>9}: {t:8.3f} s | viajes {stats['total_vehiculos_usados']:>6,} | "
+              f"utilización {stats['utilizacion_promedio']:5.1f}% | costo S/ {stats['costo_total']:,.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -3,14 +3,33 @@ Sistema de Logística FIIS SIE
 Paquete principal para simulación y análisis de operaciones logísticas
 """
 
-from .catalogos import dic_sku, dic_clientes, dic_vehiculos, inventario_inicial, punto_reposicion, lote_reposicion
-from .demanda import simular_demanda, mostrar_simulacion, exportar_pedidos_tabla
-from .inventario import reservar_y_actualizar, reponer_simple, procesar_dia_inventario
+from .aleatorio import generador_numpy, generador_python, derivar_semilla
+from .catalogos import (dic_sku, dic_clientes, dic_vehiculos, inventario_inicial, punto_reposicion, lote_reposicion,
+                        jornada_flota_horas, duracion_viaje_zona, cargar_catalogos, catalogo_compilado,
+                        CatalogoCompilado)
+from .demanda import (simular_demanda, simular_demanda_dia, simular_demanda_columnar,
+                      tabla_a_pedidos_por_dia, mostrar_simulacion, exportar_pedidos_tabla)
+from .perfiles import (PerfilDemanda, TablaAlias, simular_demanda_perfil, simular_demanda_dia_perfil,
+                       PEDIDOS_POR_DIA_MAX)
+from .inventario import (reservar_y_actualizar, reponer_simple, procesar_dia_inventario,
+                         LibroStock, procesar_dia_libro, generar_log_inventario)
+from .reposicion import TransitoReposicion
+from .pronostico import PronosticoDemanda, historia_por_serie, historia_exportada
+from .politicas import (optimizar_politicas, simular_politicas, demanda_por_sku, escenarios_demanda,
+                        aplicar_politicas)
 from .picking import asignar_picking, generar_hoja_picking, mostrar_picking_dia
-from .transporte import planificar_rutas, mostrar_transporte_dia, generar_programa_transporte
-from .indicadores import calcular_indicadores, mostrar_indicadores, calcular_indicadores_acumulados
-from .alertas import generar_alertas, mostrar_alertas, generar_recomendaciones
+from .transporte import planificar_rutas, despachar_flota, mostrar_transporte_dia, generar_programa_transporte
+from .indicadores import (calcular_indicadores, mostrar_indicadores, calcular_indicadores_acumulados,
+                          AcumuladorIndicadores)
+from .alertas import generar_alertas, mostrar_alertas, generar_recomendaciones, MotorAlertas, cargar_reglas
 from .reporte import reporte_logistica, exportar_datos_csv
+from .exportacion import exportar_columnar, leer_columnar, iterar_bloques, ErrorExportacion
+from .historial import HistorialPedidos
+from .ruteo import matriz_distancias, matriz_distancias_dia, construir_rutas
+from .backlog import ColaBacklog
+from .pedidos import AlmacenPedidos, ConjuntoPedidos, compactar_pedidos, a_json
+from .simulacion import simular_dia, simular_periodo
+from .montecarlo import replicar_simulacion
 
 __version__ = "1.0.0"
 __author__ = "FIIS SIE"
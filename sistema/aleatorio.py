@@ -0,0 +1,62 @@
+"""
+Módulo de Aleatoriedad - Sistema de Logística FIIS SIE
+Flujos de números aleatorios reproducibles por etapa y por día
+"""
+
+import random
+import numpy as np
+
+# Identificador fijo de cada etapa del pipeline. No cambiar los valores:
+# forman parte de la semilla derivada y alterarlos cambia los resultados.
+ETAPAS = {
+    'demanda': 1,
+    'picking': 2,
+    'transporte': 3,
+    'reposicion': 4
+}
+
+def secuencia_semilla(semilla, etapa, dia=0):
+    """
+    Construye la SeedSequence independiente de una etapa en un día dado.
+
+    El flujo depende sólo de (semilla, etapa, dia), nunca del orden en que
+    se ejecuten las etapas ni de cuántos procesos participen.
+
+    Args:
+        semilla: Semilla entera de la corrida
+        etapa: Nombre de la etapa (ver ETAPAS)
+        dia: Número de día (0 para flujos que abarcan todo el horizonte)
+    """
+    if etapa not in ETAPAS:
+        raise ValueError(f"Etapa desconocida: {etapa}")
+    return np.random.SeedSequence(entropy=semilla, spawn_key=(ETAPAS[etapa], dia))
+
+def generador_numpy(semilla, etapa, dia=0):
+    """
+    Devuelve un numpy.random.Generator para la etapa y el día.
+    Sin semilla se usa entropía del sistema (comportamiento no reproducible).
+    """
+    if semilla is None:
+        return np.random.default_rng()
+    return np.random.default_rng(secuencia_semilla(semilla, etapa, dia))
+
+def generador_python(semilla, etapa, dia=0):
+    """
+    Devuelve un objeto con la API del módulo random para la etapa y el día.
+    Sin semilla se devuelve el propio módulo random (comportamiento histórico).
+    """
+    if semilla is None:
+        return random
+    estado = secuencia_semilla(semilla, etapa, dia).generate_state(2)
+    return random.Random(int(estado[0]) << 32 | int(estado[1]))
+
+def derivar_semilla(semilla, *claves):
+    """
+    Deriva una semilla entera nueva e independiente a partir de otra
+    (por ejemplo, una por réplica). Devuelve None si la semilla es None.
+    """
+    if semilla is None:
+        return None
+    # El prefijo 0 no corresponde a ninguna etapa: no se solapa con sus flujos
+    estado = np.random.SeedSequence(entropy=semilla, spawn_key=(0,) + claves).generate_state(2)
+    return int(estado[0]) << 32 | int(estado[1])
@@ -3,77 +3,361 @@ Módulo de Alertas - Sistema de Logística FIIS SIE
 Genera alertas automáticas basadas en umbrales de indicadores
 """
 
-def generar_alertas(indicadores, umbrales=None):
+import os
+import json
+import numpy as np
+
+# Severidades admitidas (campo 'tipo' de cada alerta)
+SEVERIDADES = ('CRÍTICA', 'IMPORTANTE', 'INFORMATIVA')
+
+# Ámbito de una regla -> clave de los indicadores del día con sus valores
+# ({elemento: {metrica: valor}}); None = indicador global del día
+AMBITOS = {
+    None: None,
+    'zona': 'Por_Zona',
+    'sku': 'Por_SKU'
+}
+
+# Comparador -> (signo, estricto): la regla falla si signo*valor < signo*umbral
+# (o <= si no es estricto), así todas se evalúan con la misma operación
+COMPARADORES = {
+    '<': (1, True),
+    '<=': (1, False),
+    '>': (-1, True),
+    '>=': (-1, False)
+}
+
+UMBRALES_PREDETERMINADOS = {
+    'OTIF_minimo': 95.0,
+    'Fill_Rate_minimo': 98.0,
+    'Utilizacion_flota_maxima': 85.0,
+    'Backlog_rate_maximo': 5.0,
+    'Productividad_picking_minima': 150.0
+}
+
+def reglas_predeterminadas(umbrales=None):
     """
-    Genera alertas automáticas basadas en los indicadores
+    Reglas de alerta históricas del sistema, con los umbrales indicados
     
     Args:
-        indicadores: Diccionario con indicadores calculados
-        umbrales: Diccionario con umbrales para alertas (opcional)
+        umbrales: Diccionario con umbrales (opcional); las claves que falten
+                  toman el valor de UMBRALES_PREDETERMINADOS
     
     Returns:
-        Lista de alertas generadas
+        Lista de reglas (ver MotorAlertas)
     """
-    if umbrales is None:
-        umbrales = {
-            'OTIF_minimo': 95.0,
-            'Fill_Rate_minimo': 98.0,
-            'Utilizacion_flota_maxima': 85.0,
-            'Backlog_rate_maximo': 5.0,
-            'Productividad_picking_minima': 150.0
-        }
-    
-    alertas = []
+    u = dict(UMBRALES_PREDETERMINADOS)
+    if umbrales:
+        u.update(umbrales)
     
-    # Alerta por OTIF bajo
-    if indicadores['OTIF'] < umbrales['OTIF_minimo']:
-        alertas.append({
-            'tipo': 'CRÍTICA',
+    return [
+        {
+            'id': 'otif_bajo',
+            'metrica': 'OTIF',
+            'comparador': '<',
+            'umbral': u['OTIF_minimo'],
+            'severidad': 'CRÍTICA',
             'indicador': 'OTIF',
-            'valor': indicadores['OTIF'],
-            'mensaje': f"OTIF menor al {umbrales['OTIF_minimo']}% → Verificar tiempos de preparación y transporte",
+            'mensaje': "OTIF menor al {umbral}% → Verificar tiempos de preparación y transporte",
             'recomendacion': 'Revisar procesos de picking y coordinación con transporte'
-        })
-    
-    # Alerta por Fill Rate bajo
-    if indicadores['Fill_Rate'] < umbrales['Fill_Rate_minimo']:
-        alertas.append({
-            'tipo': 'IMPORTANTE',
+        },
+        {
+            'id': 'fill_rate_bajo',
+            'metrica': 'Fill_Rate',
+            'comparador': '<',
+            'umbral': u['Fill_Rate_minimo'],
+            'severidad': 'IMPORTANTE',
             'indicador': 'Fill Rate',
-            'valor': indicadores['Fill_Rate'],
-            'mensaje': f"Fill Rate menor al {umbrales['Fill_Rate_minimo']}% → Problemas de disponibilidad de stock",
+            'mensaje': "Fill Rate menor al {umbral}% → Problemas de disponibilidad de stock",
             'recomendacion': 'Verificar niveles de inventario y punto de reorden'
-        })
-    
-    # Alerta por alta utilización de flota
-    if indicadores['Utilizacion_Flota'] > umbrales['Utilizacion_flota_maxima']:
-        alertas.append({
-            'tipo': 'IMPORTANTE',
+        },
+        {
+            'id': 'flota_saturada',
+            'metrica': 'Utilizacion_Flota',
+            'comparador': '>',
+            'umbral': u['Utilizacion_flota_maxima'],
+            'severidad': 'IMPORTANTE',
             'indicador': 'Utilización Flota',
-            'valor': indicadores['Utilizacion_Flota'],
-            'mensaje': f"Alta utilización de flota (> {umbrales['Utilizacion_flota_maxima']}%) → Riesgo de saturación",
+            'mensaje': "Alta utilización de flota (> {umbral}%) → Riesgo de saturación",
             'recomendacion': 'Considerar aumentar capacidad de flota o optimizar rutas'
-        })
-    
-    # Alerta por backlog alto
-    if indicadores['Backlog_Rate'] > umbrales['Backlog_rate_maximo']:
-        alertas.append({
-            'tipo': 'IMPORTANTE',
+        },
+        {
+            'id': 'backlog_alto',
+            'metrica': 'Backlog_Rate',
+            'comparador': '>',
+            'umbral': u['Backlog_rate_maximo'],
+            'severidad': 'IMPORTANTE',
             'indicador': 'Backlog Rate',
-            'valor': indicadores['Backlog_Rate'],
-            'mensaje': f"Backlog elevado (> {umbrales['Backlog_rate_maximo']}%) → Capacidad insuficiente",
+            'mensaje': "Backlog elevado (> {umbral}%) → Capacidad insuficiente",
             'recomendacion': 'Incrementar capacidad de picking o revisar planificación'
-        })
-    
-    # Alerta por productividad de picking baja
-    if indicadores['Productividad_Picking'] < umbrales['Productividad_picking_minima']:
-        alertas.append({
-            'tipo': 'INFORMATIVA',
+        },
+        {
+            'id': 'productividad_baja',
+            'metrica': 'Productividad_Picking',
+            'comparador': '<',
+            'umbral': u['Productividad_picking_minima'],
+            'severidad': 'INFORMATIVA',
             'indicador': 'Productividad Picking',
-            'valor': indicadores['Productividad_Picking'],
-            'mensaje': f"Productividad de picking baja (< {umbrales['Productividad_picking_minima']} unid/h)",
+            'mensaje': "Productividad de picking baja (< {umbral} unid/h)",
             'recomendacion': 'Capacitar personal o revisar layout de almacén'
-        })
+        }
+    ]
+
+def validar_regla(regla):
+    """
+    Completa los valores por defecto de una regla y verifica sus campos
+    
+    Raises:
+        ValueError: Si falta un campo obligatorio o alguno no es válido
+    """
+    for campo in ('metrica', 'comparador', 'umbral', 'severidad'):
+        if campo not in regla:
+            raise ValueError(f"Regla de alerta sin '{campo}': {regla}")
+    if regla['comparador'] not in COMPARADORES:
+        raise ValueError(f"Comparador desconocido: {regla['comparador']}")
+    if regla['severidad'] not in SEVERIDADES:
+        raise ValueError(f"Severidad desconocida: {regla['severidad']}")
+    if regla.get('ambito') not in AMBITOS:
+        raise ValueError(f"Ámbito desconocido: {regla.get('ambito')}")
+    
+    completa = {
+        'id': regla.get('id', regla['metrica']),
+        'indicador': regla.get('indicador', regla['metrica']),
+        'mensaje': regla.get('mensaje', f"{regla['metrica']} {regla['comparador']} {{umbral}}"),
+        'recomendacion': regla.get('recomendacion', ''),
+        'ambito': None,
+        'elementos': None,
+        'dias_consecutivos': 1,
+        'histeresis': 0.0,
+        **regla
+    }
+    if int(completa['dias_consecutivos']) < 1:
+        raise ValueError("dias_consecutivos debe ser al menos 1")
+    if float(completa['histeresis']) < 0:
+        raise ValueError("La histéresis no puede ser negativa")
+    return completa
+
+def cargar_reglas(ruta):
+    """
+    Lee reglas de alerta de un archivo JSON: una lista de reglas o un objeto
+    {"reglas": [...]}
+    
+    Returns:
+        Lista de reglas validadas
+    """
+    with open(ruta, encoding='utf-8') as archivo:
+        datos = json.load(archivo)
+    if isinstance(datos, dict):
+        datos = datos.get('reglas', [])
+    return [validar_regla(regla) for regla in datos]
+
+class MotorAlertas:
+    """
+    Reglas de alerta compiladas en arreglos (umbral, signo, histeresis...)
+    
+    Una regla dice qué métrica vigilar, con qué comparador y umbral, su
+    severidad y, opcionalmente:
+      - ambito: 'zona' o 'sku' para evaluarla por cada zona o SKU del día
+        (valores en indicadores['Por_Zona'] / ['Por_SKU']); 'elementos'
+        limita a algunos de ellos
+      - dias_consecutivos: días seguidos en falla antes de alertar
+      - histeresis: margen que la métrica debe recuperar más allá del umbral
+        para que la alerta se apague
+    
+    Cada columna de la matriz de KPIs (regla × elemento) se evalúa en un solo
+    paso vectorizado para todos los días, y las alertas repetidas en días
+    seguidos se agrupan en un único episodio.
+    """
+    
+    def __init__(self, reglas):
+        self.reglas = [validar_regla(regla) for regla in reglas]
+        
+        signos, estrictos = zip(*(COMPARADORES[r['comparador']] for r in self.reglas)) if self.reglas else ((), ())
+        self._signo = np.array(signos, dtype=float)
+        self._estricto = np.array(estrictos, dtype=bool)
+        self._umbral = np.array([r['umbral'] for r in self.reglas], dtype=float)
+        self._histeresis = np.array([r['histeresis'] for r in self.reglas], dtype=float)
+        self._consecutivos = np.array([r['dias_consecutivos'] for r in self.reglas], dtype=int)
+    
+    def _columnas(self, indicadores_diarios):
+        """
+        Arma la matriz de KPIs: una columna por regla global y una por cada
+        (regla, elemento) de las reglas por ámbito. Los valores que faltan
+        quedan en NaN (ni fallan ni recuperan).
+        
+        Returns:
+            Tupla (columnas, valores): columnas es la lista (regla, elemento)
+            y valores el arreglo (dias × columnas)
+        """
+        columnas = []
+        for i, regla in enumerate(self.reglas):
+            clave = AMBITOS[regla['ambito']]
+            if clave is None:
+                columnas.append((i, None))
+                continue
+            elementos = regla['elementos']
+            if elementos is None:
+                vistos = {}
+                for indicadores in indicadores_diarios:
+                    vistos.update(dict.fromkeys(indicadores.get(clave, {})))
+                elementos = list(vistos)
+            columnas.extend((i, elemento) for elemento in elementos)
+        
+        valores = np.full((len(indicadores_diarios), len(columnas)), np.nan)
+        for d, indicadores in enumerate(indicadores_diarios):
+            for c, (i, elemento) in enumerate(columnas):
+                regla = self.reglas[i]
+                fuente = indicadores if elemento is None else indicadores.get(AMBITOS[regla['ambito']], {}).get(elemento, {})
+                valor = fuente.get(regla['metrica'])
+                if valor is not None:
+                    valores[d, c] = valor
+        return columnas, valores
+    
+    def _activas(self, reglas_columna, valores):
+        """
+        Alertas activas por día y columna (arreglo booleano dias × columnas)
+        
+        Una columna se enciende el día que completa dias_consecutivos en falla
+        y se apaga el día que la métrica supera el umbral más la histéresis;
+        entre ambos eventos conserva su estado.
+        """
+        dias = valores.shape[0]
+        signo = self._signo[reglas_columna]
+        umbral = signo * self._umbral[reglas_columna]
+        estricto = self._estricto[reglas_columna]
+        histeresis = self._histeresis[reglas_columna]
+        consecutivos = self._consecutivos[reglas_columna]
+        
+        x = signo * valores
+        with np.errstate(invalid='ignore'):
+            falla = np.where(estricto, x < umbral, x <= umbral)
+            recupera = np.where(estricto, x >= umbral + histeresis, x > umbral + histeresis)
+        
+        # Racha de fallas: días en falla dentro de los últimos n (suma acumulada)
+        acumulado = np.cumsum(falla, axis=0)
+        filas = np.arange(dias)[:, None]
+        desde = filas - consecutivos[None, :]
+        previo = np.where(desde >= 0, np.take_along_axis(acumulado, np.maximum(desde, 0), axis=0), 0)
+        enciende = (acumulado - previo) >= consecutivos
+        
+        # Estado = último evento (encender/apagar) hasta cada día
+        evento = np.where(enciende, 1, np.where(recupera, 0, -1))
+        ultimo = np.maximum.accumulate(np.where(evento >= 0, filas, -1), axis=0)
+        return (ultimo >= 0) & (np.take_along_axis(evento, np.maximum(ultimo, 0), axis=0) == 1)
+    
+    def _alerta(self, regla, elemento, valor):
+        alerta = {
+            'tipo': regla['severidad'],
+            'indicador': regla['indicador'] if elemento is None else f"{regla['indicador']} ({elemento})",
+            'valor': valor,
+            'mensaje': regla['mensaje'].format(umbral=regla['umbral'], valor=valor, elemento=elemento),
+            'recomendacion': regla['recomendacion']
+        }
+        if elemento is not None:
+            alerta['ambito'] = elemento
+        return alerta
+    
+    def evaluar(self, indicadores):
+        """
+        Alertas de un solo día, en el orden de las reglas
+        
+        Sin historial, una regla con dias_consecutivos > 1 no se dispara;
+        para eso está evaluar_lote.
+        """
+        columnas, valores = self._columnas([indicadores])
+        if not columnas:
+            return []
+        reglas_columna = np.array([i for i, _ in columnas])
+        activas = self._activas(reglas_columna, valores)[0]
+        
+        alertas = []
+        for c in np.flatnonzero(activas).tolist():
+            i, elemento = columnas[c]
+            regla = self.reglas[i]
+            fuente = indicadores if elemento is None else indicadores[AMBITOS[regla['ambito']]][elemento]
+            alertas.append(self._alerta(regla, elemento, fuente[regla['metrica']]))
+        return alertas
+    
+    def evaluar_lote(self, indicadores_diarios, dias=None):
+        """
+        Evalúa el periodo completo de una vez y devuelve episodios de alerta:
+        una misma regla activa varios días seguidos produce una sola alerta
+        
+        Args:
+            indicadores_diarios: Lista de indicadores por día
+            dias: Etiqueta de cada día (por defecto 1..n)
+        
+        Returns:
+            Lista de alertas ordenada por día de inicio; además de los campos
+            de generar_alertas trae 'regla', 'dia_inicio', 'dia_fin', 'dias'
+            y 'vigente' (sigue activa el último día). 'valor' es el peor
+            valor del episodio.
+        """
+        if dias is None:
+            dias = list(range(1, len(indicadores_diarios) + 1))
+        columnas, valores = self._columnas(indicadores_diarios)
+        if not columnas or not indicadores_diarios:
+            return []
+        reglas_columna = np.array([i for i, _ in columnas])
+        activas = self._activas(reglas_columna, valores)
+        
+        # Inicios y finales de cada racha activa, emparejados por columna
+        borde = np.zeros((1, activas.shape[1]), dtype=bool)
+        antes = np.vstack([borde, activas[:-1]])
+        despues = np.vstack([activas[1:], borde])
+        cols_ini, filas_ini = np.nonzero((activas & ~antes).T)
+        _, filas_fin = np.nonzero((activas & ~despues).T)
+        orden = np.lexsort((cols_ini, filas_ini))
+        
+        episodios = []
+        for k in orden.tolist():
+            c, inicio, fin = int(cols_ini[k]), int(filas_ini[k]), int(filas_fin[k])
+            i, elemento = columnas[c]
+            regla = self.reglas[i]
+            tramo = valores[inicio:fin + 1, c]
+            peor = float(tramo[np.nanargmin(self._signo[i] * tramo)])
+            alerta = self._alerta(regla, elemento, peor)
+            alerta.update({
+                'regla': regla['id'],
+                'dia_inicio': dias[inicio],
+                'dia_fin': dias[fin],
+                'dias': fin - inicio + 1,
+                'vigente': fin == len(dias) - 1
+            })
+            episodios.append(alerta)
+        return episodios
+
+_motor_predeterminado = None
+
+def motor_predeterminado():
+    """
+    Motor con las reglas configuradas: el archivo JSON de la variable de
+    entorno SISTEMA_REGLAS_ALERTAS o, si no está, las reglas históricas.
+    Se compila una sola vez por proceso.
+    """
+    global _motor_predeterminado
+    if _motor_predeterminado is None:
+        ruta = os.environ.get('SISTEMA_REGLAS_ALERTAS')
+        _motor_predeterminado = MotorAlertas(cargar_reglas(ruta) if ruta else reglas_predeterminadas())
+    return _motor_predeterminado
+
+def generar_alertas(indicadores, umbrales=None, motor=None):
+    """
+    Genera alertas automáticas basadas en los indicadores
+    
+    Args:
+        indicadores: Diccionario con indicadores calculados
+        umbrales: Diccionario con umbrales para alertas (opcional)
+        motor: MotorAlertas a usar (por defecto motor_predeterminado, o las
+               reglas históricas con los umbrales dados)
+    
+    Returns:
+        Lista de alertas generadas
+    """
+    if motor is None:
+        motor = MotorAlertas(reglas_predeterminadas(umbrales)) if umbrales else motor_predeterminado()
+    
+    alertas = motor.evaluar(indicadores)
     
     # Alerta por stock crítico (si hay información de inventario)
     if 'Stock_Critico' in indicadores and indicadores['Stock_Critico']:
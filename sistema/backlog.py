@@ -0,0 +1,71 @@
+"""
+Módulo de Backlog - Sistema de Logística FIIS SIE
+Cola de pedidos pendientes que se arrastran de un día a otro
+"""
+
+from collections import deque
+
+class ColaBacklog:
+    """
+    Cola FIFO de pedidos pendientes, ordenada por antigüedad
+
+    Los pedidos nuevos entran por el final y se ofrecen al picking desde el
+    frente; lo que se ofreció y no se preparó vuelve al frente en el mismo
+    orden, así que siempre pasa antes que la demanda más reciente. Todas las
+    operaciones son O(1) por pedido movido: un día sólo toca los pedidos que
+    ofrece, no todo el backlog.
+    """
+
+    def __init__(self):
+        # Entradas (dia_ingreso, pedido_id, pedido, unidades)
+        self._cola = deque()
+        self.unidades = 0
+
+    def __len__(self):
+        return len(self._cola)
+
+    def agregar(self, dia, pedidos):
+        """Encola los pedidos nuevos del día, detrás de los pendientes"""
+        for pedido_id, pedido in pedidos.items():
+            unidades = sum(pedido['productos'].values())
+            self._cola.append((dia, pedido_id, pedido, unidades))
+            self.unidades += unidades
+
+    def extraer(self, unidades_max):
+        """
+        Saca del frente los pedidos más antiguos hasta cubrir unidades_max
+
+        Un pedido que por sí solo supera unidades_max se saca igual (el
+        picking lo deja pendiente y devolver lo repone en su lugar) pero no
+        cuenta para el tope, así que no bloquea a los que vienen detrás.
+
+        Returns:
+            Lista de entradas (dia_ingreso, pedido_id, pedido, unidades)
+        """
+        extraidos = []
+        acumulado = 0
+        while self._cola and acumulado < unidades_max:
+            entrada = self._cola.popleft()
+            extraidos.append(entrada)
+            self.unidades -= entrada[3]
+            if entrada[3] <= unidades_max:
+                acumulado += entrada[3]
+        return extraidos
+
+    def devolver(self, entradas):
+        """Devuelve entradas al frente de la cola conservando su orden"""
+        for entrada in reversed(entradas):
+            self._cola.appendleft(entrada)
+            self.unidades += entrada[3]
+
+    def antiguedad_maxima(self, dia):
+        """Días que lleva esperando el pedido más antiguo (0 si está vacía)"""
+        return dia - self._cola[0][0] if self._cola else 0
+
+    def resumen(self, dia):
+        """Estado de la cola para el reporte del día"""
+        return {
+            'pedidos': len(self._cola),
+            'unidades': self.unidades,
+            'antiguedad_maxima': self.antiguedad_maxima(dia)
+        }
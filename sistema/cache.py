@@ -0,0 +1,182 @@
+"""
+Módulo de Caché - Sistema de Logística FIIS SIE
+Caché de resultados direccionada por contenido (memoria LRU + TTL y disco)
+"""
+
+import os
+import json
+import time
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from .configuracion import directorio_cache
+from .pedidos import a_json
+
+def clave_contenido(*partes):
+    """
+    Clave de caché a partir del contenido: misma entrada, misma clave.
+    Las partes deben ser serializables en JSON (el orden de los diccionarios
+    no importa).
+    """
+    texto = json.dumps(partes, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+class CacheResultados:
+    """
+    Caché de dos niveles para resultados serializables en JSON
+
+    El nivel en memoria es un LRU acotado en bytes; el de disco guarda un
+    archivo comprimido por clave, compartido entre procesos y reinicios. Las
+    entradas vencen a los ttl segundos en ambos niveles. Lleva contadores de
+    aciertos y fallos para medir su efectividad.
+    """
+
+    def __init__(self, ttl=3600, max_bytes=64 * 1024 * 1024, max_bytes_disco=512 * 1024 * 1024,
+                 directorio=None, usar_disco=True):
+        """
+        Args:
+            ttl: Segundos de validez de una entrada
+            max_bytes: Tamaño máximo del nivel en memoria (JSON sin comprimir)
+            max_bytes_disco: Tamaño máximo del nivel en disco (comprimido)
+            directorio: Carpeta del nivel en disco (por defecto .cache/resultados)
+            usar_disco: Si es False sólo se usa la memoria
+        """
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_bytes_disco = max_bytes_disco
+        self.directorio = None
+        if usar_disco:
+            self.directorio = directorio or directorio_cache('resultados')
+            os.makedirs(self.directorio, exist_ok=True)
+
+        # clave -> (vence, datos JSON)
+        self._memoria = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.aciertos_memoria = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, f"{clave}.json.gz")
+
+    def obtener(self, clave):
+        """Valor guardado para la clave, o None si no está o venció"""
+        ahora = time.time()
+        with self._lock:
+            entrada = self._memoria.get(clave)
+            if entrada is not None:
+                if entrada[0] > ahora:
+                    self._memoria.move_to_end(clave)
+                    self.aciertos_memoria += 1
+                    return json.loads(entrada[1])
+                self._quitar(clave)
+
+        datos = self._leer_disco(clave, ahora)
+        with self._lock:
+            if datos is None:
+                self.fallos += 1
+                return None
+            self.aciertos_disco += 1
+            self._poner(clave, datos, ahora + self.ttl)
+        return json.loads(datos)
+
+    def guardar(self, clave, valor):
+        """Guarda el valor en ambos niveles"""
+        datos = json.dumps(valor, separators=(',', ':'), default=a_json).encode('utf-8')
+        with self._lock:
+            self._poner(clave, datos, time.time() + self.ttl)
+        if self.directorio:
+            self._escribir_disco(clave, datos)
+
+    def _poner(self, clave, datos, vence):
+        self._quitar(clave)
+        if len(datos) > self.max_bytes:
+            return
+        self._memoria[clave] = (vence, datos)
+        self._bytes += len(datos)
+        while self._bytes > self.max_bytes:
+            _, (_, desalojado) = self._memoria.popitem(last=False)
+            self._bytes -= len(desalojado)
+
+    def _quitar(self, clave):
+        entrada = self._memoria.pop(clave, None)
+        if entrada is not None:
+            self._bytes -= len(entrada[1])
+
+    def _leer_disco(self, clave, ahora):
+        if not self.directorio:
+            return None
+        ruta = self._ruta(clave)
+        try:
+            if os.path.getmtime(ruta) + self.ttl <= ahora:
+                os.remove(ruta)
+                return None
+            with gzip.open(ruta, 'rb') as archivo:
+                return archivo.read()
+        except OSError:
+            return None
+
+    def _escribir_disco(self, clave, datos):
+        # Escribir a un temporal y renombrar: otro proceso nunca lee a medias
+        ruta = self._ruta(clave)
+        temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(temporal, 'wb', compresslevel=1) as archivo:
+            archivo.write(datos)
+        os.replace(temporal, ruta)
+        self._podar_disco()
+
+    def _podar_disco(self):
+        """Borra los archivos vencidos y, si sobra tamaño, los más antiguos"""
+        ahora = time.time()
+        archivos = []
+        with os.scandir(self.directorio) as entradas:
+            for entrada in entradas:
+                if not entrada.name.endswith('.json.gz'):
+                    continue
+                try:
+                    info = entrada.stat()
+                except OSError:
+                    continue
+                if info.st_mtime + self.ttl <= ahora:
+                    self._borrar(entrada.path)
+                else:
+                    archivos.append((info.st_mtime, info.st_size, entrada.path))
+
+        total = sum(tamano for _, tamano, _ in archivos)
+        for _, tamano, ruta in sorted(archivos):
+            if total <= self.max_bytes_disco:
+                break
+            self._borrar(ruta)
+            total -= tamano
+
+    @staticmethod
+    def _borrar(ruta):
+        try:
+            os.remove(ruta)
+        except OSError:
+            pass
+
+    def limpiar(self):
+        """Vacía ambos niveles (los contadores se conservan)"""
+        with self._lock:
+            self._memoria.clear()
+            self._bytes = 0
+        if self.directorio:
+            for nombre in os.listdir(self.directorio):
+                if nombre.endswith('.json.gz'):
+                    self._borrar(os.path.join(self.directorio, nombre))
+
+    def estadisticas(self):
+        """Contadores de aciertos/fallos y ocupación de la memoria"""
+        consultas = self.aciertos_memoria + self.aciertos_disco + self.fallos
+        aciertos = self.aciertos_memoria + self.aciertos_disco
+        return {
+            'aciertos_memoria': self.aciertos_memoria,
+            'aciertos_disco': self.aciertos_disco,
+            'fallos': self.fallos,
+            'tasa_aciertos': (aciertos / consultas * 100) if consultas > 0 else 0,
+            'entradas_memoria': len(self._memoria),
+            'bytes_memoria': self._bytes
+        }
@@ -1,7 +1,17 @@
 """
 Módulo de Catálogos - Sistema de Logística FIIS SIE
+Catálogos de productos, clientes y flota; carga desde archivos CSV/JSON y
+forma compilada con arreglos indexados por entero
 """
 
+import gc
+import os
+import csv
+import json
+import hashlib
+import numpy as np
+from .configuracion import ruta_cache
+
 # Catálogo de productos (SKU) - Maquillaje
 dic_sku = {
     "P001": {"nombre": "Lápiz Labial", "unidad": "cajas"},
@@ -42,6 +52,38 @@ dic_vehiculos = {
     "V05": {"capacidad": 90, "costo_km": 4.0, "tipo": "Camioneta"}
 }
 
+# Jornada diaria de cada vehículo (horas)
+jornada_flota_horas = 10
+
+# Duración de un viaje de reparto (ida y vuelta) por zona, en horas
+duracion_viaje_zona = {
+    "Zona Norte": 2.5,
+    "Zona Sur": 3.0,
+    "Zona Este": 2.0,
+    "Zona Oeste": 2.5,
+    "Zona Centro": 1.5
+}
+
+# Coordenadas (km) del almacén central y de cada cliente, usadas para
+# calcular distancias de reparto
+deposito_coordenadas = (0.0, 0.0)
+
+coordenadas_clientes = {
+    "C01": (15.2, 3.1),   # Zona Este
+    "C02": (1.8, 17.5),   # Zona Norte
+    "C03": (-1.5, -19.2), # Zona Sur
+    "F01": (-2.4, 19.6),
+    "F02": (2.2, -21.0),
+    "F03": (17.1, 0.4),
+    "F04": (-13.8, 1.9),
+    "F05": (1.2, 3.6),
+    "I01": (0.6, 15.9),
+    "I02": (-3.1, -17.8),
+    "I03": (14.0, -1.2),
+    "I04": (-15.5, -1.4),
+    "I05": (3.4, 2.1)
+}
+
 # Configuración de inventario inicial (Ajustado para ver reposiciones)
 inventario_inicial = {
     "P001": 60,
@@ -59,4 +101,544 @@ punto_reposicion = {
 # Tamaños de lote
 lote_reposicion = {
     "P001": 100, "P002": 150, "P003": 120, "P004": 80, "P005": 90
-}
\ No newline at end of file
+}
+
+def version_catalogos():
+    """
+    Huella de todos los catálogos: cambia si se modifica cualquier producto,
+    cliente, vehículo o parámetro de inventario, así que sirve para invalidar
+    resultados guardados que dependan de ellos
+    """
+    contenido = {
+        'sku': dic_sku,
+        'clientes': dic_clientes,
+        'vehiculos': dic_vehiculos,
+        'jornada': jornada_flota_horas,
+        'duracion': duracion_viaje_zona,
+        'deposito': deposito_coordenadas,
+        'coordenadas': coordenadas_clientes,
+        'inventario': inventario_inicial,
+        'punto': punto_reposicion,
+        'lote': lote_reposicion
+    }
+    texto = json.dumps(contenido, sort_keys=True)
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()[:16]
+
+
+# ---------------------------------------------------------------------------
+# Carga desde archivos
+# ---------------------------------------------------------------------------
+
+# Archivos de un directorio de catálogos (todos opcionales) y sus columnas
+# obligatorias; la primera es el identificador. Las columnas adicionales se
+# guardan como campos del elemento.
+ARCHIVOS_CATALOGO = {
+    'productos': ('productos.csv', ('sku', 'nombre', 'unidad')),
+    'clientes': ('clientes.csv', ('cliente', 'nombre', 'zona')),
+    'vehiculos': ('vehiculos.csv', ('vehiculo', 'capacidad', 'costo_km', 'tipo')),
+    'zonas': ('zonas.csv', ('zona', 'duracion_viaje_horas'))
+}
+PARAMETROS_CATALOGO = 'parametros.json'
+
+# Columnas numéricas reconocidas y su tipo. Salvo las coordenadas, ninguna
+# puede ser negativa.
+COLUMNAS_NUMERICAS = {
+    'inventario_inicial': int, 'punto_reposicion': int, 'lote_reposicion': int,
+    'x': float, 'y': float,
+    'capacidad': int, 'costo_km': float,
+    'duracion_viaje_horas': float
+}
+
+# Columnas de productos que van a los diccionarios de inventario y columnas
+# de clientes que van a coordenadas_clientes (no quedan en dic_sku / dic_clientes)
+CAMPOS_INVENTARIO = ('inventario_inicial', 'punto_reposicion', 'lote_reposicion')
+CAMPOS_COORDENADAS = ('x', 'y')
+
+def _columnas_csv(ruta):
+    """{columna: lista de textos} de un archivo CSV con encabezado"""
+    with open(ruta, newline='', encoding='utf-8-sig') as archivo:
+        lector = csv.reader(archivo)
+        encabezado = [columna.strip() for columna in next(lector, [])]
+        filas = [fila for fila in lector if fila]
+    ancho = len(encabezado)
+    if set(map(len, filas)) - {ancho}:
+        filas = [(fila + [''] * ancho)[:ancho] for fila in filas]
+    columnas = zip(*filas) if filas else [()] * ancho
+    return {nombre: list(valores) for nombre, valores in zip(encabezado, columnas)}
+
+def _columnas_json(tabla, filas):
+    """{columna: lista de valores} de una tabla JSON (lista de objetos)"""
+    if not isinstance(filas, list) or not all(isinstance(fila, dict) for fila in filas):
+        raise ValueError(f"'{tabla}' debe ser una lista de objetos")
+    nombres = list(dict.fromkeys(columna for fila in filas for columna in fila))
+    return {nombre: ['' if fila.get(nombre) is None else fila[nombre] for fila in filas] for nombre in nombres}
+
+def _columna_numerica(archivo, nombre, valores, obligatoria):
+    """Arreglo float64 de la columna (NaN = vacío), validando tipo y signo"""
+    try:
+        numeros = np.fromiter(map(float, valores), dtype=float, count=len(valores))
+    except (TypeError, ValueError):
+        # Hay vacíos o valores mal formados: se convierte de a uno
+        numeros = np.empty(len(valores))
+        for n, valor in enumerate(valores):
+            try:
+                numeros[n] = np.nan if valor == '' else float(valor)
+            except (TypeError, ValueError):
+                raise ValueError(f"{archivo}, fila {n + 1}: '{nombre}' debe ser numérico ({valor!r})") from None
+
+    vacios = np.isnan(numeros)
+    invalidos = np.isinf(numeros)
+    if COLUMNAS_NUMERICAS[nombre] is int:
+        invalidos |= ~vacios & ~invalidos & (numeros != np.floor(numeros))
+    if invalidos.any():
+        n = int(np.argmax(invalidos))
+        tipo = 'entero' if COLUMNAS_NUMERICAS[nombre] is int else 'numérico'
+        raise ValueError(f"{archivo}, fila {n + 1}: '{nombre}' debe ser {tipo} ({valores[n]!r})")
+    if obligatoria and vacios.any():
+        raise ValueError(f"{archivo}, fila {int(np.argmax(vacios)) + 1}: falta '{nombre}'")
+    if nombre not in CAMPOS_COORDENADAS and (numeros < 0).any():
+        raise ValueError(f"{archivo}, fila {int(np.argmax(numeros < 0)) + 1}: '{nombre}' no puede ser negativo")
+    return numeros
+
+def _validar_tabla(tabla, columnas):
+    """
+    Valida las columnas de una tabla: obligatorias presentes y sin vacíos,
+    números bien formados e ids únicos
+
+    Returns:
+        {columna: valores}: lista de textos, o arreglo float64 (NaN = vacío)
+        para las columnas de COLUMNAS_NUMERICAS
+    """
+    archivo, obligatorias = ARCHIVOS_CATALOGO[tabla]
+    faltan = [columna for columna in obligatorias if columna not in columnas]
+    if faltan:
+        raise ValueError(f"{archivo}: faltan las columnas {', '.join(faltan)}")
+
+    validas = {}
+    for nombre, valores in columnas.items():
+        if nombre in COLUMNAS_NUMERICAS:
+            validas[nombre] = _columna_numerica(archivo, nombre, valores, nombre in obligatorias)
+            continue
+        textos = list(map(str.strip, map(str, valores)))
+        if nombre in obligatorias and '' in textos:
+            raise ValueError(f"{archivo}, fila {textos.index('') + 1}: falta '{nombre}'")
+        validas[nombre] = textos
+
+    ids = validas[obligatorias[0]]
+    if len(set(ids)) != len(ids):
+        vistos = set()
+        for n, id_elemento in enumerate(ids, 1):
+            if id_elemento in vistos:
+                raise ValueError(f"{archivo}, fila {n}: '{id_elemento}' está repetido")
+            vistos.add(id_elemento)
+    return validas
+
+def _validar_parametros(parametros):
+    if not isinstance(parametros, dict):
+        raise ValueError("Los parámetros del catálogo deben ser un objeto JSON")
+    validos = {}
+    if 'jornada_flota_horas' in parametros:
+        jornada = parametros['jornada_flota_horas']
+        if not isinstance(jornada, (int, float)) or jornada <= 0:
+            raise ValueError("'jornada_flota_horas' debe ser un número positivo")
+        validos['jornada_flota_horas'] = jornada
+    if 'deposito' in parametros:
+        deposito = parametros['deposito']
+        if not isinstance(deposito, (list, tuple)) or len(deposito) != 2:
+            raise ValueError("'deposito' debe ser un par de coordenadas [x, y]")
+        validos['deposito'] = [float(deposito[0]), float(deposito[1])]
+    return validos
+
+def _fuentes(ruta):
+    """Archivos que forman el catálogo de `ruta` (un directorio o un .json)"""
+    if os.path.isdir(ruta):
+        nombres = [archivo for archivo, _ in ARCHIVOS_CATALOGO.values()] + [PARAMETROS_CATALOGO]
+        fuentes = [os.path.join(ruta, nombre) for nombre in nombres
+                   if os.path.exists(os.path.join(ruta, nombre))]
+        if not fuentes:
+            raise ValueError(f"No hay archivos de catálogo en {ruta}")
+        return fuentes
+    if not os.path.isfile(ruta):
+        raise ValueError(f"No existe el catálogo {ruta}")
+    return [ruta]
+
+def _leer_fuentes(fuentes):
+    """
+    Lee y valida los archivos del catálogo
+
+    Returns:
+        {'productos': columnas, ..., 'parametros': {...}} sólo con las tablas presentes
+    """
+    por_nombre = {os.path.basename(ruta): ruta for ruta in fuentes}
+    if len(fuentes) == 1 and PARAMETROS_CATALOGO not in por_nombre and fuentes[0].endswith('.json'):
+        with open(fuentes[0], encoding='utf-8') as archivo:
+            contenido = json.load(archivo)
+        if not isinstance(contenido, dict):
+            raise ValueError("El catálogo JSON debe ser un objeto con las tablas como claves")
+        tablas = {tabla: _columnas_json(tabla, contenido[tabla]) for tabla in ARCHIVOS_CATALOGO if tabla in contenido}
+        parametros = contenido.get('parametros', {})
+    else:
+        tablas = {tabla: _columnas_csv(por_nombre[archivo])
+                  for tabla, (archivo, _) in ARCHIVOS_CATALOGO.items() if archivo in por_nombre}
+        parametros = {}
+        if PARAMETROS_CATALOGO in por_nombre:
+            with open(por_nombre[PARAMETROS_CATALOGO], encoding='utf-8') as archivo:
+                parametros = json.load(archivo)
+
+    datos = {tabla: _validar_tabla(tabla, columnas) for tabla, columnas in tablas.items()}
+    datos['parametros'] = _validar_parametros(parametros)
+
+    if 'vehiculos' in datos:
+        sin_capacidad = np.flatnonzero(datos['vehiculos']['capacidad'] <= 0)
+        if sin_capacidad.size:
+            v_id = datos['vehiculos']['vehiculo'][sin_capacidad[0]]
+            raise ValueError(f"Vehículo {v_id}: la capacidad debe ser positiva")
+    if 'zonas' in datos:
+        if 'clientes' in datos:
+            zonas_clientes = set(datos['clientes']['zona'])
+        else:
+            zonas_clientes = {cliente['zona'] for cliente in dic_clientes.values()}
+        sin_duracion = zonas_clientes - set(datos['zonas']['zona'])
+        if sin_duracion:
+            raise ValueError(f"Zonas de clientes sin duración de viaje: {', '.join(sorted(sin_duracion))}")
+    return datos
+
+def _enteros(valores, n, defecto):
+    """Columna numérica como int64, con `defecto` en los vacíos (o en todo si falta)"""
+    if valores is None:
+        return np.full(n, defecto, dtype=np.int64)
+    return np.where(np.isnan(valores), defecto, valores).astype(np.int64)
+
+def _registros(columnas, clave, excluir=()):
+    """{id: {campo: valor}} a partir de columnas validadas (sin los campos vacíos)"""
+    campos = [campo for campo in columnas if campo != clave and campo not in excluir]
+    listas = []
+    hay_vacios = False
+    for campo in campos:
+        valores = columnas[campo]
+        if isinstance(valores, np.ndarray):
+            vacios = np.isnan(valores)
+            if COLUMNAS_NUMERICAS[campo] is int:
+                lista = np.where(vacios, 0, valores).astype(np.int64).tolist()
+            else:
+                lista = valores.tolist()
+            if vacios.any():
+                hay_vacios = True
+                lista = [None if vacio else valor for valor, vacio in zip(lista, vacios.tolist())]
+        else:
+            lista = valores
+            hay_vacios = hay_vacios or '' in valores
+        listas.append(lista)
+
+    ids = columnas[clave]
+    filas = zip(*listas) if listas else [()] * len(ids)
+    if not hay_vacios:
+        return {id_elemento: dict(zip(campos, fila)) for id_elemento, fila in zip(ids, filas)}
+    return {id_elemento: {campo: valor for campo, valor in zip(campos, fila) if valor is not None and valor != ''}
+            for id_elemento, fila in zip(ids, filas)}
+
+def _presentes(ids, valores):
+    """{id: valor entero} de las filas con valor en la columna"""
+    if valores is None:
+        return {}
+    presentes = np.flatnonzero(~np.isnan(valores))
+    enteros = valores[presentes].astype(np.int64).tolist()
+    if presentes.size == len(ids):
+        return dict(zip(ids, enteros))
+    return dict(zip([ids[i] for i in presentes.tolist()], enteros))
+
+def _reemplazar(destino, nuevo):
+    # En sitio: los módulos que importaron el diccionario ven el contenido nuevo
+    destino.clear()
+    destino.update(nuevo)
+
+def _aplicar(datos):
+    """Reemplaza los catálogos del módulo por las tablas presentes en `datos`"""
+    global jornada_flota_horas, deposito_coordenadas
+
+    if 'productos' in datos:
+        columnas = datos['productos']
+        skus = columnas['sku']
+        _reemplazar(dic_sku, _registros(columnas, 'sku', CAMPOS_INVENTARIO))
+        inventario = _enteros(columnas.get('inventario_inicial'), len(skus), 0)
+        _reemplazar(inventario_inicial, dict(zip(skus, inventario.tolist())))
+        _reemplazar(punto_reposicion, _presentes(skus, columnas.get('punto_reposicion')))
+        _reemplazar(lote_reposicion, _presentes(skus, columnas.get('lote_reposicion')))
+    if 'clientes' in datos:
+        columnas = datos['clientes']
+        ids = columnas['cliente']
+        _reemplazar(dic_clientes, _registros(columnas, 'cliente', CAMPOS_COORDENADAS))
+        coordenadas = {}
+        if 'x' in columnas and 'y' in columnas:
+            x, y = columnas['x'], columnas['y']
+            presentes = np.flatnonzero(~(np.isnan(x) | np.isnan(y)))
+            coordenadas = dict(zip([ids[i] for i in presentes.tolist()],
+                                   zip(x[presentes].tolist(), y[presentes].tolist())))
+        _reemplazar(coordenadas_clientes, coordenadas)
+    if 'vehiculos' in datos:
+        _reemplazar(dic_vehiculos, _registros(datos['vehiculos'], 'vehiculo'))
+    if 'zonas' in datos:
+        columnas = datos['zonas']
+        _reemplazar(duracion_viaje_zona, dict(zip(columnas['zona'], columnas['duracion_viaje_horas'].tolist())))
+
+    parametros = datos.get('parametros', {})
+    if 'jornada_flota_horas' in parametros:
+        jornada_flota_horas = parametros['jornada_flota_horas']
+    if 'deposito' in parametros:
+        deposito_coordenadas = tuple(parametros['deposito'])
+
+# ---------------------------------------------------------------------------
+# Forma compilada
+# ---------------------------------------------------------------------------
+
+# Arreglos de CatalogoCompilado según la tabla de la que salen
+ARREGLOS_POR_TABLA = {
+    'productos': ('inventario_de_sku', 'punto_reposicion_de_sku', 'lote_de_sku'),
+    'clientes': ('zona_de_cliente', 'coordenadas_de_cliente', 'duracion_de_zona'),
+    'vehiculos': ('capacidad_de_vehiculo', 'costo_km_de_vehiculo')
+}
+
+class CatalogoCompilado:
+    """
+    Catálogos traducidos a arreglos NumPy indexados por entero
+
+    La posición de cada elemento es la de su id en las listas skus,
+    clientes, vehiculos y zonas (el orden de los diccionarios); indice_sku,
+    indice_cliente, indice_vehiculo e indice_zona hacen la traducción
+    inversa. Por posición:
+        inventario_de_sku, punto_reposicion_de_sku (-1 = sin punto de reorden),
+        lote_de_sku (100 por defecto, como LibroStock)
+        zona_de_cliente (índice en zonas), coordenadas_de_cliente (n x 2, NaN
+        si el cliente no tiene coordenadas)
+        capacidad_de_vehiculo, costo_km_de_vehiculo
+        duracion_de_zona (NaN si la zona no tiene duración de viaje)
+    """
+
+    def __init__(self, skus, clientes, vehiculos, zonas, arreglos):
+        self.skus = skus
+        self.clientes = clientes
+        self.vehiculos = vehiculos
+        self.zonas = zonas
+        for nombres in ARREGLOS_POR_TABLA.values():
+            for nombre in nombres:
+                setattr(self, nombre, arreglos[nombre])
+        self.indice_sku = dict(zip(skus, range(len(skus))))
+        self.indice_cliente = dict(zip(clientes, range(len(clientes))))
+        self.indice_vehiculo = dict(zip(vehiculos, range(len(vehiculos))))
+        self.indice_zona = dict(zip(zonas, range(len(zonas))))
+
+    @classmethod
+    def desde_catalogos(cls, compilados=None):
+        """
+        Compila los catálogos actuales del módulo
+
+        Args:
+            compilados: Diccionario opcional {nombre_arreglo: arreglo} (más
+                        'zonas' si trae los de clientes) con arreglos ya
+                        armados, que se usan tal cual en lugar de recorrer
+                        los diccionarios
+        """
+        arreglos = dict(compilados or {})
+        skus = list(dic_sku)
+        clientes = list(dic_clientes)
+        vehiculos = list(dic_vehiculos)
+
+        if 'inventario_de_sku' not in arreglos:
+            n = len(skus)
+            arreglos['inventario_de_sku'] = np.fromiter((inventario_inicial.get(s, 0) for s in skus), np.int64, n)
+            arreglos['punto_reposicion_de_sku'] = np.fromiter((punto_reposicion.get(s, -1) for s in skus), np.int64, n)
+            arreglos['lote_de_sku'] = np.fromiter((lote_reposicion.get(s, 100) for s in skus), np.int64, n)
+
+        if 'zona_de_cliente' in arreglos:
+            zonas = arreglos.pop('zonas')
+        else:
+            zonas_cliente = [dic_clientes[c]['zona'] for c in clientes]
+            zonas = sorted(set(zonas_cliente) | set(duracion_viaje_zona))
+            indice_zona = {z: i for i, z in enumerate(zonas)}
+            arreglos['zona_de_cliente'] = np.fromiter((indice_zona[z] for z in zonas_cliente),
+                                                      np.int32, len(clientes))
+            sin_coordenadas = (np.nan, np.nan)
+            arreglos['coordenadas_de_cliente'] = np.array(
+                [coordenadas_clientes.get(c, sin_coordenadas) for c in clientes], dtype=float).reshape(-1, 2)
+            arreglos['duracion_de_zona'] = np.array([duracion_viaje_zona.get(z, np.nan) for z in zonas], dtype=float)
+
+        if 'capacidad_de_vehiculo' not in arreglos:
+            arreglos['capacidad_de_vehiculo'] = np.array([dic_vehiculos[v]['capacidad'] for v in vehiculos],
+                                                         dtype=np.int64)
+            arreglos['costo_km_de_vehiculo'] = np.array([dic_vehiculos[v]['costo_km'] for v in vehiculos],
+                                                        dtype=float)
+
+        return cls(skus, clientes, vehiculos, zonas, arreglos)
+
+    def posiciones_clientes(self, clientes):
+        """Arreglo con la posición de cada cliente de la lista"""
+        indice = self.indice_cliente
+        return np.fromiter((indice[c] for c in clientes), np.int64, len(clientes))
+
+    def posiciones_skus(self, skus):
+        """Arreglo con la posición de cada SKU de la lista"""
+        indice = self.indice_sku
+        return np.fromiter((indice[s] for s in skus), np.int64, len(skus))
+
+def _compilar_cargados(datos):
+    """Arreglos de CatalogoCompilado armados con NumPy desde las columnas cargadas"""
+    arreglos = {}
+    if 'productos' in datos:
+        columnas = datos['productos']
+        n = len(columnas['sku'])
+        arreglos['inventario_de_sku'] = _enteros(columnas.get('inventario_inicial'), n, 0)
+        arreglos['punto_reposicion_de_sku'] = _enteros(columnas.get('punto_reposicion'), n, -1)
+        arreglos['lote_de_sku'] = _enteros(columnas.get('lote_reposicion'), n, 100)
+    if 'clientes' in datos:
+        columnas = datos['clientes']
+        n = len(columnas['cliente'])
+        zonas = sorted(set(columnas['zona']) | set(duracion_viaje_zona))
+        indice_zona = {z: i for i, z in enumerate(zonas)}
+        arreglos['zonas'] = zonas
+        arreglos['zona_de_cliente'] = np.fromiter((indice_zona[z] for z in columnas['zona']), np.int32, n)
+        vacia = np.full(n, np.nan)
+        coordenadas = np.column_stack((columnas.get('x', vacia), columnas.get('y', vacia)))
+        coordenadas[np.isnan(coordenadas).any(axis=1)] = np.nan
+        arreglos['coordenadas_de_cliente'] = coordenadas
+        arreglos['duracion_de_zona'] = np.array([duracion_viaje_zona.get(z, np.nan) for z in zonas], dtype=float)
+    return arreglos
+
+# Catálogo compilado en memoria, revisión de los catálogos y revisión con
+# que se compiló
+_compilado = None
+_revision = 0
+_revision_compilado = None
+
+def revision_catalogos():
+    """
+    Contador que sube cada vez que cambian los catálogos (cargar_catalogos,
+    invalidar_catalogo, aplicar_politicas). Compararlo es O(1): sirve para
+    notar cambios en caminos que se recorren todos los días.
+    """
+    return _revision
+
+def catalogo_compilado():
+    """
+    CatalogoCompilado de los catálogos actuales (se compila una vez por proceso)
+
+    Se recompila cuando sube revision_catalogos(). Quien edite los
+    diccionarios en sitio (agregar, quitar o cambiar valores) debe llamar
+    luego a invalidar_catalogo(); si no, se sigue usando el compilado viejo.
+    """
+    global _compilado, _revision_compilado
+    if _compilado is None or _revision_compilado != _revision:
+        _compilado = CatalogoCompilado.desde_catalogos()
+        _revision_compilado = _revision
+    return _compilado
+
+def invalidar_catalogo():
+    """
+    Avisa que los catálogos se editaron en sitio: sube la revisión y
+    descarta el catálogo compilado en memoria (se recompila al pedirlo)
+    """
+    global _compilado, _revision
+    _revision += 1
+    _compilado = None
+
+# ---------------------------------------------------------------------------
+# Caché en disco de los catálogos cargados
+# ---------------------------------------------------------------------------
+
+def _huella_fuentes(fuentes):
+    resumen = hashlib.sha1()
+    for ruta in fuentes:
+        resumen.update(os.path.basename(ruta).encode('utf-8') + b'\0')
+        with open(ruta, 'rb') as archivo:
+            for bloque in iter(lambda: archivo.read(1 << 20), b''):
+                resumen.update(bloque)
+        resumen.update(b'\0')
+    return resumen.hexdigest()[:16]
+
+def _escribir_cache(ruta, datos):
+    """Guarda las columnas ya validadas (texto como UTF-32 de NumPy, números como float64)"""
+    columnas = {}
+    orden = {}
+    for tabla in ARCHIVOS_CATALOGO:
+        if tabla not in datos:
+            continue
+        orden[tabla] = list(datos[tabla])
+        for i, valores in enumerate(datos[tabla].values()):
+            columnas[f"{tabla}_{i}"] = valores if isinstance(valores, np.ndarray) else np.array(valores, dtype=str)
+    meta = json.dumps({'orden': orden, 'parametros': datos['parametros']}).encode('utf-8')
+
+    # Escribir a un temporal y renombrar: otro proceso nunca lee a medias
+    temporal = f"{ruta}.{os.getpid()}.tmp.npz"
+    np.savez(temporal, meta=np.frombuffer(meta, dtype=np.uint8), **columnas)
+    os.replace(temporal, ruta)
+
+def _leer_cache(ruta):
+    """Columnas guardadas por _escribir_cache, o None si la caché falta o está dañada"""
+    try:
+        with np.load(ruta, allow_pickle=False) as archivo:
+            meta = json.loads(archivo['meta'].tobytes().decode('utf-8'))
+            datos = {'parametros': meta['parametros']}
+            for tabla, nombres in meta['orden'].items():
+                datos[tabla] = {}
+                for i, nombre in enumerate(nombres):
+                    valores = archivo[f"{tabla}_{i}"]
+                    datos[tabla][nombre] = valores if valores.dtype.kind == 'f' else valores.tolist()
+    except (OSError, ValueError, KeyError):
+        return None
+    return datos
+
+def cargar_catalogos(ruta, usar_cache=True):
+    """
+    Carga los catálogos desde archivos y reemplaza los del módulo
+
+    `ruta` puede ser un directorio con productos.csv, clientes.csv,
+    vehiculos.csv, zonas.csv y parametros.json (todos opcionales: las
+    tablas ausentes conservan el catálogo actual) o un único archivo .json
+    con las claves 'productos', 'clientes', 'vehiculos', 'zonas' (listas de
+    filas) y 'parametros'. Columnas de cada tabla:
+        productos: sku, nombre, unidad [, inventario_inicial, punto_reposicion, lote_reposicion]
+        clientes: cliente, nombre, zona [, x, y]
+        vehiculos: vehiculo, capacidad, costo_km, tipo
+        zonas: zona, duracion_viaje_horas
+    parametros admite 'jornada_flota_horas' y 'deposito' ([x, y]).
+
+    Los diccionarios se actualizan en sitio, así que los módulos que ya los
+    importaron ven el catálogo nuevo. Las columnas validadas quedan en disco
+    (directorio de caché) bajo una huella del contenido de los archivos:
+    volver a cargar los mismos archivos no los vuelve a leer ni validar.
+
+    Args:
+        ruta: Directorio de catálogos o archivo JSON
+        usar_cache: Si es False se ignora la caché en disco (se reescribe)
+
+    Returns:
+        CatalogoCompilado con los catálogos cargados
+
+    Raises:
+        ValueError: Si falta un archivo o una columna, hay ids repetidos o
+                    valores inválidos (los catálogos quedan sin cambios)
+    """
+    global _compilado, _revision, _revision_compilado
+    fuentes = _fuentes(ruta)
+    ruta_guardado = ruta_cache('catalogos', f"{_huella_fuentes(fuentes)}.npz")
+
+    # Armar cientos de miles de filas y diccionarios dispara una y otra vez
+    # el recolector de ciclos, que no libera nada: se pausa durante la carga
+    recolector_activo = gc.isenabled()
+    gc.disable()
+    try:
+        datos = _leer_cache(ruta_guardado) if usar_cache and os.path.exists(ruta_guardado) else None
+        if datos is None:
+            datos = _leer_fuentes(fuentes)
+            _escribir_cache(ruta_guardado, datos)
+        _aplicar(datos)
+    finally:
+        if recolector_activo:
+            gc.enable()
+    _revision += 1
+    _compilado = CatalogoCompilado.desde_catalogos(_compilar_cargados(datos))
+    _revision_compilado = _revision
+    return _compilado
+
+# Catálogos por defecto desde archivos (variable de entorno SISTEMA_CATALOGOS)
+if os.environ.get('SISTEMA_CATALOGOS'):
+    cargar_catalogos(os.environ['SISTEMA_CATALOGOS'])
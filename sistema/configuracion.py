@@ -0,0 +1,28 @@
+"""
+Módulo de Configuración - Sistema de Logística FIIS SIE
+Rutas de trabajo compartidas por los módulos que guardan datos en disco
+"""
+
+import os
+
+# Directorio para cachés en disco (matrices de distancia, resultados, etc.).
+# Se puede cambiar con la variable de entorno SISTEMA_CACHE_DIR.
+DIRECTORIO_CACHE = os.environ.get(
+    'SISTEMA_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache')
+)
+
+def ruta_cache(*partes):
+    """
+    Devuelve una ruta dentro del directorio de caché, creando las carpetas
+    intermedias si hace falta
+    """
+    ruta = os.path.join(DIRECTORIO_CACHE, *partes)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    return ruta
+
+def directorio_cache(*partes):
+    """Devuelve una carpeta dentro del directorio de caché, creándola si hace falta"""
+    ruta = os.path.join(DIRECTORIO_CACHE, *partes)
+    os.makedirs(ruta, exist_ok=True)
+    return ruta
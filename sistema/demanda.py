@@ -3,47 +3,192 @@ Módulo de Demanda - Sistema de Logística FIIS SIE
 Simula la llegada de pedidos diarios por cliente
 """
 
-import random
+import numpy as np
 from .catalogos import dic_clientes, dic_sku
+from .aleatorio import generador_python, generador_numpy
+from .perfiles import simular_demanda_perfil
 
-def simular_demanda(n_dias, dic_clientes, dic_sku):
+def simular_demanda(n_dias, dic_clientes, dic_sku, modo="clasico", semilla=None, perfil=None):
     """
     Simula la llegada de pedidos diarios por cliente.
     Ajuste: Demanda moderada (12-20 pedidos) para realismo en stock.
+    
+    Args:
+        n_dias: Número de días a simular
+        dic_clientes: Catálogo de clientes
+        dic_sku: Catálogo de productos
+        modo: "clasico" (pedido a pedido) o "vectorizado" (NumPy, ver
+              simular_demanda_columnar). Ambos siguen la misma distribución.
+        semilla: Semilla entera para resultados reproducibles (opcional).
+                 En modo clásico cada día usa su propio flujo aleatorio.
+        perfil: PerfilDemanda opcional (estacionalidad, pesos de clientes,
+                popularidad de SKUs, promociones); si se indica, el modo no
+                se usa y los IDs de pedido son únicos en todo el horizonte
+    
+    Returns:
+        Diccionario {"Dia_N": {pedido_id: pedido}}
     """
+    if perfil is not None:
+        tabla = simular_demanda_perfil(n_dias, perfil, dic_clientes, dic_sku, semilla)
+        return tabla_a_pedidos_por_dia(tabla, dic_clientes)
+    if modo == "vectorizado":
+        rng = generador_numpy(semilla, 'demanda')
+        tabla = simular_demanda_columnar(n_dias, dic_clientes, dic_sku, rng)
+        return tabla_a_pedidos_por_dia(tabla, dic_clientes)
+    if modo != "clasico":
+        raise ValueError(f"Modo de simulación desconocido: {modo}")
+    
     pedidos_por_dia = {}
     
     for dia in range(1, n_dias + 1):
-        pedidos_dia = {}
+        pedidos_por_dia[f"Dia_{dia}"] = simular_demanda_dia(dia, dic_clientes, dic_sku, semilla)
+    
+    return pedidos_por_dia
+
+def simular_demanda_dia(dia, dic_clientes, dic_sku, semilla=None):
+    """
+    Simula los pedidos de un solo día (modo clásico).
+    
+    Con semilla da exactamente los mismos pedidos que ese día en
+    simular_demanda, así que el horizonte puede generarse día a día sin
+    tener toda la demanda en memoria.
+    
+    Returns:
+        Diccionario {pedido_id: pedido} del día
+    """
+    pedidos_dia = {}
+    rnd = generador_python(semilla, 'demanda', dia)
+    
+    # AJUSTE: Cantidad de pedidos moderada para que el stock baje gradualmente
+    # Antes era muy alto, ahora permite ver la reposición funcionar.
+    n_pedidos = rnd.randint(12, 20) 
+    
+    # Listas de ids armadas una vez por día (no por pedido ni por línea):
+    # con catálogos grandes copiar las claves domina el costo
+    clientes = list(dic_clientes.keys())
+    skus = list(dic_sku.keys())
+    
+    for i in range(n_pedidos):
+        # Generar ID único por día
+        pedido_id = f"{(dia-1)*20 + i + 1:03d}"
         
-        # AJUSTE: Cantidad de pedidos moderada para que el stock baje gradualmente
-        # Antes era muy alto, ahora permite ver la reposición funcionar.
-        n_pedidos = random.randint(12, 20) 
+        cliente_id = rnd.choice(clientes)
         
-        for i in range(n_pedidos):
-            # Generar ID único por día
-            pedido_id = f"{(dia-1)*20 + i + 1:03d}"
-            
-            cliente_id = random.choice(list(dic_clientes.keys()))
-            
-            # Cada pedido tiene entre 1 y 3 tipos de productos
-            n_productos = random.randint(1, 3)
-            productos = {}
-            
-            for _ in range(n_productos):
-                sku = random.choice(list(dic_sku.keys()))
-                # Cantidad por producto (5 a 40 unidades)
-                cantidad = random.randint(5, 40) 
-                productos[sku] = cantidad
-            
-            pedidos_dia[pedido_id] = {
-                'cliente': cliente_id,
-                'productos': productos,
+        # Cada pedido tiene entre 1 y 3 tipos de productos
+        n_productos = rnd.randint(1, 3)
+        productos = {}
+        
+        for _ in range(n_productos):
+            sku = rnd.choice(skus)
+            # Cantidad por producto (5 a 40 unidades)
+            cantidad = rnd.randint(5, 40) 
+            productos[sku] = cantidad
+        
+        pedidos_dia[pedido_id] = {
+            'cliente': cliente_id,
+            'productos': productos,
+            'fecha': dia,
+            'zona': dic_clientes[cliente_id]['zona']
+        }
+    
+    return pedidos_dia
+
+def simular_demanda_columnar(n_dias, dic_clientes, dic_sku, rng=None):
+    """
+    Genera la demanda de todo el horizonte en bloque con NumPy.
+    
+    Sigue la misma distribución que el modo clásico: 12-20 pedidos por día,
+    cliente uniforme, 1-3 extracciones de SKU por pedido y 5-40 unidades por
+    extracción. Si un SKU sale repetido dentro de un pedido, prevalece la
+    última extracción (igual que al sobrescribir la clave en el diccionario).
+    
+    Args:
+        n_dias: Número de días a simular
+        dic_clientes: Catálogo de clientes
+        dic_sku: Catálogo de productos
+        rng: numpy.random.Generator opcional
+    
+    Returns:
+        Tabla columnar (una fila por línea de pedido) con los arreglos
+        'dia', 'pedido_id', 'cliente_idx', 'sku_idx' y 'cantidad', más las
+        listas 'clientes' y 'skus' para traducir los índices.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    
+    clientes = list(dic_clientes.keys())
+    skus = list(dic_sku.keys())
+    
+    # Pedidos por día. El ID sigue la fórmula clásica (dia-1)*20 + i + 1,
+    # que se arma como desplazamiento por día + contador global.
+    n_pedidos_dia = rng.integers(12, 21, size=n_dias, dtype=np.int32)
+    total_pedidos = int(n_pedidos_dia.sum())
+    inicio_dia = np.cumsum(n_pedidos_dia) - n_pedidos_dia
+    desplazamiento = np.arange(n_dias, dtype=np.int32) * 20 - inicio_dia
+    pedido_id = np.repeat(desplazamiento, n_pedidos_dia) + np.arange(1, total_pedidos + 1, dtype=np.int32)
+    
+    cliente_pedido = rng.integers(0, len(clientes), size=total_pedidos, dtype=np.int32)
+    n_extracciones = rng.integers(1, 4, size=total_pedidos, dtype=np.int32)
+    
+    # Extracciones de productos (una fila por extracción)
+    pedido_ext = np.repeat(np.arange(total_pedidos, dtype=np.int32), n_extracciones)
+    sku_ext = rng.integers(0, len(skus), size=pedido_ext.size, dtype=np.int32)
+    cantidad_ext = rng.integers(5, 41, size=pedido_ext.size, dtype=np.int32)
+    
+    # Consolidar SKUs repetidos: como hay a lo sumo 3 extracciones por pedido,
+    # basta comparar cada fila con las dos siguientes. Una extracción queda
+    # descartada si otra posterior del mismo pedido repite el SKU.
+    descartada = np.zeros(pedido_ext.size, dtype=bool)
+    for salto in (1, 2):
+        mismo = ((pedido_ext[salto:] == pedido_ext[:-salto]) &
+                 (sku_ext[salto:] == sku_ext[:-salto]))
+        descartada[:-salto] |= mismo
+    filas = np.flatnonzero(~descartada)
+    pedido_linea = pedido_ext[filas]
+    pedido_id_linea = pedido_id[pedido_linea]
+    
+    return {
+        'dia': (pedido_id_linea - 1) // 20 + 1,
+        'pedido_id': pedido_id_linea,
+        'cliente_idx': cliente_pedido[pedido_linea],
+        'sku_idx': sku_ext[filas],
+        'cantidad': cantidad_ext[filas],
+        'clientes': clientes,
+        'skus': skus
+    }
+
+def tabla_a_pedidos_por_dia(tabla, dic_clientes):
+    """
+    Convierte la tabla columnar de simular_demanda_columnar al formato
+    clásico {"Dia_N": {pedido_id: pedido}} que consume el resto del sistema.
+    """
+    clientes = tabla['clientes']
+    skus = tabla['skus']
+    zonas = [dic_clientes[c]['zona'] for c in clientes]
+    
+    pedidos_por_dia = {}
+    pedidos_dia = None
+    dia_actual = None
+    
+    columnas = zip(tabla['dia'].tolist(), tabla['pedido_id'].tolist(),
+                   tabla['cliente_idx'].tolist(), tabla['sku_idx'].tolist(),
+                   tabla['cantidad'].tolist())
+    
+    for dia, pid, c_idx, s_idx, cantidad in columnas:
+        if dia != dia_actual:
+            dia_actual = dia
+            pedidos_dia = pedidos_por_dia.setdefault(f"Dia_{dia}", {})
+        
+        pedido_id = f"{pid:03d}"
+        pedido = pedidos_dia.get(pedido_id)
+        if pedido is None:
+            pedido = pedidos_dia[pedido_id] = {
+                'cliente': clientes[c_idx],
+                'productos': {},
                 'fecha': dia,
-                'zona': dic_clientes[cliente_id]['zona']
+                'zona': zonas[c_idx]
             }
-        
-        pedidos_por_dia[f"Dia_{dia}"] = pedidos_dia
+        pedido['productos'][skus[s_idx]] = cantidad
     
     return pedidos_por_dia
 
@@ -0,0 +1,166 @@
+"""
+Módulo de Estado - Sistema de Logística FIIS SIE
+Almacén del estado de simulación por sesión (memoria LRU o SQLite compartido)
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from .configuracion import ruta_cache
+from .pedidos import a_json
+
+# Tope por defecto del tamaño total almacenado (bytes de JSON)
+MAX_BYTES_ESTADO = 256 * 1024 * 1024
+
+def _serializar(valor):
+    return json.dumps(valor, separators=(',', ':'), default=a_json).encode('utf-8')
+
+def _deserializar(datos):
+    return json.loads(datos.decode('utf-8'))
+
+class AlmacenMemoria:
+    """
+    Almacén en el proceso con desalojo LRU por tamaño
+
+    Los valores se guardan serializados en JSON: así el tamaño que cuenta
+    para el límite es exacto y quien lee recibe una copia, nunca el objeto
+    que otro hilo está modificando. Sólo lo ve el proceso que lo creó.
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES_ESTADO, max_entradas=None):
+        self.max_bytes = max_bytes
+        self.max_entradas = max_entradas
+        self.bytes_usados = 0
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave, por_defecto=None):
+        with self._lock:
+            datos = self._datos.get(clave)
+            if datos is None:
+                return por_defecto
+            self._datos.move_to_end(clave)
+        return _deserializar(datos)
+
+    def guardar(self, clave, valor):
+        datos = _serializar(valor)
+        with self._lock:
+            anterior = self._datos.pop(clave, None)
+            if anterior is not None:
+                self.bytes_usados -= len(anterior)
+            self._datos[clave] = datos
+            self.bytes_usados += len(datos)
+
+            # Desalojar las menos usadas; la recién guardada se conserva siempre
+            while len(self._datos) > 1 and (
+                self.bytes_usados > self.max_bytes
+                or (self.max_entradas is not None and len(self._datos) > self.max_entradas)
+            ):
+                _, desalojado = self._datos.popitem(last=False)
+                self.bytes_usados -= len(desalojado)
+
+    def eliminar(self, clave):
+        with self._lock:
+            datos = self._datos.pop(clave, None)
+            if datos is not None:
+                self.bytes_usados -= len(datos)
+
+    def __len__(self):
+        return len(self._datos)
+
+class AlmacenSQLite:
+    """
+    Almacén en un archivo SQLite compartido por todos los procesos
+
+    Cada proceso (y cada hilo) abre su propia conexión al mismo archivo, así
+    que cualquier trabajador de gunicorn ve las corridas de los demás. Los
+    valores se guardan en JSON comprimido con zlib y, al superar max_bytes,
+    se desalojan los de acceso más antiguo.
+    """
+
+    def __init__(self, ruta=None, max_bytes=MAX_BYTES_ESTADO, max_entradas=None):
+        self.ruta = ruta or ruta_cache('estado.sqlite3')
+        self.max_bytes = max_bytes
+        self.max_entradas = max_entradas
+        self._local = threading.local()
+        with self._conexion() as conexion:
+            conexion.execute(
+                "CREATE TABLE IF NOT EXISTS estado ("
+                "clave TEXT PRIMARY KEY, datos BLOB NOT NULL, "
+                "tamano INTEGER NOT NULL, accedido REAL NOT NULL)"
+            )
+            conexion.execute("CREATE INDEX IF NOT EXISTS estado_accedido ON estado (accedido)")
+
+    def _conexion(self):
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None:
+            conexion = sqlite3.connect(self.ruta, timeout=30)
+            # WAL: los lectores no bloquean al escritor entre procesos
+            conexion.execute("PRAGMA journal_mode=WAL")
+            self._local.conexion = conexion
+        return conexion
+
+    def obtener(self, clave, por_defecto=None):
+        with self._conexion() as conexion:
+            fila = conexion.execute("SELECT datos FROM estado WHERE clave = ?", (clave,)).fetchone()
+            if fila is None:
+                return por_defecto
+            conexion.execute("UPDATE estado SET accedido = ? WHERE clave = ?", (time.time(), clave))
+        return _deserializar(zlib.decompress(fila[0]))
+
+    def guardar(self, clave, valor):
+        datos = zlib.compress(_serializar(valor), 1)
+        with self._conexion() as conexion:
+            conexion.execute(
+                "INSERT OR REPLACE INTO estado (clave, datos, tamano, accedido) VALUES (?, ?, ?, ?)",
+                (clave, datos, len(datos), time.time())
+            )
+            self._desalojar(conexion, clave)
+
+    def _desalojar(self, conexion, conservar):
+        """Borra las entradas de acceso más antiguo hasta respetar los topes"""
+        total, entradas = conexion.execute("SELECT COALESCE(SUM(tamano), 0), COUNT(*) FROM estado").fetchone()
+        if total <= self.max_bytes and (self.max_entradas is None or entradas <= self.max_entradas):
+            return
+
+        filas = conexion.execute(
+            "SELECT clave, tamano FROM estado WHERE clave != ? ORDER BY accedido", (conservar,)
+        ).fetchall()
+        borrar = []
+        for clave, tamano in filas:
+            if total <= self.max_bytes and (self.max_entradas is None or entradas <= self.max_entradas):
+                break
+            borrar.append((clave,))
+            total -= tamano
+            entradas -= 1
+        conexion.executemany("DELETE FROM estado WHERE clave = ?", borrar)
+
+    def eliminar(self, clave):
+        with self._conexion() as conexion:
+            conexion.execute("DELETE FROM estado WHERE clave = ?", (clave,))
+
+    def __len__(self):
+        return self._conexion().execute("SELECT COUNT(*) FROM estado").fetchone()[0]
+
+ALMACENES = {
+    'memoria': AlmacenMemoria,
+    'sqlite': AlmacenSQLite
+}
+
+def crear_almacen(tipo=None, **opciones):
+    """
+    Crea el almacén de estado configurado
+
+    Args:
+        tipo: 'memoria' o 'sqlite' (por defecto, la variable de entorno
+              SISTEMA_ESTADO o 'memoria')
+        opciones: Argumentos del almacén (max_bytes, max_entradas, ruta)
+    """
+    tipo = tipo or os.environ.get('SISTEMA_ESTADO', 'memoria')
+    if tipo not in ALMACENES:
+        raise ValueError(f"Almacén de estado desconocido: {tipo}")
+    return ALMACENES[tipo](**opciones)
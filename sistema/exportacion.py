@@ -0,0 +1,300 @@
+"""
+Módulo de Exportación - Sistema de Logística FIIS SIE
+Exportación columnar por bloques comprimidos (pedidos, picking, rutas e indicadores)
+"""
+
+import os
+import json
+import uuid
+import numpy as np
+from .indicadores import PROMEDIOS_DIARIOS, TOTALES_DIARIOS
+
+# Filas por bloque: la memoria del exportador queda acotada a un bloque por tabla
+FILAS_POR_BLOQUE = 262144
+
+MANIFIESTO = 'manifiesto.json'
+
+# Tipo de columna -> dtype del bloque. Las columnas 'categoria' se guardan
+# como códigos enteros contra un diccionario de valores (uno por columna) y
+# las de 'texto' en UTF-8 (un byte por carácter, no cuatro como str de NumPy).
+TIPOS_COLUMNA = {
+    'categoria': np.int32,
+    'texto': bytes,
+    'entero': np.int64,
+    'real': np.float64
+}
+
+# Columnas de cada tabla exportada
+ESQUEMAS = {
+    'pedidos': [('Dia', 'categoria'), ('Pedido_ID', 'texto'), ('Cliente', 'categoria'),
+                ('Zona', 'categoria'), ('SKU', 'categoria'), ('Cantidad', 'entero')],
+    'picking': [('Dia', 'categoria'), ('Pedido_ID', 'texto'), ('Estado', 'categoria'),
+                ('Unidades', 'entero')],
+    'rutas': [('Dia', 'categoria'), ('Ruta', 'entero'), ('Zona', 'categoria'), ('Vehiculo', 'categoria'),
+              ('Unidades', 'entero'), ('Capacidad', 'entero'), ('Utilizacion', 'real'),
+              ('Costo', 'real'), ('Km', 'real'), ('Pedidos', 'entero'), ('Pedidos_IDs', 'texto')],
+    'indicadores': [('Dia', 'categoria')] + [(clave, 'real') for clave in PROMEDIOS_DIARIOS + TOTALES_DIARIOS]
+}
+
+class ErrorExportacion(Exception):
+    """No se pudo escribir o leer una exportación (ruta y causa en el mensaje)"""
+
+class EscritorColumnar:
+    """
+    Escribe una tabla en bloques .npz comprimidos, fila a fila
+
+    Las filas se acumulan por columna y cada filas_por_bloque se vuelcan a
+    disco, así que nunca hay más de un bloque en memoria. Las columnas
+    'categoria' se codifican contra un diccionario que crece con los valores
+    nuevos y se guarda al cerrar (en el manifiesto). Los bloques se llaman
+    '<prefijo>-00000.npz', '<prefijo>-00001.npz', ... (por defecto el
+    prefijo es el nombre de la tabla).
+    """
+
+    def __init__(self, directorio, tabla, esquema, filas_por_bloque=FILAS_POR_BLOQUE, prefijo=None):
+        self.directorio = directorio
+        self.tabla = tabla
+        self.prefijo = prefijo or tabla
+        self.esquema = list(esquema)
+        self.filas_por_bloque = filas_por_bloque
+        self.filas = 0
+        self.bloques = []
+        self.diccionarios = {col: {} for col, tipo in self.esquema if tipo == 'categoria'}
+        self._buffer = [[] for _ in self.esquema]
+        # Por columna: diccionario de códigos (categoría) o None
+        self._codigos = [self.diccionarios.get(col) if tipo == 'categoria' else None
+                         for col, tipo in self.esquema]
+
+    def agregar(self, *valores):
+        """Agrega una fila con un valor por columna, en el orden del esquema"""
+        self.extender([[valor] for valor in valores])
+
+    def extender(self, columnas):
+        """
+        Agrega varias filas de una vez: una lista de valores por columna, en
+        el orden del esquema (todas del mismo largo)
+        """
+        for buffer, codigos, valores in zip(self._buffer, self._codigos, columnas):
+            if codigos is not None:
+                for valor in set(valores).difference(codigos):
+                    codigos[valor] = len(codigos)
+                valores = map(codigos.__getitem__, valores)
+            buffer.extend(valores)
+        while len(self._buffer[0]) >= self.filas_por_bloque:
+            self._volcar(self.filas_por_bloque)
+
+    def _volcar(self, n=None):
+        """Escribe las primeras n filas del buffer (todas si n es None) como un bloque"""
+        n = len(self._buffer[0]) if n is None else n
+        if n == 0:
+            return
+        columnas = {}
+        for (col, tipo), buffer in zip(self.esquema, self._buffer):
+            valores = buffer[:n]
+            if tipo == 'texto':
+                valores = [str(valor).encode('utf-8') for valor in valores]
+            arreglo = np.array(valores, dtype=TIPOS_COLUMNA[tipo])
+            if tipo in ('categoria', 'entero'):
+                # El entero más chico que alcanza: menos bytes que comprimir
+                arreglo = arreglo.astype(np.result_type(np.min_scalar_type(arreglo.min()),
+                                                        np.min_scalar_type(arreglo.max())))
+            columnas[col] = arreglo
+        nombre = f"{self.prefijo}-{len(self.bloques):05d}.npz"
+        ruta = os.path.join(self.directorio, nombre)
+        try:
+            with open(ruta, 'wb') as archivo:
+                np.savez_compressed(archivo, **columnas)
+        except OSError as e:
+            raise ErrorExportacion(f"No se pudo escribir {ruta}: {e}") from e
+        self.bloques.append(nombre)
+        self.filas += n
+        self._buffer = [buffer[n:] for buffer in self._buffer]
+
+    def cerrar(self):
+        """
+        Vuelca el último bloque
+
+        Returns:
+            Entrada del manifiesto para la tabla
+        """
+        self._volcar()
+        return {
+            'columnas': self.esquema,
+            'filas': self.filas,
+            'bloques': self.bloques,
+            'diccionarios': {col: list(codigos) for col, codigos in self.diccionarios.items()}
+        }
+
+def _filas_dia(dia_key, resultado_dia, escritores):
+    """Agrega a cada tabla las filas de un día simulado"""
+    # Las líneas de pedido se arman por día y directamente por columna, sin
+    # una tupla por línea
+    ids, clientes, zonas, skus, cantidades = [], [], [], [], []
+    for pedido_id, pedido in resultado_dia.get('pedidos', {}).items():
+        productos = pedido['productos']
+        n = len(productos)
+        ids.extend([pedido_id] * n)
+        clientes.extend([pedido['cliente']] * n)
+        zonas.extend([pedido['zona']] * n)
+        skus.extend(productos)
+        cantidades.extend(productos.values())
+    if ids:
+        escritores['pedidos'].extender([[dia_key] * len(ids), ids, clientes, zonas, skus, cantidades])
+
+    picking = resultado_dia.get('picking')
+    if picking:
+        for estado, clave in (('preparado', 'pedidos_preparados'), ('pendiente', 'pedidos_pendientes')):
+            for pedido_id, pedido in picking.get(clave, {}).items():
+                unidades = pedido.get('total_unidades', sum(pedido['productos'].values()))
+                escritores['picking'].agregar(dia_key, pedido_id, estado, unidades)
+
+    transporte = resultado_dia.get('transporte')
+    if transporte:
+        for i, ruta in enumerate(transporte.get('rutas', []), 1):
+            escritores['rutas'].agregar(
+                dia_key, i, ruta['zona'], ruta['vehiculo'], ruta['unidades'], ruta['capacidad_max'],
+                ruta['utilizacion'], ruta['costo'], ruta.get('km', np.nan),
+                len(ruta['pedidos_ids']), ";".join(ruta['pedidos_ids'])
+            )
+
+    indicadores = resultado_dia.get('indicadores')
+    if indicadores:
+        escritores['indicadores'].agregar(
+            dia_key, *(indicadores.get(clave, np.nan) for clave in PROMEDIOS_DIARIOS + TOTALES_DIARIOS)
+        )
+
+def exportar_columnar(directorio, dias, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Exporta una simulación a formato columnar: una tabla por etapa (pedidos,
+    picking, rutas, indicadores) en bloques .npz comprimidos más un
+    manifiesto JSON con el esquema y los diccionarios de categorías
+
+    Los días se consumen de a uno, así que puede recibir directamente el
+    generador de simular_periodo y la memoria no depende del horizonte.
+    Los bloques de cada exportación llevan un prefijo propio y el manifiesto
+    se reemplaza al final: si algo falla sólo se borran los bloques nuevos
+    y una exportación anterior en el mismo directorio sigue válida; si
+    termina bien, se borran los bloques de la anterior.
+
+    Args:
+        directorio: Carpeta de destino (se crea si no existe)
+        dias: Iterable de (dia_key, resultado_dia); de cada día se exporta
+              lo que traiga ('pedidos', 'picking', 'transporte', 'indicadores')
+        filas_por_bloque: Filas por archivo de bloque
+
+    Returns:
+        Diccionario {tabla: filas exportadas}
+
+    Raises:
+        ErrorExportacion: Si no se puede escribir en el directorio
+    """
+    try:
+        os.makedirs(directorio, exist_ok=True)
+    except OSError as e:
+        raise ErrorExportacion(f"No se pudo crear {directorio}: {e}") from e
+
+    try:
+        anteriores = [nombre for datos in leer_manifiesto(directorio)['tablas'].values()
+                      for nombre in datos['bloques']]
+    except (ErrorExportacion, KeyError, TypeError):
+        anteriores = []
+
+    lote = uuid.uuid4().hex[:8]
+    escritores = {tabla: EscritorColumnar(directorio, tabla, esquema, filas_por_bloque,
+                                          prefijo=f"{tabla}-{lote}")
+                  for tabla, esquema in ESQUEMAS.items()}
+    try:
+        for dia_key, resultado_dia in dias:
+            _filas_dia(dia_key, resultado_dia, escritores)
+        tablas = {tabla: escritor.cerrar() for tabla, escritor in escritores.items()}
+
+        ruta = os.path.join(directorio, MANIFIESTO)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump({'version': 1, 'tablas': tablas}, archivo, ensure_ascii=False)
+        os.replace(temporal, ruta)
+    except BaseException as e:
+        # Sólo los bloques de esta exportación: los de la anterior siguen en uso
+        _borrar_bloques(directorio, [nombre for escritor in escritores.values() for nombre in escritor.bloques])
+        if isinstance(e, OSError):
+            raise ErrorExportacion(f"No se pudo escribir la exportación en {directorio}: {e}") from e
+        raise
+
+    # El manifiesto nuevo ya está en su lugar: los bloques anteriores sobran
+    _borrar_bloques(directorio, anteriores)
+    return {tabla: datos['filas'] for tabla, datos in tablas.items()}
+
+def _borrar_bloques(directorio, nombres):
+    for nombre in nombres:
+        try:
+            os.remove(os.path.join(directorio, nombre))
+        except OSError:
+            pass
+
+def leer_manifiesto(directorio):
+    """Manifiesto de una exportación (esquema, filas, bloques y diccionarios)"""
+    ruta = os.path.join(directorio, MANIFIESTO)
+    try:
+        with open(ruta, encoding='utf-8') as archivo:
+            return json.load(archivo)
+    except (OSError, ValueError) as e:
+        raise ErrorExportacion(f"Exportación no válida en {directorio}: {e}") from e
+
+def iterar_bloques(directorio, tabla, columnas=None, decodificar=True):
+    """
+    Lee una tabla exportada bloque a bloque (memoria de un bloque)
+
+    Args:
+        columnas: Columnas a leer (por defecto todas)
+        decodificar: Si es False, las categorías quedan como códigos enteros
+                     (ver el diccionario en leer_manifiesto)
+
+    Yields:
+        Diccionarios {columna: arreglo} de cada bloque
+    """
+    datos = leer_manifiesto(directorio)['tablas'].get(tabla)
+    if datos is None:
+        raise ErrorExportacion(f"La exportación no tiene la tabla '{tabla}'")
+    tipos = dict(datos['columnas'])
+    columnas = list(columnas) if columnas is not None else list(tipos)
+    diccionarios = {col: np.array(valores) for col, valores in datos['diccionarios'].items()}
+
+    for nombre in datos['bloques']:
+        ruta = os.path.join(directorio, nombre)
+        try:
+            with np.load(ruta) as bloque:
+                leido = {col: bloque[col] for col in columnas}
+        except (OSError, KeyError, ValueError) as e:
+            raise ErrorExportacion(f"No se pudo leer {ruta}: {e}") from e
+        for col in columnas:
+            if tipos[col] == 'entero':
+                leido[col] = leido[col].astype(np.int64)
+            elif tipos[col] == 'texto':
+                leido[col] = _decodificar_texto(leido[col])
+            elif decodificar and tipos[col] == 'categoria':
+                leido[col] = diccionarios[col][leido[col]]
+        yield leido
+
+def _decodificar_texto(valores):
+    # Si todo es ASCII la conversión directa equivale a decodificar UTF-8 y es mucho más rápida
+    if valores.size == 0 or (valores.view(np.uint8) < 128).all():
+        return valores.astype(str)
+    return np.char.decode(valores, 'utf-8')
+
+def leer_columnar(directorio, tabla, columnas=None, decodificar=True):
+    """
+    Lee una tabla exportada completa
+
+    Returns:
+        Diccionario {columna: arreglo NumPy}
+    """
+    datos = leer_manifiesto(directorio)['tablas'].get(tabla)
+    if datos is None:
+        raise ErrorExportacion(f"La exportación no tiene la tabla '{tabla}'")
+    columnas = list(columnas) if columnas is not None else [col for col, _ in datos['columnas']]
+    bloques = list(iterar_bloques(directorio, tabla, columnas, decodificar))
+    if not bloques:
+        tipos = dict(datos['columnas'])
+        vacio = lambda tipo: str if tipo == 'texto' or (tipo == 'categoria' and decodificar) else TIPOS_COLUMNA[tipo]
+        return {col: np.array([], dtype=vacio(tipos[col])) for col in columnas}
+    return {col: np.concatenate([bloque[col] for bloque in bloques]) for col in columnas}
@@ -0,0 +1,325 @@
+"""
+Módulo de Historial - Sistema de Logística FIIS SIE
+Reproducción de pedidos reales (CSV o exportación columnar) día a día
+"""
+
+import os
+import csv
+from itertools import count, islice, repeat
+import numpy as np
+from .catalogos import catalogo_compilado
+from .exportacion import iterar_bloques, leer_manifiesto, MANIFIESTO
+from .pedidos import AlmacenPedidos
+
+# Columnas del historial (las de exportar_datos_csv); 'Zona' es opcional
+COLUMNAS_HISTORIAL = ('Dia', 'Pedido_ID', 'Cliente', 'Zona', 'SKU', 'Cantidad')
+COLUMNAS_OBLIGATORIAS = ('Dia', 'Pedido_ID', 'Cliente', 'SKU', 'Cantidad')
+
+# Motivos por los que se rechaza una línea, en orden de revisión
+MOTIVOS_RECHAZO = {
+    'cliente_desconocido': "cliente desconocido",
+    'sku_desconocido': "SKU desconocido",
+    'cantidad_invalida': "la cantidad debe ser un entero positivo",
+    'zona_inconsistente': "la zona no es la del cliente en el catálogo",
+    'pedido_inconsistente': "el pedido tiene líneas de otro cliente"
+}
+
+# Filas del CSV que se leen de una vez. Lotes chicos dejan pocas listas por
+# fila vivas a la vez y el recolector de basura casi no se dispara
+FILAS_POR_LOTE = 1024
+
+def numero_dia(texto):
+    """Número de día de 'Dia_N' (formato exportado) o 'N'"""
+    return int(str(texto).rsplit('_', 1)[-1])
+
+class HistorialPedidos:
+    """
+    Pedidos de un historial leídos día a día (iterable de (dia_key, pedidos))
+
+    Lee un CSV con las columnas de exportar_datos_csv o una exportación
+    columnar (directorio de exportar_columnar) sin cargarlo entero: en
+    memoria sólo están las líneas del día que se está armando. El archivo
+    debe venir agrupado por día en orden creciente, como lo escriben los
+    exportadores. Clientes, SKUs y zonas se validan contra los catálogos
+    cargados; cada día sale como ConjuntoPedidos indexado con las
+    posiciones del catálogo compilado, y los SKUs repetidos dentro de un
+    pedido se suman.
+
+    Se puede pasar tal cual como pedidos_por_dia de simular_periodo.
+    """
+
+    def __init__(self, ruta, errores='error'):
+        """
+        Args:
+            ruta: Archivo CSV o directorio de una exportación columnar
+            errores: 'error' (la primera línea inválida lanza ValueError con
+                     su fila) u 'omitir' (se descarta y se cuenta por motivo)
+
+        Raises:
+            ValueError: Si el modo de errores no existe
+        """
+        if errores not in ('error', 'omitir'):
+            raise ValueError(f"Modo de errores desconocido: {errores}")
+        self.ruta = ruta
+        self.errores = errores
+        self.columnar = os.path.isdir(ruta)
+        self._reiniciar_contadores()
+
+    def _reiniciar_contadores(self):
+        self.dias = 0
+        self.pedidos = 0
+        self.lineas = 0
+        self.omitidas = {}
+
+    def resumen(self):
+        """Días, pedidos y líneas leídos, y líneas omitidas por motivo"""
+        return {
+            'dias': self.dias,
+            'pedidos': self.pedidos,
+            'lineas': self.lineas,
+            'lineas_omitidas': dict(self.omitidas)
+        }
+
+    def __iter__(self):
+        """
+        Yields:
+            Tuplas (dia_key, ConjuntoPedidos) en orden de día
+
+        Raises:
+            ValueError: Si faltan columnas, el archivo no está ordenado por
+                        día o (con errores='error') hay una línea inválida
+        """
+        self._reiniciar_contadores()
+        catalogo = catalogo_compilado()
+        dias = self._dias_columnar(catalogo) if self.columnar else self._dias_csv(catalogo)
+        anterior = None
+        for dia, filas, columnas in dias:
+            if anterior is not None and dia <= anterior:
+                raise ValueError(f"{self.ruta}, fila {filas[0]}: el historial no está ordenado por día "
+                                 f"(día {dia} después del {anterior})")
+            anterior = dia
+            pedidos = self._armar_dia(dia, filas, columnas, catalogo)
+            if len(pedidos):
+                self.dias += 1
+                yield f"Dia_{dia}", pedidos
+
+    def _dias_csv(self, catalogo):
+        """(dia, filas, columnas) de cada día de un CSV, leído fila a fila"""
+        try:
+            archivo = open(self.ruta, newline='', encoding='utf-8-sig')
+        except OSError as e:
+            raise ValueError(f"No se pudo abrir {self.ruta}: {e}") from e
+
+        with archivo:
+            lector = csv.reader(archivo)
+            encabezado = [columna.strip() for columna in next(lector, [])]
+            faltan = [columna for columna in COLUMNAS_OBLIGATORIAS if columna not in encabezado]
+            if faltan:
+                raise ValueError(f"{self.ruta}: faltan las columnas {', '.join(faltan)}")
+            posicion = {columna: encabezado.index(columna) for columna in COLUMNAS_HISTORIAL
+                        if columna in encabezado}
+            ancho = len(encabezado)
+            col_dia = posicion['Dia']
+
+            # Las filas se leen por lotes (list/islice/zip corren en C) y cada
+            # lote se pasa enseguida a columnas: no quedan listas por fila
+            # vivas (que además harían trabajar al recolector de basura)
+            texto_dia, columnas, primera = None, [[] for _ in range(ancho)], 1
+            while True:
+                lote = list(islice(lector, FILAS_POR_LOTE))
+                if not lote:
+                    break
+                if [] in lote:
+                    lote = [fila for fila in lote if fila]
+                if set(map(len, lote)) != {ancho}:
+                    lote = [(fila + [''] * ancho)[:ancho] for fila in lote]
+                columnas_lote = list(zip(*lote))
+                del lote
+                dias = columnas_lote[col_dia]
+                inicio = 0
+                if dias.count(texto_dia) != len(dias):
+                    for i, texto in enumerate(dias):
+                        if texto == texto_dia:
+                            continue
+                        for columna, valores in zip(columnas, columnas_lote):
+                            columna.extend(valores[inicio:i])
+                        if columnas[0]:
+                            yield self._dia_csv(texto_dia, primera, columnas, posicion, catalogo)
+                            primera += len(columnas[0])
+                        texto_dia, columnas, inicio = texto, [[] for _ in range(ancho)], i
+                for columna, valores in zip(columnas, columnas_lote):
+                    columna.extend(valores[inicio:])
+            if columnas[0]:
+                yield self._dia_csv(texto_dia, primera, columnas, posicion, catalogo)
+
+    def _dia_csv(self, texto_dia, primera, columnas_csv, posicion, catalogo):
+        """Columnas de un día del CSV traducidas a posiciones del catálogo"""
+        try:
+            dia = numero_dia(texto_dia)
+        except ValueError:
+            raise ValueError(f"{self.ruta}, fila {primera}: día inválido ({texto_dia!r})") from None
+        crudas = dict.fromkeys(COLUMNAS_HISTORIAL)
+        for columna, i in posicion.items():
+            crudas[columna] = columnas_csv[i]
+        n = len(columnas_csv[0])
+
+        indice_cliente, indice_sku = catalogo.indice_cliente, catalogo.indice_sku
+        cliente = np.fromiter(map(indice_cliente.get, crudas['Cliente'], repeat(-1)), np.int64, n)
+        sku = np.fromiter(map(indice_sku.get, crudas['SKU'], repeat(-1)), np.int64, n)
+        try:
+            cantidad = np.fromiter(map(int, crudas['Cantidad']), np.int64, n)
+        except ValueError:
+            cantidad = np.fromiter((_entero(valor) for valor in crudas['Cantidad']), np.int64, n)
+        zona = None
+        if crudas['Zona'] is not None:
+            # -2 = zona vacía (se toma la del catálogo)
+            indice_zona = dict(catalogo.indice_zona, **{'': -2})
+            zona = np.fromiter(map(indice_zona.get, crudas['Zona'], repeat(-1)), np.int64, n)
+
+        columnas = {'Pedido_ID': crudas['Pedido_ID'], 'cliente': cliente, 'sku': sku,
+                    'cantidad': cantidad, 'zona': zona, 'crudas': crudas}
+        return dia, _Filas(primera), columnas
+
+    def _dias_columnar(self, catalogo):
+        """(dia, filas, columnas) de cada día de la tabla 'pedidos' exportada, bloque a bloque"""
+        if not os.path.exists(os.path.join(self.ruta, MANIFIESTO)):
+            raise ValueError(f"{self.ruta} no es una exportación columnar (falta {MANIFIESTO})")
+        tabla = leer_manifiesto(self.ruta)['tablas'].get('pedidos')
+        if tabla is None:
+            raise ValueError(f"{self.ruta}: la exportación no tiene la tabla 'pedidos'")
+        diccionarios = tabla['diccionarios']
+
+        # Los códigos de cada categoría se traducen con un arreglo de consulta
+        def traductor(columna, indice):
+            return np.array([indice.get(valor, -1) for valor in diccionarios.get(columna, [])], dtype=np.int64)
+        dia_de_codigo = np.array([numero_dia(d) for d in diccionarios.get('Dia', [])], dtype=np.int64)
+        cliente_de_codigo = traductor('Cliente', catalogo.indice_cliente)
+        sku_de_codigo = traductor('SKU', catalogo.indice_sku)
+        zona_de_codigo = traductor('Zona', catalogo.indice_zona)
+
+        pendientes, dia_actual, fila = [], None, 1
+        for bloque in iterar_bloques(self.ruta, 'pedidos', decodificar=False):
+            dias = dia_de_codigo[bloque['Dia']]
+            cortes = np.flatnonzero(dias[1:] != dias[:-1]) + 1
+            for a, b in zip(np.concatenate(([0], cortes)).tolist(), np.concatenate((cortes, [dias.size])).tolist()):
+                dia = int(dias[a])
+                if dia != dia_actual and pendientes:
+                    yield self._dia_columnar(dia_actual, pendientes, diccionarios)
+                    pendientes = []
+                dia_actual = dia
+                pendientes.append((fila + a, {
+                    'Pedido_ID': bloque['Pedido_ID'][a:b],
+                    'cliente': cliente_de_codigo[bloque['Cliente'][a:b]],
+                    'sku': sku_de_codigo[bloque['SKU'][a:b]],
+                    'cantidad': bloque['Cantidad'][a:b],
+                    'zona': zona_de_codigo[bloque['Zona'][a:b]],
+                    'codigos': {col: bloque[col][a:b] for col in ('Cliente', 'SKU', 'Zona')}
+                }))
+            fila += dias.size
+        if pendientes:
+            yield self._dia_columnar(dia_actual, pendientes, diccionarios)
+
+    def _dia_columnar(self, dia, partes, diccionarios):
+        """Une los pedazos de un día que cayeron en bloques distintos"""
+        columnas = {clave: np.concatenate([parte[clave] for _, parte in partes])
+                    for clave in ('Pedido_ID', 'cliente', 'sku', 'cantidad', 'zona')}
+        codigos = {col: np.concatenate([parte['codigos'][col] for _, parte in partes])
+                   for col in ('Cliente', 'SKU', 'Zona')}
+        columnas['crudas'] = {
+            'Pedido_ID': columnas['Pedido_ID'],
+            'Cantidad': columnas['cantidad'],
+            **{col: _Decodificador(codigos[col], diccionarios.get(col, [])) for col in codigos}
+        }
+        return dia, _Filas(partes[0][0]), columnas
+
+    def _armar_dia(self, dia, filas, columnas, catalogo):
+        """ConjuntoPedidos del día con las líneas válidas"""
+        cliente, sku, cantidad = columnas['cliente'], columnas['sku'], columnas['cantidad']
+        n = cliente.size
+
+        # Pedido de cada línea, en orden de aparición
+        pedido_ids = columnas['Pedido_ID']
+        if isinstance(pedido_ids, np.ndarray):
+            pedido_ids = pedido_ids.tolist()
+        posicion = dict(zip(dict.fromkeys(pedido_ids), count()))
+        codigo = np.fromiter(map(posicion.__getitem__, pedido_ids), np.int64, n)
+        # Cliente de la primera línea de cada pedido (la última escritura gana)
+        cliente_pedido = np.empty(len(posicion), dtype=np.int64)
+        cliente_pedido[codigo[::-1]] = cliente[::-1]
+
+        zona_cliente = catalogo.zona_de_cliente[np.maximum(cliente, 0)]
+        rechazos = {
+            'cliente_desconocido': cliente < 0,
+            'sku_desconocido': sku < 0,
+            'cantidad_invalida': cantidad <= 0,
+            'zona_inconsistente': (np.zeros(n, dtype=bool) if columnas['zona'] is None else
+                                   (cliente >= 0) & (columnas['zona'] != -2) & (columnas['zona'] != zona_cliente)),
+            'pedido_inconsistente': cliente != cliente_pedido[codigo]
+        }
+        invalida = np.zeros(n, dtype=bool)
+        for motivo, mascara in rechazos.items():
+            nuevas = mascara & ~invalida
+            if not nuevas.any():
+                continue
+            if self.errores == 'error':
+                self._rechazar(motivo, int(np.argmax(nuevas)), filas, columnas)
+            self.omitidas[motivo] = self.omitidas.get(motivo, 0) + int(nuevas.sum())
+            invalida |= nuevas
+
+        validas = ~invalida
+        codigo, sku, cantidad = codigo[validas], sku[validas], cantidad[validas]
+        self.lineas += int(validas.sum())
+
+        # Una línea por (pedido, SKU), sumando las repetidas; los pedidos
+        # quedan en orden de aparición y sin los que se quedaron sin líneas
+        n_skus = max(len(catalogo.skus), 1)
+        lineas, inverso = np.unique(codigo * n_skus + sku, return_inverse=True)
+        cantidad = np.bincount(inverso, weights=cantidad, minlength=lineas.size).astype(np.int64)
+        codigo_linea = lineas // n_skus
+        presentes = np.unique(codigo_linea)
+        nuevo_codigo = np.searchsorted(presentes, codigo_linea)
+        inicio = np.concatenate(([0], np.cumsum(np.bincount(nuevo_codigo, minlength=presentes.size))))
+
+        ids = list(posicion)
+        if presentes.size < len(ids):
+            ids = [ids[i] for i in presentes.tolist()]
+        cliente_idx = cliente_pedido[presentes]
+        self.pedidos += len(ids)
+        almacen = AlmacenPedidos(ids, cliente_idx, catalogo.zona_de_cliente[cliente_idx], np.full(len(ids), dia),
+                                 inicio, lineas % n_skus, cantidad, catalogo.clientes, catalogo.zonas, catalogo.skus)
+        return almacen.vista()
+
+    def _rechazar(self, motivo, i, filas, columnas):
+        crudas = columnas['crudas']
+        valor = {
+            'cliente_desconocido': 'Cliente', 'sku_desconocido': 'SKU', 'cantidad_invalida': 'Cantidad',
+            'zona_inconsistente': 'Zona', 'pedido_inconsistente': 'Cliente'
+        }[motivo]
+        raise ValueError(f"{self.ruta}, fila {filas[i]}: {MOTIVOS_RECHAZO[motivo]} "
+                         f"(pedido {crudas['Pedido_ID'][i]}, {valor} {crudas[valor][i]!r})")
+
+class _Filas:
+    """Número de fila (de datos, desde 1) de cada línea de un día: son consecutivas"""
+
+    def __init__(self, primera):
+        self.primera = primera
+
+    def __getitem__(self, i):
+        return self.primera + i
+
+class _Decodificador:
+    """Valor original de una columna categórica, decodificado sólo al consultarlo"""
+
+    def __init__(self, codigos, diccionario):
+        self.codigos = codigos
+        self.diccionario = diccionario
+
+    def __getitem__(self, i):
+        return self.diccionario[int(self.codigos[i])]
+
+def _entero(valor):
+    """Entero de un texto, o -1 si no es un entero"""
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return -1
@@ -3,8 +3,38 @@ Módulo de Indicadores - Sistema de Logística FIIS SIE
 Cálculo de KPIs de desempeño logístico
 """
 
+import heapq
+import math
+from bisect import insort
+from collections import deque
+import numpy as np
+from .pedidos import ConjuntoPedidos
+
+# Totales del periodo que se suman día a día
+TOTALES_DIARIOS = ('Pedidos_Totales', 'Pedidos_Procesados', 'Unidades_Solicitadas',
+                   'Unidades_Entregadas', 'Unidades_Pendientes')
+
+# Indicadores diarios con media y desviación (Welford) a lo largo del periodo
+PROMEDIOS_DIARIOS = ('OTIF', 'Fill_Rate', 'Backlog_Rate', 'Productividad_Picking', 'Utilizacion_Flota')
+
+# Tasas ponderadas como (numerador, denominador) de los totales diarios
+TASAS = {
+    'OTIF': ('Pedidos_Procesados', 'Pedidos_Totales'),
+    'Fill_Rate': ('Unidades_Entregadas', 'Unidades_Solicitadas'),
+    'Backlog_Rate': ('Unidades_Pendientes', 'Unidades_Solicitadas')
+}
+
+# Días de las ventanas móviles y percentiles aproximados de los valores diarios
+VENTANAS_MOVILES = (7, 30)
+PERCENTILES_DIARIOS = (50, 95)
+
+# Posiciones de los rankings que se mantienen al sumar (consultas de más
+# posiciones recorren toda la demanda)
+TOP_RANKING = 10
+
 def calcular_indicadores(pedidos_recibidos, pedidos_preparados, pedidos_pendientes, 
-                        unidades_preparadas, unidades_solicitadas, resultados_transporte):
+                        unidades_preparadas, unidades_solicitadas, resultados_transporte,
+                        unidades_pendientes=None):
     """
     Calcula los indicadores clave de desempeño logístico
     
@@ -15,6 +45,9 @@ def calcular_indicadores(pedidos_recibidos, pedidos_preparados, pedidos_pendient
         unidades_preparadas: Total de unidades preparadas
         unidades_solicitadas: Total de unidades solicitadas
         resultados_transporte: Resultados del módulo de transporte
+        unidades_pendientes: Unidades pendientes si ya se conocen (por ejemplo,
+                             el total del backlog); si es None se suman de
+                             pedidos_pendientes
     
     Returns:
         Diccionario con todos los indicadores calculados
@@ -30,7 +63,8 @@ def calcular_indicadores(pedidos_recibidos, pedidos_preparados, pedidos_pendient
     indicadores['Fill_Rate'] = (unidades_preparadas / unidades_solicitadas * 100) if unidades_solicitadas > 0 else 0
     
     # Backlog Rate = unidades pendientes / unidades solicitadas × 100
-    unidades_pendientes = sum(pedido['total_unidades'] for pedido in pedidos_pendientes.values())
+    if unidades_pendientes is None:
+        unidades_pendientes = sum(pedido['total_unidades'] for pedido in pedidos_pendientes.values())
     indicadores['Backlog_Rate'] = (unidades_pendientes / unidades_solicitadas * 100) if unidades_solicitadas > 0 else 0
     
     # Productividad Picking = unidades preparadas / hora (asumiendo 8 horas laborales)
@@ -39,7 +73,15 @@ def calcular_indicadores(pedidos_recibidos, pedidos_preparados, pedidos_pendient
     
     # Utilización de Flota = carga entregada / capacidad disponible × 100
     if resultados_transporte and 'estadisticas' in resultados_transporte:
-        indicadores['Utilizacion_Flota'] = resultados_transporte['estadisticas']['utilizacion_promedio']
+        estadisticas = resultados_transporte['estadisticas']
+        if 'utilizacion_tiempo' in estadisticas:
+            # Flota finita (despachar_flota): la utilización es el % de horas
+            # de la flota ocupadas, que sí refleja la saturación
+            indicadores['Utilizacion_Flota'] = estadisticas['utilizacion_tiempo']
+            indicadores['Utilizacion_Carga'] = estadisticas['utilizacion_promedio']
+            indicadores['Unidades_No_Despachadas'] = estadisticas['unidades_no_despachadas']
+        else:
+            indicadores['Utilizacion_Flota'] = estadisticas['utilizacion_promedio']
     else:
         indicadores['Utilizacion_Flota'] = 0
     
@@ -52,6 +94,47 @@ def calcular_indicadores(pedidos_recibidos, pedidos_preparados, pedidos_pendient
     
     return indicadores
 
+def indicadores_por_ambito(pedidos_preparados, pedidos_pendientes, stock):
+    """
+    Indicadores del día desglosados por zona y por SKU, para las reglas de
+    alerta por ámbito (ver alertas.MotorAlertas)
+    
+    Args:
+        pedidos_preparados: Pedidos preparados del día
+        pedidos_pendientes: Pedidos que quedaron sin preparar
+        stock: Stock al cierre del día {sku: unidades}
+    
+    Returns:
+        Tupla (por_zona, por_sku) de diccionarios {elemento: {metrica: valor}}
+    """
+    por_zona = {}
+    por_sku = {sku: {'Stock': cantidad, 'Unidades_Solicitadas': 0, 'Unidades_Entregadas': 0}
+               for sku, cantidad in stock.items()}
+    
+    for pedidos, preparado in ((pedidos_preparados, True), (pedidos_pendientes, False)):
+        for pedido in pedidos.values():
+            zona = por_zona.setdefault(pedido['zona'], {
+                'Pedidos': 0, 'Unidades_Solicitadas': 0, 'Unidades_Entregadas': 0
+            })
+            unidades = sum(pedido['productos'].values())
+            zona['Pedidos'] += 1
+            zona['Unidades_Solicitadas'] += unidades
+            if preparado:
+                zona['Unidades_Entregadas'] += unidades
+            for sku, cantidad in pedido['productos'].items():
+                fila = por_sku.setdefault(sku, {'Stock': 0, 'Unidades_Solicitadas': 0, 'Unidades_Entregadas': 0})
+                fila['Unidades_Solicitadas'] += cantidad
+                if preparado:
+                    fila['Unidades_Entregadas'] += cantidad
+    
+    for fila in list(por_zona.values()) + list(por_sku.values()):
+        solicitadas = fila['Unidades_Solicitadas']
+        fila['Fill_Rate'] = (fila['Unidades_Entregadas'] / solicitadas * 100) if solicitadas > 0 else 0
+    for fila in por_zona.values():
+        fila['Backlog_Rate'] = 100 - fila['Fill_Rate'] if fila['Unidades_Solicitadas'] > 0 else 0
+    
+    return por_zona, por_sku
+
 def mostrar_indicadores(dia, indicadores):
     """
     Muestra los indicadores de forma formateada
@@ -68,37 +151,375 @@ def mostrar_indicadores(dia, indicadores):
 def calcular_indicadores_acumulados(indicadores_diarios):
     """
     Calcula indicadores acumulados para toda la simulación
+    
+    Args:
+        indicadores_diarios: Lista de indicadores por día, o un
+                             AcumuladorIndicadores ya alimentado (O(1))
+    """
+    if isinstance(indicadores_diarios, AcumuladorIndicadores):
+        return indicadores_diarios.acumulados()
+    
+    acumulador = AcumuladorIndicadores()
+    for indicadores in indicadores_diarios:
+        acumulador.agregar_dia(indicadores)
+    return acumulador.acumulados()
+
+class VentanaMovil:
+    """
+    Tasa ponderada de los últimos `tamano` días (suma de numeradores sobre
+    suma de denominadores). Guarda sólo esos días: memoria fija.
+    """
+    
+    def __init__(self, tamano, dias=()):
+        self.tamano = tamano
+        self.dias = deque(maxlen=tamano)
+        self.numerador = 0
+        self.denominador = 0
+        for numerador, denominador in dias:
+            self.agregar(numerador, denominador)
+    
+    def agregar(self, numerador, denominador):
+        if len(self.dias) == self.tamano:
+            saliente_num, saliente_den = self.dias[0]
+            self.numerador -= saliente_num
+            self.denominador -= saliente_den
+        self.dias.append((numerador, denominador))
+        self.numerador += numerador
+        self.denominador += denominador
+    
+    def valor(self):
+        """Tasa de la ventana en %"""
+        return (self.numerador / self.denominador * 100) if self.denominador > 0 else 0
+
+class CuantilP2:
+    """
+    Percentil aproximado con el algoritmo P² (Jain y Chlamtac): cinco
+    marcadores que se ajustan con cada observación, sin guardar la serie.
+    
+    Las primeras MUESTRA_EXACTA observaciones se guardan y el percentil es
+    exacto; al superarlas, los marcadores arrancan desde esa muestra, lo que
+    evita el sesgo de P² con pocas observaciones. Memoria fija en ambos casos.
+    """
+    
+    MUESTRA_EXACTA = 50
+    
+    def __init__(self, percentil):
+        p = percentil / 100
+        self.percentil = percentil
+        self.muestra = []
+        self.alturas = None
+        self.posiciones = None
+        self.deseadas = None
+        self.fracciones = [0, p / 2, p, (1 + p) / 2, 1]
+    
+    def agregar(self, x):
+        if self.alturas is None:
+            insort(self.muestra, x)
+            if len(self.muestra) > self.MUESTRA_EXACTA:
+                self._iniciar_marcadores()
+            return
+        
+        q, n = self.alturas, self.posiciones
+        # Celda donde cae x (ajustando los extremos si hace falta)
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.deseadas[i] += self.fracciones[i]
+        
+        # Mover los marcadores centrales hacia su posición deseada
+        for i in (1, 2, 3):
+            d = self.deseadas[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                parabolica = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if q[i - 1] < parabolica < q[i + 1]:
+                    q[i] = parabolica
+                else:
+                    q[i] = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                n[i] += d
+    
+    def _iniciar_marcadores(self):
+        """Marcadores en los rangos de la muestra exacta; luego se descarta"""
+        ultimo = len(self.muestra) - 1
+        self.posiciones = [round(ultimo * f) for f in self.fracciones]
+        self.deseadas = [ultimo * f for f in self.fracciones]
+        self.alturas = [self.muestra[i] for i in self.posiciones]
+        self.muestra = []
+    
+    def valor(self):
+        if self.alturas is not None:
+            return self.alturas[2]
+        if not self.muestra:
+            return 0
+        # Percentil exacto por interpolación lineal
+        posicion = self.percentil / 100 * (len(self.muestra) - 1)
+        i = int(posicion)
+        if i + 1 >= len(self.muestra):
+            return self.muestra[-1]
+        return self.muestra[i] + (self.muestra[i + 1] - self.muestra[i]) * (posicion - i)
+    
+    def a_dict(self):
+        return {'percentil': self.percentil, 'muestra': self.muestra, 'alturas': self.alturas,
+                'posiciones': self.posiciones, 'deseadas': self.deseadas}
+    
+    @classmethod
+    def desde_dict(cls, datos):
+        cuantil = cls(datos['percentil'])
+        cuantil.muestra = list(datos['muestra'])
+        cuantil.alturas = datos['alturas']
+        cuantil.posiciones = datos['posiciones']
+        cuantil.deseadas = datos['deseadas']
+        return cuantil
+
+class RankingDemanda:
+    """
+    Unidades acumuladas por nombre (cliente o SKU) y los TOP_RANKING nombres
+    con más unidades, mantenidos al sumar
+    
+    Como las sumas sólo crecen, un nombre que no está en el top sólo puede
+    entrar cuando se le suma algo: basta compararlo con el peor del top, y
+    consultar el ranking cuesta O(TOP_RANKING), no O(nombres). Los empates
+    se resuelven por orden de primera aparición, como heapq.nlargest.
+    """
+    
+    def __init__(self, totales=None, tamano=TOP_RANKING):
+        self.totales = dict(totales or {})
+        self.tamano = tamano
+        self.orden = {nombre: i for i, nombre in enumerate(self.totales)}
+        mayores = heapq.nlargest(tamano, self.totales.items(), key=lambda item: item[1])
+        self.top = {nombre for nombre, _ in mayores}
+        self._peor = self._buscar_peor()
+    
+    def _clave(self, nombre):
+        # Mayor es mejor: más unidades y, a igualdad, primera aparición más temprana
+        return (self.totales[nombre], -self.orden[nombre])
+    
+    def _buscar_peor(self):
+        return min(self.top, key=self._clave) if self.top else None
+    
+    def sumar(self, nombre, unidades):
+        """Suma unidades a un nombre y actualiza el top"""
+        total = self.totales.get(nombre)
+        if total is None:
+            self.orden[nombre] = len(self.orden)
+            total = 0
+        self.totales[nombre] = total + unidades
+        
+        if nombre in self.top:
+            if nombre == self._peor:
+                self._peor = self._buscar_peor()
+        elif len(self.top) < self.tamano:
+            self.top.add(nombre)
+            self._peor = self._buscar_peor()
+        elif self._clave(nombre) > self._clave(self._peor):
+            self.top.discard(self._peor)
+            self.top.add(nombre)
+            self._peor = self._buscar_peor()
+    
+    def mejores(self, k):
+        """Los k nombres con más unidades: lista de (nombre, unidades)"""
+        if k > self.tamano:
+            return heapq.nlargest(k, self.totales.items(), key=lambda item: item[1])
+        orden = sorted(self.top, key=self._clave, reverse=True)[:k]
+        return [(nombre, self.totales[nombre]) for nombre in orden]
+
+class AcumuladorIndicadores:
+    """
+    Agregado incremental de los indicadores de un periodo
+    
+    Se alimenta una vez por día simulado (agregar_dia) y responde los
+    acumulados y los datos del reporte sin volver a recorrer el historial:
+    sumas corridas para los totales, Welford para media y desviación de los
+    porcentajes diarios, ventanas móviles de 7/30 días, percentiles P² y
+    demanda por cliente y SKU con su top mantenido al sumar (RankingDemanda). La memoria no crece con el
+    horizonte (salvo por la cantidad de clientes y SKUs distintos).
+    Se puede guardar y restaurar como diccionario JSON (a_dict / desde_dict).
     """
-    if not indicadores_diarios:
-        return {}
-    
-    # Sumar totales
-    total_pedidos = sum(ind['Pedidos_Totales'] for ind in indicadores_diarios)
-    total_procesados = sum(ind['Pedidos_Procesados'] for ind in indicadores_diarios)
-    total_solicitadas = sum(ind['Unidades_Solicitadas'] for ind in indicadores_diarios)
-    total_entregadas = sum(ind['Unidades_Entregadas'] for ind in indicadores_diarios)
-    total_pendientes = sum(ind['Unidades_Pendientes'] for ind in indicadores_diarios)
-    
-    # Calcular promedios ponderados
-    otif_acumulado = (total_procesados / total_pedidos * 100) if total_pedidos > 0 else 0
-    fill_rate_acumulado = (total_entregadas / total_solicitadas * 100) if total_solicitadas > 0 else 0
-    backlog_rate_acumulado = (total_pendientes / total_solicitadas * 100) if total_solicitadas > 0 else 0
-    
-    # Promedio de utilización de flota
-    utilizacion_flota_promedio = sum(ind['Utilizacion_Flota'] for ind in indicadores_diarios) / len(indicadores_diarios)
-    
-    # Productividad de picking promedio
-    productividad_promedio = sum(ind['Productividad_Picking'] for ind in indicadores_diarios) / len(indicadores_diarios)
-    
-    return {
-        'OTIF_Acumulado': otif_acumulado,
-        'Fill_Rate_Acumulado': fill_rate_acumulado,
-        'Backlog_Rate_Acumulado': backlog_rate_acumulado,
-        'Utilizacion_Flota_Promedio': utilizacion_flota_promedio,
-        'Productividad_Picking_Promedio': productividad_promedio,
-        'Total_Pedidos_Recibidos': total_pedidos,
-        'Total_Pedidos_Procesados': total_procesados,
-        'Total_Unidades_Solicitadas': total_solicitadas,
-        'Total_Unidades_Entregadas': total_entregadas,
-        'Total_Unidades_Pendientes': total_pendientes
-    }
\ No newline at end of file
+    
+    def __init__(self):
+        self.dias = 0
+        self.totales = {clave: 0 for clave in TOTALES_DIARIOS}
+        # Por indicador: [n, media, m2, minimo, maximo]; la suma se lleva
+        # aparte para que el promedio coincida exactamente con sum()/n
+        self.welford = {clave: [0, 0.0, 0.0, math.inf, -math.inf] for clave in PROMEDIOS_DIARIOS}
+        self.sumas = {clave: 0 for clave in PROMEDIOS_DIARIOS}
+        self.ventanas = {(clave, tamano): VentanaMovil(tamano) for clave in TASAS for tamano in VENTANAS_MOVILES}
+        self.cuantiles = {(clave, p): CuantilP2(p) for clave in TASAS for p in PERCENTILES_DIARIOS}
+        self._asignar_demanda({}, {})
+    
+    def _asignar_demanda(self, clientes, skus):
+        self.ranking_clientes = RankingDemanda(clientes)
+        self.ranking_skus = RankingDemanda(skus)
+        # Los diccionarios de demanda son los de los rankings (se serializan en a_dict)
+        self.demanda_clientes = self.ranking_clientes.totales
+        self.demanda_skus = self.ranking_skus.totales
+    
+    def agregar_dia(self, indicadores, pedidos_dia=None):
+        """
+        Incorpora los indicadores de un día (y opcionalmente sus pedidos,
+        para los rankings de clientes y productos)
+        """
+        self.dias += 1
+        for clave in TOTALES_DIARIOS:
+            self.totales[clave] += indicadores.get(clave, 0)
+        
+        for clave in PROMEDIOS_DIARIOS:
+            valor = indicadores.get(clave, 0)
+            self.sumas[clave] += valor
+            estado = self.welford[clave]
+            estado[0] += 1
+            delta = valor - estado[1]
+            estado[1] += delta / estado[0]
+            estado[2] += delta * (valor - estado[1])
+            estado[3] = min(estado[3], valor)
+            estado[4] = max(estado[4], valor)
+        
+        for (clave, _), ventana in self.ventanas.items():
+            numerador, denominador = TASAS[clave]
+            ventana.agregar(indicadores.get(numerador, 0), indicadores.get(denominador, 0))
+        for (clave, _), cuantil in self.cuantiles.items():
+            cuantil.agregar(indicadores.get(clave, 0))
+        
+        if pedidos_dia:
+            self.agregar_pedidos(pedidos_dia)
+    
+    def agregar_pedidos(self, pedidos_dia):
+        """Suma la demanda de un día a los rankings de clientes y productos"""
+        if isinstance(pedidos_dia, ConjuntoPedidos):
+            self._agregar_conjunto(pedidos_dia)
+            return
+        sumar_cliente = self.ranking_clientes.sumar
+        sumar_sku = self.ranking_skus.sumar
+        for pedido in pedidos_dia.values():
+            sumar_cliente(pedido['cliente'], sum(pedido['productos'].values()))
+            for sku, cantidad in pedido['productos'].items():
+                sumar_sku(sku, cantidad)
+    
+    def _agregar_conjunto(self, pedidos):
+        """agregar_pedidos sobre los arreglos del almacén (sin recorrer pedido a pedido)"""
+        almacen = pedidos.almacen
+        lineas = pedidos.lineas()
+        sumas = (
+            (self.ranking_clientes, almacen.clientes, almacen.cliente_idx[pedidos.indices], pedidos.unidades()),
+            (self.ranking_skus, almacen.skus, almacen.sku_idx[lineas], almacen.cantidad[lineas])
+        )
+        for ranking, nombres, codigos, cantidades in sumas:
+            if codigos.size == 0:
+                continue
+            totales = np.bincount(codigos, weights=cantidades, minlength=len(nombres))
+            # En orden de primera aparición, como el recorrido pedido a pedido
+            _, primera = np.unique(codigos, return_index=True)
+            for codigo in codigos[np.sort(primera)].tolist():
+                ranking.sumar(nombres[codigo], int(totales[codigo]))
+    
+    def media(self, clave):
+        """Promedio simple de un indicador diario"""
+        return self.sumas[clave] / self.dias if self.dias > 0 else 0
+    
+    def estadisticas(self, clave):
+        """Media, desviación estándar (muestral), mínimo y máximo de un indicador diario"""
+        n, media, m2, minimo, maximo = self.welford[clave]
+        if n == 0:
+            return {'media': 0, 'std': 0, 'min': 0, 'max': 0}
+        return {
+            'media': self.media(clave),
+            'std': math.sqrt(m2 / (n - 1)) if n > 1 else 0.0,
+            'min': minimo,
+            'max': maximo
+        }
+    
+    def tasa(self, clave):
+        """Tasa ponderada del periodo completo (por ejemplo, OTIF sobre todos los pedidos)"""
+        numerador, denominador = TASAS[clave]
+        total = self.totales[denominador]
+        return (self.totales[numerador] / total * 100) if total > 0 else 0
+    
+    def ventanas_moviles(self):
+        """Tasas ponderadas de las ventanas móviles: {'OTIF_7d': ..., ...}"""
+        return {f"{clave}_{tamano}d": ventana.valor() for (clave, tamano), ventana in self.ventanas.items()}
+    
+    def percentiles(self):
+        """Percentiles aproximados de los valores diarios: {'OTIF_P50': ..., ...}"""
+        return {f"{clave}_P{p}": cuantil.valor() for (clave, p), cuantil in self.cuantiles.items()}
+    
+    def top_clientes(self, k=1):
+        """Los k clientes con más unidades pedidas: lista de (cliente, unidades)"""
+        return self.ranking_clientes.mejores(k)
+    
+    def top_skus(self, k=1):
+        """Los k SKUs con más unidades pedidas: lista de (sku, unidades)"""
+        return self.ranking_skus.mejores(k)
+    
+    def acumulados(self):
+        """Mismo resultado que calcular_indicadores_acumulados sobre el historial"""
+        if self.dias == 0:
+            return {}
+        
+        total_pedidos = self.totales['Pedidos_Totales']
+        total_procesados = self.totales['Pedidos_Procesados']
+        total_solicitadas = self.totales['Unidades_Solicitadas']
+        total_entregadas = self.totales['Unidades_Entregadas']
+        total_pendientes = self.totales['Unidades_Pendientes']
+        
+        acumulados = {
+            'OTIF_Acumulado': self.tasa('OTIF'),
+            'Fill_Rate_Acumulado': self.tasa('Fill_Rate'),
+            'Backlog_Rate_Acumulado': self.tasa('Backlog_Rate'),
+            'Utilizacion_Flota_Promedio': self.media('Utilizacion_Flota'),
+            'Productividad_Picking_Promedio': self.media('Productividad_Picking'),
+            'Total_Pedidos_Recibidos': total_pedidos,
+            'Total_Pedidos_Procesados': total_procesados,
+            'Total_Unidades_Solicitadas': total_solicitadas,
+            'Total_Unidades_Entregadas': total_entregadas,
+            'Total_Unidades_Pendientes': total_pendientes
+        }
+        acumulados.update(self.ventanas_moviles())
+        acumulados.update(self.percentiles())
+        return acumulados
+    
+    def a_dict(self):
+        """Estado serializable en JSON"""
+        return {
+            'dias': self.dias,
+            'totales': self.totales,
+            'sumas': self.sumas,
+            'welford': {clave: [n, media, m2, minimo if n else None, maximo if n else None]
+                        for clave, (n, media, m2, minimo, maximo) in self.welford.items()},
+            'ventanas': {f"{clave}|{tamano}": list(ventana.dias) for (clave, tamano), ventana in self.ventanas.items()},
+            'cuantiles': {f"{clave}|{p}": cuantil.a_dict() for (clave, p), cuantil in self.cuantiles.items()},
+            'demanda_clientes': self.demanda_clientes,
+            'demanda_skus': self.demanda_skus
+        }
+    
+    @classmethod
+    def desde_dict(cls, datos):
+        """Reconstruye un acumulador guardado con a_dict"""
+        acumulador = cls()
+        acumulador.dias = datos['dias']
+        acumulador.totales.update(datos['totales'])
+        acumulador.sumas.update(datos['sumas'])
+        for clave, (n, media, m2, minimo, maximo) in datos['welford'].items():
+            acumulador.welford[clave] = [n, media, m2,
+                                         math.inf if minimo is None else minimo,
+                                         -math.inf if maximo is None else maximo]
+        for nombre, dias in datos['ventanas'].items():
+            clave, tamano = nombre.split('|')
+            acumulador.ventanas[(clave, int(tamano))] = VentanaMovil(int(tamano), dias)
+        for nombre, cuantil in datos['cuantiles'].items():
+            clave, p = nombre.split('|')
+            acumulador.cuantiles[(clave, int(p))] = CuantilP2.desde_dict(cuantil)
+        acumulador._asignar_demanda(datos['demanda_clientes'], datos['demanda_skus'])
+        return acumulador
@@ -3,7 +3,210 @@ Módulo de Inventario - Sistema de Logística FIIS SIE
 Control de inventario y reposición automática
 """
 
-from .catalogos import inventario_inicial, punto_reposicion, lote_reposicion
+from array import array
+from collections.abc import Mapping
+import numpy as np
+from .catalogos import (inventario_inicial, punto_reposicion, lote_reposicion, catalogo_compilado,
+                        revision_catalogos)
+
+class LibroStock:
+    """
+    Libro de stock compacto: cada SKU ocupa una posición entera de un arreglo.
+    
+    Las reservas se aplican en sitio (sin copiar el inventario por pedido) y
+    la reposición sólo revisa los SKUs que se movieron o que quedaron bajo
+    su punto de reorden, así el costo de un día no depende del tamaño del
+    catálogo. simular_periodo mantiene un mismo libro durante todo el
+    horizonte (ver procesar_dia_inventario).
+    """
+    
+    def __init__(self, stock, punto_reorden=None, lote=None):
+        self.skus = list(stock.keys())
+        self.cantidades = array('q', stock.values())
+        self._cargar_parametros(punto_reorden or {}, lote or {})
+    
+    def _cargar_parametros(self, punto_reorden, lote):
+        self._parametros = self._version_parametros(punto_reorden, lote)
+        
+        compilado = None
+        if punto_reorden is punto_reposicion and lote is lote_reposicion:
+            compilado = catalogo_compilado()
+            if compilado.skus != self.skus:
+                compilado = None
+        
+        if compilado is not None:
+            # Stock con los SKUs del catálogo, en su orden: índice y
+            # parámetros salen del catálogo compilado sin recorrer diccionarios
+            self.indice = compilado.indice_sku
+            self.punto = array('q', compilado.punto_reposicion_de_sku.tobytes())
+            self.lote = array('q', compilado.lote_de_sku.tobytes())
+            bajo_punto = np.frombuffer(self.cantidades, dtype=np.int64) < compilado.punto_reposicion_de_sku
+            self._revisar = set(np.flatnonzero(bajo_punto).tolist())
+            return
+        
+        self.indice = {sku: i for i, sku in enumerate(self.skus)}
+        # -1 = SKU sin punto de reorden (nunca se repone)
+        self.punto = array('q', (punto_reorden.get(sku, -1) for sku in self.skus))
+        self.lote = array('q', (lote.get(sku, 100) for sku in self.skus))  # Lote por defecto de 100
+        
+        # Posiciones a revisar en la próxima reposición
+        self._revisar = {i for i in range(len(self.skus)) if self.cantidades[i] < self.punto[i]}
+    
+    @staticmethod
+    def _version_parametros(punto_reorden, lote):
+        # Los del catálogo se reconocen por su revisión (O(1)); otros
+        # diccionarios, por una copia de su contenido
+        if punto_reorden is punto_reposicion and lote is lote_reposicion:
+            return revision_catalogos()
+        return (dict(punto_reorden), dict(lote))
+    
+    def usar_parametros(self, punto_reorden, lote):
+        """
+        Cambia los puntos de reorden y lotes si difieren de los vigentes
+        (también si se editaron en sitio; los del catálogo, avisando con
+        invalidar_catalogo). Con los del catálogo sin cambios es O(1).
+        """
+        punto_reorden = punto_reorden or {}
+        lote = lote or {}
+        if punto_reorden is punto_reposicion and lote is lote_reposicion:
+            vigentes = revision_catalogos()
+        else:
+            vigentes = (punto_reorden, lote)
+        if self._parametros != vigentes:
+            self._cargar_parametros(punto_reorden, lote)
+    
+    def foto(self):
+        """StockDia con las cantidades actuales (copia del arreglo, no un diccionario)"""
+        return StockDia(self.skus, self.indice, self.cantidades[:])
+    
+    def reservar(self, productos, detalle=None):
+        """
+        Reserva en sitio las líneas de un pedido
+        
+        Args:
+            productos: Diccionario {sku: cantidad_solicitada}
+            detalle: Lista opcional donde se agregan tuplas
+                     (sku, despachadas, stock_restante) por línea despachada
+        
+        Returns:
+            Tupla (unidades_despachadas, faltantes)
+        """
+        cantidades = self.cantidades
+        indice = self.indice
+        despachadas_total = 0
+        faltantes = {}
+        
+        for sku, cantidad_solicitada in productos.items():
+            i = indice.get(sku)
+            if i is None:
+                # SKU no existe en inventario
+                faltantes[sku] = cantidad_solicitada
+                continue
+            
+            disponible = cantidades[i]
+            if disponible >= cantidad_solicitada:
+                despachadas = cantidad_solicitada
+            else:
+                # No hay suficiente stock: se agota
+                despachadas = disponible
+                faltantes[sku] = cantidad_solicitada - disponible
+            
+            cantidades[i] = disponible - despachadas
+            self._revisar.add(i)
+            despachadas_total += despachadas
+            if detalle is not None and despachadas > 0:
+                detalle.append((sku, despachadas, cantidades[i]))
+        
+        return despachadas_total, faltantes
+    
+    def recibir(self, llegadas):
+        """
+        Suma al stock las órdenes de reposición que llegan
+        
+        Args:
+            llegadas: Diccionario {sku: unidades} (ver TransitoReposicion.recibir)
+        """
+        cantidades, indice = self.cantidades, self.indice
+        for sku, unidades in llegadas.items():
+            i = indice.get(sku)
+            if i is not None:
+                cantidades[i] += unidades
+                self._revisar.add(i)
+    
+    def reponer(self, transito=None, dia=None):
+        """
+        Aplica la reposición a los SKUs bajo su punto de reorden
+        
+        Sin tránsito el lote entra al stock en el acto. Con un
+        TransitoReposicion se decide con la posición de inventario (stock +
+        en camino) y el lote queda en camino hasta su día de llegada; las
+        órdenes que no llegan hoy quedan en self.ordenes.
+        
+        Args:
+            transito: TransitoReposicion opcional
+            dia: Día de la orden (obligatorio con tránsito)
+        
+        Returns:
+            Diccionario {sku: cantidad_repuesta} con lo que entró hoy al stock
+        """
+        cantidades, punto, lote = self.cantidades, self.punto, self.lote
+        en_camino = transito.en_camino if transito is not None else {}
+        reposiciones = {}
+        self.ordenes = {}
+        pendientes = set()
+        
+        for i in sorted(self._revisar):
+            sku = self.skus[i]
+            posicion = cantidades[i] + en_camino.get(sku, 0)
+            if posicion < punto[i]:
+                if transito is None or transito.pedir(dia, sku, lote[i]) == dia:
+                    cantidades[i] += lote[i]
+                    reposiciones[sku] = lote[i]
+                else:
+                    self.ordenes[sku] = lote[i]
+                if posicion + lote[i] < punto[i]:
+                    pendientes.add(i)
+        
+        self._revisar = pendientes
+        return reposiciones
+    
+    def a_dict(self):
+        """Stock como diccionario {sku: cantidad} (recorre todo el catálogo)"""
+        return dict(zip(self.skus, self.cantidades))
+
+class StockDia(Mapping):
+    """
+    Stock de un momento visto como diccionario {sku: unidades} de sólo
+    lectura. Comparte con el libro la lista de SKUs y el índice, y guarda
+    una copia del arreglo de cantidades: el libro puede seguir cambiando
+    sin alterarla. Se serializa como diccionario (ver pedidos.a_json).
+    """
+    
+    __slots__ = ('skus', 'indice', 'cantidades')
+    
+    def __init__(self, skus, indice, cantidades):
+        self.skus = skus
+        self.indice = indice
+        self.cantidades = cantidades
+    
+    def __getitem__(self, sku):
+        return self.cantidades[self.indice[sku]]
+    
+    def __iter__(self):
+        return iter(self.skus)
+    
+    def __len__(self):
+        return len(self.skus)
+    
+    def items(self):
+        return zip(self.skus, self.cantidades)
+    
+    def copy(self):
+        """Copia como diccionario (editable)"""
+        return dict(zip(self.skus, self.cantidades))
+    
+    def __repr__(self):
+        return repr(self.copy())
 
 def reservar_y_actualizar(stock, pedido):
     """
@@ -72,56 +275,194 @@ def mostrar_inventario(stock, titulo="Inventario Actual"):
     
     return "\n".join(resultado)
 
-def procesar_dia_inventario(pedidos_dia, stock_inicial, punto_reorden, lote):
+def procesar_dia_libro(pedidos_dia, libro, eventos=None, transito=None, dia=None):
     """
-    Procesa todos los pedidos de un día y actualiza el inventario
+    Procesa en sitio todos los pedidos de un día sobre un LibroStock
+    
+    Args:
+        pedidos_dia: Diccionario {pedido_id: pedido}
+        libro: LibroStock que se actualiza en sitio
+        eventos: Lista opcional donde se registran tuplas
+                 (pedido_id, sku, despachadas, stock_restante) por línea despachada
+        transito: TransitoReposicion opcional: al empezar el día se reciben
+                  sus llegadas y la reposición queda en camino
+        dia: Número de día (obligatorio con tránsito)
     
     Returns:
-        Diccionario con resultados del procesamiento
+        Diccionario con pedidos procesados, reposiciones y unidades
+        despachadas; con tránsito, además 'llegadas', 'ordenes_reposicion'
+        y 'total_unidades_faltantes'
     """
-    stock_actual = stock_inicial.copy()
     pedidos_procesados = []
     total_unidades_despachadas = 0
+    total_unidades_faltantes = 0
+    detalle = [] if eventos is not None else None
     
-    resultado = ["\n=== Procesamiento de Inventario ==="]
-    resultado.append(mostrar_inventario(stock_actual, "Inventario Inicial"))
+    llegadas = None
+    if transito is not None:
+        if dia is None:
+            raise ValueError("Con órdenes en tránsito hace falta el número de día")
+        llegadas = transito.recibir(dia)
+        libro.recibir(llegadas)
     
     for pedido_id, pedido in pedidos_dia.items():
-        stock_anterior = stock_actual.copy()
-        stock_actual, pedido_completo, faltantes = reservar_y_actualizar(stock_actual, pedido)
-        
-        # Calcular unidades despachadas
-        unidades_despachadas = 0
-        for sku, cantidad in pedido['productos'].items():
-            if sku in stock_anterior:
-                despachadas = min(stock_anterior[sku], cantidad)
-                unidades_despachadas += despachadas
-                if despachadas > 0:
-                    resultado.append(f"Pedido {pedido_id} - {sku}: {despachadas} unidades despachadas (Stock restante: {stock_actual[sku]})")
+        unidades_despachadas, faltantes = libro.reservar(pedido['productos'], detalle)
+        
+        if detalle:
+            eventos.extend((pedido_id,) + linea for linea in detalle)
+            detalle.clear()
         
         total_unidades_despachadas += unidades_despachadas
+        if faltantes:
+            total_unidades_faltantes += sum(faltantes.values())
         
         pedidos_procesados.append({
             'pedido_id': pedido_id,
-            'completo': pedido_completo,
+            'completo': not faltantes,
             'faltantes': faltantes,
             'unidades_despachadas': unidades_despachadas
         })
     
     # Verificar reposiciones
-    stock_final, reposiciones = reponer_simple(stock_actual, punto_reorden, lote)
-    
-    if reposiciones:
-        resultado.append("\n--- Reaprovisionamiento automático ---")
-        for sku, cantidad in reposiciones.items():
-            resultado.append(f"{sku}: +{cantidad} unidades añadidas")
-    
-    resultado.append(mostrar_inventario(stock_final, "Stock Final"))
+    reposiciones = libro.reponer(transito, dia)
     
-    return {
-        'stock_final': stock_final,
+    procesamiento = {
         'pedidos_procesados': pedidos_procesados,
         'reposiciones': reposiciones,
-        'total_unidades_despachadas': total_unidades_despachadas,
-        'log': "\n".join(resultado)
-    }
\ No newline at end of file
+        'total_unidades_despachadas': total_unidades_despachadas
+    }
+    if transito is not None:
+        procesamiento['llegadas'] = llegadas
+        procesamiento['ordenes_reposicion'] = libro.ordenes
+        procesamiento['total_unidades_faltantes'] = total_unidades_faltantes
+    return procesamiento
+
+# Niveles de detalle del log de inventario
+NIVELES_LOG = ('ninguno', 'resumen', 'completo')
+
+class ResultadoInventario(dict):
+    """
+    Resultado de procesar_dia_inventario.
+    
+    Se comporta como el diccionario de siempre, pero en nivel 'completo' la
+    clave 'log' no existe hasta que alguien la lee: en ese momento se arma
+    a partir de los eventos registrados. Así, quien no lee el log (por
+    ejemplo al serializar a JSON) no paga el formateo de texto.
+    """
+    
+    def __init__(self, *args, eventos=None, stock_inicial=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.eventos = eventos
+        self.stock_inicial = stock_inicial
+    
+    def __missing__(self, clave):
+        if clave == 'log' and self.eventos is not None:
+            return generar_log_inventario(self)
+        raise KeyError(clave)
+    
+    def get(self, clave, defecto=None):
+        # dict.get no pasa por __missing__
+        try:
+            return self[clave]
+        except KeyError:
+            return defecto
+
+def generar_log_inventario(resultado):
+    """
+    Arma el log de texto completo de un día a partir de sus eventos y lo
+    deja guardado en resultado['log']
+    """
+    if 'log' in resultado:
+        return resultado['log']
+    
+    texto = ["\n=== Procesamiento de Inventario ==="]
+    texto.append(mostrar_inventario(resultado.stock_inicial, "Inventario Inicial"))
+    
+    if resultado.get('llegadas'):
+        texto.append("\n--- Llegadas de reposición ---")
+        for sku, cantidad in resultado['llegadas'].items():
+            texto.append(f"{sku}: +{cantidad} unidades recibidas")
+    
+    for pedido_id, sku, despachadas, restante in resultado.eventos:
+        texto.append(f"Pedido {pedido_id} - {sku}: {despachadas} unidades despachadas (Stock restante: {restante})")
+    
+    if resultado['reposiciones']:
+        texto.append("\n--- Reaprovisionamiento automático ---")
+        for sku, cantidad in resultado['reposiciones'].items():
+            texto.append(f"{sku}: +{cantidad} unidades añadidas")
+    
+    if resultado.get('ordenes_reposicion'):
+        texto.append("\n--- Órdenes de reposición en camino ---")
+        for sku, cantidad in resultado['ordenes_reposicion'].items():
+            texto.append(f"{sku}: {cantidad} unidades pedidas")
+    
+    texto.append(mostrar_inventario(resultado['stock_final'], "Stock Final"))
+    
+    resultado['log'] = "\n".join(texto)
+    return resultado['log']
+
+def procesar_dia_inventario(pedidos_dia, stock_inicial, punto_reorden, lote, nivel_log='completo',
+                            transito=None, dia=None):
+    """
+    Procesa todos los pedidos de un día y actualiza el inventario
+    
+    Args:
+        stock_inicial: Diccionario {sku: unidades}, o un LibroStock que se
+                       actualiza en sitio (stock_final es entonces un
+                       StockDia: una foto del libro, sin armar diccionario)
+        nivel_log: 'ninguno' (sin log), 'resumen' (totales del día) o
+                   'completo' (línea por línea, armado recién al leer 'log')
+        transito: TransitoReposicion opcional (reposición con tiempo de
+                  entrega; se actualiza en sitio)
+        dia: Número de día (obligatorio con tránsito)
+    
+    Returns:
+        Diccionario con resultados del procesamiento; con tránsito incluye
+        además 'llegadas', 'ordenes_reposicion', 'total_unidades_faltantes'
+        y 'unidades_en_camino'
+    """
+    if nivel_log not in NIVELES_LOG:
+        raise ValueError(f"Nivel de log desconocido: {nivel_log}")
+    
+    eventos = [] if nivel_log == 'completo' else None
+    if isinstance(stock_inicial, LibroStock):
+        # Libro que sigue de un día a otro: no se arma ni se vuelca a diccionario
+        libro = stock_inicial
+        libro.usar_parametros(punto_reorden, lote)
+        inicial = libro.foto() if eventos is not None else None
+    else:
+        libro = LibroStock(stock_inicial, punto_reorden, lote)
+        inicial = dict(stock_inicial) if eventos is not None else None
+    
+    procesamiento = procesar_dia_libro(pedidos_dia, libro, eventos, transito, dia)
+    
+    resultado = ResultadoInventario(
+        stock_final=libro.foto() if libro is stock_inicial else libro.a_dict(),
+        pedidos_procesados=procesamiento['pedidos_procesados'],
+        reposiciones=procesamiento['reposiciones'],
+        total_unidades_despachadas=procesamiento['total_unidades_despachadas'],
+        eventos=eventos,
+        stock_inicial=inicial
+    )
+    if transito is not None:
+        for clave in ('llegadas', 'ordenes_reposicion', 'total_unidades_faltantes'):
+            resultado[clave] = procesamiento[clave]
+        resultado['unidades_en_camino'] = transito.unidades
+    
+    if nivel_log == 'ninguno':
+        resultado['log'] = ""
+    elif nivel_log == 'resumen':
+        repuestos = ", ".join(f"{sku} +{cantidad}" for sku, cantidad in resultado['reposiciones'].items())
+        resultado['log'] = (
+            f"Pedidos procesados: {len(resultado['pedidos_procesados'])} | "
+            f"Unidades despachadas: {resultado['total_unidades_despachadas']} | "
+            f"Reposiciones: {repuestos or 'ninguna'}"
+        )
+        if transito is not None:
+            resultado['log'] += (
+                f" | Llegadas: {sum(resultado['llegadas'].values())} u. | "
+                f"Órdenes nuevas: {len(resultado['ordenes_reposicion'])} | "
+                f"En camino: {resultado['unidades_en_camino']} u."
+            )
+    
+    return resultado
@@ -0,0 +1,112 @@
+"""
+Módulo Monte Carlo - Sistema de Logística FIIS SIE
+Réplicas independientes del horizonte completo en paralelo
+"""
+
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from .aleatorio import derivar_semilla
+from .simulacion import simular_periodo
+from .indicadores import calcular_indicadores_acumulados
+
+def _es_numerico(valor):
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+
+def _ejecutar_replica(n_dias, capacidad_picking, semilla):
+    """
+    Corre una réplica y devuelve sólo los valores numéricos de los
+    indicadores (diarios y acumulados), que es lo que viaja entre procesos.
+    """
+    indicadores_diarios = [resultado['indicadores'] for _, resultado in
+                           simular_periodo(n_dias, capacidad_picking, semilla, nivel_log='ninguno')]
+    acumulados = calcular_indicadores_acumulados(indicadores_diarios)
+
+    diarios = [{k: v for k, v in ind.items() if _es_numerico(v)} for ind in indicadores_diarios]
+    acumulados = {k: v for k, v in acumulados.items() if _es_numerico(v)}
+    return diarios, acumulados
+
+def _ejecutar_lote(n_dias, capacidad_picking, semilla, replicas):
+    """Ejecuta un bloque de réplicas en un mismo proceso trabajador"""
+    return [_ejecutar_replica(n_dias, capacidad_picking, derivar_semilla(semilla, r))
+            for r in replicas]
+
+def _resumir(matriz, percentiles):
+    """Media, desviación y percentiles a lo largo del eje de réplicas"""
+    resumen = {
+        'media': matriz.mean(axis=0),
+        'std': matriz.std(axis=0, ddof=1) if matriz.shape[0] > 1 else np.zeros(matriz.shape[1:])
+    }
+    for p, valores in zip(percentiles, np.percentile(matriz, percentiles, axis=0)):
+        resumen[f"p{p:g}"] = valores
+    return {k: v.tolist() for k, v in resumen.items()}
+
+def replicar_simulacion(n_replicas, n_dias, capacidad_picking=1500, semilla=None,
+                        max_procesos=None, percentiles=(5, 50, 95)):
+    """
+    Ejecuta N réplicas independientes del horizonte y resume los indicadores
+
+    Cada réplica usa una semilla derivada de (semilla, número de réplica), así
+    que el resultado no depende de cuántos procesos participen. Las réplicas
+    se reparten en bloques para que cada proceso haga trabajo suficiente.
+
+    Args:
+        n_replicas: Número de réplicas
+        n_dias: Días por réplica
+        capacidad_picking: Unidades que se pueden preparar por día
+        semilla: Semilla base (si es None se genera una y se informa)
+        max_procesos: Procesos trabajadores (por defecto, todos los núcleos;
+                      1 ejecuta en el proceso actual). Nunca se lanzan más
+                      que réplicas.
+        percentiles: Percentiles a informar
+
+    Returns:
+        Diccionario con 'diario' (por indicador: listas por día) y
+        'acumulado' (por indicador: valores del periodo), cada uno con
+        media, std y los percentiles pedidos
+    """
+    if n_replicas < 1:
+        raise ValueError("Se necesita al menos una réplica")
+    if semilla is None:
+        semilla = int(np.random.SeedSequence().generate_state(1)[0])
+    if max_procesos is None:
+        max_procesos = os.cpu_count() or 1
+    if max_procesos < 1:
+        raise ValueError("Se necesita al menos un proceso")
+    max_procesos = min(max_procesos, n_replicas)
+
+    # Unos 4 bloques contiguos por proceso: reparte bien la carga sin saturar
+    # de mensajes, y al concatenarlos las réplicas quedan en su orden original
+    n_bloques = min(n_replicas, max_procesos * 4)
+    limites = np.linspace(0, n_replicas, n_bloques + 1).astype(int)
+    bloques = [range(a, b) for a, b in zip(limites[:-1], limites[1:])]
+
+    if max_procesos == 1:
+        resultados = [_ejecutar_lote(n_dias, capacidad_picking, semilla, b) for b in bloques]
+    else:
+        with ProcessPoolExecutor(max_workers=max_procesos) as pool:
+            futuros = [pool.submit(_ejecutar_lote, n_dias, capacidad_picking, semilla, b)
+                       for b in bloques]
+            resultados = [f.result() for f in futuros]
+
+    replicas = [r for lote in resultados for r in lote]
+    claves_diarias = list(replicas[0][0][0].keys()) if replicas[0][0] else []
+    claves_acumuladas = list(replicas[0][1].keys())
+
+    diario = {}
+    for clave in claves_diarias:
+        matriz = np.array([[ind[clave] for ind in diarios] for diarios, _ in replicas], dtype=float)
+        diario[clave] = _resumir(matriz, percentiles)
+
+    acumulado = {}
+    for clave in claves_acumuladas:
+        matriz = np.array([[acum[clave]] for _, acum in replicas], dtype=float)
+        acumulado[clave] = {k: v[0] for k, v in _resumir(matriz, percentiles).items()}
+
+    return {
+        'n_replicas': n_replicas,
+        'n_dias': n_dias,
+        'semilla': semilla,
+        'diario': diario,
+        'acumulado': acumulado
+    }
@@ -0,0 +1,272 @@
+"""
+Módulo de Pedidos - Sistema de Logística FIIS SIE
+Almacén compacto de pedidos (arreglos por línea) con vistas tipo diccionario
+"""
+
+from collections.abc import Mapping
+import numpy as np
+
+# Campos de un pedido guardados como columnas; cualquier otro campo (por
+# ejemplo 'fecha_entrega') se guarda aparte sólo para los pedidos que lo traen
+CAMPOS_PEDIDO = ('cliente', 'productos', 'fecha', 'zona', 'total_unidades')
+_CAMPOS_COLUMNAS = frozenset(CAMPOS_PEDIDO)
+
+# Marca de 'fecha' ausente en la columna de fechas
+SIN_FECHA = np.iinfo(np.int32).min
+
+class AlmacenPedidos:
+    """
+    Pedidos guardados por columnas en lugar de un diccionario por pedido
+
+    Por pedido i: ids[i], cliente_idx[i], zona_idx[i], fecha[i] y
+    total_unidades[i] (precalculado). Sus líneas ocupan las posiciones
+    inicio[i]:inicio[i+1] de sku_idx y cantidad (formato CSR). Clientes,
+    zonas y SKUs se guardan una sola vez en las listas clientes, zonas y
+    skus; las columnas sólo llevan su índice.
+
+    Las etapas pueden trabajar con índices de pedido sobre los arreglos, o
+    con vista() / ConjuntoPedidos, que se comporta como el diccionario
+    {pedido_id: pedido} de siempre sin copiar nada.
+    """
+
+    def __init__(self, ids, cliente_idx, zona_idx, fecha, inicio, sku_idx, cantidad,
+                 clientes, zonas, skus, extras=None):
+        self.ids = list(ids)
+        self.cliente_idx = np.asarray(cliente_idx, dtype=np.int32)
+        self.zona_idx = np.asarray(zona_idx, dtype=np.int32)
+        self.fecha = np.asarray(fecha, dtype=np.int32)
+        self.inicio = np.asarray(inicio, dtype=np.int64)
+        self.sku_idx = np.asarray(sku_idx, dtype=np.int32)
+        self.cantidad = np.asarray(cantidad, dtype=np.int64)
+        self.clientes = list(clientes)
+        self.zonas = list(zonas)
+        self.skus = list(skus)
+        # {indice_pedido: {campo: valor}} de los campos fuera de CAMPOS_PEDIDO
+        self.extras = extras or {}
+
+        acumulada = np.concatenate(([0], np.cumsum(self.cantidad)))
+        self.total_unidades = acumulada[self.inicio[1:]] - acumulada[self.inicio[:-1]]
+        self.posicion = {pedido_id: i for i, pedido_id in enumerate(self.ids)}
+
+    @classmethod
+    def desde_dict(cls, pedidos):
+        """Compacta un diccionario {pedido_id: pedido} (una sola pasada)"""
+        clientes, zonas, skus = {}, {}, {}
+        cliente_idx, zona_idx, fecha, inicio, sku_idx, cantidad = [], [], [], [0], [], []
+        extras = {}
+
+        for i, pedido in enumerate(pedidos.values()):
+            cliente_idx.append(clientes.setdefault(pedido['cliente'], len(clientes)))
+            zona_idx.append(zonas.setdefault(pedido['zona'], len(zonas)))
+            fecha.append(pedido.get('fecha', SIN_FECHA))
+            productos = pedido['productos']
+            for sku in productos:
+                sku_idx.append(skus.setdefault(sku, len(skus)))
+            cantidad.extend(productos.values())
+            inicio.append(len(sku_idx))
+            # Se revisa siempre: un pedido sin 'fecha' puede traer 'fecha_entrega'
+            otros = pedido.keys() - _CAMPOS_COLUMNAS
+            if otros:
+                extras[i] = {k: v for k, v in pedido.items() if k in otros}
+
+        return cls(pedidos.keys(), cliente_idx, zona_idx, fecha, inicio, sku_idx, cantidad,
+                   clientes, zonas, skus, extras)
+
+    @classmethod
+    def desde_tabla(cls, tabla, dic_clientes):
+        """
+        Arma el almacén desde la tabla de simular_demanda_columnar sin pasar
+        por diccionarios (todo con NumPy salvo los ids de texto)
+        """
+        pid = tabla['pedido_id']
+        n_lineas = pid.size
+        nuevo = np.ones(n_lineas, dtype=bool)
+        nuevo[1:] = pid[1:] != pid[:-1]
+        primera = np.flatnonzero(nuevo)
+        inicio = np.append(primera, n_lineas)
+
+        zonas_cliente = [dic_clientes[c]['zona'] for c in tabla['clientes']]
+        zonas = sorted(set(zonas_cliente))
+        indice_zona = {zona: i for i, zona in enumerate(zonas)}
+        zona_de_cliente = np.fromiter((indice_zona[z] for z in zonas_cliente), np.int32, len(zonas_cliente))
+        cliente_idx = tabla['cliente_idx'][primera]
+        ids = [f"{p:03d}" for p in pid[primera].tolist()]
+
+        return cls(ids, cliente_idx, zona_de_cliente[cliente_idx], tabla['dia'][primera], inicio,
+                   tabla['sku_idx'], tabla['cantidad'], tabla['clientes'], zonas, tabla['skus'])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def productos(self, i):
+        """Diccionario {sku: cantidad} del pedido i"""
+        a, b = self.inicio[i], self.inicio[i + 1]
+        skus = self.skus
+        return {skus[s]: c for s, c in zip(self.sku_idx[a:b].tolist(), self.cantidad[a:b].tolist())}
+
+    def vista(self, indices=None):
+        """ConjuntoPedidos con los pedidos indicados (por defecto todos, en orden)"""
+        if indices is None:
+            indices = np.arange(len(self.ids))
+        return ConjuntoPedidos(self, indices)
+
+    def por_dia(self):
+        """{"Dia_N": ConjuntoPedidos} agrupando por fecha (orden de aparición)"""
+        dias = {}
+        if not self.ids:
+            return dias
+        cambio = np.flatnonzero(self.fecha[1:] != self.fecha[:-1]) + 1
+        limites = np.concatenate(([0], cambio, [len(self.ids)]))
+        for a, b in zip(limites[:-1].tolist(), limites[1:].tolist()):
+            dias[f"Dia_{int(self.fecha[a])}"] = ConjuntoPedidos(self, np.arange(a, b))
+        return dias
+
+class VistaPedido(Mapping):
+    """
+    Un pedido del almacén visto como diccionario de sólo lectura, con las
+    claves de siempre ('cliente', 'productos', 'fecha', 'zona') más
+    'total_unidades'. No guarda datos propios: sólo el almacén y el índice.
+    """
+
+    __slots__ = ('almacen', 'i')
+
+    def __init__(self, almacen, i):
+        self.almacen = almacen
+        self.i = i
+
+    def __getitem__(self, clave):
+        almacen, i = self.almacen, self.i
+        if clave == 'cliente':
+            return almacen.clientes[almacen.cliente_idx[i]]
+        if clave == 'productos':
+            return almacen.productos(i)
+        if clave == 'total_unidades':
+            return int(almacen.total_unidades[i])
+        if clave == 'zona':
+            return almacen.zonas[almacen.zona_idx[i]]
+        if clave == 'fecha':
+            fecha = int(almacen.fecha[i])
+            if fecha == SIN_FECHA:
+                raise KeyError(clave)
+            return fecha
+        return almacen.extras.get(i, {})[clave]
+
+    def _campos(self):
+        if self.almacen.fecha[self.i] == SIN_FECHA:
+            return tuple(campo for campo in CAMPOS_PEDIDO if campo != 'fecha')
+        return CAMPOS_PEDIDO
+
+    def __iter__(self):
+        yield from self._campos()
+        yield from self.almacen.extras.get(self.i, ())
+
+    def __len__(self):
+        return len(self._campos()) + len(self.almacen.extras.get(self.i, ()))
+
+    def copy(self):
+        """Copia como diccionario común (modificable)"""
+        return dict(self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+class ConjuntoPedidos(Mapping):
+    """
+    Subconjunto de pedidos de un almacén visto como {pedido_id: pedido}
+
+    Guarda sólo los índices de los pedidos (un arreglo de enteros): filtrar,
+    repartir o pasar pedidos entre etapas no copia ninguno.
+    """
+
+    __slots__ = ('almacen', 'indices', '_miembros')
+
+    def __init__(self, almacen, indices):
+        self.almacen = almacen
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self._miembros = None
+
+    def _contiene(self, i):
+        if len(self.indices) == len(self.almacen):
+            return True
+        if self._miembros is None:
+            self._miembros = np.zeros(len(self.almacen), dtype=bool)
+            self._miembros[self.indices] = True
+        return bool(self._miembros[i])
+
+    def __getitem__(self, pedido_id):
+        i = self.almacen.posicion.get(pedido_id)
+        if i is None or not self._contiene(i):
+            raise KeyError(pedido_id)
+        return VistaPedido(self.almacen, i)
+
+    def __contains__(self, pedido_id):
+        i = self.almacen.posicion.get(pedido_id)
+        return i is not None and self._contiene(i)
+
+    def __iter__(self):
+        ids = self.almacen.ids
+        return (ids[i] for i in self.indices.tolist())
+
+    def __len__(self):
+        return len(self.indices)
+
+    def items(self):
+        almacen = self.almacen
+        return ((almacen.ids[i], VistaPedido(almacen, i)) for i in self.indices.tolist())
+
+    def values(self):
+        almacen = self.almacen
+        return (VistaPedido(almacen, i) for i in self.indices.tolist())
+
+    def unidades(self):
+        """Arreglo con el total de unidades de cada pedido, en orden"""
+        return self.almacen.total_unidades[self.indices]
+
+    def lineas(self):
+        """Posiciones (en sku_idx / cantidad) de todas las líneas, pedido a pedido"""
+        inicio = self.almacen.inicio
+        desde = inicio[self.indices]
+        largos = inicio[self.indices + 1] - desde
+        if largos.size == 0:
+            return np.zeros(0, dtype=np.int64)
+        base = np.repeat(desde - (np.cumsum(largos) - largos), largos)
+        return base + np.arange(int(largos.sum()))
+
+    def subconjunto(self, pedido_ids):
+        """ConjuntoPedidos con esos pedidos (del mismo almacén), en ese orden"""
+        posicion = self.almacen.posicion
+        return ConjuntoPedidos(self.almacen, [posicion[pedido_id] for pedido_id in pedido_ids])
+
+    def a_dict(self):
+        """Copia como {pedido_id: dict} (para serializar o modificar)"""
+        return {pedido_id: dict(pedido) for pedido_id, pedido in self.items()}
+
+    def __repr__(self):
+        return f"ConjuntoPedidos({len(self)} pedidos)"
+
+def compactar_pedidos(pedidos):
+    """
+    Devuelve los pedidos como ConjuntoPedidos (si ya lo son, tal cual)
+
+    Args:
+        pedidos: Diccionario {pedido_id: pedido} o ConjuntoPedidos
+    """
+    if isinstance(pedidos, ConjuntoPedidos):
+        return pedidos
+    return AlmacenPedidos.desde_dict(pedidos).vista()
+
+def a_json(valor):
+    """
+    Conversión para json.dumps(default=...): las vistas se serializan como
+    los diccionarios que representan y los escalares de NumPy como números
+
+    Raises:
+        TypeError: Si el valor no es de un tipo conocido
+    """
+    if isinstance(valor, Mapping):
+        return dict(valor)
+    if isinstance(valor, np.integer):
+        return int(valor)
+    if isinstance(valor, np.floating):
+        return float(valor)
+    raise TypeError(f"Objeto de tipo {type(valor).__name__} no serializable en JSON")
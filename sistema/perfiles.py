@@ -0,0 +1,268 @@
+"""
+Módulo de Perfiles de Demanda - Sistema de Logística FIIS SIE
+Demanda con estacionalidad, pesos por cliente, popularidad Zipf de SKUs y
+promociones, muestreada con tablas de alias
+"""
+
+import copy
+import math
+import numpy as np
+from .aleatorio import generador_numpy
+from .pedidos import AlmacenPedidos
+
+# Los IDs de pedido de un perfil son dia * PEDIDOS_POR_DIA_MAX + i + 1: no
+# se repiten entre días sin importar cuántos pedidos tenga cada uno, y se
+# pueden generar día a día sin saber cuántos hubo antes
+PEDIDOS_POR_DIA_MAX = 100_000
+
+class TablaAlias:
+    """
+    Tabla de alias (método de Vose) para sortear índices con pesos dados
+
+    Armarla cuesta O(n) y cada sorteo O(1): un índice uniforme y una
+    comparación con su probabilidad (si falla, se toma su alias).
+    """
+
+    def __init__(self, pesos):
+        """
+        Args:
+            pesos: Pesos no negativos (no hace falta que sumen 1)
+
+        Raises:
+            ValueError: Si hay pesos negativos o todos son cero
+        """
+        pesos = np.asarray(pesos, dtype=np.float64)
+        if pesos.ndim != 1 or pesos.size == 0:
+            raise ValueError("Se necesita al menos un peso")
+        if (pesos < 0).any() or not np.isfinite(pesos).all():
+            raise ValueError("Los pesos deben ser finitos y no negativos")
+        total = pesos.sum()
+        if total <= 0:
+            raise ValueError("Algún peso debe ser positivo")
+
+        n = pesos.size
+        probabilidad = (pesos * n / total).tolist()
+        alias = list(range(n))
+        chicos = [i for i, p in enumerate(probabilidad) if p < 1.0]
+        grandes = [i for i, p in enumerate(probabilidad) if p >= 1.0]
+        while chicos and grandes:
+            chico, grande = chicos.pop(), grandes.pop()
+            alias[chico] = grande
+            probabilidad[grande] -= 1.0 - probabilidad[chico]
+            (chicos if probabilidad[grande] < 1.0 else grandes).append(grande)
+        # Lo que queda es 1 salvo error de redondeo
+        for i in chicos + grandes:
+            probabilidad[i] = 1.0
+
+        self.probabilidad = np.array(probabilidad)
+        self.alias = np.array(alias, dtype=np.int64)
+
+    def __len__(self):
+        return self.alias.size
+
+    def muestrear(self, rng, n):
+        """
+        Sortea n índices
+
+        Args:
+            rng: numpy.random.Generator
+            n: Cantidad de sorteos
+
+        Returns:
+            Arreglo de n índices
+        """
+        i = rng.integers(0, self.alias.size, size=n)
+        return np.where(rng.random(n) < self.probabilidad[i], i, self.alias[i])
+
+class PerfilDemanda:
+    """
+    Forma de la demanda: cuántos pedidos llegan cada día, de qué clientes,
+    con qué SKUs y en qué cantidades
+
+    Pedidos del día = sorteo uniforme en pedidos_dia × multiplicador del
+    día de la semana × estacionalidad × factor de las promociones activas.
+    Clientes y SKUs se sortean con tablas de alias: los clientes según
+    pesos_clientes y los SKUs con popularidad Zipf (el de rango r pesa
+    1 / r^zipf_skus), con los SKUs en promoción multiplicados por su factor.
+    """
+
+    def __init__(self, pedidos_dia=(12, 20), multiplicador_semana=None, amplitud_estacional=0.0,
+                 periodo_estacional=365, pesos_clientes=None, zipf_skus=0.0, ranking_skus=None,
+                 productos_por_pedido=(1, 3), cantidad=(5, 40), promociones=()):
+        """
+        Args:
+            pedidos_dia: Rango (mín, máx) base de pedidos por día
+            multiplicador_semana: 7 factores, del día 1 de la semana al 7
+                                  (el día 1 de la simulación es el día 1)
+            amplitud_estacional: Amplitud de la onda estacional (0,3 = ±30%)
+            periodo_estacional: Días de un ciclo estacional
+            pesos_clientes: {cliente: peso} de volumen (los demás pesan 1)
+            zipf_skus: Exponente de popularidad (0 = todos iguales)
+            ranking_skus: SKUs del más al menos popular (por defecto, el
+                          orden del catálogo; los que falten van al final)
+            productos_por_pedido: Rango (mín, máx) de SKUs sorteados por pedido
+            cantidad: Rango (mín, máx) de unidades por línea
+            promociones: Lista de diccionarios con 'desde' y 'hasta' (días,
+                         inclusive), 'skus', 'factor' (peso de esos SKUs) y
+                         opcionalmente 'factor_pedidos' (pedidos del día)
+
+        Raises:
+            ValueError: Si algún parámetro no es válido
+        """
+        for nombre, (minimo, maximo) in (('pedidos_dia', pedidos_dia), ('cantidad', cantidad),
+                                          ('productos_por_pedido', productos_por_pedido)):
+            if not 0 <= minimo <= maximo:
+                raise ValueError(f"Rango inválido en {nombre}: {(minimo, maximo)}")
+        if productos_por_pedido[0] < 1:
+            raise ValueError("Cada pedido debe tener al menos un producto")
+        multiplicador_semana = tuple(multiplicador_semana or (1.0,) * 7)
+        if len(multiplicador_semana) != 7 or min(multiplicador_semana) < 0:
+            raise ValueError("multiplicador_semana debe tener 7 factores no negativos")
+        if not 0 <= amplitud_estacional <= 1 or periodo_estacional <= 0:
+            raise ValueError("Estacionalidad inválida: amplitud en [0, 1] y periodo positivo")
+        if zipf_skus < 0:
+            raise ValueError("El exponente Zipf no puede ser negativo")
+        for promocion in promociones:
+            if promocion['desde'] > promocion['hasta'] or promocion.get('factor', 1.0) < 0:
+                raise ValueError(f"Promoción inválida: {promocion}")
+
+        self.pedidos_dia = tuple(pedidos_dia)
+        self.multiplicador_semana = multiplicador_semana
+        self.amplitud_estacional = amplitud_estacional
+        self.periodo_estacional = periodo_estacional
+        self.pesos_clientes = dict(pesos_clientes or {})
+        self.zipf_skus = zipf_skus
+        self.ranking_skus = list(ranking_skus or [])
+        self.productos_por_pedido = tuple(productos_por_pedido)
+        self.cantidad = tuple(cantidad)
+        self.promociones = [dict(promocion) for promocion in promociones]
+        # Tablas de alias del último catálogo usado (ver _firma)
+        self._tablas = None
+
+    def multiplicador(self, dia):
+        """Factor de volumen del día (semana × estacionalidad × promociones)"""
+        factor = self.multiplicador_semana[(dia - 1) % 7]
+        factor *= 1.0 + self.amplitud_estacional * math.sin(2 * math.pi * (dia - 1) / self.periodo_estacional)
+        for promocion in self._promociones_activas(dia):
+            factor *= promocion.get('factor_pedidos', 1.0)
+        return factor
+
+    def _promociones_activas(self, dia):
+        return [p for p in self.promociones if p['desde'] <= dia <= p['hasta']]
+
+    def _firma(self, dic_clientes, dic_sku):
+        """
+        Contenido del que dependen las tablas: ids de clientes y SKUs en
+        orden y los parámetros del perfil (una edición en sitio la cambia)
+        """
+        return (list(dic_clientes), list(dic_sku), dict(self.pesos_clientes), list(self.ranking_skus),
+                self.zipf_skus, copy.deepcopy(self.promociones))
+
+    def _compilar(self, dic_clientes, dic_sku):
+        """Tablas de alias de clientes y SKUs base (cacheadas por contenido del catálogo)"""
+        firma = self._firma(dic_clientes, dic_sku)
+        if self._tablas is not None and self._tablas['firma'] == firma:
+            return self._tablas
+
+        clientes = list(dic_clientes.keys())
+        skus = list(dic_sku.keys())
+        indice_sku = {sku: j for j, sku in enumerate(skus)}
+
+        # Rango de popularidad de cada SKU: primero los del ranking
+        rango = np.empty(len(skus), dtype=np.float64)
+        orden = [sku for sku in self.ranking_skus if sku in indice_sku]
+        vistos = set(orden)
+        orden += [sku for sku in skus if sku not in vistos]
+        rango[[indice_sku[sku] for sku in orden]] = np.arange(1, len(skus) + 1)
+
+        self._tablas = {
+            'firma': firma,
+            'clientes': clientes,
+            'skus': skus,
+            'indice_sku': indice_sku,
+            'alias_clientes': TablaAlias([self.pesos_clientes.get(c, 1.0) for c in clientes]),
+            'pesos_skus': rango ** -self.zipf_skus,
+            # Tabla de SKUs por combinación de promociones activas
+            'alias_skus': {}
+        }
+        return self._tablas
+
+    def _alias_skus(self, tablas, dia):
+        activas = self._promociones_activas(dia)
+        # Posiciones en self.promociones: un cambio en su contenido cambia la firma
+        clave = tuple(i for i, p in enumerate(self.promociones) if p['desde'] <= dia <= p['hasta'])
+        alias = tablas['alias_skus'].get(clave)
+        if alias is None:
+            pesos = tablas['pesos_skus']
+            if activas:
+                pesos = pesos.copy()
+                for promocion in activas:
+                    posiciones = [tablas['indice_sku'][s] for s in promocion['skus'] if s in tablas['indice_sku']]
+                    pesos[posiciones] *= promocion.get('factor', 1.0)
+            alias = tablas['alias_skus'][clave] = TablaAlias(pesos)
+        return alias
+
+    def tabla_dia(self, dia, dic_clientes, dic_sku, semilla=None):
+        """
+        Pedidos de un día como tabla columnar (mismo formato que
+        simular_demanda_columnar). Con semilla, el día sale siempre igual
+        sin importar qué días se generen antes.
+        """
+        tablas = self._compilar(dic_clientes, dic_sku)
+        rng = generador_numpy(semilla, 'demanda', dia)
+
+        base = rng.integers(self.pedidos_dia[0], self.pedidos_dia[1] + 1)
+        n_pedidos = int(round(base * self.multiplicador(dia)))
+        if n_pedidos >= PEDIDOS_POR_DIA_MAX:
+            raise ValueError(f"Día {dia}: {n_pedidos} pedidos superan el máximo de {PEDIDOS_POR_DIA_MAX - 1}")
+
+        cliente_pedido = tablas['alias_clientes'].muestrear(rng, n_pedidos)
+        n_extracciones = rng.integers(self.productos_por_pedido[0], self.productos_por_pedido[1] + 1,
+                                      size=n_pedidos)
+        pedido_ext = np.repeat(np.arange(n_pedidos, dtype=np.int64), n_extracciones)
+        sku_ext = self._alias_skus(tablas, dia).muestrear(rng, pedido_ext.size)
+        cantidad_ext = rng.integers(self.cantidad[0], self.cantidad[1] + 1, size=pedido_ext.size)
+
+        # Un SKU repetido dentro de un pedido: prevalece la última extracción
+        clave = pedido_ext * len(tablas['skus']) + sku_ext
+        _, ultima = np.unique(clave[::-1], return_index=True)
+        filas = np.sort(clave.size - 1 - ultima)
+        pedido_linea = pedido_ext[filas]
+
+        return {
+            'dia': np.full(filas.size, dia, dtype=np.int32),
+            'pedido_id': dia * PEDIDOS_POR_DIA_MAX + pedido_linea + 1,
+            'cliente_idx': cliente_pedido[pedido_linea].astype(np.int32),
+            'sku_idx': sku_ext[filas].astype(np.int32),
+            'cantidad': cantidad_ext[filas].astype(np.int32),
+            'clientes': tablas['clientes'],
+            'skus': tablas['skus']
+        }
+
+def simular_demanda_perfil(n_dias, perfil, dic_clientes, dic_sku, semilla=None):
+    """
+    Genera la demanda del horizonte con un PerfilDemanda
+
+    Returns:
+        Tabla columnar como la de simular_demanda_columnar (ver
+        tabla_a_pedidos_por_dia y AlmacenPedidos.desde_tabla)
+    """
+    dias = [perfil.tabla_dia(dia, dic_clientes, dic_sku, semilla) for dia in range(1, max(n_dias, 0) + 1)]
+    tipos = {'dia': np.int32, 'pedido_id': np.int64, 'cliente_idx': np.int32, 'sku_idx': np.int32,
+             'cantidad': np.int32}
+    tabla = {columna: np.concatenate([d[columna] for d in dias] + [np.zeros(0, dtype=tipo)])
+             for columna, tipo in tipos.items()}
+    tabla['clientes'] = list(dic_clientes.keys())
+    tabla['skus'] = list(dic_sku.keys())
+    return tabla
+
+def simular_demanda_dia_perfil(dia, perfil, dic_clientes, dic_sku, semilla=None):
+    """
+    Pedidos de un solo día con un PerfilDemanda (los mismos que ese día en
+    simular_demanda_perfil)
+
+    Returns:
+        ConjuntoPedidos {pedido_id: pedido} del día
+    """
+    tabla = perfil.tabla_dia(dia, dic_clientes, dic_sku, semilla)
+    return AlmacenPedidos.desde_tabla(tabla, dic_clientes).vista()
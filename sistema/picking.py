@@ -3,51 +3,105 @@ Módulo de Picking - Sistema de Logística FIIS SIE
 Simula la preparación de pedidos con alta eficiencia
 """
 
-import random
 from .catalogos import dic_sku, dic_clientes
+from .aleatorio import generador_python
+from .pedidos import VistaPedido, ConjuntoPedidos
 
-def asignar_picking(dia, pedidos, capacidad_picking=1500):
+# Días de plazo de entrega cuando el pedido no trae 'fecha_entrega'
+PLAZO_ENTREGA_DIAS = 2
+
+# Unidades máximas por ola de picking (un recorrido del almacén)
+UNIDADES_POR_OLA = 300
+
+def unidades_pedido(pedido):
+    """Unidades del pedido (las vistas de AlmacenPedidos ya las traen calculadas)"""
+    if isinstance(pedido, VistaPedido):
+        return pedido['total_unidades']
+    return sum(pedido['productos'].values())
+
+def _unidades_por_pedido(pedidos):
+    """Lista [(pedido_id, unidades)] en el orden de los pedidos"""
+    if isinstance(pedidos, ConjuntoPedidos):
+        return list(zip(pedidos, pedidos.unidades().tolist()))
+    return [(pedido_id, unidades_pedido(pedido)) for pedido_id, pedido in pedidos.items()]
+
+def _seleccion(pedidos, elegidos):
+    """
+    Pedidos elegidos, en ese orden, cada uno con 'total_unidades'
+
+    Desde un ConjuntoPedidos el resultado es otro ConjuntoPedidos del mismo
+    almacén, y las vistas sueltas se pasan tal cual: nada se copia. Los
+    pedidos diccionario se copian para no modificar los del llamador.
+    """
+    if isinstance(pedidos, ConjuntoPedidos):
+        return pedidos.subconjunto(pedido_id for pedido_id, _ in elegidos)
+    seleccion = {}
+    for pedido_id, total_unidades in elegidos:
+        pedido = pedidos[pedido_id]
+        if not isinstance(pedido, VistaPedido):
+            pedido = pedido.copy()
+            pedido['total_unidades'] = total_unidades
+        seleccion[pedido_id] = pedido
+    return seleccion
+
+def asignar_picking(dia, pedidos, capacidad_picking=1500, semilla=None, estrategia='aleatoria',
+                    objetivo='unidades'):
     """
     Asigna pedidos para picking.
     Ajuste: Alta eficiencia para mantener OTIF > 80%.
+    
+    Con semilla, la eficiencia, el orden y los errores del día salen de un
+    flujo aleatorio propio del picking para ese día (reproducible).
+    
+    Args:
+        estrategia: 'aleatoria' (orden al azar, histórico), 'fifo' (en el
+                    orden recibido, p. ej. backlog primero) u 'olas'
+                    (prioridad por atraso y vencimiento, ver planificar_olas)
+        objetivo: Con 'olas', maximizar 'unidades' o 'pedidos' completados
     """
-    pedidos_preparados = {}
-    pedidos_pendientes = {}
+    if estrategia == 'olas':
+        return planificar_olas(dia, pedidos, capacidad_picking, semilla, objetivo)
+    if estrategia not in ('aleatoria', 'fifo'):
+        raise ValueError(f"Estrategia de picking desconocida: {estrategia}")
+    
+    preparados = []
+    pendientes = []
     unidades_preparadas = 0
+    backlog = 0
     
     # AJUSTE 1: Eficiencia del personal (entre 90% y 110% de lo planeado)
     # Esto simula que a veces son más rápidos o un poco más lentos, pero eficientes.
-    eficiencia_dia = random.uniform(0.90, 1.10)
+    rnd = generador_python(semilla, 'picking', dia)
+    eficiencia_dia = rnd.uniform(0.90, 1.10)
     capacidad_real = capacidad_picking * eficiencia_dia
 
     # Convertir a lista y mezclar para no priorizar siempre a los mismos
-    lista_pedidos = list(pedidos.items())
-    random.shuffle(lista_pedidos)
+    lista_pedidos = _unidades_por_pedido(pedidos)
+    if estrategia == 'aleatoria':
+        rnd.shuffle(lista_pedidos)
 
-    for pedido_id, pedido in lista_pedidos:
-        total_unidades = sum(pedido['productos'].values())
-        
+    for pedido_id, total_unidades in lista_pedidos:
         # Verificar si cabe en la capacidad del día
         if unidades_preparadas + total_unidades <= capacidad_real:
             
             # AJUSTE 2: Probabilidad de error operativo muy baja (2%)
             # Solo el 2% de los pedidos fallarán por errores humanos.
             # Esto garantiza que el OTIF se mantenga alto.
-            if random.random() < 0.02: 
+            if rnd.random() < 0.02: 
                 # Simula un error (se queda pendiente)
-                pedidos_pendientes[pedido_id] = pedido.copy()
-                pedidos_pendientes[pedido_id]['total_unidades'] = total_unidades
+                pendientes.append((pedido_id, total_unidades))
+                backlog += total_unidades
             else:
                 # Pedido preparado con éxito
-                pedidos_preparados[pedido_id] = pedido.copy()
-                pedidos_preparados[pedido_id]['total_unidades'] = total_unidades
+                preparados.append((pedido_id, total_unidades))
                 unidades_preparadas += total_unidades
         else:
             # No hay capacidad -> Backlog
-            pedidos_pendientes[pedido_id] = pedido.copy()
-            pedidos_pendientes[pedido_id]['total_unidades'] = total_unidades
+            pendientes.append((pedido_id, total_unidades))
+            backlog += total_unidades
 
-    backlog = sum(p['total_unidades'] for p in pedidos_pendientes.values())
+    pedidos_preparados = _seleccion(pedidos, preparados)
+    pedidos_pendientes = _seleccion(pedidos, pendientes)
     
     # Calcular % de capacidad usada (evitando división por cero)
     capacidad_utilizada = (unidades_preparadas / capacidad_picking * 100) if capacidad_picking > 0 else 0
@@ -60,6 +114,111 @@ def asignar_picking(dia, pedidos, capacidad_picking=1500):
         'capacidad_utilizada': capacidad_utilizada
     }
 
+def planificar_olas(dia, pedidos, capacidad_picking=1500, semilla=None, objetivo='unidades'):
+    """
+    Planifica el picking del día por prioridad y lo agrupa en olas.
+    
+    1. Prioridad: primero el backlog vencido (fecha de entrega anterior a
+       hoy), luego lo que vence hoy y al final el resto; dentro de cada
+       grupo, los más antiguos primero. Se toman en ese orden hasta el
+       primer pedido que no cabe.
+    2. Capacidad: la capacidad que queda se llena con los demás pedidos
+       (grupo por grupo) con una heurística de mochila: para 'unidades', de
+       mayor a menor tomando todo lo que cabe; para 'pedidos', de menor a
+       mayor.
+    3. Olas: lo seleccionado se agrupa por zona y, dentro de la zona, por
+       SKU principal para que cada recorrido repita ubicaciones; cada ola
+       tiene a lo sumo UNIDADES_POR_OLA unidades.
+    
+    Todo es O(n log n), así que escala a decenas de miles de pedidos por día.
+    Devuelve el mismo diccionario que asignar_picking, más 'olas'.
+    """
+    if objetivo not in ('unidades', 'pedidos'):
+        raise ValueError(f"Objetivo de picking desconocido: {objetivo}")
+    
+    rnd = generador_python(semilla, 'picking', dia)
+    eficiencia_dia = rnd.uniform(0.90, 1.10)
+    libre = capacidad_picking * eficiencia_dia
+    
+    # (grupo, fecha, unidades, pedido_id) por pedido
+    candidatos = []
+    for pedido_id, pedido in pedidos.items():
+        total_unidades = unidades_pedido(pedido)
+        fecha = pedido.get('fecha', dia)
+        vence = pedido.get('fecha_entrega', fecha + PLAZO_ENTREGA_DIAS)
+        grupo = 0 if vence < dia else (1 if vence == dia else 2)
+        candidatos.append((grupo, fecha, total_unidades, pedido_id))
+    
+    signo = -1 if objetivo == 'unidades' else 1
+    candidatos.sort(key=lambda c: (c[0], c[1], signo * c[2], c[3]))
+    
+    # Primera pasada: por antigüedad hasta que un pedido no cabe
+    seleccionados = []
+    for n, (grupo, fecha, total_unidades, pedido_id) in enumerate(candidatos):
+        if total_unidades > libre:
+            break
+        seleccionados.append((pedido_id, total_unidades))
+        libre -= total_unidades
+    else:
+        n = len(candidatos)
+    
+    # Segunda pasada: mochila con el resto, sin mezclar grupos
+    resto = sorted(candidatos[n:], key=lambda c: (c[0], signo * c[2], c[1], c[3]))
+    no_seleccionados = []
+    for grupo, fecha, total_unidades, pedido_id in resto:
+        if total_unidades <= libre:
+            seleccionados.append((pedido_id, total_unidades))
+            libre -= total_unidades
+        else:
+            no_seleccionados.append((pedido_id, total_unidades))
+    
+    # Error operativo (2%): el pedido queda pendiente y no consume capacidad
+    preparados = []
+    pendientes = []
+    for entrada in seleccionados:
+        (pendientes if rnd.random() < 0.02 else preparados).append(entrada)
+    pendientes.extend(no_seleccionados)
+    
+    pedidos_preparados = _seleccion(pedidos, preparados)
+    pedidos_pendientes = _seleccion(pedidos, pendientes)
+    unidades_preparadas = sum(total for _, total in preparados)
+    backlog = sum(total for _, total in pendientes)
+    capacidad_utilizada = (unidades_preparadas / capacidad_picking * 100) if capacidad_picking > 0 else 0
+    
+    return {
+        'pedidos_preparados': pedidos_preparados,
+        'pedidos_pendientes': pedidos_pendientes,
+        'unidades_preparadas': unidades_preparadas,
+        'backlog': backlog,
+        'capacidad_utilizada': capacidad_utilizada,
+        'olas': agrupar_olas(pedidos_preparados)
+    }
+
+def agrupar_olas(pedidos_preparados, unidades_por_ola=UNIDADES_POR_OLA):
+    """
+    Agrupa pedidos en olas por zona y SKU principal (el de mayor cantidad)
+    """
+    por_zona = {}
+    for pedido_id, pedido in pedidos_preparados.items():
+        zona = pedido.get('zona') or dic_clientes.get(pedido['cliente'], {}).get('zona', "Sin Zona")
+        sku_principal = max(pedido['productos'], key=pedido['productos'].get)
+        por_zona.setdefault(zona, []).append((sku_principal, pedido_id))
+    
+    olas = []
+    for zona in sorted(por_zona):
+        ola = None
+        for sku_principal, pedido_id in sorted(por_zona[zona]):
+            pedido = pedidos_preparados[pedido_id]
+            if ola is None or ola['unidades'] + pedido['total_unidades'] > unidades_por_ola:
+                ola = {'ola': len(olas) + 1, 'zona': zona, 'pedidos': [], 'unidades': 0, 'skus': {}}
+                olas.append(ola)
+            ola['pedidos'].append(pedido_id)
+            ola['unidades'] += pedido['total_unidades']
+            for sku, cantidad in pedido['productos'].items():
+                ola['skus'][sku] = ola['skus'].get(sku, 0) + cantidad
+    
+    return olas
+
 def generar_hoja_picking(dia, pedidos_preparados):
     """
     Consolida los productos totales a recoger en el almacén
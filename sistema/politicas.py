@@ -0,0 +1,285 @@
+"""
+Módulo de Políticas de Inventario - Sistema de Logística FIIS SIE
+Optimización de puntos de reposición y lotes por SKU con un simulador
+vectorizado de inventario (todos los SKUs y políticas candidatas a la vez)
+"""
+
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from . import catalogos
+
+# Políticas soportadas:
+#   'sQ': si al cierre el stock queda bajo s, llega un lote fijo Q (una vez
+#         por día), igual que reponer_simple / LibroStock. Es la política
+#         (R, Q) con R = s.
+#   'sS': si al cierre el stock queda bajo s, se repone hasta el nivel S.
+POLITICAS = ('sQ', 'sS')
+
+# Grilla de candidatos por SKU: s = media + z * desviación de la demanda
+# diaria y Q = factor * lote económico (EOQ)
+NIVELES_Z = tuple(np.round(np.linspace(-1.0, 3.0, 13), 3))
+FACTORES_LOTE = (0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 4.0)
+
+# Elementos (escenarios x candidatos x SKUs) por bloque de trabajo
+ELEMENTOS_POR_BLOQUE = 2_000_000
+
+def demanda_por_sku(tabla, n_skus=None):
+    """
+    Demanda diaria por SKU a partir de la tabla de simular_demanda_columnar
+
+    Returns:
+        Arreglo (dias, skus) de unidades pedidas; la columna j es tabla['skus'][j]
+    """
+    n_skus = len(tabla['skus']) if n_skus is None else n_skus
+    n_dias = int(tabla['dia'].max()) if tabla['dia'].size else 0
+    posicion = (tabla['dia'].astype(np.int64) - 1) * n_skus + tabla['sku_idx']
+    return np.bincount(posicion, weights=tabla['cantidad'],
+                       minlength=n_dias * n_skus).astype(np.int64).reshape(n_dias, n_skus)
+
+def escenarios_demanda(historia, n_escenarios, n_dias, rng=None):
+    """
+    Escenarios de demanda por remuestreo de días completos de la historia
+    (conserva la correlación entre SKUs de un mismo día)
+
+    Args:
+        historia: Arreglo (dias, skus) de demanda observada
+        n_escenarios: Número de escenarios
+        n_dias: Días por escenario
+        rng: numpy.random.Generator opcional
+
+    Returns:
+        Arreglo (escenarios, dias, skus)
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    dias = rng.integers(0, historia.shape[0], size=(n_escenarios, n_dias))
+    return historia[dias]
+
+def simular_politicas(demanda, punto, reposicion, politica='sQ', stock_inicial=None):
+    """
+    Simula a la vez todas las políticas candidatas de todos los SKUs
+
+    Cada día se atiende la demanda con el stock disponible (lo que falta se
+    pierde, como en LibroStock) y al cierre se repone según la política. El
+    bucle es sólo sobre los días: escenarios, candidatos y SKUs van en un
+    mismo arreglo.
+
+    Args:
+        demanda: Arreglo (dias, skus) o (escenarios, dias, skus)
+        punto: Arreglo (candidatos, skus) con el punto de reposición s
+        reposicion: Arreglo (candidatos, skus) con Q ('sQ') o S ('sS')
+        politica: 'sQ' o 'sS'
+        stock_inicial: Arreglo (skus,) o (candidatos, skus); por defecto s + Q
+                       ('sQ') o S ('sS')
+
+    Returns:
+        Diccionario de arreglos (candidatos, skus), promediados entre
+        escenarios: 'solicitadas', 'entregadas', 'fill_rate' (%),
+        'stock_promedio' (al cierre) y 'pedidos' (reposiciones)
+    """
+    if politica not in POLITICAS:
+        raise ValueError(f"Política desconocida: {politica}")
+    # Stock y demanda diarios en int32 (la mitad de bytes a recorrer por día);
+    # los acumulados del horizonte en int64
+    demanda = np.asarray(demanda, dtype=np.int32)
+    if demanda.ndim == 2:
+        demanda = demanda[None]
+    punto = np.asarray(punto, dtype=np.int32)
+    reposicion = np.asarray(reposicion, dtype=np.int32)
+    n_escenarios, n_dias, _ = demanda.shape
+
+    if stock_inicial is None:
+        stock_inicial = punto + reposicion if politica == 'sQ' else reposicion
+    stock = np.broadcast_to(np.asarray(stock_inicial, dtype=np.int32),
+                            (n_escenarios,) + punto.shape).copy()
+    entregadas = np.zeros(stock.shape, dtype=np.int64)
+    stock_acumulado = np.zeros(stock.shape, dtype=np.int64)
+    pedidos = np.zeros_like(stock)
+    entregado = np.empty_like(stock)
+    bajo = np.empty(stock.shape, dtype=bool)
+
+    for dia in range(n_dias):
+        demanda_dia = demanda[:, dia, None, :]
+        np.minimum(stock, demanda_dia, out=entregado)
+        stock -= entregado
+        entregadas += entregado
+
+        np.less(stock, punto, out=bajo)
+        if politica == 'sQ':
+            np.add(stock, reposicion, out=stock, where=bajo)
+        else:
+            np.copyto(stock, np.broadcast_to(reposicion, stock.shape), where=bajo)
+        pedidos += bajo
+        stock_acumulado += stock
+
+    solicitadas = np.broadcast_to(demanda.sum(axis=1, dtype=np.int64)[:, None, :], stock.shape).mean(axis=0)
+    entregadas = entregadas.mean(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fill_rate = np.where(solicitadas > 0, entregadas / solicitadas * 100, 100.0)
+    return {
+        'solicitadas': solicitadas,
+        'entregadas': entregadas,
+        'fill_rate': fill_rate,
+        'stock_promedio': stock_acumulado.mean(axis=0) / max(n_dias, 1),
+        'pedidos': pedidos.mean(axis=0)
+    }
+
+def candidatos_politica(demanda, costo_mantener, costo_pedido, politica='sQ',
+                        niveles_z=NIVELES_Z, factores_lote=FACTORES_LOTE):
+    """
+    Grilla de políticas candidatas por SKU a partir de la demanda diaria
+
+    Returns:
+        Tupla (punto, reposicion) de arreglos (candidatos, skus)
+    """
+    diaria = np.asarray(demanda, dtype=float).reshape(-1, np.shape(demanda)[-1])
+    media = diaria.mean(axis=0)
+    desviacion = diaria.std(axis=0)
+    lote_economico = np.sqrt(2 * media * costo_pedido / costo_mantener)
+
+    z = np.asarray(niveles_z, dtype=float)[:, None, None]
+    factor = np.asarray(factores_lote, dtype=float)[None, :, None]
+    punto = np.maximum(0, np.ceil(media + z * desviacion))
+    lote = np.maximum(1, np.round(factor * lote_economico))
+    punto, lote = np.broadcast_arrays(punto, lote)
+
+    n_skus = diaria.shape[1]
+    punto = punto.reshape(-1, n_skus).astype(np.int64)
+    lote = lote.reshape(-1, n_skus).astype(np.int64)
+    return punto, (lote if politica == 'sQ' else punto + lote)
+
+def _evaluar_bloque(demanda, costo_mantener, costo_pedido, fill_rate_objetivo, politica,
+                    niveles_z, factores_lote, stock_inicial):
+    """
+    Evalúa la grilla de candidatos de un bloque de SKUs y elige por SKU la
+    política de menor costo que cumple el fill rate objetivo (o, si ninguna
+    lo cumple, la de mayor fill rate)
+    """
+    punto, reposicion = candidatos_politica(demanda, costo_mantener, costo_pedido, politica,
+                                            niveles_z, factores_lote)
+    metricas = simular_politicas(demanda, punto, reposicion, politica, stock_inicial)
+    n_dias = demanda.shape[-2]
+    costo = (costo_mantener * metricas['stock_promedio'] +
+             costo_pedido * metricas['pedidos'] / max(n_dias, 1))
+
+    cumple = metricas['fill_rate'] >= fill_rate_objetivo
+    # Orden de preferencia: cumplir el objetivo, luego menor costo; si
+    # ningún candidato cumple, mayor fill rate y luego menor costo
+    alguno = cumple.any(axis=0)
+    primaria = np.where(alguno, ~cumple, -metricas['fill_rate'])
+    mejor = np.lexsort((costo, primaria), axis=0)[0]
+    columnas = np.arange(punto.shape[1])
+
+    return {
+        'punto': punto[mejor, columnas],
+        'reposicion': reposicion[mejor, columnas],
+        'fill_rate': metricas['fill_rate'][mejor, columnas],
+        'costo': costo[mejor, columnas],
+        'stock_promedio': metricas['stock_promedio'][mejor, columnas],
+        'cumple': alguno
+    }
+
+def optimizar_politicas(demanda, skus=None, fill_rate_objetivo=95.0, costo_mantener=0.05,
+                        costo_pedido=20.0, politica='sQ', stock_inicial=None, max_procesos=None,
+                        niveles_z=NIVELES_Z, factores_lote=FACTORES_LOTE):
+    """
+    Busca por SKU el punto de reposición y el lote (o nivel máximo) que
+    alcanzan el fill rate objetivo al menor costo de mantener + pedir
+
+    Los candidatos de cada SKU salen de una grilla alrededor de su demanda
+    (ver candidatos_politica) y se evalúan con simular_politicas. Los SKUs
+    se reparten en bloques entre procesos; el resultado no depende de
+    cuántos participen.
+
+    Args:
+        demanda: Arreglo (dias, skus) o (escenarios, dias, skus); ver
+                 demanda_por_sku y escenarios_demanda
+        skus: IDs de las columnas (por defecto, los del catálogo)
+        fill_rate_objetivo: Fill rate mínimo por SKU (%)
+        costo_mantener: Costo por unidad en stock por día
+        costo_pedido: Costo fijo por reposición
+        politica: 'sQ' (punto + lote fijo, como LibroStock) o 'sS'
+        stock_inicial: Stock inicial por SKU (por defecto s + Q, o S)
+        max_procesos: Procesos trabajadores (por defecto, todos los núcleos;
+                      1 ejecuta en el proceso actual)
+        niveles_z: Niveles z de la grilla de puntos de reposición
+        factores_lote: Múltiplos del lote económico de la grilla
+
+    Returns:
+        Diccionario con 'punto_reposicion' y 'lote_reposicion' ('sQ') o
+        'nivel_maximo' ('sS') como {sku: unidades}, 'fill_rate', 'costo'
+        (por día) y 'cumple' por SKU, y un 'resumen' del catálogo
+    """
+    if politica not in POLITICAS:
+        raise ValueError(f"Política desconocida: {politica}")
+    demanda = np.asarray(demanda, dtype=np.int32)
+    if demanda.ndim == 2:
+        demanda = demanda[None]
+    n_skus = demanda.shape[2]
+    if skus is None:
+        skus = list(catalogos.dic_sku)
+    if len(skus) != n_skus:
+        raise ValueError(f"La demanda tiene {n_skus} SKUs y se indicaron {len(skus)}")
+    if costo_mantener <= 0:
+        raise ValueError("El costo de mantener debe ser positivo")
+    if max_procesos is None:
+        max_procesos = os.cpu_count() or 1
+    if stock_inicial is not None:
+        stock_inicial = np.asarray(stock_inicial, dtype=np.int64)
+
+    # Bloques de SKUs de tamaño acotado en memoria, al menos uno por proceso
+    n_candidatos = len(niveles_z) * len(factores_lote)
+    por_bloque = max(1, ELEMENTOS_POR_BLOQUE // (demanda.shape[0] * n_candidatos))
+    n_bloques = max(min(n_skus, max_procesos), -(-n_skus // por_bloque))
+    limites = np.linspace(0, n_skus, n_bloques + 1).astype(int)
+    tramos = [(a, b) for a, b in zip(limites[:-1].tolist(), limites[1:].tolist()) if b > a]
+
+    def argumentos(a, b):
+        inicial = None if stock_inicial is None else stock_inicial[a:b]
+        return (demanda[:, :, a:b], costo_mantener, costo_pedido, fill_rate_objetivo, politica,
+                niveles_z, factores_lote, inicial)
+
+    if max_procesos == 1 or len(tramos) <= 1:
+        resultados = [_evaluar_bloque(*argumentos(a, b)) for a, b in tramos]
+    else:
+        with ProcessPoolExecutor(max_workers=max_procesos) as pool:
+            futuros = [pool.submit(_evaluar_bloque, *argumentos(a, b)) for a, b in tramos]
+            resultados = [f.result() for f in futuros]
+
+    if resultados:
+        unir = {clave: np.concatenate([r[clave] for r in resultados]) for clave in resultados[0]}
+    else:
+        # Sin SKUs no hay bloques: resultado vacío
+        unir = {clave: np.zeros(0) for clave in ('punto', 'reposicion', 'fill_rate', 'costo', 'stock_promedio')}
+        unir['cumple'] = np.zeros(0, dtype=bool)
+    clave_reposicion = 'lote_reposicion' if politica == 'sQ' else 'nivel_maximo'
+    return {
+        'politica': politica,
+        'punto_reposicion': dict(zip(skus, unir['punto'].tolist())),
+        clave_reposicion: dict(zip(skus, unir['reposicion'].tolist())),
+        'fill_rate': dict(zip(skus, unir['fill_rate'].tolist())),
+        'costo': dict(zip(skus, unir['costo'].tolist())),
+        'cumple': dict(zip(skus, unir['cumple'].tolist())),
+        'resumen': {
+            'skus': n_skus,
+            'skus_cumplen': int(unir['cumple'].sum()),
+            'costo_total_dia': float(unir['costo'].sum()),
+            'stock_promedio_total': float(unir['stock_promedio'].sum()),
+            'fill_rate_minimo': float(unir['fill_rate'].min()) if n_skus else 0.0
+        }
+    }
+
+def aplicar_politicas(resultado):
+    """
+    Reemplaza punto_reposicion y lote_reposicion del catálogo por los de
+    una optimización 'sQ' (la que aplica LibroStock)
+
+    Raises:
+        ValueError: Si el resultado es de otra política
+    """
+    if resultado.get('politica') != 'sQ':
+        raise ValueError("Sólo las políticas 'sQ' se aplican al catálogo (LibroStock repone lotes fijos)")
+    catalogos.punto_reposicion.update(resultado['punto_reposicion'])
+    catalogos.lote_reposicion.update(resultado['lote_reposicion'])
+    catalogos.invalidar_catalogo()
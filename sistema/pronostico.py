@@ -0,0 +1,292 @@
+"""
+Módulo de Pronóstico - Sistema de Logística FIIS SIE
+Pronóstico de demanda por SKU (o SKU × zona) y puntos de reposición dinámicos
+"""
+
+import numpy as np
+from .exportacion import leer_columnar, leer_manifiesto
+from .pedidos import compactar_pedidos
+
+# Modelos soportados:
+#   'media_movil': promedio de los últimos `ventana` días
+#   'suavizado':   suavizado exponencial simple (nivel con peso alfa)
+#   'croston':     Croston para demanda intermitente: suaviza por separado
+#                  el tamaño de la demanda y el intervalo entre días con
+#                  demanda; el pronóstico diario es tamaño / intervalo
+#   'auto':        por serie, Croston si la demanda es intermitente y
+#                  suavizado si no (ver INTERVALO_INTERMITENTE)
+MODELOS = ('media_movil', 'suavizado', 'croston', 'auto')
+
+# Intervalo medio entre días con demanda a partir del cual una serie se
+# considera intermitente (corte de Syntetos-Boylan)
+INTERVALO_INTERMITENTE = 1.32
+
+# Desviación estándar ≈ 1,25 × error absoluto medio (demanda normal)
+FACTOR_MAD = 1.25
+
+def historia_por_serie(tabla, dic_clientes=None, por_zona=False):
+    """
+    Demanda diaria por serie a partir de la tabla de simular_demanda_columnar
+
+    Args:
+        tabla: Tabla columnar de pedidos
+        dic_clientes: Catálogo de clientes (sólo con por_zona, para la zona)
+        por_zona: Si es True, una serie por par (SKU, zona) con demanda
+
+    Returns:
+        Tupla (historia, claves): arreglo (dias, series) de unidades y la
+        clave de cada columna (el SKU, o la tupla (sku, zona))
+    """
+    zona_idx, zonas = None, None
+    if por_zona:
+        zonas_cliente = [dic_clientes[c]['zona'] for c in tabla['clientes']]
+        zonas = sorted(set(zonas_cliente))
+        indice_zona = {zona: i for i, zona in enumerate(zonas)}
+        zona_de_cliente = np.array([indice_zona[z] for z in zonas_cliente], dtype=np.int64)
+        zona_idx = zona_de_cliente[tabla['cliente_idx']]
+    return _historia(tabla['dia'], tabla['sku_idx'], tabla['cantidad'], tabla['skus'], zona_idx, zonas)
+
+def historia_exportada(directorio, por_zona=False):
+    """
+    Demanda diaria por serie desde la tabla 'pedidos' de exportar_columnar
+
+    Returns:
+        Tupla (historia, claves), igual que historia_por_serie
+    """
+    columnas = ['Dia', 'SKU', 'Cantidad'] + (['Zona'] if por_zona else [])
+    datos = leer_columnar(directorio, 'pedidos', columnas, decodificar=False)
+    diccionarios = leer_manifiesto(directorio)['tablas']['pedidos']['diccionarios']
+    # Las categorías quedan como códigos: se traduce sólo el diccionario de días
+    numero_dia = np.array([int(dia.split('_')[1]) for dia in diccionarios.get('Dia', [])], dtype=np.int64)
+    dia = numero_dia[datos['Dia']] if datos['Dia'].size else datos['Dia']
+    zona_idx = datos['Zona'] if por_zona else None
+    return _historia(dia, datos['SKU'], datos['Cantidad'], diccionarios.get('SKU', []), zona_idx,
+                     diccionarios.get('Zona', []))
+
+def _historia(dia, sku_idx, cantidad, skus, zona_idx=None, zonas=None):
+    dia = np.asarray(dia, dtype=np.int64)
+    sku_idx = np.asarray(sku_idx, dtype=np.int64)
+    n_dias = int(dia.max()) if dia.size else 0
+
+    if zona_idx is None:
+        serie, claves = sku_idx, list(skus)
+    else:
+        # Sólo los pares (SKU, zona) que aparecen: no la grilla completa
+        par = sku_idx * len(zonas) + np.asarray(zona_idx, dtype=np.int64)
+        pares, serie = np.unique(par, return_inverse=True)
+        claves = [(skus[p // len(zonas)], zonas[p % len(zonas)]) for p in pares.tolist()]
+
+    posicion = (dia - 1) * len(claves) + serie
+    historia = np.bincount(posicion, weights=cantidad, minlength=n_dias * len(claves))
+    return historia.astype(np.int64).reshape(n_dias, len(claves)), claves
+
+class PronosticoDemanda:
+    """
+    Pronóstico de la demanda diaria de muchas series a la vez
+
+    El estado de cada modelo es un arreglo con una posición por serie, y
+    cada día nuevo actualiza todas las series con unas pocas operaciones de
+    NumPy: ajustar una historia es recorrer sus días, y sumar un día es un
+    solo paso (sin reajustar). El error absoluto medio del pronóstico de un
+    día para el siguiente se suaviza junto con el modelo y da la
+    desviación para el stock de seguridad.
+    """
+
+    def __init__(self, claves, modelo='suavizado', alfa=0.2, ventana=7):
+        """
+        Args:
+            claves: Clave de cada serie (SKU, o tupla (sku, zona))
+            modelo: Uno de MODELOS
+            alfa: Peso del último dato en el suavizado, en Croston y en el
+                  error absoluto medio
+            ventana: Días de la media móvil
+
+        Raises:
+            ValueError: Si el modelo no existe o alfa / ventana no son válidos
+        """
+        if modelo not in MODELOS:
+            raise ValueError(f"Modelo desconocido: {modelo}")
+        if not 0 < alfa <= 1:
+            raise ValueError("alfa debe estar en (0, 1]")
+        if ventana < 1:
+            raise ValueError("La ventana debe ser de al menos un día")
+        self.claves = list(claves)
+        self.indice = {clave: i for i, clave in enumerate(self.claves)}
+        # Series por (SKU, zona) si las claves son tuplas
+        self.por_zona = bool(self.claves) and isinstance(self.claves[0], tuple)
+        self.modelo = modelo
+        self.alfa = alfa
+        self.ventana = ventana
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Vuelve al estado sin días observados"""
+        n = len(self.claves)
+        self.dias = 0
+        self.dias_con_demanda = np.zeros(n, dtype=np.int64)
+        self.mad = np.zeros(n)
+        if self.modelo == 'media_movil':
+            self._ultimos = np.zeros((self.ventana, n))
+            self._suma = np.zeros(n)
+        if self.modelo in ('suavizado', 'auto'):
+            self._nivel = np.zeros(n)
+        if self.modelo in ('croston', 'auto'):
+            self._tamano = np.zeros(n)
+            self._intervalo = np.zeros(n)
+            self._desde_ultima = np.zeros(n)
+
+    def pronostico(self):
+        """Demanda esperada por día de cada serie (arreglo)"""
+        if self.modelo == 'media_movil':
+            return self._suma / max(1, min(self.dias, self.ventana))
+        if self.modelo == 'suavizado':
+            return self._nivel.copy()
+        croston = np.divide(self._tamano, self._intervalo, out=np.zeros(len(self.claves)),
+                            where=self._intervalo > 0)
+        if self.modelo == 'croston':
+            return croston
+        return np.where(self.intermitentes(), croston, self._nivel)
+
+    def intermitentes(self):
+        """Series cuyo intervalo medio entre días con demanda supera el corte"""
+        return self.dias > INTERVALO_INTERMITENTE * self.dias_con_demanda
+
+    def desviacion(self):
+        """Desviación estimada de la demanda diaria de cada serie"""
+        return FACTOR_MAD * self.mad
+
+    def actualizar(self, demanda):
+        """
+        Suma un día observado a todas las series
+
+        Args:
+            demanda: Arreglo con las unidades de cada serie (en el orden de
+                     claves) o diccionario {clave: unidades}; las claves que
+                     no son series se ignoran
+        """
+        if isinstance(demanda, dict):
+            vector = np.zeros(len(self.claves))
+            for clave, unidades in demanda.items():
+                i = self.indice.get(clave)
+                if i is not None:
+                    vector[i] += unidades
+            demanda = vector
+        demanda = np.asarray(demanda, dtype=np.float64)
+        if demanda.shape != (len(self.claves),):
+            raise ValueError(f"Se esperaban {len(self.claves)} series y llegaron {demanda.shape}")
+
+        alfa = self.alfa
+        if self.dias > 0:
+            self.mad += alfa * (np.abs(demanda - self.pronostico()) - self.mad)
+        hubo = demanda > 0
+
+        if self.modelo == 'media_movil':
+            # Buffer circular de los últimos `ventana` días
+            fila = self.dias % self.ventana
+            self._suma += demanda - self._ultimos[fila]
+            self._ultimos[fila] = demanda
+        if self.modelo in ('suavizado', 'auto'):
+            if self.dias == 0:
+                self._nivel[:] = demanda
+            else:
+                self._nivel += alfa * (demanda - self._nivel)
+        if self.modelo in ('croston', 'auto'):
+            # Tamaño e intervalo sólo cambian en los días con demanda; la
+            # primera demanda de cada serie los inicializa sin suavizar
+            # (peso 1); se usan pesos por serie en lugar de índices booleanos
+            self._desde_ultima += 1
+            peso = np.where(self._intervalo > 0, alfa, 1.0) * hubo
+            self._tamano += peso * (demanda - self._tamano)
+            self._intervalo += peso * (self._desde_ultima - self._intervalo)
+            self._desde_ultima *= ~hubo
+
+        self.dias_con_demanda += hubo
+        self.dias += 1
+
+    def ajustar(self, historia):
+        """
+        Ajusta desde cero con una historia completa (un paso por día)
+
+        Args:
+            historia: Arreglo (dias, series); ver historia_por_serie
+
+        Returns:
+            El mismo objeto, ajustado
+        """
+        self.reiniciar()
+        for demanda_dia in np.asarray(historia, dtype=np.float64):
+            self.actualizar(demanda_dia)
+        return self
+
+    def demanda_pedidos(self, pedidos_dia):
+        """
+        Unidades pedidas por serie en los pedidos de un día
+
+        Args:
+            pedidos_dia: Diccionario {pedido_id: pedido} o ConjuntoPedidos
+
+        Returns:
+            Arreglo alineado con claves (los SKUs sin serie se ignoran)
+        """
+        pedidos = compactar_pedidos(pedidos_dia)
+        almacen = pedidos.almacen
+        lineas = pedidos.lineas()
+        if lineas.size == 0:
+            return np.zeros(len(self.claves))
+        if self.por_zona:
+            # Serie de cada (SKU, zona) local del almacén
+            largos = almacen.inicio[pedidos.indices + 1] - almacen.inicio[pedidos.indices]
+            zona_linea = almacen.zona_idx[np.repeat(pedidos.indices, largos)]
+            par = almacen.sku_idx[lineas].astype(np.int64) * len(almacen.zonas) + zona_linea
+            pares, local = np.unique(par, return_inverse=True)
+            n_zonas = len(almacen.zonas)
+            serie_de_par = np.array([self.indice.get((almacen.skus[p // n_zonas], almacen.zonas[p % n_zonas]), -1)
+                                     for p in pares.tolist()], dtype=np.int64)
+            serie = serie_de_par[local]
+        else:
+            serie_de_sku = np.array([self.indice.get(sku, -1) for sku in almacen.skus], dtype=np.int64)
+            serie = serie_de_sku[almacen.sku_idx[lineas]]
+        validas = serie >= 0
+        return np.bincount(serie[validas], weights=almacen.cantidad[lineas][validas],
+                           minlength=len(self.claves))
+
+    def puntos_reposicion(self, tiempo_entrega=0, nivel_z=1.65):
+        """
+        Puntos de reposición por SKU con el pronóstico actual
+
+        La posición de inventario tiene que cubrir la demanda hasta que
+        llegue la orden de la próxima revisión: max(tiempo de entrega, 1)
+        días (la reposición se revisa al cierre de cada día). El punto es
+        la demanda esperada en esos días más nivel_z desviaciones. Las
+        series por zona se suman por SKU.
+
+        Args:
+            tiempo_entrega: Días de entrega (entero, o {sku: días}; de un
+                            rango (mín, máx) se toma el máximo)
+            nivel_z: Desviaciones de stock de seguridad (1,65 ≈ 95%)
+
+        Returns:
+            Diccionario {sku: punto_reposicion}, listo para reponer_simple o
+            procesar_dia_inventario
+        """
+        media, varianza = self.pronostico(), self.desviacion() ** 2
+        if self.por_zona:
+            skus = list(dict.fromkeys(sku for sku, _ in self.claves))
+            posicion = {sku: j for j, sku in enumerate(skus)}
+            sku_de_serie = np.array([posicion[sku] for sku, _ in self.claves], dtype=np.int64)
+            media = np.bincount(sku_de_serie, weights=media, minlength=len(skus))
+            varianza = np.bincount(sku_de_serie, weights=varianza, minlength=len(skus))
+        else:
+            skus = self.claves
+
+        if isinstance(tiempo_entrega, dict):
+            dias = np.array([_dias_maximos(tiempo_entrega.get(sku, 0)) for sku in skus], dtype=np.float64)
+        else:
+            dias = np.full(len(skus), _dias_maximos(tiempo_entrega), dtype=np.float64)
+        cobertura = np.maximum(dias, 1)
+
+        puntos = np.ceil(media * cobertura + nivel_z * np.sqrt(varianza * cobertura))
+        return dict(zip(skus, np.maximum(puntos, 0).astype(np.int64).tolist()))
+
+def _dias_maximos(tiempo):
+    return max(tiempo) if isinstance(tiempo, (tuple, list)) else tiempo
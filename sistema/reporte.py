@@ -3,69 +3,57 @@ Módulo de Reporte - Sistema de Logística FIIS SIE
 Genera reportes consolidados y permite exportación de datos
 """
 
+import os
 import datetime
 import csv
 from .catalogos import dic_clientes, dic_sku
+from .indicadores import AcumuladorIndicadores
+from .exportacion import ErrorExportacion
 
 def reporte_logistica(pedidos, indicadores_historia, alertas, periodo="SEMANAL"):
     """
     Genera reporte logístico consolidado con datos acumulados reales.
+    
+    Args:
+        pedidos: Pedidos por día (para los rankings de clientes y productos)
+        indicadores_historia: Lista de indicadores diarios, un solo día
+                              (dict) o un AcumuladorIndicadores ya
+                              alimentado (en ese caso pedidos no se recorre)
+        alertas: Alertas del último corte
     """
     resultado = []
     resultado.append("=" * 60)
     resultado.append(f"===== REPORTE LOGÍSTICO {periodo} - LIA S.A.C. =====")
     resultado.append("=" * 60)
     
-    # 1. CÁLCULOS REALES (Suma de historiales para evitar ceros)
-    total_pedidos = 0
-    total_solic = 0
-    total_entreg = 0
+    # 1. CÁLCULOS REALES: un acumulador alimentado día a día responde en
+    # O(1); si llega el historial, se arma aquí en una sola pasada
+    if isinstance(indicadores_historia, AcumuladorIndicadores):
+        acumulador = indicadores_historia
+    else:
+        acumulador = AcumuladorIndicadores()
+        if isinstance(indicadores_historia, dict):
+            # Caso borde: solo llega un día
+            indicadores_historia = [indicadores_historia]
+        for ind in indicadores_historia or []:
+            acumulador.agregar_dia(ind)
+        if isinstance(pedidos, dict):
+            for pedidos_dia in pedidos.values():
+                acumulador.agregar_pedidos(pedidos_dia)
     
-    # Variables para promedios
-    sum_otif = 0
-    sum_fill = 0
-    sum_backlog = 0
-    sum_prod = 0
-    sum_flota = 0
-    n_dias = 0
+    total_pedidos = acumulador.totales['Pedidos_Totales']
+    total_solic = acumulador.totales['Unidades_Solicitadas']
+    total_entreg = acumulador.totales['Unidades_Entregadas']
     
-    # Si recibimos una lista (historial completo), sumamos
-    if isinstance(indicadores_historia, list):
-        n_dias = len(indicadores_historia)
-        for ind in indicadores_historia:
-            total_pedidos += ind.get('Pedidos_Totales', 0)
-            total_solic += ind.get('Unidades_Solicitadas', 0)
-            total_entreg += ind.get('Unidades_Entregadas', 0)
-            
-            sum_otif += ind.get('OTIF', 0)
-            sum_fill += ind.get('Fill_Rate', 0)
-            sum_backlog += ind.get('Backlog_Rate', 0)
-            sum_prod += ind.get('Productividad_Picking', 0)
-            sum_flota += ind.get('Utilizacion_Flota', 0)
-            
-    elif isinstance(indicadores_historia, dict):
-        # Caso borde: solo llega un día
-        n_dias = 1
-        i = indicadores_historia
-        total_pedidos = i.get('Pedidos_Totales', 0)
-        total_solic = i.get('Unidades_Solicitadas', 0)
-        total_entreg = i.get('Unidades_Entregadas', 0)
-        
-        sum_otif = i.get('OTIF', 0)
-        sum_fill = i.get('Fill_Rate', 0)
-        sum_backlog = i.get('Backlog_Rate', 0)
-        sum_prod = i.get('Productividad_Picking', 0)
-        sum_flota = i.get('Utilizacion_Flota', 0)
-
-    # Calcular promedios
-    if n_dias > 0:
-        otif_global = sum_otif / n_dias
-        fill_global = sum_fill / n_dias
-        backlog_rate_global = sum_backlog / n_dias
-        prod_global = sum_prod / n_dias
-        flota_global = sum_flota / n_dias
-    else:
-        otif_global = fill_global = backlog_rate_global = prod_global = flota_global = 0
+    # Tasas ponderadas por pedidos/unidades del periodo (promediar los % diarios
+    # daría el mismo peso a un día de 5 pedidos que a uno de 500)
+    otif_global = acumulador.tasa('OTIF')
+    fill_global = acumulador.tasa('Fill_Rate')
+    backlog_rate_global = acumulador.tasa('Backlog_Rate')
+    
+    # Promedios diarios de magnitudes que ya son por día
+    prod_global = acumulador.media('Productividad_Picking')
+    flota_global = acumulador.media('Utilizacion_Flota')
 
     backlog_total = total_solic - total_entreg
     if backlog_total < 0: backlog_total = 0 # Por seguridad
@@ -77,13 +65,22 @@ def reporte_logistica(pedidos, indicadores_historia, alertas, periodo="SEMANAL")
     resultado.append(f"   • Total unidades entregadas: {total_entreg:,}")
     resultado.append(f"   • Backlog acumulado (unidades): {backlog_total:,}")
 
-    resultado.append(f"\n📈 INDICADORES GLOBALES (Promedio del periodo):")
+    resultado.append(f"\n📈 INDICADORES GLOBALES (Ponderados del periodo):")
     resultado.append(f"   • OTIF: {otif_global:.1f}%")
     resultado.append(f"   • Fill Rate: {fill_global:.1f}%")
-    resultado.append(f"   • Backlog Rate Promedio: {backlog_rate_global:.1f}%")
+    resultado.append(f"   • Backlog Rate: {backlog_rate_global:.1f}%")
     resultado.append(f"   • Productividad de Picking: {prod_global:.1f} unid/h")
     resultado.append(f"   • Utilización de Flota: {flota_global:.1f}%")
 
+    # Tendencia reciente y dispersión diaria
+    ventanas = acumulador.ventanas_moviles()
+    percentiles = acumulador.percentiles()
+    resultado.append(f"\n📉 TENDENCIA (Ventanas móviles):")
+    resultado.append(f"   • OTIF 7/30 días: {ventanas['OTIF_7d']:.1f}% / {ventanas['OTIF_30d']:.1f}%")
+    resultado.append(f"   • Fill Rate 7/30 días: {ventanas['Fill_Rate_7d']:.1f}% / {ventanas['Fill_Rate_30d']:.1f}%")
+    resultado.append(f"   • Backlog Rate diario P50/P95: {percentiles['Backlog_Rate_P50']:.1f}% / "
+                     f"{percentiles['Backlog_Rate_P95']:.1f}%")
+
     # 3. ALERTAS (Texto completo)
     if alertas:
         resultado.append(f"\n🚨 ALERTAS ACTIVAS (Último corte):")
@@ -95,24 +92,11 @@ def reporte_logistica(pedidos, indicadores_historia, alertas, periodo="SEMANAL")
         resultado.append(f"\n✅ SIN ALERTAS CRÍTICAS")
 
     # 4. ANÁLISIS DETALLADO (Top Productos)
-    demanda_prod = {}
-    demanda_cli = {}
-    
-    if isinstance(pedidos, dict):
-        for dia_data in pedidos.values():
-            for p in dia_data.values():
-                cli = p['cliente']
-                demanda_cli[cli] = demanda_cli.get(cli, 0) + sum(p['productos'].values())
-                for sku, cant in p['productos'].items():
-                    demanda_prod[sku] = demanda_prod.get(sku, 0) + cant
-                    
     resultado.append(f"\n📋 ANÁLISIS DETALLADO:")
-    if demanda_cli:
-        top_cli = max(demanda_cli, key=demanda_cli.get)
-        resultado.append(f"   • Cliente Top: {dic_clientes[top_cli]['nombre']} ({demanda_cli[top_cli]:,} unds)")
-    if demanda_prod:
-        top_prod = max(demanda_prod, key=demanda_prod.get)
-        resultado.append(f"   • Producto Top: {dic_sku[top_prod]['nombre']} ({demanda_prod[top_prod]:,} unds)")
+    for top_cli, unidades in acumulador.top_clientes(1):
+        resultado.append(f"   • Cliente Top: {dic_clientes[top_cli]['nombre']} ({unidades:,} unds)")
+    for top_prod, unidades in acumulador.top_skus(1):
+        resultado.append(f"   • Producto Top: {dic_sku[top_prod]['nombre']} ({unidades:,} unds)")
 
     # 5. RECOMENDACIONES GENERALES
     resultado.append(f"\n💡 RECOMENDACIONES DEL SISTEMA:")
@@ -133,33 +117,39 @@ def reporte_logistica(pedidos, indicadores_historia, alertas, periodo="SEMANAL")
 
 def exportar_datos_csv(pedidos, indicadores, filename="datos_logistica.csv"):
     """
-    Exporta datos para análisis en CSV (Función requerida por __init__)
-    """
-    datos = []
+    Exporta las líneas de pedido a CSV, escribiéndolas a medida que se
+    recorren (sin armar la lista completa en memoria)
+    
+    Si no hay líneas no se crea el archivo. Para volúmenes grandes conviene
+    exportacion.exportar_columnar, más compacto y rápido de volver a leer.
     
-    # Datos de pedidos
-    if isinstance(pedidos, dict):
-        for dia_key, pedidos_dia in pedidos.items():
-            for pedido_id, pedido in pedidos_dia.items():
-                for sku, cantidad in pedido['productos'].items():
-                    datos.append({
-                        'Dia': dia_key,
-                        'Pedido_ID': pedido_id,
-                        'Cliente': pedido['cliente'],
-                        'Zona': pedido['zona'],
-                        'SKU': sku,
-                        'Cantidad': cantidad
-                    })
+    Returns:
+        Número de líneas exportadas
+    
+    Raises:
+        ErrorExportacion: Si no se puede escribir el archivo
+    """
+    if not isinstance(pedidos, dict):
+        return 0
     
-    # Guardar CSV (Opcional, solo si se requiere guardar en disco servidor)
+    lineas = 0
+    temporal = f"{filename}.{os.getpid()}.tmp"
     try:
-        if datos:
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['Dia', 'Pedido_ID', 'Cliente', 'Zona', 'SKU', 'Cantidad']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(datos)
-    except Exception:
-        pass # Ignorar errores de escritura de archivo en demo
+        with open(temporal, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['Dia', 'Pedido_ID', 'Cliente', 'Zona', 'SKU', 'Cantidad'])
+            for dia_key, pedidos_dia in pedidos.items():
+                for pedido_id, pedido in pedidos_dia.items():
+                    for sku, cantidad in pedido['productos'].items():
+                        writer.writerow((dia_key, pedido_id, pedido['cliente'], pedido['zona'], sku, cantidad))
+                        lineas += 1
+        if lineas:
+            os.replace(temporal, filename)
+        else:
+            os.remove(temporal)
+    except OSError as e:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise ErrorExportacion(f"No se pudo escribir {filename}: {e}") from e
     
-    return len(datos)
\ No newline at end of file
+    return lineas
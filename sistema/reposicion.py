@@ -0,0 +1,136 @@
+"""
+Módulo de Reposición - Sistema de Logística FIIS SIE
+Tiempos de entrega de la reposición y órdenes en tránsito
+"""
+
+from .aleatorio import generador_numpy
+
+class TransitoReposicion:
+    """
+    Órdenes de reposición pedidas y todavía no recibidas
+
+    Las órdenes se guardan en un buffer circular con una cubeta por día de
+    llegada: la que llega el día d va a la cubeta d % n, con n = tiempo de
+    entrega máximo + 1, así que nunca se pisan dos días pendientes. Recibir
+    un día sólo recorre su cubeta (O(llegadas)), no todas las órdenes en
+    camino. en_camino lleva por SKU las unidades pedidas y no recibidas,
+    para decidir con la posición de inventario (stock + en camino).
+
+    Un tiempo de entrega t significa que la orden pedida al cierre del día d
+    está disponible al empezar el día d + t; con t = 0 entra al stock en el
+    mismo cierre (la reposición inmediata de siempre).
+    """
+
+    def __init__(self, tiempos_entrega=0, tiempo_defecto=0, semilla=None):
+        """
+        Args:
+            tiempos_entrega: Días de entrega para todos los SKUs, o diccionario
+                             {sku: días}. Los días son un entero fijo o un par
+                             (mínimo, máximo) que se sortea en cada orden.
+            tiempo_defecto: Días de los SKUs que no están en el diccionario
+            semilla: Semilla de la corrida para sortear los tiempos (flujo
+                     'reposicion' de cada día)
+
+        Raises:
+            ValueError: Si algún tiempo es negativo o un rango está invertido
+        """
+        if isinstance(tiempos_entrega, dict):
+            self.tiempos = dict(tiempos_entrega)
+        else:
+            self.tiempos = {}
+            tiempo_defecto = tiempos_entrega
+        self.tiempo_defecto = tiempo_defecto
+        self.semilla = semilla
+
+        maximo = 0
+        for tiempo in list(self.tiempos.values()) + [tiempo_defecto]:
+            minimo_t, maximo_t = tiempo if isinstance(tiempo, (tuple, list)) else (tiempo, tiempo)
+            if not (0 <= minimo_t <= maximo_t):
+                raise ValueError(f"Tiempo de entrega inválido: {tiempo}")
+            maximo = max(maximo, maximo_t)
+
+        self.cubetas = [[] for _ in range(maximo + 1)]
+        self.en_camino = {}
+        self.unidades = 0
+        self.ordenes = 0
+        self._ultimo_dia = None
+        self._rng = (None, None)
+
+    def tiempo_entrega(self, dia, sku):
+        """Días de entrega de una orden del SKU pedida el día indicado"""
+        tiempo = self.tiempos.get(sku, self.tiempo_defecto)
+        if not isinstance(tiempo, (tuple, list)):
+            return tiempo
+        if tiempo[0] == tiempo[1]:
+            return tiempo[0]
+        # Un generador por día: el sorteo no depende de los días anteriores
+        if self._rng[0] != dia:
+            self._rng = (dia, generador_numpy(self.semilla, 'reposicion', dia))
+        return int(self._rng[1].integers(tiempo[0], tiempo[1] + 1))
+
+    def pedir(self, dia, sku, cantidad):
+        """
+        Registra una orden de reposición
+
+        Returns:
+            Día de llegada. Si es el mismo día (tiempo 0) la orden no queda en
+            tránsito: quien pide la suma al stock en el acto.
+        """
+        llegada = dia + self.tiempo_entrega(dia, sku)
+        if llegada == dia:
+            return llegada
+        self.cubetas[llegada % len(self.cubetas)].append((llegada, sku, cantidad))
+        self.en_camino[sku] = self.en_camino.get(sku, 0) + cantidad
+        self.unidades += cantidad
+        self.ordenes += 1
+        return llegada
+
+    def recibir(self, dia):
+        """
+        Saca las órdenes que llegan hasta el día indicado (incluye los días
+        que no se hayan recibido, si se saltó alguno)
+
+        Returns:
+            Diccionario {sku: unidades} que entran al stock
+        """
+        desde = dia if self._ultimo_dia is None else self._ultimo_dia + 1
+        # Todas las órdenes pendientes llegan a más tardar n - 1 días después
+        # del último día recibido: basta recorrer cada cubeta una vez
+        hasta = min(dia, desde + len(self.cubetas) - 1)
+        self._ultimo_dia = dia
+
+        llegadas = {}
+        for d in range(desde, hasta + 1):
+            cubeta = self.cubetas[d % len(self.cubetas)]
+            if not cubeta:
+                continue
+            # Si se pidió después de saltar días, la cubeta puede tener
+            # órdenes de una vuelta posterior: se quedan hasta su llegada
+            quedan = []
+            for orden in cubeta:
+                llegada, sku, cantidad = orden
+                if llegada > dia:
+                    quedan.append(orden)
+                else:
+                    llegadas[sku] = llegadas.get(sku, 0) + cantidad
+            self.ordenes -= len(cubeta) - len(quedan)
+            cubeta[:] = quedan
+
+        # Se descuenta de en_camino una vez por SKU, no por orden
+        en_camino = self.en_camino
+        for sku, cantidad in llegadas.items():
+            restante = en_camino[sku] - cantidad
+            if restante:
+                en_camino[sku] = restante
+            else:
+                del en_camino[sku]
+        self.unidades -= sum(llegadas.values())
+        return llegadas
+
+    def pendientes(self):
+        """Órdenes en camino como lista de (dia_llegada, sku, cantidad), por fecha"""
+        return sorted(orden for cubeta in self.cubetas for orden in cubeta)
+
+    def resumen(self):
+        """Órdenes y unidades en camino"""
+        return {'ordenes_en_camino': self.ordenes, 'unidades_en_camino': self.unidades}
@@ -0,0 +1,262 @@
+"""
+Módulo de Ruteo - Sistema de Logística FIIS SIE
+Matriz de distancias y construcción de rutas multi-parada (ahorros + 2-opt)
+"""
+
+import os
+import json
+import hashlib
+import numpy as np
+from . import catalogos
+from .configuracion import ruta_cache
+
+# Matrices ya cargadas en este proceso, por huella de coordenadas
+_matrices = {}
+
+# Con más clientes que esto en el catálogo no se arma la matriz completa
+# (n² distancias) sino una por día, sólo con los clientes a visitar
+LIMITE_MATRIZ_COMPLETA = 2000
+
+# Con más paradas que esto los vecinos se buscan entre ubicaciones distintas
+# (por bloques de filas) en lugar de armar la submatriz paradas × paradas
+LIMITE_PARADAS_DENSAS = 2000
+
+# Filas de la submatriz de ubicaciones que se arman de una vez
+FILAS_POR_BLOQUE_VECINOS = 512
+
+def matriz_distancias(coordenadas=None, deposito=None):
+    """
+    Matriz de distancias euclidianas (km) entre el almacén y los clientes
+
+    Se calcula una sola vez por juego de coordenadas: queda en memoria y en
+    disco (directorio de caché) bajo una huella de las coordenadas, así que
+    cualquier cambio en el catálogo genera una matriz nueva.
+
+    Args:
+        coordenadas: Diccionario {cliente_id: (x, y)} (por defecto el catálogo)
+        deposito: Coordenadas (x, y) del almacén
+
+    Returns:
+        Tupla (indice, matriz): indice es {cliente_id: fila}; la fila 0 es el almacén
+    """
+    if coordenadas is None:
+        coordenadas = catalogos.coordenadas_clientes
+    if deposito is None:
+        deposito = catalogos.deposito_coordenadas
+
+    ids = list(coordenadas)
+    puntos = np.array([deposito] + [coordenadas[c] for c in ids], dtype=float)
+    huella = hashlib.sha1(json.dumps([ids, puntos.tolist()]).encode('utf-8')).hexdigest()[:16]
+
+    if huella in _matrices:
+        return _matrices[huella]
+
+    ruta = ruta_cache('distancias', f"{huella}.npy")
+    if os.path.exists(ruta):
+        matriz = np.load(ruta)
+    else:
+        diferencia = puntos[:, None, :] - puntos[None, :, :]
+        matriz = np.sqrt((diferencia ** 2).sum(axis=2))
+        # Escribir a un temporal y renombrar: otro proceso nunca lee a medias
+        temporal = f"{ruta}.{os.getpid()}.tmp.npy"
+        np.save(temporal, matriz)
+        os.replace(temporal, ruta)
+
+    indice = {c: i + 1 for i, c in enumerate(ids)}
+    _matrices[huella] = (indice, matriz)
+    return indice, matriz
+
+def matriz_distancias_dia(clientes):
+    """
+    Matriz de distancias para las rutas de un día
+
+    Con catálogos chicos es la matriz completa (en caché). Con más de
+    LIMITE_MATRIZ_COMPLETA clientes se calcula sólo entre el almacén y los
+    clientes indicados, tomando las coordenadas del catálogo compilado; las
+    distancias son las mismas que en la matriz completa.
+
+    Args:
+        clientes: IDs de los clientes a visitar (se admiten repetidos)
+
+    Returns:
+        Tupla (indice, matriz) como matriz_distancias
+    """
+    if len(catalogos.coordenadas_clientes) <= LIMITE_MATRIZ_COMPLETA:
+        return matriz_distancias()
+
+    compilado = catalogos.catalogo_compilado()
+    ids = list(dict.fromkeys(clientes))
+    coordenadas = compilado.coordenadas_de_cliente[compilado.posiciones_clientes(ids)]
+    sin_coordenadas = np.flatnonzero(np.isnan(coordenadas).any(axis=1))
+    if sin_coordenadas.size:
+        raise KeyError(ids[sin_coordenadas[0]])
+
+    puntos = np.vstack((np.asarray(catalogos.deposito_coordenadas, dtype=float), coordenadas))
+    diferencia = puntos[:, None, :] - puntos[None, :, :]
+    matriz = np.sqrt((diferencia ** 2).sum(axis=2))
+    return {c: i + 1 for i, c in enumerate(ids)}, matriz
+
+def distancia_ruta(secuencia, matriz):
+    """Km de una ruta que sale del almacén, visita las ubicaciones y vuelve"""
+    recorrido = [0] + list(secuencia) + [0]
+    return float(matriz[recorrido[:-1], recorrido[1:]].sum())
+
+def _pares_densos(ubicaciones, matriz, k):
+    """Pares (a < b) de cada parada con sus k más cercanas, desde la submatriz completa"""
+    n = len(ubicaciones)
+    entre_paradas = matriz[np.ix_(ubicaciones, ubicaciones)]
+    cercanos = np.argpartition(entre_paradas, k, axis=1)[:, :k + 1]
+    a = np.repeat(np.arange(n), k + 1)
+    return a, cercanos.ravel()
+
+def _pares_por_ubicacion(ubicaciones, matriz, k):
+    """
+    Pares de cada parada con k cercanas sin armar la submatriz paradas ×
+    paradas: primero las paradas en su misma ubicación (distancia 0) y, si
+    no alcanzan, las de las ubicaciones más cercanas en orden de distancia.
+    Las distancias entre ubicaciones se calculan por bloques de filas, así
+    que la memoria extra es O(paradas × k + bloque × ubicaciones).
+    """
+    filas, grupo = np.unique(ubicaciones, return_inverse=True)
+    m = filas.size
+    orden = np.argsort(grupo, kind='stable')
+    inicio = np.concatenate(([0], np.cumsum(np.bincount(grupo, minlength=m))))
+
+    # Las k ubicaciones más cercanas de cada ubicación, ordenadas
+    kl = min(k, m - 1)
+    cercanas = np.empty((m, kl), dtype=np.int64)
+    if kl > 0:
+        for desde in range(0, m, FILAS_POR_BLOQUE_VECINOS):
+            hasta = min(desde + FILAS_POR_BLOQUE_VECINOS, m)
+            bloque = matriz[np.ix_(filas[desde:hasta], filas)]
+            bloque[np.arange(hasta - desde), np.arange(desde, hasta)] = np.inf
+            candidatas = np.argpartition(bloque, kl - 1, axis=1)[:, :kl]
+            distancias = np.take_along_axis(bloque, candidatas, axis=1)
+            cercanas[desde:hasta] = np.take_along_axis(
+                candidatas, np.argsort(distancias, axis=1, kind='stable'), axis=1)
+
+    desde_a, desde_b = [], []
+    for g in range(m):
+        miembros = orden[inicio[g]:inicio[g + 1]]
+        c = miembros.size
+        # Misma ubicación: cada parada con las siguientes t (en ronda)
+        t = min(k, c - 1)
+        if t > 0:
+            siguientes = (np.arange(c)[:, None] + np.arange(1, t + 1)) % c
+            desde_a.append(np.repeat(miembros, t))
+            desde_b.append(miembros[siguientes].ravel())
+        faltan = k - (c - 1)
+        if faltan > 0 and kl > 0:
+            externas = np.concatenate([orden[inicio[h]:inicio[h + 1]] for h in cercanas[g]])[:faltan]
+            desde_a.append(np.repeat(miembros, externas.size))
+            desde_b.append(np.tile(externas, c))
+
+    if not desde_a:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(desde_a), np.concatenate(desde_b)
+
+def construir_rutas(ubicaciones, cargas, matriz, capacidad, vecinos=25):
+    """
+    Algoritmo de ahorros (Clarke-Wright) con capacidad, seguido de 2-opt
+
+    Para escalar a miles de paradas sólo se evalúan los ahorros entre cada
+    parada y sus `vecinos` más cercanas, en lugar de todos los pares. Con
+    más de LIMITE_PARADAS_DENSAS paradas los vecinos se buscan por
+    ubicación, sin la submatriz paradas × paradas (memoria lineal en las
+    paradas del día).
+
+    Args:
+        ubicaciones: Fila de la matriz de cada parada
+        cargas: Unidades de cada parada (ninguna mayor que la capacidad)
+        matriz: Matriz de distancias (fila/columna 0 = almacén)
+        capacidad: Capacidad del vehículo
+        vecinos: Vecinos por parada considerados en los ahorros
+
+    Returns:
+        Lista de rutas; cada ruta es la lista de paradas (índices) en orden de visita
+    """
+    n = len(ubicaciones)
+    if n == 0:
+        return []
+
+    ubicaciones = np.asarray(ubicaciones)
+    rutas = {i: [i] for i in range(n)}
+    ruta_de = list(range(n))
+    carga = list(cargas)
+
+    k = min(vecinos, n - 1)
+    if k > 0:
+        desde_almacen = matriz[0, ubicaciones]
+        if n <= LIMITE_PARADAS_DENSAS:
+            a, b = _pares_densos(ubicaciones, matriz, k)
+        else:
+            a, b = _pares_por_ubicacion(ubicaciones, matriz, k)
+
+        # Pares candidatos (a < b) sin repetir
+        a, b = np.minimum(a, b), np.maximum(a, b)
+        distintos = a != b
+        pares = np.unique(a[distintos].astype(np.int64) * n + b[distintos])
+        a, b = pares // n, pares % n
+
+        ahorro = desde_almacen[a] + desde_almacen[b] - matriz[ubicaciones[a], ubicaciones[b]]
+        orden = np.argsort(-ahorro, kind='stable')
+        orden = orden[ahorro[orden] > 0]
+
+        for i, j in zip(a[orden].tolist(), b[orden].tolist()):
+            ri, rj = ruta_de[i], ruta_de[j]
+            if ri == rj or carga[ri] + carga[rj] > capacidad:
+                continue
+            ruta_i, ruta_j = rutas[ri], rutas[rj]
+            # Sólo se unen rutas por sus extremos: i al final, j al inicio
+            if ruta_i[-1] != i:
+                if ruta_i[0] != i:
+                    continue
+                ruta_i.reverse()
+            if ruta_j[0] != j:
+                if ruta_j[-1] != j:
+                    continue
+                ruta_j.reverse()
+            ruta_i.extend(ruta_j)
+            carga[ri] += carga[rj]
+            for parada in ruta_j:
+                ruta_de[parada] = ri
+            del rutas[rj]
+
+    return [mejorar_2opt(ruta, ubicaciones, matriz) for ruta in rutas.values()]
+
+def mejorar_2opt(ruta, ubicaciones, matriz):
+    """
+    Mejora local 2-opt: invierte tramos de la ruta mientras acorten el
+    recorrido (almacén → paradas → almacén)
+
+    Para cada inicio de tramo i se evalúan con NumPy todos los finales j de
+    una vez y se aplica el primero que mejora; la búsqueda sigue desde j + 1
+    con el recorrido ya invertido, igual que el doble bucle de siempre.
+    """
+    if len(ruta) < 3:
+        return ruta
+
+    # Recorrido con el almacén en ambos extremos: paradas (-1 = almacén) y
+    # sus filas en la matriz
+    paradas = np.array([-1] + list(ruta) + [-1])
+    filas = np.concatenate(([0], np.asarray(ubicaciones)[ruta], [0]))
+    largo = paradas.size
+
+    mejora = True
+    while mejora:
+        mejora = False
+        for i in range(1, largo - 2):
+            j = i + 1
+            while j < largo - 1:
+                a, b = filas[i - 1], filas[i]
+                c, d = filas[j:largo - 1], filas[j + 1:largo]
+                mejoran = np.flatnonzero(matriz[a, c] + matriz[b, d] < matriz[a, b] + matriz[c, d] - 1e-9)
+                if mejoran.size == 0:
+                    break
+                j += int(mejoran[0])
+                paradas[i:j + 1] = paradas[i:j + 1][::-1]
+                filas[i:j + 1] = filas[i:j + 1][::-1]
+                mejora = True
+                j += 1
+
+    return paradas[1:-1].tolist()
@@ -0,0 +1,298 @@
+"""
+Módulo de Simulación - Sistema de Logística FIIS SIE
+Pipeline diario completo: inventario → picking → transporte → indicadores → alertas
+"""
+
+from collections.abc import Mapping
+from .catalogos import dic_clientes, dic_sku, inventario_inicial, punto_reposicion, lote_reposicion
+from .demanda import simular_demanda_dia
+from .perfiles import simular_demanda_dia_perfil
+from .inventario import procesar_dia_inventario, LibroStock
+from .reposicion import TransitoReposicion
+from .picking import asignar_picking
+from .backlog import ColaBacklog
+from .pedidos import compactar_pedidos
+from .transporte import planificar_rutas, despachar_flota
+from .indicadores import calcular_indicadores, indicadores_por_ambito
+from .alertas import generar_alertas
+
+# Eficiencia máxima del picking (ver asignar_picking): tope de lo que se
+# ofrece del backlog en un día
+EFICIENCIA_MAXIMA_PICKING = 1.10
+
+def simular_dia(dia, pedidos_dia, stock, capacidad_picking=1500, semilla=None, nivel_log='completo',
+                flota_limitada=False, pendientes_transporte=None, backlog=None, transito=None,
+                puntos_reorden=None):
+    """
+    Ejecuta todas las etapas para un día
+
+    Sin backlog, cada día es independiente (comportamiento histórico): el
+    inventario se reserva para todos los pedidos del día y lo que el picking
+    no prepara se descarta. Con una ColaBacklog, los pendientes persisten, se
+    ofrecen antes que la demanda nueva y el stock sólo se consume para los
+    pedidos efectivamente preparados.
+
+    Args:
+        dia: Número de día
+        pedidos_dia: Diccionario {pedido_id: pedido} del día
+        stock: Stock al inicio del día (diccionario, o LibroStock que se
+               actualiza en sitio)
+        capacidad_picking: Unidades que se pueden preparar en el día
+        semilla: Semilla de la corrida (opcional)
+        nivel_log: Detalle del log de inventario ('ninguno', 'resumen', 'completo')
+        flota_limitada: Si es True, despacha con flota finita (despachar_flota)
+        pendientes_transporte: Pedidos que no salieron el día anterior
+        backlog: ColaBacklog con los pendientes de días anteriores (se actualiza)
+        transito: TransitoReposicion con las órdenes de reposición en camino
+                  (se actualiza); sin él la reposición es inmediata
+        puntos_reorden: Puntos de reposición {sku: unidades} del día (por
+                        defecto, los del catálogo)
+
+    Returns:
+        Diccionario con los resultados de cada etapa del día. Los pedidos
+        son vistas del almacén columnar: para json.dumps hay que pasar
+        default=a_json (de sistema.pedidos)
+    """
+    if puntos_reorden is None:
+        puntos_reorden = punto_reposicion
+    if backlog is not None:
+        return _simular_dia_con_backlog(dia, pedidos_dia, stock, capacidad_picking, semilla,
+                                        nivel_log, flota_limitada, pendientes_transporte, backlog,
+                                        transito, puntos_reorden)
+
+    # Procesar inventario
+    resultado_inventario = procesar_dia_inventario(
+        pedidos_dia, stock, puntos_reorden, lote_reposicion, nivel_log, transito, dia
+    )
+
+    # Procesar picking
+    resultados_picking = asignar_picking(dia, pedidos_dia, capacidad_picking, semilla=semilla)
+
+    # Planificar transporte
+    if flota_limitada:
+        resultados_transporte = despachar_flota(
+            dia, resultados_picking['pedidos_preparados'], pendientes_transporte
+        )
+    else:
+        resultados_transporte = planificar_rutas(
+            dia, resultados_picking['pedidos_preparados'], semilla=semilla
+        )
+
+    # Calcular indicadores
+    indicadores = calcular_indicadores(
+        len(pedidos_dia),
+        resultados_picking['pedidos_preparados'],
+        resultados_picking['pedidos_pendientes'],
+        resultados_picking['unidades_preparadas'],
+        resultados_picking['unidades_preparadas'] + resultados_picking['backlog'],
+        resultados_transporte
+    )
+    indicadores['Por_Zona'], indicadores['Por_SKU'] = indicadores_por_ambito(
+        resultados_picking['pedidos_preparados'], resultados_picking['pedidos_pendientes'],
+        resultado_inventario['stock_final']
+    )
+    _indicadores_reposicion(indicadores, resultado_inventario)
+
+    # Generar alertas
+    alertas = generar_alertas(indicadores)
+
+    return {
+        'pedidos': pedidos_dia,
+        'inventario': resultado_inventario,
+        'picking': resultados_picking,
+        'transporte': resultados_transporte,
+        'indicadores': indicadores,
+        'alertas': alertas
+    }
+
+def _simular_dia_con_backlog(dia, pedidos_dia, stock, capacidad_picking, semilla, nivel_log,
+                             flota_limitada, pendientes_transporte, backlog, transito=None,
+                             puntos_reorden=punto_reposicion):
+    """
+    Día con backlog persistente: picking → inventario (sólo lo preparado) →
+    transporte → indicadores → alertas
+    """
+    backlog.agregar(dia, pedidos_dia)
+
+    # Sólo se ofrece lo que el picking podría llegar a preparar hoy, así que
+    # el costo del día no crece con el tamaño del backlog
+    ofrecidos = backlog.extraer(capacidad_picking * EFICIENCIA_MAXIMA_PICKING)
+    resultados_picking = asignar_picking(
+        dia, {pedido_id: pedido for _, pedido_id, pedido, _ in ofrecidos},
+        capacidad_picking, semilla=semilla, estrategia='fifo'
+    )
+    pendientes = resultados_picking['pedidos_pendientes']
+    backlog.devolver([entrada for entrada in ofrecidos if entrada[1] in pendientes])
+
+    resultados_picking['backlog'] = backlog.unidades
+    resultados_picking['estado_backlog'] = backlog.resumen(dia)
+
+    # El stock sólo se consume para los pedidos preparados
+    resultado_inventario = procesar_dia_inventario(
+        resultados_picking['pedidos_preparados'], stock, puntos_reorden, lote_reposicion, nivel_log,
+        transito, dia
+    )
+
+    if flota_limitada:
+        resultados_transporte = despachar_flota(
+            dia, resultados_picking['pedidos_preparados'], pendientes_transporte
+        )
+    else:
+        resultados_transporte = planificar_rutas(
+            dia, resultados_picking['pedidos_preparados'], semilla=semilla
+        )
+
+    # La cartera del día es lo preparado más lo que sigue en el backlog
+    indicadores = calcular_indicadores(
+        len(resultados_picking['pedidos_preparados']) + len(backlog),
+        resultados_picking['pedidos_preparados'],
+        pendientes,
+        resultados_picking['unidades_preparadas'],
+        resultados_picking['unidades_preparadas'] + backlog.unidades,
+        resultados_transporte,
+        unidades_pendientes=backlog.unidades
+    )
+    indicadores['Pedidos_Backlog'] = len(backlog)
+    indicadores['Antiguedad_Backlog'] = backlog.antiguedad_maxima(dia)
+    indicadores['Por_Zona'], indicadores['Por_SKU'] = indicadores_por_ambito(
+        resultados_picking['pedidos_preparados'], pendientes, resultado_inventario['stock_final']
+    )
+    _indicadores_reposicion(indicadores, resultado_inventario)
+
+    alertas = generar_alertas(indicadores)
+
+    return {
+        'pedidos': pedidos_dia,
+        'inventario': resultado_inventario,
+        'picking': resultados_picking,
+        'transporte': resultados_transporte,
+        'indicadores': indicadores,
+        'alertas': alertas
+    }
+
+def _indicadores_reposicion(indicadores, resultado_inventario):
+    """
+    Con tiempos de entrega, agrega el fill rate del stock (unidades
+    despachadas del inventario / solicitadas) y las unidades en camino
+    """
+    if 'unidades_en_camino' not in resultado_inventario:
+        return
+    despachadas = resultado_inventario['total_unidades_despachadas']
+    solicitadas = despachadas + resultado_inventario['total_unidades_faltantes']
+    indicadores['Fill_Rate_Stock'] = (despachadas / solicitadas * 100) if solicitadas > 0 else 0
+    indicadores['Unidades_En_Transito'] = resultado_inventario['unidades_en_camino']
+
+class _DemandaEnOrden:
+    """
+    Pares (dia_key, pedidos) en orden de día consultados como el diccionario
+    {"Dia_N": pedidos}: sólo se lee hasta el día pedido, así que nunca hay
+    más de un día del iterable en memoria
+    """
+
+    def __init__(self, pares):
+        self._pares = iter(pares)
+        self._actual = None
+        self._dia = 0
+
+    def _avanzar_hasta(self, dia):
+        while self._dia < dia:
+            par = next(self._pares, None)
+            if par is None:
+                self._actual, self._dia = None, float('inf')
+                return
+            numero = int(par[0].rsplit('_', 1)[-1])
+            if numero <= self._dia:
+                raise ValueError(f"Los días deben venir en orden: {par[0]} después del Dia_{self._dia}")
+            self._actual, self._dia = par, numero
+
+    def __contains__(self, dia_key):
+        dia = int(dia_key.rsplit('_', 1)[-1])
+        self._avanzar_hasta(dia)
+        return self._dia == dia
+
+    def __getitem__(self, dia_key):
+        if dia_key not in self:
+            raise KeyError(dia_key)
+        return self._actual[1]
+
+def _puntos_pronostico(pronostico, tiempos_entrega):
+    """Puntos del catálogo con los del pronóstico encima (SKUs sin serie: los del catálogo)"""
+    puntos = dict(punto_reposicion)
+    puntos.update(pronostico.puntos_reposicion(tiempos_entrega or 0))
+    return puntos
+
+def simular_periodo(n_dias, capacidad_picking=1500, semilla=None, pedidos_por_dia=None,
+                    stock_inicial=None, nivel_log='completo', flota_limitada=False,
+                    arrastrar_backlog=False, tiempos_entrega=None, pronostico=None, perfil=None):
+    """
+    Simula el horizonte completo día a día (generador)
+
+    Args:
+        n_dias: Número de días a simular
+        capacidad_picking: Unidades que se pueden preparar por día
+        semilla: Semilla de la corrida (opcional)
+        pedidos_por_dia: Demanda ya generada: diccionario {"Dia_N": pedidos}
+                         o un iterable de pares (dia_key, pedidos) en orden
+                         de día (por ejemplo HistorialPedidos), que se
+                         consume a medida que avanza la simulación. Si es
+                         None se simula día a día, sin tener el horizonte
+                         completo en memoria.
+        stock_inicial: Stock al inicio (por defecto inventario_inicial)
+        nivel_log: Detalle del log de inventario ('ninguno', 'resumen', 'completo')
+        flota_limitada: Flota finita; lo no despachado pasa al día siguiente
+        arrastrar_backlog: Los pedidos no preparados pasan al día siguiente
+                           (ver simular_dia)
+        tiempos_entrega: Días de entrega de la reposición (entero, o
+                         {sku: días}, con días fijos o un rango (mín, máx)
+                         sorteado; ver TransitoReposicion). Si es None la
+                         reposición es inmediata.
+        pronostico: PronosticoDemanda por SKU (o SKU × zona) que se
+                    actualiza con la demanda de cada día; sus puntos de
+                    reposición reemplazan a los del catálogo desde el día
+                    siguiente (o desde el primero, si ya viene ajustado)
+        perfil: PerfilDemanda con el que se simula la demanda día a día (si
+                no se pasa pedidos_por_dia)
+
+    Yields:
+        Tuplas (dia_key, resultados_del_dia); para serializarlos con
+        json.dumps hay que pasar default=a_json (ver simular_dia)
+    """
+    # Un solo libro de stock para todo el horizonte: cada día trabaja sobre
+    # sus arreglos y stock_final es una foto, no un diccionario nuevo
+    stock = LibroStock(stock_inicial if stock_inicial is not None else inventario_inicial,
+                       punto_reposicion, lote_reposicion)
+    if pedidos_por_dia is not None and not isinstance(pedidos_por_dia, Mapping):
+        pedidos_por_dia = _DemandaEnOrden(pedidos_por_dia)
+    pendientes_transporte = {}
+    backlog = ColaBacklog() if arrastrar_backlog else None
+    transito = TransitoReposicion(tiempos_entrega, semilla=semilla) if tiempos_entrega is not None else None
+    puntos_reorden = None
+    if pronostico is not None and pronostico.dias > 0:
+        puntos_reorden = _puntos_pronostico(pronostico, tiempos_entrega)
+
+    for dia in range(1, n_dias + 1):
+        dia_key = f"Dia_{dia}"
+
+        if pedidos_por_dia is None and perfil is not None:
+            pedidos_dia = simular_demanda_dia_perfil(dia, perfil, dic_clientes, dic_sku, semilla)
+        elif pedidos_por_dia is None:
+            pedidos_dia = simular_demanda_dia(dia, dic_clientes, dic_sku, semilla)
+        elif dia_key in pedidos_por_dia:
+            pedidos_dia = pedidos_por_dia[dia_key]
+        elif backlog is not None:
+            # Con backlog, un día sin pedidos nuevos igual atiende lo pendiente
+            pedidos_dia = {}
+        else:
+            continue
+
+        # Un almacén compacto por día: las etapas reparten vistas, no copias
+        pedidos_dia = compactar_pedidos(pedidos_dia)
+
+        resultado = simular_dia(dia, pedidos_dia, stock, capacidad_picking,
+                                semilla, nivel_log, flota_limitada, pendientes_transporte,
+                                backlog, transito, puntos_reorden)
+        pendientes_transporte = resultado['transporte'].get('pedidos_no_despachados', {})
+        if pronostico is not None:
+            pronostico.actualizar(pronostico.demanda_pedidos(pedidos_dia))
+            puntos_reorden = _puntos_pronostico(pronostico, tiempos_entrega)
+        yield dia_key, resultado
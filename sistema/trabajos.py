@@ -0,0 +1,220 @@
+"""
+Módulo de Trabajos - Sistema de Logística FIIS SIE
+Ejecución en segundo plano de simulaciones largas, con progreso y cancelación
+"""
+
+import json
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from .pedidos import a_json
+
+# Estados posibles de un trabajo
+EN_COLA = 'en_cola'
+EJECUTANDO = 'ejecutando'
+COMPLETADO = 'completado'
+CANCELADO = 'cancelado'
+ERROR = 'error'
+ESTADOS_FINALES = (COMPLETADO, CANCELADO, ERROR)
+
+# Tope por defecto de los resultados de trabajos terminados (bytes de JSON)
+MAX_BYTES_RESULTADOS = 64 * 1024 * 1024
+
+class ColaLlena(RuntimeError):
+    """No se aceptan más trabajos (límite global o de la sesión)"""
+
+class TrabajoCancelado(Exception):
+    """Se pidió cancelar el trabajo; lo lanza Trabajo.avanzar"""
+
+class Trabajo:
+    """
+    Un trabajo en segundo plano y su progreso
+
+    La función del trabajo recibe esta instancia y llama a avanzar() al
+    terminar cada unidad (por ejemplo, cada día simulado); ahí es donde se
+    atiende la cancelación. El resultado se guarda serializado en JSON y el
+    gestor puede descartarlo para respetar su tope de bytes (queda el estado).
+    """
+
+    def __init__(self, sesion, total):
+        self.id = uuid.uuid4().hex
+        self.sesion = sesion
+        self.total = total
+        self.completados = 0
+        self.estado = EN_COLA
+        # Resultado en JSON (bytes); None si no terminó o se descartó
+        self._resultado = None
+        self.resultado_descartado = False
+        self.error = None
+        self.creado = time.time()
+        self.iniciado = None
+        self.terminado = None
+        self._cancelar = threading.Event()
+
+    @property
+    def resultado(self):
+        """Resultado del trabajo (una copia), o None si no hay"""
+        if self._resultado is None:
+            return None
+        return json.loads(self._resultado.decode('utf-8'))
+
+    def avanzar(self, n=1):
+        """Registra n unidades completadas; lanza TrabajoCancelado si corresponde"""
+        self.completados += n
+        if self._cancelar.is_set():
+            raise TrabajoCancelado()
+
+    def estimar_restante(self):
+        """Segundos estimados para terminar (None si aún no hay referencia)"""
+        if self.estado != EJECUTANDO or self.completados == 0:
+            return None
+        transcurrido = time.time() - self.iniciado
+        return transcurrido / self.completados * (self.total - self.completados)
+
+    def a_dict(self, incluir_resultado=True):
+        """Estado público del trabajo (lo que devuelve la API)"""
+        estado = {
+            'trabajo_id': self.id,
+            'estado': self.estado,
+            'completados': self.completados,
+            'total': self.total,
+            'progreso': (self.completados / self.total * 100) if self.total else 0,
+            'eta_segundos': self.estimar_restante(),
+            'creado': self.creado,
+            'iniciado': self.iniciado,
+            'terminado': self.terminado
+        }
+        if self.error is not None:
+            estado['error'] = self.error
+        if incluir_resultado and self.estado == COMPLETADO:
+            if self.resultado_descartado:
+                estado['resultado_descartado'] = True
+            else:
+                estado['resultado'] = self.resultado
+        return estado
+
+class GestorTrabajos:
+    """
+    Cola de trabajos con un número fijo de hilos trabajadores
+
+    Los trabajos pertenecen a una sesión: sólo esa sesión puede consultarlos
+    o cancelarlos. Además del límite de trabajos simultáneos hay un tope de
+    trabajos en espera (global y por sesión), así que una ráfaga de
+    peticiones se rechaza en lugar de acumularse sin fin. Los resultados de
+    los terminados están acotados en bytes: al superar el tope se descartan
+    los más antiguos y de esos trabajos sólo queda el estado.
+    """
+
+    def __init__(self, max_concurrentes=2, max_en_cola=20, max_por_sesion=3, max_terminados=200,
+                 max_bytes_resultados=MAX_BYTES_RESULTADOS):
+        """
+        Args:
+            max_concurrentes: Trabajos ejecutándose a la vez (hilos)
+            max_en_cola: Trabajos activos (en cola + ejecutando) en total
+            max_por_sesion: Trabajos activos por sesión
+            max_terminados: Trabajos terminados que se conservan para consulta
+            max_bytes_resultados: Tamaño total (JSON) de los resultados que
+                                  se conservan
+        """
+        self.max_en_cola = max_en_cola
+        self.max_por_sesion = max_por_sesion
+        self.max_terminados = max_terminados
+        self.max_bytes_resultados = max_bytes_resultados
+        self.bytes_resultados = 0
+        self._trabajos = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrentes, thread_name_prefix='trabajo')
+
+    def enviar(self, sesion, funcion, total):
+        """
+        Encola funcion(trabajo) y devuelve el Trabajo creado
+
+        Raises:
+            ColaLlena: Si se supera el límite global o el de la sesión
+        """
+        with self._lock:
+            activos = [t for t in self._trabajos.values() if t.estado not in ESTADOS_FINALES]
+            if len(activos) >= self.max_en_cola:
+                raise ColaLlena("Hay demasiados trabajos en curso, intente más tarde")
+            if sum(1 for t in activos if t.sesion == sesion) >= self.max_por_sesion:
+                raise ColaLlena(f"La sesión ya tiene {self.max_por_sesion} trabajos en curso")
+
+            trabajo = Trabajo(sesion, total)
+            self._trabajos[trabajo.id] = trabajo
+            self._purgar()
+
+        self._pool.submit(self._ejecutar, trabajo, funcion)
+        return trabajo
+
+    def _ejecutar(self, trabajo, funcion):
+        if trabajo._cancelar.is_set():
+            trabajo.estado = CANCELADO
+            trabajo.terminado = time.time()
+            return
+
+        trabajo.estado = EJECUTANDO
+        trabajo.iniciado = time.time()
+        try:
+            datos = json.dumps(funcion(trabajo), separators=(',', ':'), default=a_json).encode('utf-8')
+            with self._lock:
+                self._guardar_resultado(trabajo, datos)
+                trabajo.estado = COMPLETADO
+        except TrabajoCancelado:
+            trabajo.estado = CANCELADO
+        except Exception as e:
+            trabajo.error = str(e)
+            trabajo.estado = ERROR
+        finally:
+            trabajo.terminado = time.time()
+
+    def _guardar_resultado(self, trabajo, datos):
+        """Guarda el resultado y descarta los más antiguos por encima del tope de bytes"""
+        if len(datos) > self.max_bytes_resultados:
+            trabajo.resultado_descartado = True
+            return
+        trabajo._resultado = datos
+        self.bytes_resultados += len(datos)
+        for anterior in self._trabajos.values():
+            if self.bytes_resultados <= self.max_bytes_resultados:
+                break
+            if anterior is not trabajo:
+                self._descartar_resultado(anterior)
+
+    def _descartar_resultado(self, trabajo):
+        if trabajo._resultado is not None:
+            self.bytes_resultados -= len(trabajo._resultado)
+            trabajo._resultado = None
+            trabajo.resultado_descartado = True
+
+    def _purgar(self):
+        """Descarta los trabajos terminados más antiguos por encima del tope"""
+        terminados = [i for i, t in self._trabajos.items() if t.estado in ESTADOS_FINALES]
+        for trabajo_id in terminados[:max(0, len(terminados) - self.max_terminados)]:
+            self._descartar_resultado(self._trabajos.pop(trabajo_id))
+
+    def obtener(self, trabajo_id, sesion):
+        """Trabajo de la sesión con ese id (None si no existe o es de otra sesión)"""
+        trabajo = self._trabajos.get(trabajo_id)
+        if trabajo is None or trabajo.sesion != sesion:
+            return None
+        return trabajo
+
+    def listar(self, sesion):
+        """Trabajos de la sesión, del más antiguo al más reciente"""
+        return [t for t in list(self._trabajos.values()) if t.sesion == sesion]
+
+    def cancelar(self, trabajo_id, sesion):
+        """
+        Pide cancelar un trabajo. Uno en cola no llega a ejecutarse; uno en
+        ejecución se detiene en su próximo avanzar().
+
+        Returns:
+            False si el trabajo no existe, es de otra sesión o ya terminó
+        """
+        trabajo = self.obtener(trabajo_id, sesion)
+        if trabajo is None or trabajo.estado in ESTADOS_FINALES:
+            return False
+        trabajo._cancelar.set()
+        return True
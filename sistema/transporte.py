@@ -1,17 +1,354 @@
-from .catalogos import dic_vehiculos, dic_clientes
-import random
+import heapq
+from bisect import bisect_left, insort
+from . import catalogos
+from .catalogos import dic_vehiculos, dic_clientes, duracion_viaje_zona
+from .aleatorio import generador_python
+from .ruteo import matriz_distancias_dia, construir_rutas, distancia_ruta, mejorar_2opt
 
-def planificar_rutas(dia, pedidos_preparados, vehiculos_disponibles=None):
+ESTRATEGIAS_RUTEO = ('distancia', 'bfd', 'ffd', 'aleatoria')
+
+def planificar_rutas(dia, pedidos_preparados, vehiculos_disponibles=None, semilla=None, estrategia='distancia'):
+    """
+    Arma los viajes del día.
+    
+    Estrategias:
+        'distancia': rutas multi-parada por ahorros + 2-opt sobre la matriz
+                     de distancias; costo = km * costo_km (por defecto)
+        'bfd': best-fit decreasing por zona; costo = unidades * costo_km
+        'ffd': first-fit decreasing por zona; costo = unidades * costo_km
+        'aleatoria': vehículo al azar por viaje y llenado first-fit (histórico)
+    """
+    if vehiculos_disponibles is None:
+        vehiculos_disponibles = list(dic_vehiculos.keys())
+    if estrategia == 'distancia':
+        return _planificar_rutas_distancia(pedidos_preparados, vehiculos_disponibles)
+    if estrategia == 'aleatoria':
+        return _planificar_rutas_aleatoria(dia, pedidos_preparados, vehiculos_disponibles, semilla)
+    if estrategia not in ESTRATEGIAS_RUTEO:
+        raise ValueError(f"Estrategia de ruteo desconocida: {estrategia}")
+    
+    # Vehículo de referencia para abrir viajes: menor costo por unidad de
+    # capacidad. El costo de un viaje es carga * costo_km, así que un viaje
+    # lleno cuesta capacidad * costo_km: por unidad, costo_km.
+    v_ref = min(vehiculos_disponibles, key=lambda v: (dic_vehiculos[v]['costo_km'], -dic_vehiculos[v]['capacidad'], v))
+    cap_ref = dic_vehiculos[v_ref]['capacidad']
+    v_mayor = max(vehiculos_disponibles, key=lambda v: (dic_vehiculos[v]['capacidad'], -dic_vehiculos[v]['costo_km']))
+    cap_mayor = dic_vehiculos[v_mayor]['capacidad']
+    # Para cada carga final, el vehículo más barato que la lleva (a igual costo, el más chico)
+    por_costo = sorted(vehiculos_disponibles, key=lambda v: (dic_vehiculos[v]['costo_km'], dic_vehiculos[v]['capacidad'], v))
+    
+    items_por_zona = {}
+    for pid, pedido in pedidos_preparados.items():
+        zona = dic_clientes[pedido['cliente']]['zona']
+        total = pedido['total_unidades'] if 'total_unidades' in pedido else sum(pedido['productos'].values())
+        items_por_zona.setdefault(zona, []).append((total, pid))
+    
+    rutas_finales = []
+    stats = {'total_vehiculos_usados':0, 'total_unidades_transportadas':0, 'utilizacion_promedio':0, 'costo_total':0, 'detalles_rutas':[]}
+    
+    def registrar(zona, v_id, carga, ids):
+        cap_max = dic_vehiculos[v_id]['capacidad']
+        costo = carga * dic_vehiculos[v_id]['costo_km']
+        rutas_finales.append({
+            'zona': zona, 'vehiculo': v_id, 'unidades': carga,
+            'capacidad_max': cap_max, 'utilizacion': carga / cap_max * 100, 'costo': costo,
+            'pedidos_ids': ids
+        })
+        stats['total_vehiculos_usados'] += 1
+        stats['total_unidades_transportadas'] += carga
+        stats['costo_total'] += costo
+    
+    for zona, items in items_por_zona.items():
+        normales = []
+        for total, pid in items:
+            if total > cap_mayor:
+                # Pedido más grande que cualquier vehículo: viajes llenos del
+                # vehículo mayor y el resto entra al empaque como parcial
+                while total > cap_mayor:
+                    registrar(zona, v_mayor, cap_mayor, [pid + " (Parcial)"])
+                    total -= cap_mayor
+                if total > 0:
+                    normales.append((total, pid + " (Parcial)"))
+            else:
+                normales.append((total, pid))
+        
+        # Los pedidos que no caben en el vehículo de referencia viajan solos
+        viajes = [(total, [pid]) for total, pid in normales if total > cap_ref]
+        normales = [(total, pid) for total, pid in normales if total <= cap_ref]
+        if estrategia == 'ffd':
+            viajes += _empacar_ffd(normales, cap_ref)
+        else:
+            viajes += _empacar_bfd(normales, cap_ref)
+        
+        for carga, ids in viajes:
+            v_id = next(v for v in por_costo if dic_vehiculos[v]['capacidad'] >= carga)
+            registrar(zona, v_id, carga, ids)
+    
+    stats['detalles_rutas'] = rutas_finales
+    if rutas_finales:
+        stats['utilizacion_promedio'] = sum(r['utilizacion'] for r in rutas_finales) / len(rutas_finales)
+    
+    return {'rutas': rutas_finales, 'estadisticas': stats}
+
+def _planificar_rutas_distancia(pedidos_preparados, vehiculos_disponibles):
+    """
+    Rutas multi-parada dentro y entre zonas. Cada pedido es una parada en la
+    ubicación de su cliente; el costo de una ruta son sus km reales por el
+    costo_km del vehículo asignado.
+    """
+    indice, matriz = matriz_distancias_dia([pedido['cliente'] for pedido in pedidos_preparados.values()])
+    
+    # Las rutas se arman con el vehículo de menor costo por km por unidad de capacidad
+    v_ref = min(vehiculos_disponibles, key=lambda v: (dic_vehiculos[v]['costo_km'] / dic_vehiculos[v]['capacidad'], v))
+    cap_ref = dic_vehiculos[v_ref]['capacidad']
+    por_costo = sorted(vehiculos_disponibles, key=lambda v: (dic_vehiculos[v]['costo_km'], dic_vehiculos[v]['capacidad'], v))
+    
+    rutas_finales = []
+    stats = {'total_vehiculos_usados':0, 'total_unidades_transportadas':0, 'utilizacion_promedio':0, 'costo_total':0, 'km_totales':0, 'detalles_rutas':[]}
+    
+    def registrar(v_id, carga, ids, clientes_ruta, secuencia):
+        cap_max = dic_vehiculos[v_id]['capacidad']
+        km = distancia_ruta(secuencia, matriz)
+        costo = km * dic_vehiculos[v_id]['costo_km']
+        zonas = {dic_clientes[c]['zona'] for c in clientes_ruta}
+        rutas_finales.append({
+            'zona': zonas.pop() if len(zonas) == 1 else 'Multi-zona', 'vehiculo': v_id, 'unidades': carga,
+            'capacidad_max': cap_max, 'utilizacion': carga / cap_max * 100, 'costo': costo,
+            'pedidos_ids': ids, 'km': km, 'secuencia': clientes_ruta
+        })
+        stats['total_vehiculos_usados'] += 1
+        stats['total_unidades_transportadas'] += carga
+        stats['costo_total'] += costo
+        stats['km_totales'] += km
+    
+    # Paradas: (id, cliente, unidades). Los pedidos que superan al vehículo
+    # de referencia salen en viajes directos llenos y el resto es una parada.
+    paradas = []
+    for pid, pedido in pedidos_preparados.items():
+        cliente = pedido['cliente']
+        total = pedido['total_unidades'] if 'total_unidades' in pedido else sum(pedido['productos'].values())
+        if total > cap_ref:
+            while total > cap_ref:
+                registrar(v_ref, cap_ref, [pid + " (Parcial)"], [cliente], [indice[cliente]])
+                total -= cap_ref
+            pid = pid + " (Parcial)"
+        if total > 0:
+            paradas.append((pid, cliente, total))
+    
+    ubicaciones = [indice[cliente] for _, cliente, _ in paradas]
+    cargas = [total for _, _, total in paradas]
+    
+    for ruta in construir_rutas(ubicaciones, cargas, matriz, cap_ref):
+        carga = sum(cargas[p] for p in ruta)
+        v_id = next(v for v in por_costo if dic_vehiculos[v]['capacidad'] >= carga)
+        registrar(v_id, carga, [paradas[p][0] for p in ruta], [paradas[p][1] for p in ruta],
+                  [ubicaciones[p] for p in ruta])
+    
+    stats['detalles_rutas'] = rutas_finales
+    if rutas_finales:
+        stats['utilizacion_promedio'] = sum(r['utilizacion'] for r in rutas_finales) / len(rutas_finales)
+    
+    return {'rutas': rutas_finales, 'estadisticas': stats}
+
+def _llenar_viaje(restantes, capacidad, ids):
+    """
+    Carga un viaje tomando siempre el pedido más grande que aún cabe.
+    restantes es una lista ordenada de tuplas (unidades, id, ...) que se
+    consume en sitio; los ids cargados se agregan a ids.
+    
+    Returns:
+        Unidades cargadas
+    """
+    carga, libre = 0, capacidad
+    while restantes:
+        pos = bisect_left(restantes, (libre + 1,)) - 1
+        if pos < 0:
+            break
+        item = restantes.pop(pos)
+        carga += item[0]
+        libre -= item[0]
+        ids.append(item[1])
+    return carga
+
+def _empacar_ffd(items, capacidad):
+    """
+    First-fit decreasing. Llenar los viajes de a uno tomando siempre el
+    pedido más grande que aún cabe da exactamente el mismo resultado que FFD;
+    con la lista ordenada y bisect cada búsqueda es O(log n).
+    """
+    restantes = sorted(items)
+    viajes = []
+    while restantes:
+        ids = []
+        carga = _llenar_viaje(restantes, capacidad, ids)
+        viajes.append((carga, ids))
+    return viajes
+
+def _empacar_bfd(items, capacidad):
+    """
+    Best-fit decreasing: cada pedido (de mayor a menor) va al viaje abierto
+    con menor espacio libre donde cabe. Los espacios libres se mantienen en
+    una lista ordenada para ubicar ese viaje con bisect.
+    """
+    viajes = []
+    libres = []  # (espacio_libre, indice_viaje) ordenado
+    for total, pid in sorted(items, key=lambda x: (-x[0], x[1])):
+        pos = bisect_left(libres, (total, -1))
+        if pos < len(libres):
+            libre, idx = libres.pop(pos)
+        else:
+            idx = len(viajes)
+            viajes.append([0, []])
+            libre = capacidad
+        viajes[idx][0] += total
+        viajes[idx][1].append(pid)
+        if libre - total > 0:
+            insort(libres, (libre - total, idx))
+    return [(carga, ids) for carga, ids in viajes]
+
+def despachar_flota(dia, pedidos_preparados, cola_pendiente=None, vehiculos_disponibles=None,
+                    jornada_horas=None, duracion_viaje=None):
+    """
+    Despacho con flota finita: cada vehículo trabaja una jornada de
+    jornada_horas y cada viaje a una zona lo ocupa duracion_viaje[zona] horas
+    (ida y vuelta). Los viajes se programan con un heap por hora en que cada
+    vehículo queda libre; lo que no alcanza a salir pasa al día siguiente.
+    El costo de cada viaje es km reales (paradas ordenadas con 2-opt) * costo_km.
+    
+    Args:
+        dia: Número de día
+        pedidos_preparados: Pedidos nuevos listos para despacho
+        cola_pendiente: Pedidos no despachados el día anterior (salen primero)
+        vehiculos_disponibles: IDs de vehículos de la flota (por defecto todos)
+        jornada_horas: Horas de trabajo por vehículo y día
+        duracion_viaje: Diccionario {zona: horas por viaje}
+    
+    Returns:
+        Diccionario con 'rutas', 'estadisticas' (mismas claves que
+        planificar_rutas más las de uso de la flota en el tiempo) y
+        'pedidos_no_despachados' para encolar al día siguiente
+    """
     if vehiculos_disponibles is None:
         vehiculos_disponibles = list(dic_vehiculos.keys())
+    if jornada_horas is None:
+        jornada_horas = catalogos.jornada_flota_horas
+    if duracion_viaje is None:
+        duracion_viaje = duracion_viaje_zona
+    
+    cap_mayor = max(dic_vehiculos[v]['capacidad'] for v in vehiculos_disponibles)
+    
+    # Por zona, dos listas ordenadas (pendientes de ayer y nuevos) de tuplas
+    # (unidades, id_ruta, id_pedido). Los pedidos más grandes que cualquier
+    # vehículo se parten en trozos de cap_mayor.
+    pedidos = {}
+    cliente_de = {}
+    colas = {}
+    pendientes_zona = {}
+    for prioridad, origen in enumerate((cola_pendiente or {}, pedidos_preparados)):
+        for pid, pedido in origen.items():
+            pedidos[pid] = pedido
+            zona = dic_clientes[pedido['cliente']]['zona']
+            total = pedido['total_unidades'] if 'total_unidades' in pedido else sum(pedido['productos'].values())
+            if total <= 0:
+                continue
+            pendientes_zona[zona] = pendientes_zona.get(zona, 0) + total
+            listas = colas.setdefault(zona, ([], []))
+            etiqueta = pid if total <= cap_mayor else pid + " (Parcial)"
+            cliente_de[etiqueta] = pedido['cliente']
+            while total > 0:
+                trozo = min(total, cap_mayor)
+                listas[prioridad].append((trozo, etiqueta, pid))
+                total -= trozo
+    for listas in colas.values():
+        listas[0].sort()
+        listas[1].sort()
+    
+    def menor_pendiente(zona):
+        return min(lista[0][0] for lista in colas[zona] if lista)
+    
+    indice, matriz = matriz_distancias_dia(cliente_de.values())
+    rutas_finales = []
+    stats = {'total_vehiculos_usados':0, 'total_unidades_transportadas':0, 'utilizacion_promedio':0, 'costo_total':0, 'km_totales':0, 'detalles_rutas':[]}
+    horas_usadas = 0
+    
+    libres = [(0.0, v) for v in vehiculos_disponibles]
+    heapq.heapify(libres)
+    
+    while libres and pendientes_zona:
+        hora, v_id = heapq.heappop(libres)
+        cap_max = dic_vehiculos[v_id]['capacidad']
+        
+        # Zona con más unidades pendientes a la que el vehículo alcanza a ir
+        # dentro de su jornada y donde cabe al menos un pedido
+        candidatas = [z for z in pendientes_zona
+                      if hora + duracion_viaje[z] <= jornada_horas and menor_pendiente(z) <= cap_max]
+        if not candidatas:
+            continue  # El vehículo termina su jornada
+        zona = max(candidatas, key=lambda z: (pendientes_zona[z], z))
+        
+        ids = []
+        carga = _llenar_viaje(colas[zona][0], cap_max, ids)
+        carga += _llenar_viaje(colas[zona][1], cap_max - carga, ids)
+        
+        pendientes_zona[zona] -= carga
+        if not colas[zona][0] and not colas[zona][1]:
+            del pendientes_zona[zona]
+        
+        # Orden de visita y km reales del viaje
+        ubicaciones = [indice[cliente_de[e]] for e in ids]
+        orden = mejorar_2opt(list(range(len(ids))), ubicaciones, matriz)
+        km = distancia_ruta([ubicaciones[p] for p in orden], matriz)
+        
+        util = carga / cap_max * 100
+        costo = km * dic_vehiculos[v_id]['costo_km']
+        regreso = hora + duracion_viaje[zona]
+        rutas_finales.append({
+            'zona': zona, 'vehiculo': v_id, 'unidades': carga,
+            'capacidad_max': cap_max, 'utilizacion': util, 'costo': costo,
+            'pedidos_ids': [ids[p] for p in orden], 'km': km,
+            'secuencia': [cliente_de[ids[p]] for p in orden],
+            'salida': hora, 'regreso': regreso
+        })
+        stats['total_vehiculos_usados'] += 1
+        stats['total_unidades_transportadas'] += carga
+        stats['costo_total'] += costo
+        stats['km_totales'] += km
+        horas_usadas += duracion_viaje[zona]
+        
+        heapq.heappush(libres, (regreso, v_id))
+    
+    # Lo que quedó en cola pasa al día siguiente con las unidades que faltan
+    restantes = {}
+    for listas in colas.values():
+        for lista in listas:
+            for trozo, _, pid in lista:
+                restantes[pid] = restantes.get(pid, 0) + trozo
+    no_despachados = {}
+    for pid, unidades in restantes.items():
+        no_despachados[pid] = dict(pedidos[pid])
+        no_despachados[pid]['total_unidades'] = unidades
+    
+    horas_disponibles = jornada_horas * len(vehiculos_disponibles)
+    stats['detalles_rutas'] = rutas_finales
+    if rutas_finales:
+        stats['utilizacion_promedio'] = sum(r['utilizacion'] for r in rutas_finales) / len(rutas_finales)
+    stats['horas_usadas'] = horas_usadas
+    stats['horas_disponibles'] = horas_disponibles
+    stats['utilizacion_tiempo'] = (horas_usadas / horas_disponibles * 100) if horas_disponibles > 0 else 0
+    stats['unidades_no_despachadas'] = sum(restantes.values())
+    
+    return {'rutas': rutas_finales, 'estadisticas': stats, 'pedidos_no_despachados': no_despachados}
+
+def _planificar_rutas_aleatoria(dia, pedidos_preparados, vehiculos_disponibles, semilla=None):
+    rnd = generador_python(semilla, 'transporte', dia)
 
+    # (id, unidades) por zona: no hace falta copiar los pedidos
     pedidos_por_zona = {}
     for pid, pedido in pedidos_preparados.items():
         zona = dic_clientes[pedido['cliente']]['zona']
         if zona not in pedidos_por_zona: pedidos_por_zona[zona] = []
-        p_copy = pedido.copy()
-        p_copy['id'] = pid
-        pedidos_por_zona[zona].append(p_copy)
+        total = pedido['total_unidades'] if 'total_unidades' in pedido else sum(pedido['productos'].values())
+        pedidos_por_zona[zona].append((pid, total))
 
     rutas_finales = []
     stats = {'total_vehiculos_usados':0, 'total_unidades_transportadas':0, 'utilizacion_promedio':0, 'costo_total':0, 'detalles_rutas':[]}
@@ -22,7 +359,7 @@ def planificar_rutas(dia, pedidos_preparados, vehiculos_disponibles=None):
         # Mientras haya pedidos en cola para esta zona
         while len(cola) > 0:
             # Elegir vehículo random para variedad
-            v_id = random.choice(vehiculos_disponibles)
+            v_id = rnd.choice(vehiculos_disponibles)
             cap_max = dic_vehiculos[v_id]['capacidad']
             
             carga_actual = 0
@@ -31,10 +368,10 @@ def planificar_rutas(dia, pedidos_preparados, vehiculos_disponibles=None):
 
             # Intentar llenar el vehículo
             for pedido in cola:
-                peso = pedido['total_unidades']
+                pid, peso = pedido
                 if carga_actual + peso <= cap_max:
                     carga_actual += peso
-                    ids_a_bordo.append(pedido['id'])
+                    ids_a_bordo.append(pid)
                 else:
                     sobrantes.append(pedido) # No cabe, al siguiente camión
             
@@ -62,8 +399,7 @@ def planificar_rutas(dia, pedidos_preparados, vehiculos_disponibles=None):
             else:
                 # Caso borde: El primer pedido es más grande que el camión entero.
                 # Lógica: Dividimos el pedido (Split). Llevamos lo que cabe.
-                pedido_gigante = cola[0]
-                pendiente = pedido_gigante['total_unidades']
+                id_gigante, pendiente = cola[0]
                 
                 while pendiente > 0:
                     # Usar el vehículo actual (o elegir uno grande)
@@ -74,7 +410,7 @@ def planificar_rutas(dia, pedidos_preparados, vehiculos_disponibles=None):
                     rutas_finales.append({
                         'zona': zona, 'vehiculo': v_id, 'unidades': llevo,
                         'capacidad_max': cap_max, 'utilizacion': util_split, 'costo': costo_split,
-                        'pedidos_ids': [pedido_gigante['id'] + " (Parcial)"]
+                        'pedidos_ids': [id_gigante + " (Parcial)"]
                     })
                     
                     stats['total_vehiculos_usados'] += 1
@@ -85,14 +421,12 @@ def planificar_rutas(dia, pedidos_preparados, vehiculos_disponibles=None):
                     pendiente -= llevo
                     # Para el siguiente trozo, elegimos otro vehiculo (loop) o el mismo
                     if pendiente > 0:
-                        v_id = random.choice(vehiculos_disponibles)
+                        v_id = rnd.choice(vehiculos_disponibles)
                         cap_max = dic_vehiculos[v_id]['capacidad']
                 
-                # Quitamos el pedido gigante de la cola ya procesada
-                cola.pop(0)
-                # Y agregamos los demás sobrantes si había
-                cola.extend(sobrantes)
-                sobrantes = []
+                # Ningún pedido cupo, así que sobrantes es la cola completa:
+                # seguimos con todos menos el pedido gigante ya despachado
+                cola = sobrantes[1:]
 
     stats['detalles_rutas'] = rutas_finales
     if count_rutas > 0: stats['utilizacion_promedio'] = suma_util / count_rutas
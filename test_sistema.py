@@ -9,10 +9,16 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from sistema import (
     dic_sku, dic_clientes, dic_vehiculos, inventario_inicial,
-    simular_demanda, mostrar_simulacion,
+    simular_demanda, mostrar_simulacion, simular_demanda_columnar,
     procesar_dia_inventario, asignar_picking, planificar_rutas,
     calcular_indicadores, generar_alertas, reporte_logistica,
-    punto_reposicion, lote_reposicion
+    punto_reposicion, lote_reposicion, replicar_simulacion, despachar_flota,
+    simular_periodo, MotorAlertas, exportar_columnar, leer_columnar, exportar_datos_csv,
+    ErrorExportacion, AlmacenPedidos, ConjuntoPedidos, compactar_pedidos,
+    cargar_catalogos, catalogo_compilado, LibroStock, optimizar_politicas, simular_politicas,
+    demanda_por_sku, TransitoReposicion, PronosticoDemanda, historia_por_serie, historia_exportada,
+    reponer_simple, PerfilDemanda, TablaAlias, simular_demanda_perfil, simular_demanda_dia_perfil,
+    HistorialPedidos
 )
 
 def test_catalogos():
@@ -41,6 +47,76 @@ def test_catalogos():
     
     return True
 
+def test_carga_catalogos():
+    """Probar la carga de catálogos desde CSV, su forma compilada y la caché"""
+    print("\n📂 PROBANDO CARGA DE CATÁLOGOS...")
+    import tempfile
+    from sistema import catalogos, ruteo
+    
+    # Copia de los catálogos actuales para restaurarlos al final
+    originales = [(d, dict(d)) for d in (catalogos.dic_sku, catalogos.dic_clientes, catalogos.dic_vehiculos,
+                                         catalogos.duracion_viaje_zona, catalogos.coordenadas_clientes,
+                                         catalogos.inventario_inicial, catalogos.punto_reposicion,
+                                         catalogos.lote_reposicion)]
+    
+    def escribir(carpeta, nombre, texto):
+        with open(os.path.join(carpeta, nombre), 'w', encoding='utf-8') as archivo:
+            archivo.write(texto)
+    
+    try:
+        with tempfile.TemporaryDirectory() as carpeta:
+            escribir(carpeta, 'productos.csv', "sku,nombre,unidad,inventario_inicial,punto_reposicion,lote_reposicion\n"
+                                               "A1,Crema,cajas,50,10,40\nA2,Gel,cajas,30,,\nA3,Jabón,cajas,0,5,20\n")
+            escribir(carpeta, 'clientes.csv', "cliente,nombre,zona,x,y\n"
+                                              "K1,Tienda 1,Norte,1.5,2.0\nK2,Tienda 2,Sur,-3.0,-4.0\n"
+                                              "K3,Tienda 3,Norte,0.5,6.0\n")
+            escribir(carpeta, 'zonas.csv', "zona,duracion_viaje_horas\nNorte,2.0\nSur,3.5\n")
+            
+            compilado = cargar_catalogos(carpeta)
+            assert list(dic_sku) == ['A1', 'A2', 'A3'], "Error: Productos no cargados"
+            assert dic_sku['A1'] == {'nombre': 'Crema', 'unidad': 'cajas'}, "Error: Campos de producto incorrectos"
+            assert punto_reposicion == {'A1': 10, 'A3': 5}, "Error: Puntos de reposición incorrectos"
+            assert list(compilado.punto_reposicion_de_sku) == [10, -1, 5], "Error: Punto compilado incorrecto"
+            assert list(compilado.lote_de_sku) == [40, 100, 20], "Error: Lote compilado incorrecto"
+            assert [compilado.zonas[z] for z in compilado.zona_de_cliente] == ['Norte', 'Sur', 'Norte'], \
+                "Error: Zona compilada incorrecta"
+            assert catalogos.coordenadas_clientes['K2'] == (-3.0, -4.0), "Error: Coordenadas incorrectas"
+            assert catalogo_compilado() is compilado, "Error: El catálogo compilado no quedó en memoria"
+            
+            # Misma carga desde la caché en disco: mismo resultado
+            desde_cache = cargar_catalogos(carpeta)
+            assert desde_cache.skus == compilado.skus and \
+                (desde_cache.coordenadas_de_cliente == compilado.coordenadas_de_cliente).all(), \
+                "Error: La caché de catálogos no reproduce la carga"
+            
+            # Matriz del día (catálogos grandes) con las mismas distancias que la completa
+            indice, matriz = ruteo.matriz_distancias()
+            limite = ruteo.LIMITE_MATRIZ_COMPLETA
+            ruteo.LIMITE_MATRIZ_COMPLETA = 0
+            try:
+                indice_dia, matriz_dia = ruteo.matriz_distancias_dia(['K3', 'K1', 'K3'])
+            finally:
+                ruteo.LIMITE_MATRIZ_COMPLETA = limite
+            assert list(indice_dia) == ['K3', 'K1'], "Error: Clientes de la matriz del día"
+            assert matriz_dia[indice_dia['K3'], indice_dia['K1']] == matriz[indice['K3'], indice['K1']], \
+                "Error: Distancias distintas en la matriz del día"
+            
+            # Un catálogo inválido no modifica los actuales
+            escribir(carpeta, 'productos.csv', "sku,nombre,unidad\nB1,X,cajas\nB1,Y,cajas\n")
+            try:
+                cargar_catalogos(carpeta)
+                assert False, "Error: Se esperaba ValueError por SKU repetido"
+            except ValueError:
+                pass
+            assert list(dic_sku) == ['A1', 'A2', 'A3'], "Error: Un catálogo inválido modificó los productos"
+    finally:
+        for catalogo, contenido in originales:
+            catalogo.clear()
+            catalogo.update(contenido)
+        catalogos.invalidar_catalogo()
+    
+    print(f"✅ {len(compilado.skus)} SKUs y {len(compilado.clientes)} clientes compilados")
+
 def test_simulacion_demanda():
     """Probar la simulación de demanda"""
     print("\n🔄 PROBANDO SIMULACIÓN DE DEMANDA...")
@@ -66,6 +142,51 @@ def test_simulacion_demanda():
     
     return pedidos
 
+def test_demanda_vectorizada():
+    """Probar la generación columnar de demanda y su adaptador"""
+    print("\n⚡ PROBANDO DEMANDA VECTORIZADA...")
+    
+    tabla = simular_demanda_columnar(30, dic_clientes, dic_sku)
+    assert tabla['cantidad'].min() >= 5 and tabla['cantidad'].max() <= 40, "Error: Cantidades fuera de rango"
+    
+    # Un mismo SKU no puede repetirse dentro de un pedido
+    claves = set(zip(tabla['pedido_id'].tolist(), tabla['sku_idx'].tolist()))
+    assert len(claves) == tabla['cantidad'].size, "Error: SKU repetido dentro de un pedido"
+    
+    pedidos = simular_demanda(30, dic_clientes, dic_sku, modo="vectorizado")
+    assert len(pedidos) == 30, "Error: Se esperaban 30 días"
+    for pedidos_dia in pedidos.values():
+        assert 12 <= len(pedidos_dia) <= 20, "Error: Pedidos por día fuera de rango"
+    
+    print(f"✅ Tabla columnar: {tabla['cantidad'].size} líneas generadas")
+    
+    return tabla
+
+def test_reproducibilidad():
+    """Probar que una misma semilla produce los mismos resultados"""
+    print("\n🎲 PROBANDO REPRODUCIBILIDAD...")
+    
+    pedidos_a = simular_demanda(5, dic_clientes, dic_sku, semilla=123)
+    pedidos_b = simular_demanda(8, dic_clientes, dic_sku, semilla=123)
+    assert pedidos_a["Dia_5"] == pedidos_b["Dia_5"], "Error: El día 5 depende del horizonte"
+    
+    picking_a = asignar_picking(5, pedidos_a["Dia_5"], 300, semilla=123)
+    picking_b = asignar_picking(5, pedidos_b["Dia_5"], 300, semilla=123)
+    assert picking_a == picking_b, "Error: Picking no reproducible"
+    
+    rutas_a = planificar_rutas(5, picking_a['pedidos_preparados'], semilla=123)
+    rutas_b = planificar_rutas(5, picking_b['pedidos_preparados'], semilla=123)
+    assert rutas_a == rutas_b, "Error: Rutas no reproducibles"
+    
+    # Generar la demanda día a día (transmisión) no cambia la corrida
+    por_dia = dict(simular_periodo(5, 300, semilla=123, nivel_log='ninguno'))
+    en_bloque = dict(simular_periodo(5, 300, semilla=123, pedidos_por_dia=pedidos_a, nivel_log='ninguno'))
+    assert por_dia["Dia_5"]['indicadores'] == en_bloque["Dia_5"]['indicadores'], "Error: Demanda día a día distinta"
+    
+    print("✅ Misma semilla, mismos resultados")
+    
+    return True
+
 def test_inventario(pedidos_dia1):
     """Probar el procesamiento de inventario"""
     print("\n📊 PROBANDO INVENTARIO...")
@@ -81,11 +202,254 @@ def test_inventario(pedidos_dia1):
     assert "stock_final" in resultado, "Error: Falta stock_final"
     assert "pedidos_procesados" in resultado, "Error: Falta pedidos_procesados"
     assert "total_unidades_despachadas" in resultado, "Error: Falta total_unidades_despachadas"
-    
+
+    # Un parámetro editado en sitio (avisando con invalidar_catalogo) entre
+    # dos días se aplica al siguiente
+    from sistema.catalogos import invalidar_catalogo
+    original = punto_reposicion['P001']
+    try:
+        punto_reposicion['P001'] = 1000
+        invalidar_catalogo()
+        segundo = procesar_dia_inventario({}, resultado['stock_final'], punto_reposicion, lote_reposicion)
+        _, esperado = reponer_simple(resultado['stock_final'], punto_reposicion, lote_reposicion)
+        assert segundo['reposiciones'] == esperado and 'P001' in esperado, \
+            "Error: El punto de reposición editado en sitio no se aplicó"
+    finally:
+        punto_reposicion['P001'] = original
+        invalidar_catalogo()
+
     print(f"✅ Inventario procesado: {resultado['total_unidades_despachadas']} unidades despachadas")
     
     return resultado
 
+def test_log_inventario(pedidos_dia1):
+    """Probar los niveles de log del inventario"""
+    print("\n📝 PROBANDO NIVELES DE LOG...")
+    
+    completo = procesar_dia_inventario(pedidos_dia1, inventario_inicial, punto_reposicion, lote_reposicion)
+    ninguno = procesar_dia_inventario(pedidos_dia1, inventario_inicial, punto_reposicion, lote_reposicion,
+                                      nivel_log='ninguno')
+    
+    assert 'log' not in completo, "Error: El log completo no debe armarse hasta leerlo"
+    assert completo.get('log') == completo['log'], "Error: get('log') no arma el log"
+    assert "Stock Final" in completo['log'], "Error: Log completo sin stock final"
+    assert ninguno['log'] == "", "Error: El nivel 'ninguno' no debe generar texto"
+    assert completo['stock_final'] == ninguno['stock_final'], "Error: El nivel de log altera el stock"
+    
+    # Un mismo LibroStock de un día a otro: stock_final es una foto que no cambia después
+    libro = LibroStock(inventario_inicial, punto_reposicion, lote_reposicion)
+    dia1 = procesar_dia_inventario(pedidos_dia1, libro, punto_reposicion, lote_reposicion)
+    assert dia1['stock_final'] == completo['stock_final'], "Error: El libro persistente no coincide"
+    assert dia1['log'] == completo['log'], "Error: Log distinto con el libro persistente"
+    foto = dia1['stock_final'].copy()
+    dia2 = procesar_dia_inventario(pedidos_dia1, libro, punto_reposicion, lote_reposicion)
+    assert dia1['stock_final'] == foto, "Error: La foto del día 1 cambió con el día 2"
+    con_dict = procesar_dia_inventario(pedidos_dia1, foto, punto_reposicion, lote_reposicion)
+    assert dia2['stock_final'] == con_dict['stock_final'], "Error: El segundo día con el libro no coincide"
+    
+    print(f"✅ Log completo: {len(completo['log'])} caracteres, generado bajo demanda")
+    
+    return True
+
+def test_politicas():
+    """Probar el simulador vectorizado de políticas y el optimizador"""
+    print("\n📐 PROBANDO OPTIMIZACIÓN DE POLÍTICAS...")
+    import numpy as np
+    
+    # El simulador vectorizado repone igual que LibroStock
+    demanda = np.random.default_rng(5).poisson(15, size=(40, 3))
+    punto, lote = np.array([[10, 25, 0]]), np.array([[30, 60, 20]])
+    metricas = simular_politicas(demanda, punto, lote, stock_inicial=np.array([40, 40, 40]))
+    libro = LibroStock({'A': 40, 'B': 40, 'C': 40}, {'A': 10, 'B': 25, 'C': 0}, {'A': 30, 'B': 60, 'C': 20})
+    entregadas = np.zeros(3)
+    for dia in range(40):
+        for j, sku in enumerate('ABC'):
+            entregadas[j] += libro.reservar({sku: int(demanda[dia, j])})[0]
+        libro.reponer()
+    assert (metricas['entregadas'][0] == entregadas).all(), "Error: El simulador vectorizado no coincide con LibroStock"
+    
+    # Optimización sobre la demanda simulada del catálogo
+    tabla = simular_demanda_columnar(120, dic_clientes, dic_sku, np.random.default_rng(2))
+    historia = demanda_por_sku(tabla)
+    assert historia.sum() == tabla['cantidad'].sum(), "Error: Demanda por SKU incompleta"
+    for politica, clave in (('sQ', 'lote_reposicion'), ('sS', 'nivel_maximo')):
+        resultado = optimizar_politicas(historia, fill_rate_objetivo=90, politica=politica, max_procesos=1)
+        assert set(resultado['punto_reposicion']) == set(dic_sku), "Error: Faltan SKUs en la optimización"
+        assert all(resultado['cumple'].values()), "Error: Algún SKU no alcanza el fill rate objetivo"
+        assert min(resultado['fill_rate'].values()) >= 90, "Error: Fill rate bajo el objetivo"
+        assert clave in resultado, f"Error: Falta '{clave}' en el resultado {politica}"
+    
+    # Sin SKUs el resultado queda vacío
+    vacio = optimizar_politicas(np.zeros((5, 0)), skus=[], max_procesos=1)
+    assert vacio['punto_reposicion'] == {} and vacio['resumen']['skus'] == 0, "Error: Optimización sin SKUs"
+    
+    print(f"✅ {len(dic_sku)} SKUs optimizados; costo/día {resultado['resumen']['costo_total_dia']:.1f}")
+
+def test_tiempos_entrega(pedidos_dia1):
+    """Probar los tiempos de entrega de la reposición"""
+    print("\n🚚 PROBANDO TIEMPOS DE ENTREGA...")
+    
+    # Buffer circular: cada orden llega en su día, aunque se salten días
+    transito = TransitoReposicion({'A': 2, 'B': (1, 3)}, tiempo_defecto=0, semilla=7)
+    assert transito.pedir(1, 'A', 50) == 3, "Error: Día de llegada incorrecto"
+    llegada_b = transito.pedir(1, 'B', 30)
+    assert 2 <= llegada_b <= 4, "Error: Tiempo sorteado fuera del rango"
+    assert transito.pedir(1, 'C', 10) == 1, "Error: Con tiempo 0 la orden no debe quedar en tránsito"
+    assert transito.en_camino == {'A': 50, 'B': 30}, "Error: Unidades en camino incorrectas"
+    assert transito.recibir(2) == ({'B': 30} if llegada_b == 2 else {}), "Error: Llegadas del día 2"
+    llegadas = transito.recibir(5)
+    assert llegadas.get('A') == 50 and transito.unidades == 0, "Error: Órdenes perdidas al saltar días"
+    
+    # Una orden pedida tras saltar días no llega antes de tiempo aunque comparta cubeta
+    transito = TransitoReposicion(2)
+    transito.recibir(1)
+    assert transito.pedir(5, 'A', 20) == 7, "Error: Día de llegada incorrecto"
+    assert transito.recibir(4) == {}, "Error: Orden recibida antes de su llegada"
+    assert transito.recibir(7) == {'A': 20} and transito.ordenes == 0, "Error: Orden no recibida en su día"
+    try:
+        TransitoReposicion({'A': (3, 1)})
+        assert False, "Error: Se aceptó un rango invertido"
+    except ValueError:
+        pass
+    
+    # Con tiempo 0 el inventario repone igual que sin tránsito
+    sin_transito = procesar_dia_inventario(pedidos_dia1, inventario_inicial, punto_reposicion, lote_reposicion)
+    inmediato = procesar_dia_inventario(pedidos_dia1, inventario_inicial, punto_reposicion, lote_reposicion,
+                                        transito=TransitoReposicion(0), dia=1)
+    assert inmediato['stock_final'] == sin_transito['stock_final'], "Error: Tiempo 0 distinto de reposición inmediata"
+    
+    # Con tiempo de entrega la reposición llega después y se pide por posición
+    transito = TransitoReposicion(2)
+    dia1 = procesar_dia_inventario(pedidos_dia1, inventario_inicial, punto_reposicion, lote_reposicion,
+                                   transito=transito, dia=1)
+    assert dia1['reposiciones'] == {}, "Error: La reposición no debe entrar el mismo día"
+    assert dia1['unidades_en_camino'] == sum(dia1['ordenes_reposicion'].values()), "Error: Unidades en camino"
+    dia2 = procesar_dia_inventario({}, dia1['stock_final'], punto_reposicion, lote_reposicion,
+                                   transito=transito, dia=2)
+    assert dia2['ordenes_reposicion'] == {}, "Error: Se repitió una orden ya en camino"
+    dia3 = procesar_dia_inventario({}, dia2['stock_final'], punto_reposicion, lote_reposicion,
+                                   transito=transito, dia=3)
+    assert dia3['llegadas'] == dia1['ordenes_reposicion'], "Error: Las órdenes no llegaron a tiempo"
+    for sku, cantidad in dia3['llegadas'].items():
+        assert dia3['stock_final'][sku] == dia2['stock_final'][sku] + cantidad, "Error: Llegada no sumada al stock"
+    
+    # En la simulación baja el fill rate del stock frente a la reposición inmediata
+    inmediata = dict(simular_periodo(6, semilla=3, tiempos_entrega=0, nivel_log='ninguno'))
+    demorada = dict(simular_periodo(6, semilla=3, tiempos_entrega=3, nivel_log='ninguno'))
+    fill_inmediato = sum(d['indicadores']['Fill_Rate_Stock'] for d in inmediata.values())
+    fill_demorado = sum(d['indicadores']['Fill_Rate_Stock'] for d in demorada.values())
+    assert fill_demorado <= fill_inmediato, "Error: La demora no debería mejorar el fill rate"
+    
+    print(f"✅ {len(dia3['llegadas'])} órdenes recibidas al día 3; "
+          f"fill rate del stock {fill_inmediato / 6:.1f}% → {fill_demorado / 6:.1f}%")
+    
+    return True
+
+def test_pronostico():
+    """Probar los modelos de pronóstico y los puntos de reposición dinámicos"""
+    print("\n🔮 PROBANDO PRONÓSTICO DE DEMANDA...")
+    import tempfile
+    import numpy as np
+    
+    # Series conocidas: constante, intermitente (6 cada 3 días) y escalonada
+    historia = np.array([[10, 0, 5], [10, 0, 5], [10, 6, 5], [10, 0, 8], [10, 0, 8], [10, 6, 8]] * 5)
+    media_movil = PronosticoDemanda(['A', 'B', 'C'], 'media_movil', ventana=4).ajustar(historia)
+    assert np.allclose(media_movil.pronostico(), historia[-4:].mean(axis=0)), "Error: Media móvil incorrecta"
+    suavizado = PronosticoDemanda(['A', 'B', 'C'], 'suavizado', alfa=0.3).ajustar(historia)
+    assert suavizado.pronostico()[0] == 10 and suavizado.mad[0] == 0, "Error: Suavizado de serie constante"
+    croston = PronosticoDemanda(['A', 'B', 'C'], 'croston').ajustar(historia)
+    assert np.isclose(croston.pronostico()[1], 2.0), "Error: Croston de demanda intermitente"
+    auto = PronosticoDemanda(['A', 'B', 'C'], 'auto').ajustar(historia)
+    assert auto.intermitentes().tolist() == [False, True, False], "Error: Clasificación de intermitencia"
+    
+    # Actualizar día a día equivale a reajustar con la historia completa
+    for modelo in ('media_movil', 'suavizado', 'croston', 'auto'):
+        incremental = PronosticoDemanda(['A', 'B', 'C'], modelo).ajustar(historia[:-3])
+        for demanda_dia in historia[-3:]:
+            incremental.actualizar(demanda_dia)
+        completo = PronosticoDemanda(['A', 'B', 'C'], modelo).ajustar(historia)
+        assert np.allclose(incremental.pronostico(), completo.pronostico()), f"Error: {modelo} incremental"
+        assert np.allclose(incremental.mad, completo.mad), f"Error: Error medio de {modelo} incremental"
+    
+    # Historia simulada y exportada por SKU × zona; los puntos van a reponer_simple
+    tabla = simular_demanda_columnar(30, dic_clientes, dic_sku, np.random.default_rng(4))
+    por_sku, skus = historia_por_serie(tabla)
+    por_zona, claves = historia_por_serie(tabla, dic_clientes, por_zona=True)
+    assert por_sku.sum() == por_zona.sum() == tabla['cantidad'].sum(), "Error: Historia incompleta"
+    pronostico = PronosticoDemanda(claves, 'auto').ajustar(por_zona)
+    puntos = pronostico.puntos_reposicion(tiempo_entrega=2)
+    assert set(puntos) == set(dic_sku), "Error: Faltan SKUs en los puntos de reposición"
+    assert all(p > 0 for p in puntos.values()), "Error: Puntos de reposición nulos"
+    _, repuestos = reponer_simple({sku: 0 for sku in puntos}, puntos, lote_reposicion)
+    assert set(repuestos) == set(puntos), "Error: reponer_simple no usa los puntos dinámicos"
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        dias = simular_periodo(5, semilla=2, nivel_log='ninguno')
+        exportar_columnar(directorio, dias)
+        exportada, claves_exportadas = historia_exportada(directorio, por_zona=True)
+        filas = leer_columnar(directorio, 'pedidos', ['Cantidad'])
+        assert exportada.shape[0] == 5, "Error: Días de la historia exportada"
+        assert exportada.sum() == filas['Cantidad'].sum(), "Error: Unidades de la historia exportada"
+        assert all(isinstance(clave, tuple) for clave in claves_exportadas), "Error: Claves por zona"
+    
+    # En la simulación los puntos se actualizan con la demanda de cada día
+    en_simulacion = PronosticoDemanda(list(dic_sku), 'suavizado')
+    list(simular_periodo(4, semilla=2, nivel_log='ninguno', pronostico=en_simulacion))
+    assert en_simulacion.dias == 4, "Error: El pronóstico no se actualizó cada día"
+    
+    print(f"✅ {len(claves)} series SKU × zona; puntos de reposición {puntos}")
+    
+    return True
+
+def test_perfiles_demanda():
+    """Probar los perfiles de demanda y la tabla de alias"""
+    print("\n📈 PROBANDO PERFILES DE DEMANDA...")
+    import numpy as np
+    
+    # La tabla de alias respeta los pesos (y nunca sortea un peso cero)
+    alias = TablaAlias([1, 2, 3, 4, 0])
+    frecuencia = np.bincount(alias.muestrear(np.random.default_rng(0), 200_000), minlength=5) / 200_000
+    assert np.allclose(frecuencia, [0.1, 0.2, 0.3, 0.4, 0.0], atol=0.01), "Error: Frecuencias de la tabla de alias"
+    
+    # Más de 20 pedidos por día, domingo sin pedidos, promoción y cliente dominante
+    skus = list(dic_sku)
+    clientes = list(dic_clientes)
+    perfil = PerfilDemanda(pedidos_dia=(60, 80), multiplicador_semana=(1, 1, 1, 1, 1, 1, 0),
+                           pesos_clientes={clientes[0]: 50}, zipf_skus=1.5,
+                           promociones=[{'desde': 3, 'hasta': 3, 'skus': [skus[-1]], 'factor': 100}])
+    pedidos = simular_demanda(10, dic_clientes, dic_sku, semilla=8, perfil=perfil)
+    ids = [pedido_id for pedidos_dia in pedidos.values() for pedido_id in pedidos_dia]
+    assert len(ids) == len(set(ids)), "Error: IDs de pedido repetidos entre días"
+    assert min(len(p) for p in pedidos.values()) > 20, "Error: El perfil no escaló los pedidos"
+    assert "Dia_7" not in pedidos, "Error: Un día con multiplicador 0 no debe tener pedidos"
+    
+    tabla = simular_demanda_perfil(10, perfil, dic_clientes, dic_sku, semilla=8)
+    unidades = np.bincount(tabla['sku_idx'], weights=tabla['cantidad'], minlength=len(skus))
+    assert unidades[0] == unidades.max(), "Error: El SKU más popular no es el primero del ranking"
+    dia_3 = tabla['dia'] == 3
+    por_sku_dia_3 = np.bincount(tabla['sku_idx'][dia_3], weights=tabla['cantidad'][dia_3], minlength=len(skus))
+    assert por_sku_dia_3.argmax() == len(skus) - 1, "Error: La promoción no disparó la demanda del SKU"
+    por_cliente = np.bincount(tabla['cliente_idx'], minlength=len(clientes))
+    assert por_cliente.argmax() == 0, "Error: El peso del cliente no se respetó"
+    
+    # Un día suelto sale igual que dentro del horizonte
+    dia_4 = simular_demanda_dia_perfil(4, perfil, dic_clientes, dic_sku, semilla=8)
+    assert {pid: dict(p, productos=dict(p['productos'])) for pid, p in dia_4.items()} == \
+        {pid: dict(p, total_unidades=sum(p['productos'].values())) for pid, p in pedidos["Dia_4"].items()}, \
+        "Error: El día suelto no coincide con el horizonte"
+
+    # Editar en sitio el catálogo ya compilado usa los SKUs nuevos
+    catalogo = {sku: dic_sku[sku] for sku in skus[:3]}
+    perfil.tabla_dia(1, dic_clientes, catalogo, semilla=8)
+    catalogo.clear()
+    catalogo.update({f"N{sku}": dic_sku[sku] for sku in skus[:3]})
+    nuevos = perfil.tabla_dia(1, dic_clientes, catalogo, semilla=8)
+    assert set(nuevos['skus']) == set(catalogo), "Error: El perfil usó tablas de un catálogo viejo"
+
+    print(f"✅ {len(ids)} pedidos con IDs únicos; SKU top {unidades.max() / unidades.sum() * 100:.0f}% de las unidades")
+    
+    return True
+
 def test_picking(pedidos_dia1):
     """Probar las operaciones de picking"""
     print("\n🚛 PROBANDO PICKING...")
@@ -103,6 +467,79 @@ def test_picking(pedidos_dia1):
     
     return resultado
 
+def test_picking_olas():
+    """Probar la planificación de picking por prioridad y olas"""
+    print("\n🌊 PROBANDO PICKING POR OLAS...")
+    
+    # Un pedido grande atrasado (día 1) y varios chicos del día 3
+    pedidos = {'001': {'cliente': 'C01', 'productos': {'P001': 900}, 'fecha': 1}}
+    for i, cliente_id in enumerate(dic_clientes):
+        pedidos[f"{i + 2:03d}"] = {'cliente': cliente_id, 'productos': {'P002': 50, 'P003': 30}, 'fecha': 3}
+    
+    resultado = asignar_picking(3, pedidos, capacidad_picking=1500, semilla=1, estrategia='olas')
+    preparados = resultado['pedidos_preparados']
+    
+    assert resultado['unidades_preparadas'] <= 1500 * 1.10, "Error: Se excedió la capacidad"
+    assert len(preparados) + len(resultado['pedidos_pendientes']) == len(pedidos), "Error: Pedidos perdidos"
+    en_olas = sorted(pid for ola in resultado['olas'] for pid in ola['pedidos'])
+    assert en_olas == sorted(preparados), "Error: Cada pedido preparado debe estar en una ola"
+    for ola in resultado['olas']:
+        zonas = {dic_clientes[preparados[pid]['cliente']]['zona'] for pid in ola['pedidos']}
+        assert zonas == {ola['zona']}, "Error: Una ola no debe mezclar zonas"
+    
+    # Dentro del backlog vencido va primero el más antiguo, aunque otro más
+    # nuevo complete más unidades
+    vencidos = {'A': {'cliente': 'C01', 'productos': {'P001': 400}, 'fecha': 1},
+                'B': {'cliente': 'C02', 'productos': {'P001': 450}, 'fecha': 2}}
+    por_antiguedad = asignar_picking(5, vencidos, capacidad_picking=500, semilla=1, estrategia='olas')
+    assert list(por_antiguedad['pedidos_preparados']) == ['A'], "Error: No se priorizó el pedido más antiguo"
+    assert list(por_antiguedad['pedidos_pendientes']) == ['B'], "Error: El pedido más nuevo debía quedar pendiente"
+    
+    # Con objetivo 'pedidos' se completan al menos tantos pedidos como con 'unidades'
+    por_pedidos = asignar_picking(3, pedidos, 1500, semilla=1, estrategia='olas', objetivo='pedidos')
+    assert len(por_pedidos['pedidos_preparados']) + len(por_pedidos['pedidos_pendientes']) == len(pedidos), \
+        "Error: Pedidos perdidos"
+    
+    print(f"✅ Olas: {len(resultado['olas'])}, backlog {resultado['backlog']} unidades")
+    
+    return resultado
+
+def test_almacen_pedidos():
+    """Probar el almacén compacto de pedidos y sus vistas"""
+    print("\n🗃️ PROBANDO ALMACÉN COMPACTO DE PEDIDOS...")
+    import json
+    from sistema.pedidos import a_json
+    
+    pedidos = simular_demanda(2, dic_clientes, dic_sku, semilla=21)['Dia_2']
+    conjunto = compactar_pedidos(pedidos)
+    
+    assert isinstance(conjunto, ConjuntoPedidos), "Error: Se esperaba un ConjuntoPedidos"
+    assert list(conjunto) == list(pedidos), "Error: Orden de pedidos distinto"
+    for pedido_id, pedido in pedidos.items():
+        vista = conjunto[pedido_id]
+        assert vista['productos'] == pedido['productos'], "Error: Líneas de pedido distintas"
+        assert vista['total_unidades'] == sum(pedido['productos'].values()), "Error: Total de unidades incorrecto"
+    
+    # El picking sobre el almacén no copia pedidos y decide lo mismo
+    con_dict = asignar_picking(2, pedidos, 300, semilla=21)
+    con_vistas = asignar_picking(2, conjunto, 300, semilla=21)
+    assert isinstance(con_vistas['pedidos_preparados'], ConjuntoPedidos), "Error: El picking copió los pedidos"
+    assert list(con_vistas['pedidos_preparados']) == list(con_dict['pedidos_preparados']), \
+        "Error: Picking distinto con el almacén compacto"
+    assert con_vistas['backlog'] == con_dict['backlog'], "Error: Backlog distinto"
+    
+    # Se serializa como los diccionarios de siempre
+    texto = json.dumps(con_vistas['pedidos_preparados'], default=a_json)
+    assert json.loads(texto) == json.loads(json.dumps(con_dict['pedidos_preparados'])), \
+        "Error: Serialización JSON distinta"
+    
+    # Los campos fuera de las columnas se conservan aunque falte 'fecha'
+    sin_fecha = compactar_pedidos({'X1': {'cliente': 'C01', 'productos': {'P001': 3}, 'zona': 'Este',
+                                          'fecha_entrega': 2}})
+    assert sin_fecha['X1'].get('fecha_entrega') == 2, "Error: Se perdió fecha_entrega"
+    
+    print(f"✅ {len(conjunto)} pedidos en {len(conjunto.almacen.cantidad)} líneas compactas")
+
 def test_transporte(pedidos_preparados):
     """Probar la planificación de transporte"""
     print("\n🚚 PROBANDO TRANSPORTE...")
@@ -122,6 +559,230 @@ def test_transporte(pedidos_preparados):
     
     return resultado
 
+def test_ruteo_distancia(pedidos_preparados):
+    """Probar el ruteo por distancia (ahorros + 2-opt)"""
+    print("\n🗺️ PROBANDO RUTEO POR DISTANCIA...")
+    
+    resultado = planificar_rutas(1, pedidos_preparados, estrategia='distancia')
+    
+    visitados = [pid for ruta in resultado['rutas'] for pid in ruta['pedidos_ids']]
+    assert sorted(visitados) == sorted(pedidos_preparados), "Error: Cada pedido debe visitarse una vez"
+    for ruta in resultado['rutas']:
+        assert ruta['unidades'] <= ruta['capacidad_max'], "Error: Ruta excede la capacidad"
+        costo_km = dic_vehiculos[ruta['vehiculo']]['costo_km']
+        assert abs(ruta['costo'] - ruta['km'] * costo_km) < 1e-6, "Error: El costo debe ser km * costo_km"
+    
+    # Vecinos por ubicación (días grandes): cada parada en una sola ruta y sin exceder la capacidad
+    import numpy as np
+    from sistema import ruteo
+    indice, matriz = ruteo.matriz_distancias()
+    rng = np.random.default_rng(2)
+    ubicaciones = rng.choice(list(indice.values()), size=300).tolist()
+    cargas = rng.integers(5, 60, size=300).tolist()
+    limite = ruteo.LIMITE_PARADAS_DENSAS
+    ruteo.LIMITE_PARADAS_DENSAS = 0
+    try:
+        rutas = ruteo.construir_rutas(ubicaciones, cargas, matriz, 150)
+    finally:
+        ruteo.LIMITE_PARADAS_DENSAS = limite
+    assert sorted(p for ruta in rutas for p in ruta) == list(range(300)), "Error: Paradas perdidas o repetidas"
+    assert all(sum(cargas[p] for p in ruta) <= 150 for ruta in rutas), "Error: Ruta excede la capacidad"
+    assert len(rutas) < 300, "Error: Los vecinos por ubicación no unieron rutas"
+    
+    print(f"✅ Rutas: {len(resultado['rutas'])}, {resultado['estadisticas']['km_totales']:.1f} km")
+    
+    return resultado
+
+def test_flota_limitada():
+    """Probar el despacho con flota finita y arrastre al día siguiente"""
+    print("\n⏱️ PROBANDO FLOTA LIMITADA...")
+    
+    # Demanda muy superior a lo que la flota puede mover en una jornada
+    pedidos = {}
+    for i, cliente_id in enumerate(list(dic_clientes) * 40):
+        pedidos[f"{i:04d}"] = {'cliente': cliente_id, 'productos': {'P001': 60}, 'total_unidades': 60}
+    
+    resultado = despachar_flota(1, pedidos)
+    stats = resultado['estadisticas']
+    pendientes = resultado['pedidos_no_despachados']
+    
+    assert stats['utilizacion_tiempo'] <= 100, "Error: La flota no puede superar su jornada"
+    assert pendientes, "Error: Con demanda excesiva deben quedar pedidos para mañana"
+    total = sum(p['total_unidades'] for p in pedidos.values())
+    assert stats['total_unidades_transportadas'] + stats['unidades_no_despachadas'] == total, "Error: Unidades perdidas"
+    
+    # Al día siguiente lo pendiente sale primero
+    siguiente = despachar_flota(2, {}, cola_pendiente=pendientes)
+    assert siguiente['estadisticas']['total_unidades_transportadas'] > 0, "Error: No se despachó lo pendiente"
+    
+    print(f"✅ Flota al {stats['utilizacion_tiempo']:.0f}% de su jornada, {len(pendientes)} pedidos pasan al día 2")
+    
+    return resultado
+
+def test_backlog():
+    """Probar el arrastre de pendientes entre días"""
+    print("\n📥 PROBANDO BACKLOG MULTI-DÍA...")
+    
+    pedidos = simular_demanda(5, dic_clientes, dic_sku, semilla=11)
+    dias = list(simular_periodo(5, capacidad_picking=300, semilla=11, pedidos_por_dia=pedidos,
+                                nivel_log='ninguno', arrastrar_backlog=True))
+    
+    # Ningún pedido se pierde: o se preparó algún día o sigue en el backlog
+    preparados = [pid for _, r in dias for pid in r['picking']['pedidos_preparados']]
+    estado = dias[-1][1]['picking']['estado_backlog']
+    total = sum(len(p) for p in pedidos.values())
+    assert len(preparados) == len(set(preparados)), "Error: Un pedido se preparó dos veces"
+    assert len(preparados) + estado['pedidos'] == total, "Error: Pedidos perdidos en el backlog"
+    assert estado['antiguedad_maxima'] > 0, "Error: Con poca capacidad el backlog debe envejecer"
+    
+    # El stock sólo baja por lo preparado
+    _, dia1 = dias[0]
+    despachado = dia1['inventario']['total_unidades_despachadas']
+    assert despachado <= dia1['picking']['unidades_preparadas'], "Error: Se consumió stock de pedidos no preparados"
+    
+    # Un pedido que nunca cabe en la capacidad no bloquea a los que vienen detrás
+    clientes = list(dic_clientes)
+    pedidos = {f"Dia_{dia}": {f"{dia}-{i}": {'cliente': clientes[i], 'productos': {'P001': 20}, 'fecha': dia,
+                                            'zona': dic_clientes[clientes[i]]['zona']}
+                              for i in range(5)}
+               for dia in range(1, 6)}
+    pedidos["Dia_1"]["grande"] = dict(pedidos["Dia_1"]["1-0"], productos={'P002': 500})
+    dias = list(simular_periodo(5, capacidad_picking=300, semilla=11, pedidos_por_dia=pedidos,
+                                nivel_log='ninguno', arrastrar_backlog=True))
+    for _, resultado in dias:
+        assert resultado['picking']['pedidos_preparados'], "Error: El pedido excedido bloqueó el backlog"
+    assert dias[-1][1]['picking']['estado_backlog']['pedidos'] < 6, "Error: El backlog creció detrás del pedido excedido"
+    
+    print(f"✅ Backlog final: {estado['pedidos']} pedidos, {estado['antiguedad_maxima']} días de antigüedad")
+    
+    return estado
+
+def test_trabajos():
+    """Probar la cola de trabajos en segundo plano"""
+    print("\n⚙️ PROBANDO TRABAJOS EN SEGUNDO PLANO...")
+    
+    import time
+    import threading
+    from sistema.trabajos import GestorTrabajos, ColaLlena
+    
+    gestor = GestorTrabajos(max_concurrentes=1, max_en_cola=2, max_por_sesion=2)
+    liberar = threading.Event()
+    
+    def simulacion_corta(trabajo):
+        otif = []
+        for _, resultado in simular_periodo(3, semilla=1, nivel_log='ninguno'):
+            otif.append(resultado['indicadores']['OTIF'])
+            trabajo.avanzar()
+        return otif
+    
+    def bloqueante(trabajo):
+        while not liberar.is_set():
+            trabajo.avanzar(0)
+            time.sleep(0.01)
+    
+    trabajo = gestor.enviar('sesion_a', simulacion_corta, 3)
+    espera = gestor.enviar('sesion_a', bloqueante, 1)
+    try:
+        gestor.enviar('sesion_b', simulacion_corta, 3)
+        assert False, "Error: Se debía rechazar un trabajo por límite de cola"
+    except ColaLlena:
+        pass
+    
+    assert gestor.obtener(trabajo.id, 'sesion_b') is None, "Error: Otra sesión ve el trabajo"
+    assert gestor.cancelar(espera.id, 'sesion_a'), "Error: No se pudo cancelar"
+    liberar.set()
+    
+    for _ in range(200):
+        if trabajo.estado == 'completado' and espera.estado == 'cancelado':
+            break
+        time.sleep(0.01)
+    assert trabajo.a_dict()['completados'] == 3, "Error: Progreso incorrecto"
+    assert len(trabajo.a_dict()['resultado']) == 3, "Error: Falta el resultado"
+    assert espera.estado == 'cancelado', "Error: El trabajo no se canceló"
+    
+    # Los resultados terminados respetan el tope de bytes: el más antiguo se descarta
+    acotado = GestorTrabajos(max_concurrentes=1, max_bytes_resultados=3000)
+    viejo = acotado.enviar('sesion_a', lambda t: list(range(500)), 1)
+    nuevo = acotado.enviar('sesion_a', lambda t: list(range(500)), 1)
+    for _ in range(200):
+        if nuevo.estado == 'completado':
+            break
+        time.sleep(0.01)
+    assert viejo.a_dict().get('resultado_descartado') and 'resultado' not in viejo.a_dict(), \
+        "Error: No se descartó el resultado más antiguo"
+    assert nuevo.a_dict()['resultado'] == list(range(500)), "Error: Se perdió el resultado más reciente"
+    assert acotado.bytes_resultados <= 3000, "Error: Se superó el tope de bytes de resultados"
+    
+    print(f"✅ Trabajo {trabajo.estado} ({trabajo.completados}/{trabajo.total}), otro {espera.estado}")
+    
+    return trabajo
+
+def test_almacen_estado():
+    """Probar los almacenes de estado por sesión y su desalojo por tamaño"""
+    print("\n🗄️ PROBANDO ALMACÉN DE ESTADO...")
+    
+    import tempfile
+    from sistema.estado import AlmacenMemoria, AlmacenSQLite
+    
+    pedidos = simular_demanda(3, dic_clientes, dic_sku, semilla=2)
+    directorio = tempfile.mkdtemp()
+    almacenes = [AlmacenMemoria(max_bytes=20_000),
+                 AlmacenSQLite(os.path.join(directorio, 'estado.sqlite3'), max_bytes=8_000)]
+    
+    for almacen in almacenes:
+        for i in range(30):
+            almacen.guardar(f"sesion_{i}", {'pedidos': pedidos, 'corrida': i})
+        
+        assert almacen.obtener("sesion_29")['pedidos'] == pedidos, "Error: Estado alterado al guardar"
+        assert almacen.obtener("sesion_0") is None, "Error: No se desalojó la sesión más antigua"
+        assert 0 < len(almacen) < 30, "Error: El tamaño del almacén no está acotado"
+        almacen.eliminar("sesion_29")
+        assert almacen.obtener("sesion_29", {}) == {}, "Error: No se eliminó la sesión"
+    
+    # Otro proceso ve lo mismo: una segunda conexión al mismo archivo
+    compartido = AlmacenSQLite(os.path.join(directorio, 'estado.sqlite3'))
+    assert compartido.obtener("sesion_28")['corrida'] == 28, "Error: El estado no se comparte"
+    
+    print(f"✅ Memoria: {len(almacenes[0])} sesiones, SQLite: {len(almacenes[1])} sesiones")
+    
+    return True
+
+def test_cache_resultados():
+    """Probar la caché de resultados direccionada por contenido"""
+    print("\n💾 PROBANDO CACHÉ DE RESULTADOS...")
+    
+    import time
+    import tempfile
+    from sistema.cache import CacheResultados, clave_contenido
+    from sistema.catalogos import version_catalogos
+    
+    clave = clave_contenido('simular', version_catalogos(), {'dias': 3, 'semilla': 1})
+    assert clave == clave_contenido('simular', version_catalogos(), {'semilla': 1, 'dias': 3}), \
+        "Error: La clave depende del orden de los parámetros"
+    
+    directorio = tempfile.mkdtemp()
+    cache = CacheResultados(ttl=60, directorio=directorio)
+    indicadores = [r['indicadores'] for _, r in simular_periodo(3, semilla=1, nivel_log='ninguno')]
+    assert cache.obtener(clave) is None, "Error: Caché vacía no debe acertar"
+    cache.guardar(clave, indicadores)
+    assert cache.obtener(clave) == indicadores, "Error: Valor distinto en memoria"
+    
+    # Otro proceso (otra instancia) lo encuentra en disco
+    otra = CacheResultados(ttl=60, directorio=directorio)
+    assert otra.obtener(clave) == indicadores, "Error: Valor distinto en disco"
+    assert otra.estadisticas()['aciertos_disco'] == 1, "Error: Contador de disco incorrecto"
+    
+    # Con TTL vencido no hay acierto en ningún nivel
+    vencida = CacheResultados(ttl=0.01, directorio=tempfile.mkdtemp())
+    vencida.guardar(clave, indicadores)
+    time.sleep(0.02)
+    assert vencida.obtener(clave) is None, "Error: Entrada vencida devuelta"
+    
+    stats = cache.estadisticas()
+    print(f"✅ Aciertos {stats['aciertos_memoria']}, fallos {stats['fallos']}, catálogos {version_catalogos()}")
+    
+    return stats
+
 def test_indicadores(pedidos_dia1, resultados_picking, resultados_transporte):
     """Probar el cálculo de indicadores"""
     print("\n📈 PROBANDO INDICADORES...")
@@ -151,6 +812,76 @@ def test_indicadores(pedidos_dia1, resultados_picking, resultados_transporte):
     
     return indicadores
 
+def test_acumulador_indicadores():
+    """Probar el acumulador incremental de indicadores"""
+    print("\n➕ PROBANDO ACUMULADOR DE INDICADORES...")
+    
+    import statistics
+    from sistema import AcumuladorIndicadores, calcular_indicadores_acumulados
+    
+    acumulador = AcumuladorIndicadores()
+    historial = []
+    for _, resultado in simular_periodo(10, semilla=4, nivel_log='ninguno'):
+        acumulador.agregar_dia(resultado['indicadores'], resultado['pedidos'])
+        historial.append(resultado['indicadores'])
+    
+    assert acumulador.acumulados() == calcular_indicadores_acumulados(historial), \
+        "Error: El acumulador no coincide con el historial"
+    otif = [ind['OTIF'] for ind in historial]
+    assert abs(acumulador.estadisticas('OTIF')['std'] - statistics.stdev(otif)) < 1e-9, "Error: Desviación incorrecta"
+    
+    # Se guarda y restaura como JSON sin perder nada
+    restaurado = AcumuladorIndicadores.desde_dict(acumulador.a_dict())
+    assert restaurado.acumulados() == acumulador.acumulados(), "Error: Acumulador restaurado distinto"
+    assert restaurado.top_clientes(3) == acumulador.top_clientes(3), "Error: Ranking restaurado distinto"
+    
+    # El top mantenido al sumar coincide con ordenar toda la demanda (también con empates)
+    import heapq
+    import random
+    from sistema.indicadores import RankingDemanda
+    rnd = random.Random(3)
+    ranking = RankingDemanda(tamano=5)
+    for _ in range(2000):
+        ranking.sumar(f"S{rnd.randrange(60)}", rnd.choice((0, 1, 2, 5)))
+    assert ranking.mejores(5) == heapq.nlargest(5, ranking.totales.items(), key=lambda item: item[1]), \
+        "Error: Top incremental distinto del ranking completo"
+    
+    cliente, unidades = acumulador.top_clientes(1)[0]
+    print(f"✅ {acumulador.dias} días acumulados, cliente top {cliente} ({unidades} unds)")
+    
+    return acumulador
+
+def test_ventanas_percentiles():
+    """Probar las ventanas móviles y los percentiles P²"""
+    print("\n📉 PROBANDO VENTANAS MÓVILES Y PERCENTILES...")
+    
+    import random
+    from sistema import AcumuladorIndicadores
+    from sistema.indicadores import CuantilP2
+    
+    historial = [r['indicadores'] for _, r in simular_periodo(40, 900, semilla=3, nivel_log='ninguno')]
+    acumulador = AcumuladorIndicadores()
+    for ind in historial:
+        acumulador.agregar_dia(ind)
+    
+    # La ventana de 7 días pondera por pedidos, igual que el cálculo directo
+    ultimos = historial[-7:]
+    otif_7d = sum(i['Pedidos_Procesados'] for i in ultimos) / sum(i['Pedidos_Totales'] for i in ultimos) * 100
+    assert abs(acumulador.ventanas_moviles()['OTIF_7d'] - otif_7d) < 1e-9, "Error: Ventana móvil incorrecta"
+    
+    # P² se acerca al percentil exacto con muchas observaciones
+    rnd = random.Random(1)
+    valores = [rnd.gauss(90, 5) for _ in range(20000)]
+    cuantil = CuantilP2(95)
+    for v in valores:
+        cuantil.agregar(v)
+    exacto = sorted(valores)[int(0.95 * (len(valores) - 1))]
+    assert abs(cuantil.valor() - exacto) < 0.5, "Error: Percentil P² muy alejado"
+    
+    print(f"✅ OTIF 7d {otif_7d:.1f}%, P95 aproximado {cuantil.valor():.2f} vs exacto {exacto:.2f}")
+    
+    return acumulador
+
 def test_alertas(indicadores):
     """Probar el sistema de alertas"""
     print("\n🚨 PROBANDO ALERTAS...")
@@ -165,6 +896,34 @@ def test_alertas(indicadores):
     
     return alertas
 
+def test_motor_alertas():
+    """Probar el motor de reglas de alerta en lote"""
+    print("\n🧭 PROBANDO MOTOR DE ALERTAS...")
+    
+    motor = MotorAlertas([
+        {'id': 'otif', 'metrica': 'OTIF', 'comparador': '<', 'umbral': 90,
+         'severidad': 'CRÍTICA', 'dias_consecutivos': 2, 'histeresis': 3},
+        {'id': 'zona', 'metrica': 'Fill_Rate', 'comparador': '<', 'umbral': 90,
+         'severidad': 'IMPORTANTE', 'ambito': 'zona'}
+    ])
+    serie = [(95, 80), (85, 85), (85, 95), (92, 80), (94, 99), (80, 99), (80, 99)]
+    diarios = [{'OTIF': otif, 'Por_Zona': {'Norte': {'Fill_Rate': fill}, 'Sur': {'Fill_Rate': 99}}}
+               for otif, fill in serie]
+    episodios = motor.evaluar_lote(diarios)
+    
+    otif = [(e['dia_inicio'], e['dia_fin']) for e in episodios if e['regla'] == 'otif']
+    # Se enciende al 2º día seguido bajo 90 y no se apaga hasta superar 93
+    assert otif == [(3, 4), (7, 7)], f"Error: Episodios OTIF inesperados {otif}"
+    zonas = [(e['ambito'], e['dia_inicio'], e['dias']) for e in episodios if e['regla'] == 'zona']
+    assert zonas == [('Norte', 1, 2), ('Norte', 4, 1)], f"Error: Episodios por zona inesperados {zonas}"
+    assert episodios[-1]['vigente'], "Error: La última alerta OTIF debería seguir vigente"
+    
+    # Un día real trae el desglose por zona y SKU
+    _, resultado = next(simular_periodo(1, semilla=3))
+    assert resultado['indicadores']['Por_SKU'], "Error: Faltan indicadores por SKU"
+    
+    print(f"✅ {len(episodios)} episodios de alerta en {len(serie)} días")
+
 def test_reporte(pedidos, indicadores, alertas):
     """Probar la generación de reportes"""
     print("\n📄 PROBANDO REPORTE...")
@@ -179,6 +938,144 @@ def test_reporte(pedidos, indicadores, alertas):
     
     return reporte
 
+def test_exportacion_columnar():
+    """Probar la exportación columnar por bloques y su relectura"""
+    print("\n🗜️ PROBANDO EXPORTACIÓN COLUMNAR...")
+    import tempfile
+    from sistema.exportacion import leer_manifiesto
+    
+    dias = list(simular_periodo(4, semilla=11))
+    lineas = sum(len(p['productos']) for _, r in dias for p in r['pedidos'].values())
+    
+    with tempfile.TemporaryDirectory() as carpeta:
+        filas = exportar_columnar(carpeta, iter(dias), filas_por_bloque=40)
+        assert filas['pedidos'] == lineas, "Error: Faltan líneas de pedido en la exportación"
+        assert filas['indicadores'] == 4, "Error: Se esperaba una fila de indicadores por día"
+        
+        tabla = leer_columnar(carpeta, 'pedidos')
+        dia_key, resultado = dias[0]
+        pedido_id, pedido = next(iter(resultado['pedidos'].items()))
+        primera = (tabla['Dia'][0], tabla['Pedido_ID'][0], tabla['Cliente'][0], tabla['Zona'][0])
+        assert primera == (dia_key, pedido_id, pedido['cliente'], pedido['zona']), \
+            "Error: Categorías mal decodificadas"
+        assert int(tabla['Cantidad'].sum()) == sum(
+            sum(p['productos'].values()) for _, r in dias for p in r['pedidos'].values()
+        ), "Error: Cantidades exportadas distintas"
+        
+        # Una exportación que falla a medias no toca la anterior del mismo directorio
+        def dias_con_falla():
+            yield dias[0]
+            raise RuntimeError("falla simulada")
+        try:
+            exportar_columnar(carpeta, dias_con_falla(), filas_por_bloque=1)
+            assert False, "Error: Se esperaba la falla simulada"
+        except RuntimeError:
+            pass
+        assert len(leer_columnar(carpeta, 'pedidos')['Cantidad']) == lineas, \
+            "Error: La exportación fallida dañó la anterior"
+        
+        # Al reexportar se reemplazan los bloques anteriores
+        exportar_columnar(carpeta, iter(dias), filas_por_bloque=40)
+        bloques = sorted(f for f in os.listdir(carpeta) if f.endswith('.npz'))
+        manifiesto = leer_manifiesto(carpeta)
+        assert bloques == sorted(b for datos in manifiesto['tablas'].values() for b in datos['bloques']), \
+            "Error: Quedaron bloques de otra exportación"
+        
+        # El CSV informa los errores de escritura en lugar de ignorarlos
+        pedidos = {d: r['pedidos'] for d, r in dias}
+        assert exportar_datos_csv(pedidos, None, os.path.join(carpeta, 'pedidos.csv')) == lineas, \
+            "Error: Líneas CSV incorrectas"
+        try:
+            exportar_datos_csv(pedidos, None, os.path.join(carpeta, 'no_existe', 'pedidos.csv'))
+            assert False, "Error: Se esperaba ErrorExportacion"
+        except ErrorExportacion:
+            pass
+    
+    print(f"✅ {lineas} líneas exportadas y releídas")
+
+def test_montecarlo():
+    """Probar el motor de réplicas Monte Carlo"""
+    print("\n🎰 PROBANDO RÉPLICAS MONTE CARLO...")
+    
+    resultado = replicar_simulacion(6, 3, semilla=7, max_procesos=1)
+    
+    assert resultado['n_replicas'] == 6, "Error: Número de réplicas incorrecto"
+    otif = resultado['diario']['OTIF']
+    assert len(otif['media']) == 3, "Error: Se esperaba una media por día"
+    assert all(otif['p5'][d] <= otif['p95'][d] for d in range(3)), "Error: Percentiles desordenados"
+    assert 'OTIF_Acumulado' in resultado['acumulado'], "Error: Falta OTIF acumulado"
+    
+    # Misma semilla => mismas bandas, sin importar la partición en bloques
+    assert resultado == replicar_simulacion(6, 3, semilla=7, max_procesos=1), "Error: Réplicas no reproducibles"
+    
+    print(f"✅ OTIF acumulado medio: {resultado['acumulado']['OTIF_Acumulado']['media']:.1f}%")
+    
+    return resultado
+
+def test_historial():
+    """Probar la reproducción de historiales CSV y columnares día a día"""
+    print("\n📜 PROBANDO REPRODUCCIÓN DE HISTORIAL...")
+    import csv
+    import tempfile
+    
+    dias = list(simular_periodo(3, semilla=5))
+    pedidos = {d: r['pedidos'] for d, r in dias}
+    
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, 'pedidos.csv')
+        exportar_datos_csv(pedidos, None, ruta)
+        exportar_columnar(os.path.join(carpeta, 'columnar'), iter(dias), filas_por_bloque=16)
+        
+        # CSV y columnar devuelven los mismos pedidos que se exportaron
+        for origen in (ruta, os.path.join(carpeta, 'columnar')):
+            leidos = dict(HistorialPedidos(origen))
+            assert list(leidos) == list(pedidos), "Error: Días del historial incorrectos"
+            assert all(leidos[d] == pedidos[d] for d in pedidos), f"Error: Pedidos distintos desde {origen}"
+        
+        # Como pedidos_por_dia da la misma corrida que el diccionario
+        desde_historial = list(simular_periodo(3, semilla=5, pedidos_por_dia=HistorialPedidos(ruta)))
+        assert [r['indicadores'] for _, r in desde_historial] == [r['indicadores'] for _, r in dias], \
+            "Error: La reproducción del historial cambia los resultados"
+        
+        cliente = next(iter(dic_clientes))
+        def escribir(nombre, filas):
+            destino = os.path.join(carpeta, nombre)
+            with open(destino, 'w', newline='', encoding='utf-8') as archivo:
+                escritor = csv.writer(archivo)
+                escritor.writerow(['Dia', 'Pedido_ID', 'Cliente', 'SKU', 'Cantidad'])
+                escritor.writerows(filas)
+            return destino
+        
+        # Un SKU repetido en el pedido se suma
+        sumado = dict(HistorialPedidos(escribir('repetido.csv', [
+            ['Dia_1', 1, cliente, 'P001', 5], ['Dia_1', 1, cliente, 'P001', 7]])))
+        assert sumado['Dia_1']['1']['productos'] == {'P001': 12}, "Error: SKUs repetidos no sumados"
+        
+        # Líneas inválidas: error con su fila, u omitidas y contadas por motivo
+        invalido = escribir('invalido.csv', [
+            ['Dia_1', 1, cliente, 'P001', 5], ['Dia_1', 2, 'NO_EXISTE', 'P001', 5],
+            ['Dia_1', 3, cliente, 'XXX', 5], ['Dia_1', 4, cliente, 'P002', -1]])
+        try:
+            list(HistorialPedidos(invalido))
+            assert False, "Error: Se aceptó un cliente desconocido"
+        except ValueError as e:
+            assert "fila 2" in str(e), "Error: El mensaje no indica la fila"
+        historial = HistorialPedidos(invalido, errores='omitir')
+        assert len(dict(historial)['Dia_1']) == 1, "Error: Se esperaba un solo pedido válido"
+        assert historial.resumen()['lineas_omitidas'] == {
+            'cliente_desconocido': 1, 'sku_desconocido': 1, 'cantidad_invalida': 1
+        }, "Error: Conteo de líneas omitidas incorrecto"
+        
+        # El historial debe venir ordenado por día
+        try:
+            list(HistorialPedidos(escribir('desordenado.csv', [
+                ['Dia_2', 1, cliente, 'P001', 5], ['Dia_1', 2, cliente, 'P001', 5]])))
+            assert False, "Error: Se aceptó un historial desordenado"
+        except ValueError:
+            pass
+    
+    print(f"✅ {sum(len(p) for p in pedidos.values())} pedidos reproducidos desde CSV y columnar")
+
 def main():
     """Ejecutar todas las pruebas"""
     print("🧪 INICIANDO PRUEBAS DEL SISTEMA DE LOGÍSTICA")
@@ -187,15 +1084,37 @@ def main():
     try:
         # Ejecutar pruebas en secuencia
         test_catalogos()
+        test_carga_catalogos()
         pedidos = test_simulacion_demanda()
         pedidos_dia1 = pedidos["Dia_1"]
+        test_demanda_vectorizada()
+        test_reproducibilidad()
         
         resultado_inventario = test_inventario(pedidos_dia1)
+        test_log_inventario(pedidos_dia1)
+        test_politicas()
+        test_tiempos_entrega(pedidos_dia1)
+        test_pronostico()
+        test_perfiles_demanda()
         resultados_picking = test_picking(pedidos_dia1)
+        test_picking_olas()
+        test_almacen_pedidos()
         resultados_transporte = test_transporte(resultados_picking['pedidos_preparados'])
+        test_ruteo_distancia(resultados_picking['pedidos_preparados'])
+        test_flota_limitada()
+        test_backlog()
+        test_trabajos()
+        test_almacen_estado()
+        test_cache_resultados()
         indicadores = test_indicadores(pedidos_dia1, resultados_picking, resultados_transporte)
+        test_acumulador_indicadores()
+        test_ventanas_percentiles()
         alertas = test_alertas(indicadores)
+        test_motor_alertas()
         reporte = test_reporte(pedidos, indicadores, alertas)
+        test_exportacion_columnar()
+        test_historial()
+        test_montecarlo()
         
         print("\n" + "=" * 60)
         print("🎉 ¡TODAS LAS PRUEBAS PASARON EXITOSAMENTE!")